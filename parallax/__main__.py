@@ -56,6 +56,105 @@ if __name__ == "__main__":
         action="store_true",
         help="Enable bundle adjustment feature",
     )
+
+    parser.add_argument(
+        "-r",
+        "--raw_recording",
+        action="store_true",
+        help="Record lossless raw frames with a frame index instead of XVID video",
+    )
+
+    parser.add_argument(
+        "--replay",
+        nargs="+",
+        metavar="PATH",
+        help="Replay raw recordings or video files as cameras",
+    )
+
+    parser.add_argument(
+        "--replay_mode",
+        choices=["realtime", "fast", "step"],
+        default="realtime",
+        help="Replay pacing: original timing, as fast as possible, or single step",
+    )
+
+    parser.add_argument(
+        "--sync",
+        choices=["timestamp", "trigger"],
+        help="Group the frames of all cameras into time-aligned frame sets",
+    )
+
+    parser.add_argument(
+        "--sync_tolerance",
+        type=float,
+        default=20.0,
+        metavar="MS",
+        help="Maximum capture time difference within a frame set in milliseconds",
+    )
+
+    parser.add_argument(
+        "--roi_tracking",
+        action="store_true",
+        help="Narrow the camera acquisition to a region of interest around the tracked probe",
+    )
+
+    parser.add_argument(
+        "--camera_stats",
+        action="store_true",
+        help="Show acquisition health counters (fps, dropped frames, latency) on the screens",
+    )
+
+    parser.add_argument(
+        "--snapshot_format",
+        choices=["png", "tiff", "npy"],
+        default="png",
+        help="Snapshot format: PNG, uncompressed TIFF or raw frames as NPY",
+    )
+
+    parser.add_argument(
+        "--png_compression",
+        type=int,
+        choices=range(10),
+        default=1,
+        metavar="LEVEL",
+        help="PNG compression level of the snapshots from 0 (none) to 9",
+    )
+
+    parser.add_argument(
+        "--burst",
+        type=float,
+        default=0.0,
+        metavar="SECONDS",
+        help="Enable burst captures saving the given time before and after the trigger",
+    )
+
+    parser.add_argument(
+        "--display_fps",
+        type=float,
+        default=8.0,
+        metavar="FPS",
+        help="Refresh rate of the camera screens",
+    )
+
+    parser.add_argument(
+        "--detection_fps",
+        type=float,
+        default=0.0,
+        metavar="FPS",
+        help="Maximum probe detection rate per camera, 0 for every new frame shown",
+    )
+
+    parser.add_argument(
+        "--detection_processes",
+        action="store_true",
+        help="Run the probe detection of each camera in a separate process",
+    )
+
+    parser.add_argument(
+        "--detection_profile",
+        metavar="CSV",
+        help="Save the probe detection stage timings of all cameras to a CSV file on exit",
+    )
     args = parser.parse_args()
 
     # Print a message if running in dummy mode (no hardware interaction)
@@ -64,13 +163,40 @@ if __name__ == "__main__":
     # Print a message if bundle adjustment is enabled
     if args.bundle_adjustment:
         print("\nBundle adjustment feature enabled.")
+    # Print a message if raw recording is enabled
+    if args.raw_recording:
+        print("\nRaw recording enabled.")
+    # Print a message if synchronized acquisition is enabled
+    if args.sync:
+        print(f"\nSynchronized acquisition enabled ({args.sync}).")
+    # Print a message if ROI tracking is enabled
+    if args.roi_tracking:
+        print("\nROI tracking enabled.")
 
     # Set up logging as configured in the setup_logging function
     setup_logging()
 
     # Initialize the Qt application
     app = QApplication([])
-    model = Model(version="V2", bundle_adjustment=args.bundle_adjustment)  # Initialize the data model with version "V2"
+    model = Model(
+        version="V2",
+        bundle_adjustment=args.bundle_adjustment,
+        recording_format="raw" if args.raw_recording else "video",
+        sync_mode=args.sync,
+        sync_tolerance_ms=args.sync_tolerance,
+        roi_tracking=args.roi_tracking,
+        camera_stats=args.camera_stats,
+        snapshot_format=args.snapshot_format,
+        png_compression=args.png_compression,
+        burst_seconds=args.burst,
+        display_fps=args.display_fps,
+        detection_fps=args.detection_fps,
+        detection_processes=args.detection_processes,
+        detection_profile=args.detection_profile,
+    )  # Initialize the data model with version "V2"
+    # Add replay cameras before the main window scans for cameras
+    for path in args.replay or []:
+        model.add_video_source(path, mode=args.replay_mode)
     main_window = MainWindowV2(model, dummy=args.dummy)  # main window
 
     # Show the main window on screen
@@ -0,0 +1,253 @@
+"""
+AsyncFrameWriter hands recorded frames from the camera capture thread to a dedicated
+writer thread through a bounded queue, so that encoding and disk I/O never stall
+acquisition. When the writer falls behind, a configurable policy decides whether the
+oldest queued frame, the newest frame, or the producer (back-pressure) gives way.
+VideoFileSink encodes the frames into a video file on the writer thread.
+"""
+
+import logging
+import threading
+from collections import deque
+
+import cv2
+import numpy as np
+
+# Set logger name
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)
+
+
+class VideoFileSink:
+    """Writes frames to a video file with cv2.VideoWriter."""
+
+    def __init__(self, filename, frame_rate, frame_size, pixelformat=None, fourcc="XVID"):
+        """Open the video file.
+
+        Args:
+            filename (str): Path of the video file.
+            frame_rate (float): Frame rate of the video.
+            frame_size (tuple): Frame size (width, height).
+            pixelformat (str, optional): Pixel format of the raw frames, e.g. "BayerRG8".
+            fourcc (str): FourCC code of the codec. Defaults to "XVID".
+        """
+        self.filename = filename
+        self.pixelformat = pixelformat
+        self.video_output = cv2.VideoWriter(
+            filename,
+            cv2.VideoWriter_fourcc(*fourcc),
+            frame_rate,
+            tuple(frame_size),
+            True,
+        )
+
+    def write(self, frame, frame_id=None, timestamp=None):
+        """Convert the raw frame to a color frame and encode it.
+
+        Args:
+            frame (numpy.ndarray): Raw frame.
+            frame_id (int, optional): Frame ID.
+            timestamp (int, optional): Capture time of the frame in nanoseconds.
+        """
+        if self.pixelformat == "BayerRG8":
+            # Same channel order as debayering for display followed by RGB2BGR
+            frame = cv2.cvtColor(frame, cv2.COLOR_BayerRG2RGB)
+        elif frame.ndim == 2:
+            frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+        else:
+            frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+        self.video_output.write(frame)
+
+    def release(self):
+        """Close the video file."""
+        self.video_output.release()
+
+
+class AsyncFrameWriter:
+    """Writes frames to a sink on a dedicated thread through a bounded queue."""
+
+    POLICIES = ("drop_oldest", "drop_newest", "block")
+
+    def __init__(self, sink, max_queue=8, policy="drop_oldest", block_timeout=1.0, name=""):
+        """Initialize the writer.
+
+        Args:
+            sink (object): Object with write(frame, frame_id, timestamp) and release().
+            max_queue (int): Maximum number of frames waiting to be written. Defaults to 8.
+            policy (str): What to do when the queue is full.
+                "drop_oldest" discards the oldest queued frame,
+                "drop_newest" discards the submitted frame,
+                "block" waits up to block_timeout for space, then drops the submitted frame.
+            block_timeout (float): Maximum wait in seconds for the "block" policy.
+            name (str): Name used for the writer thread and log messages.
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown queue policy '{policy}', expected one of {self.POLICIES}")
+        if max_queue < 1:
+            raise ValueError("AsyncFrameWriter needs a queue size of at least one")
+        self.sink = sink
+        self.max_queue = max_queue
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.name = name
+
+        self.frames_queued = 0
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.write_errors = 0
+
+        self._pending = deque()
+        self._free_buffers = []
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        """Start the writer thread."""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name=f"AsyncFrameWriter-{self.name}", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def is_running(self):
+        """bool: True while the writer accepts frames."""
+        return self._running
+
+    def queue_length(self):
+        """Return the number of frames waiting to be written."""
+        with self._cond:
+            return len(self._pending)
+
+    def get_stats(self):
+        """Return the writer counters.
+
+        Returns:
+            dict: Queued, written and dropped frame counts, write errors and queue length.
+        """
+        with self._cond:
+            return {
+                "queued": self.frames_queued,
+                "written": self.frames_written,
+                "dropped": self.frames_dropped,
+                "errors": self.write_errors,
+                "pending": len(self._pending),
+            }
+
+    def _get_buffer(self, frame):
+        """Take a free buffer matching the frame, or allocate a new one. Caller holds the lock."""
+        while self._free_buffers:
+            buffer = self._free_buffers.pop()
+            if buffer.shape == frame.shape and buffer.dtype == frame.dtype:
+                return buffer
+        return np.empty_like(frame)
+
+    def submit(self, frame, frame_id=None, timestamp=None):
+        """Copy a frame into the queue. Called from the capture thread.
+
+        The frame is copied into a recycled buffer, so the caller may overwrite
+        its own frame memory as soon as this returns.
+
+        Args:
+            frame (numpy.ndarray): Frame to write.
+            frame_id (int, optional): Frame ID.
+            timestamp (int, optional): Capture time of the frame in nanoseconds.
+
+        Returns:
+            bool: True if the frame was queued, False if it was dropped.
+        """
+        with self._cond:
+            if not self._running:
+                return False
+            if len(self._pending) >= self.max_queue:
+                if self.policy == "drop_oldest":
+                    buffer, _, _ = self._pending.popleft()
+                    self._free_buffers.append(buffer)
+                    self.frames_dropped += 1
+                elif self.policy == "block":
+                    self._cond.wait_for(
+                        lambda: len(self._pending) < self.max_queue or not self._running,
+                        timeout=self.block_timeout,
+                    )
+                    if len(self._pending) >= self.max_queue or not self._running:
+                        self.frames_dropped += 1
+                        return False
+                else:
+                    self.frames_dropped += 1
+                    return False
+            buffer = self._get_buffer(frame)
+
+        # The buffer is owned by this call until it is queued
+        np.copyto(buffer, frame)
+
+        with self._cond:
+            if not self._running:
+                # Stopped while copying, the writer thread may already be gone
+                self.frames_dropped += 1
+                return False
+            self._pending.append((buffer, frame_id, timestamp))
+            self.frames_queued += 1
+            self._cond.notify_all()
+        return True
+
+    def _run(self):
+        """Write queued frames until stopped and the queue is empty."""
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or not self._running)
+                if not self._pending:
+                    break
+                buffer, frame_id, timestamp = self._pending.popleft()
+                # Wake up a producer waiting for space
+                self._cond.notify_all()
+
+            try:
+                self.sink.write(buffer, frame_id, timestamp)
+                written = True
+            except Exception as e:
+                logger.error(f"{self.name} failed to write frame {frame_id}: {e}")
+                written = False
+
+            with self._cond:
+                if written:
+                    self.frames_written += 1
+                else:
+                    self.write_errors += 1
+                self._free_buffers.append(buffer)
+
+        try:
+            self.sink.release()
+        except Exception as e:
+            logger.error(f"{self.name} failed to release the sink: {e}")
+
+    def stop(self, drain=True, timeout=None):
+        """Stop accepting frames and wait for the writer thread to finish.
+
+        Args:
+            drain (bool): If True, write all queued frames before stopping.
+                Otherwise queued frames are counted as dropped.
+            timeout (float, optional): Maximum time in seconds to wait for the writer thread.
+
+        Returns:
+            dict: Final writer counters.
+        """
+        with self._cond:
+            self._running = False
+            if not drain:
+                self.frames_dropped += len(self._pending)
+                self._free_buffers.extend(buffer for buffer, _, _ in self._pending)
+                self._pending.clear()
+            self._cond.notify_all()
+
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                logger.warning(f"{self.name} writer thread did not finish in time")
+            else:
+                self._thread = None
+                self._free_buffers = []
+        return self.get_stats()
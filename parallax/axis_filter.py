@@ -6,12 +6,12 @@ the user on the screen.
 """
 
 import logging
-import time
 
-import cv2
 import numpy as np
-from PyQt5.QtCore import QObject, QThread, pyqtSignal
+from PyQt5.QtCore import QObject, pyqtSignal
+from . import overlay as ov
 from .calibration_camera import CalibrationCamera
+from .frame_scheduler import FrameScheduler
 
 # Set logger name
 logger = logging.getLogger(__name__)
@@ -28,64 +28,64 @@ class AxisFilter(QObject):
     name = "None"
     frame_processed = pyqtSignal(object)
     found_coords = pyqtSignal(np.ndarray, np.ndarray, np.ndarray, np.ndarray, tuple, tuple)
+    OVERLAY_LAYER = "axis_filter"
 
     class Worker(QObject):
         """
-        Worker class for processing frames and handling user interactions in a separate thread.
+        Worker class for processing frames on the frame scheduler and handling user interactions.
 
         This class processes frames by displaying reticle coordinates and handles user clicks to select
         the positive x-axis point. It also performs calibration based on selected points.
         """
 
-        finished = pyqtSignal()
         frame_processed = pyqtSignal(object)
         found_coords = pyqtSignal(
             np.ndarray, np.ndarray, np.ndarray, np.ndarray, tuple, tuple
         )
 
-        def __init__(self, name, model):
+        def __init__(self, name, model, overlay):
             """
             Initialize the worker object.
 
             Args:
                 name (str): The name of the camera (e.g., serial number).
                 model: The data model associated with the worker.
+                overlay (OverlayModel): Overlay showing the reticle points.
             """
             QObject.__init__(self)
             self.model = model
+            self.overlay = overlay
             self.name = name
             self.running = False
-            self.new = False
-            self.frame = None
             self.reticle_coords = self.model.get_coords_axis(self.name)
             self.pos_x = None
             self.calibrationCamera = CalibrationCamera(self.name)
 
-        def update_frame(self, frame):
-            """Update the frame to be processed.
+        def process(self, frame):
+            """Update the overlay and emit the frame_processed signal.
 
             Args:
                 frame: The frame to be processed.
             """
-            self.frame = frame
-            self.new = True
+            self.update_overlay()
+            self.frame_processed.emit(frame)
 
-        def process(self):
-            """Process the frame and emit the frame_processed signal."""
+        def update_overlay(self):
+            """Show the reticle points, the axis end points and the positive x-axis point.
+
+            The overlay is only redrawn when the points change.
+            """
+            shapes = []
             if self.reticle_coords is not None:
                 for reticle_coords in self.reticle_coords:
-                    for pt in reticle_coords:
-                        cv2.circle(self.frame, tuple(pt), 4, (155, 155, 50), -1)
-                    first_pt = reticle_coords[0]
-                    last_pt = reticle_coords[-1]
-                    cv2.circle(self.frame, tuple(first_pt), 12, (255, 255, 0), -1)
-                    cv2.circle(self.frame, tuple(last_pt), 12, (255, 255, 0), -1)
+                    shapes.append(ov.points(reticle_coords, 4, (155, 155, 50)))
+                    end_pts = [reticle_coords[0], reticle_coords[-1]]
+                    shapes.append(ov.points(end_pts, 12, (255, 255, 0)))
 
             pos_x = self.model.get_pos_x(self.name)
             if pos_x is not None:
-                cv2.circle(self.frame, pos_x, 15, (255, 0, 0), -1)
-
-            self.frame_processed.emit(self.frame)
+                shapes.append(ov.points([pos_x], 15, (255, 0, 0)))
+            self.overlay.set_layer(AxisFilter.OVERLAY_LAYER, *shapes)
             
         def squared_distance(self, p1, p2):
             """Calculate the squared distance between two points.
@@ -169,15 +169,14 @@ class AxisFilter(QObject):
             """Start the worker running."""
             self.running = True
 
-        def run(self):
-            """Run the worker thread."""
-            while self.running:
-                if self.new:
-                    self.process()
-                    self.new = False
-                time.sleep(0.001)
-            self.finished.emit()
-            logger.debug(f"thread finished {self.name}")
+        def run(self, frame):
+            """Process one frame. Called by the frame scheduler.
+
+            Args:
+                frame: The frame to be processed.
+            """
+            if self.running:
+                self.process(frame)
 
         def set_name(self, name):
             """Set name as camera serial number."""
@@ -185,68 +184,63 @@ class AxisFilter(QObject):
             self.reticle_coords = self.model.get_coords_axis(self.name)
             self.pos_x = self.model.get_pos_x(self.name)
 
-    def __init__(self, model, camera_name):
-        """Initialize the filter object."""
+    def __init__(self, model, camera_name, overlay=None, scheduler=None):
+        """Initialize the filter object.
+
+        Args:
+            model: The data model.
+            camera_name (str): The name of the camera (e.g., serial number).
+            overlay (OverlayModel, optional): Overlay of the screen showing the camera.
+            scheduler (FrameScheduler, optional): Scheduler running the worker.
+                Defaults to the shared scheduler.
+        """
         logger.debug("Init axis filter manager")
         super().__init__()
         self.model = model
+        self.overlay = overlay if overlay is not None else ov.OverlayModel()
+        self.scheduler = scheduler if scheduler is not None else FrameScheduler.shared()
         self.worker = None
+        self.job = None
         self.name = camera_name
-        self.thread = None
-        self.threadDeleted = False
-
-    def init_thread(self):
-        """Initialize or reinitialize the worker and thread"""
-        if self.thread is not None:
-            self.clean()  # Clean up existing thread and worker before reinitializing 
-        self.thread = QThread()
-        self.worker = self.Worker(self.name, self.model)
-        self.worker.moveToThread(self.thread)
-
-        self.thread.started.connect(self.worker.run)
-        self.thread.finished.connect(self.thread.deleteLater)
-        self.thread.destroyed.connect(self.onThreadDestroyed)
-        self.threadDeleted = False
 
+    def init_job(self):
+        """Initialize or reinitialize the worker and its scheduler job."""
+        if self.job is not None:
+            self.clean()  # Clean up existing job and worker before reinitializing
+        self.worker = self.Worker(self.name, self.model, self.overlay)
         self.worker.frame_processed.connect(self.frame_processed.emit)
         self.worker.found_coords.connect(self.found_coords)
-        self.worker.finished.connect(self.thread.quit)
-        self.worker.finished.connect(self.worker.deleteLater)
-        self.worker.destroyed.connect(self.onWorkerDestroyed)
+        self.job = self.scheduler.add_job(
+            self.worker.run, FrameScheduler.PRIORITY_DISPLAY, f"{self.name} axis filter"
+        )
         logger.debug(f"init camera name: {self.name}")
 
-    def process(self, frame):
+    def process(self, frame, frame_id=None):
         """Process the frame using the worker.
 
         Args:
             frame: The frame to be processed.
+            frame_id (int, optional): Camera frame ID. A frame is only processed once.
         """
-        if self.worker is not None:
-            self.worker.update_frame(frame)
+        if self.job is not None:
+            self.job.submit(frame, frame_id=frame_id)
 
     def start(self):
-        """Start the filter by reinitializing and starting the worker and thread."""
-        logger.debug(f" {self.name} Starting thread")
-        self.init_thread()  # Reinitialize and start the worker and thread
+        """Start the filter by reinitializing and starting the worker and its job."""
+        logger.debug(f" {self.name} Starting job")
+        self.init_job()  # Reinitialize and start the worker and job
         self.worker.start_running()
-        self.thread.start()
 
     def stop(self):
         """Stop the filter by stopping the worker."""
-        logger.debug(f" {self.name} Stopping thread")
+        logger.debug(f" {self.name} Stopping job")
         if self.worker is not None:
             self.worker.reset_pos_x()
             self.worker.stop_running()
-
-    def onWorkerDestroyed(self):
-        """Cleanup after worker finishes."""
-        logger.debug(f"{self.name} worker destroyed")
-
-    def onThreadDestroyed(self):
-        """Flag if thread is deleted"""
-        logger.debug(f"{self.name} thread destroyed")
-        self.threadDeleted = True
-        self.thread = None
+        if self.job is not None:
+            self.job.remove(wait=True)  # A restarted worker must not overlap the running one
+            self.job = None
+        self.overlay.clear(self.OVERLAY_LAYER)
 
     def set_name(self, camera_name):
         """Set camera name."""
@@ -260,27 +254,25 @@ class AxisFilter(QObject):
         if self.worker is not None:
             self.worker.clicked_position(pt)
 
-    def clean(self):
-        """Safely clean up the reticle detection manager."""
-        logger.debug(f"{self.name} Cleaning the thread")
+    def clean(self, wait=True):
+        """Safely clean up the axis filter.
+
+        Args:
+            wait (bool): Whether to wait for a running frame to finish. Must be False
+                when called from a scheduler thread, e.g. by the garbage collector.
+        """
+        logger.debug(f"{self.name} Cleaning the job")
         if self.worker is not None:
             self.worker.stop_running()  # Signal the worker to stop
-        
-        if self.thread and not self.threadDeleted and self.thread.isRunning():
-            self.thread.quit()  # Ask the thread to quit
-            self.thread.wait()  # Wait for the thread to finish
-        self.thread = None  # Clear the reference to the thread
-        self.worker = None  # Clear the reference to the worker
-        self.threadDeleted = True
-        logger.debug(f"{self.name} Cleaned the thread")
 
-    def onThreadDestroyed(self):
-        """Flag if thread is deleted"""
-        self.threadDeleted = True
-        self.thread = None
+        if self.job is not None:
+            self.job.remove(wait=wait)  # Wait for a running frame to finish
+        self.job = None  # Clear the reference to the job
+        self.worker = None  # Clear the reference to the worker
+        logger.debug(f"{self.name} Cleaned the job")
 
     def __del__(self):
         """Destructor for the filter object."""
-        self.clean()
+        self.clean(wait=False)  # May run on any thread
 
 
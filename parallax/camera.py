@@ -2,7 +2,6 @@
 PySpinCamera: A class to interface with cameras using the PySpin library.
 """
 
-import datetime
 import logging
 import os
 import threading
@@ -11,6 +10,13 @@ import time
 import cv2
 import numpy as np
 
+from .async_frame_writer import AsyncFrameWriter, VideoFileSink
+from .camera_stats import CameraStats
+from .frame_buffer import FrameRingBuffer
+from .frame_products import FrameProductsCache
+from .raw_recording import RAW_RECORDING_EXTENSION, RawRecordingSink
+from .timestamps import NS_PER_SECOND, DeviceClockMapper, format_timestamp_ns
+
 # Initialize the logger
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.WARNING)
@@ -59,6 +65,11 @@ class PySpinCamera:
     pyspin_cameras = None
     pyspin_instance = None
     cameras = []
+    # Number of preallocated frame slots kept per camera
+    frame_buffer_slots = 4
+    # Bounded queue between the capture thread and the recording writer thread
+    recording_queue_size = 8
+    recording_queue_policy = "drop_oldest"
 
     @classmethod
     def list_cameras(cls):
@@ -106,23 +117,11 @@ class PySpinCamera:
         Parameters:
         - camera_pyspin: The underlying PySpin camera object.
         """
-        self.running = False
         self.camera = camera_pyspin
         self.tldnm = self.camera.GetTLDeviceNodeMap()
         self.camera.Init()
         self.node_map = self.camera.GetNodeMap()
-
-        self.last_image = None
-        self.last_image_filled = threading.Event()
-        self.last_image_cleared = threading.Event()
-
-        self.video_output = None
-        self.video_recording_on = threading.Event()
-        self.video_recording_idle = threading.Event()
-        self.height = None
-        self.width = None
-        self.channels = None
-        self.frame_rate = None
+        self._init_acquisition_state()
 
         self.device_model = self.camera.DeviceModelName()
         self.device_color_type = None
@@ -233,6 +232,7 @@ class PySpinCamera:
                 "BayerRG8"
             )
             node_pixelformat.SetIntValue(entry_pixelformat_bayerRG8.GetValue())
+        self.frame_products.pixelformat = self.pixelformat
 
         self.camera_info()
         
@@ -376,6 +376,214 @@ class PySpinCamera:
 
         return initial_val  # Return the initial value if no change is detected
 
+    def set_software_trigger(self, enable=True):
+        """
+        Enables or disables software triggering. Must be called while acquisition is stopped.
+        With software triggering enabled, a frame is captured on each call to
+        execute_software_trigger(), so that several cameras expose at the same time.
+
+        Args:
+        - enable (bool): Whether to enable software triggering.
+
+        Returns:
+        - bool: True if the trigger mode was applied.
+        """
+        try:
+            node_trigger_mode = PySpin.CEnumerationPtr(self.node_map.GetNode("TriggerMode"))
+            # The trigger source can only be changed while the trigger mode is off
+            node_trigger_mode.SetIntValue(node_trigger_mode.GetEntryByName("Off").GetValue())
+            if enable:
+                node_trigger_selector = PySpin.CEnumerationPtr(
+                    self.node_map.GetNode("TriggerSelector")
+                )
+                node_trigger_selector.SetIntValue(
+                    node_trigger_selector.GetEntryByName("FrameStart").GetValue()
+                )
+                node_trigger_source = PySpin.CEnumerationPtr(
+                    self.node_map.GetNode("TriggerSource")
+                )
+                node_trigger_source.SetIntValue(
+                    node_trigger_source.GetEntryByName("Software").GetValue()
+                )
+                node_trigger_mode.SetIntValue(
+                    node_trigger_mode.GetEntryByName("On").GetValue()
+                )
+            self.node_trigger_software = PySpin.CCommandPtr(
+                self.node_map.GetNode("TriggerSoftware")
+            )
+        except PySpin.SpinnakerException as e:
+            logger.error(f"An error occurred while setting the trigger mode: {e}")
+            return False
+        self.software_trigger_enabled = enable
+        return True
+
+    def execute_software_trigger(self):
+        """
+        Triggers the capture of a frame when software triggering is enabled.
+        """
+        if not self.software_trigger_enabled:
+            return
+        try:
+            self.node_trigger_software.Execute()
+        except PySpin.SpinnakerException as e:
+            logger.error(f"{self.name(sn_only=True)} software trigger failed: {e}")
+
+    def request_roi(self, roi):
+        """
+        Requests a new region of interest. The ROI is applied by the capture thread
+        between two frames.
+
+        Args:
+        - roi (tuple): (offset_x, offset_y, width, height) in full-frame pixels,
+          or None for the full frame.
+        """
+        with self._roi_lock:
+            self._pending_roi = roi if roi is not None else ()
+
+    def clear_roi(self):
+        """
+        Requests the full frame.
+        """
+        self.request_roi(None)
+
+    @staticmethod
+    def _aligned(node, value):
+        """
+        Aligns a value to the increment of an integer node and clamps it to its range.
+
+        Args:
+        - node: PySpin integer node.
+        - value (int): Requested value.
+
+        Returns:
+        - int: Value accepted by the node.
+        """
+        inc = node.GetInc()
+        value = max(node.GetMin(), value - value % inc)
+        return min(value, node.GetMax())
+
+    def _set_roi_nodes(self, roi):
+        """
+        Writes the ROI into the Width, Height, OffsetX and OffsetY nodes.
+        The offsets are reset first, so that the new size is always valid.
+
+        Args:
+        - roi (tuple): (offset_x, offset_y, width, height), or None for the full frame.
+
+        Returns:
+        - tuple: ROI applied by the camera after alignment to the node increments,
+          or None for the full frame.
+        """
+        nodes = {
+            name: PySpin.CIntegerPtr(self.node_map.GetNode(name))
+            for name in ("OffsetX", "OffsetY", "Width", "Height")
+        }
+        if roi is None:
+            width_max = PySpin.CIntegerPtr(self.node_map.GetNode("WidthMax")).GetValue()
+            height_max = PySpin.CIntegerPtr(self.node_map.GetNode("HeightMax")).GetValue()
+            roi = (0, 0, width_max, height_max)
+            full_frame = True
+        else:
+            full_frame = False
+
+        nodes["OffsetX"].SetValue(0)
+        nodes["OffsetY"].SetValue(0)
+        nodes["Width"].SetValue(self._aligned(nodes["Width"], roi[2]))
+        nodes["Height"].SetValue(self._aligned(nodes["Height"], roi[3]))
+        # The offset range depends on the size set above
+        nodes["OffsetX"].SetValue(self._aligned(nodes["OffsetX"], roi[0]))
+        nodes["OffsetY"].SetValue(self._aligned(nodes["OffsetY"], roi[1]))
+        if full_frame:
+            return None
+        return tuple(
+            nodes[name].GetValue() for name in ("OffsetX", "OffsetY", "Width", "Height")
+        )
+
+    def _apply_pending_roi(self):
+        """
+        Applies the requested ROI. If only the offsets change, they are updated while
+        acquiring. A new size needs the acquisition to be restarted.
+        """
+        with self._roi_lock:
+            roi, self._pending_roi = self._pending_roi, None
+        if roi is None:
+            return
+        roi = roi or None
+        if roi == self.roi:
+            return
+
+        try:
+            if roi is not None and self.roi is not None and roi[2:] == self.roi[2:]:
+                node_offset_x = PySpin.CIntegerPtr(self.node_map.GetNode("OffsetX"))
+                node_offset_y = PySpin.CIntegerPtr(self.node_map.GetNode("OffsetY"))
+                node_offset_x.SetValue(self._aligned(node_offset_x, roi[0]))
+                node_offset_y.SetValue(self._aligned(node_offset_y, roi[1]))
+                roi = (node_offset_x.GetValue(), node_offset_y.GetValue()) + roi[2:]
+            else:
+                self.camera.EndAcquisition()
+                try:
+                    roi = self._set_roi_nodes(roi)
+                finally:
+                    self.camera.BeginAcquisition()
+        except PySpin.SpinnakerException as e:
+            logger.warning(f"{self.name(sn_only=True)} failed to set ROI {roi}: {e}")
+            return
+        logger.debug(f"{self.name(sn_only=True)} ROI: {roi}")
+        self.roi = roi
+
+    def _to_full_frame(self, frame, offset_x, offset_y):
+        """
+        Pastes an ROI frame into the full-size canvas. Pixels outside the ROI keep
+        the content of the last frame that covered them.
+
+        Args:
+        - frame (numpy.ndarray): ROI frame.
+        - offset_x (int), offset_y (int): Position of the ROI in the full frame.
+
+        Returns:
+        - numpy.ndarray: Full-size frame.
+        """
+        if self._roi_canvas is None or self._roi_canvas.dtype != frame.dtype:
+            self._roi_canvas = np.zeros((self.height, self.width), dtype=frame.dtype)
+        height, width = frame.shape[:2]
+        self._roi_canvas[offset_y:offset_y + height, offset_x:offset_x + width] = frame
+        return self._roi_canvas
+
+    def _init_acquisition_state(self):
+        """
+        Initialize the frame buffers, counters, ROI and recording state shared by
+        all cameras acquiring through this class, including replay cameras.
+        """
+        self.running = False
+        self.frame_buffer = FrameRingBuffer(n_slots=self.frame_buffer_slots)
+        self.frame_products = FrameProductsCache(self.frame_buffer)
+        self.last_capture_time = None
+        self.last_image_filled = threading.Event()
+        self.last_image_cleared = threading.Event()
+        # Maps the camera timestamp counter onto the host clock
+        self.device_clock = DeviceClockMapper()
+        # Whether the camera supports timestamp latching, None until first checked
+        self.timestamp_latch_supported = None
+        self.software_trigger_enabled = False
+        # Acquisition health counters
+        self.stats = CameraStats()
+        # Region of interest (offset_x, offset_y, width, height), None for the full frame.
+        # ROI frames are pasted into a full-size canvas, so that consumers always
+        # receive full-frame coordinates.
+        self.roi = None
+        self._pending_roi = None
+        self._roi_lock = threading.Lock()
+        self._roi_canvas = None
+        # Rolling frame history for burst captures, see enable_frame_history()
+        self.frame_history = None
+
+        self.video_writer = None
+        self.video_recording_on = threading.Event()
+        self.height = None
+        self.width = None
+        self.channels = None
+        self.frame_rate = None
+
     def name(self, sn_only=False):
         """
         Retrieves the name and serial number of the camera.
@@ -421,6 +629,7 @@ class PySpinCamera:
         # Begin Acquisition: Image acquisition must be ended when no more images are needed.
         self.camera.BeginAcquisition()
         print(f"Begin Single Frame Acquisition {self.name(sn_only=True)} ")
+        self._latch_timestamp()
         self.capture_thread = threading.Thread(
             target=self.capture, daemon=False
         )
@@ -431,7 +640,6 @@ class PySpinCamera:
         self.last_image_cleared.wait()
         self.capture_thread.join()
         self.camera.EndAcquisition()
-        self.last_image = None
         self.last_image_cleared.clear()
         self.last_image_filled.clear()
 
@@ -459,6 +667,7 @@ class PySpinCamera:
             # Begin Acquisition: Image acquisition must be ended when no more images are needed.
             self.camera.BeginAcquisition()
             logger.debug(f"BeginAcquisition {self.name(sn_only=True)} ")
+            self._latch_timestamp()
             self.running = True
             self.capture_thread = threading.Thread(
                 target=self.capture_loop, daemon=True
@@ -479,7 +688,10 @@ class PySpinCamera:
     def capture(self):
         """
         Captures an image and checks for its completeness.
-        If video recording is enabled, writes the image to the video file.
+        The image data is copied into the next slot of the frame ring buffer
+        and the camera buffer is released right away.
+        If video recording is enabled, hands the raw image to the recording
+        writer thread.
 
         *** NOTES ***
         Capturing an image houses images on the camera buffer.
@@ -489,36 +701,138 @@ class PySpinCamera:
         causing the camera to hang.
         Images can also be released manually by calling Release().
         """
-        # Timestamp for the current capture
-        ts = time.time()
-        self.last_capture_time = ts
+        if self._pending_roi is not None:
+            self._apply_pending_roi()
+
+        # Host timestamp, used if the camera timestamp is not available
+        host_ts = time.time_ns()
 
         # Retrieve the next image from the camera
-        image = self.camera.GetNextImage(1000)
+        try:
+            image = self.camera.GetNextImage(1000)
+        except PySpin.SpinnakerException:
+            if self.software_trigger_enabled:
+                # No software trigger within the timeout
+                return
+            raise
+
+        received_ts = time.time_ns()
+
+        if image.IsIncomplete():
+            # An incomplete image does not complete later, drop it
+            self.stats.add_incomplete()
+            logger.debug(
+                f"{self.name(sn_only=True)} incomplete image, status {image.GetImageStatus()}"
+            )
+            self._release_image(image, received_ts)
+            return
+
+        # Copy into the preallocated slot and hand the buffer back to the camera
+        ts = self._get_image_timestamp(image, host_ts)
+        frame = image.GetNDArray()
+        if self.roi is not None:
+            frame = self._to_full_frame(frame, image.GetXOffset(), image.GetYOffset())
+        self._store_frame(frame, ts)
+        self.stats.add_frame(ts, device_frame_id=image.GetFrameID())
+        self._release_image(image, received_ts)
+
+    def _release_image(self, image, received_ts):
+        """
+        Hands an image buffer back to the camera and counts late or failed releases.
+
+        Args:
+        - image: PySpin image.
+        - received_ts (int): Host time in ns when the image was received.
+        """
+        try:
+            image.Release()
+        except PySpin.SpinnakerException:
+            print("Spinnaker Exception: Couldn't release image")
+            self.stats.add_release(time.time_ns() - received_ts, failed=True)
+            return
+        self.stats.add_release(time.time_ns() - received_ts)
+
+    def _latch_timestamp(self):
+        """
+        Latches the camera timestamp counter and stores its offset to the host clock.
+        The host time is taken as the midpoint around the latch command.
 
-        while image.IsIncomplete():
-            time.sleep(0.001)
+        Returns:
+        - bool: True if the camera supports timestamp latching.
+        """
+        if self.timestamp_latch_supported is False:
+            return False  # Checked once, the nodes are not looked up for every frame
+        try:
+            node_latch = PySpin.CCommandPtr(self.node_map.GetNode("TimestampLatch"))
+            node_latch_value = PySpin.CIntegerPtr(
+                self.node_map.GetNode("TimestampLatchValue")
+            )
+            if not (
+                PySpin.IsAvailable(node_latch)
+                and PySpin.IsWritable(node_latch)
+                and PySpin.IsAvailable(node_latch_value)
+                and PySpin.IsReadable(node_latch_value)
+            ):
+                self.timestamp_latch_supported = False
+                self.device_clock.invalidate()
+                return False
+            host_before = time.time_ns()
+            node_latch.Execute()
+            host_after = time.time_ns()
+            device_ts = node_latch_value.GetValue()
+        except PySpin.SpinnakerException as e:
+            logger.warning(f"{self.name(sn_only=True)} timestamp latch failed: {e}")
+            self.device_clock.invalidate()
+            return False
+
+        self.timestamp_latch_supported = True
+        self.device_clock.update(device_ts, (host_before + host_after) // 2)
+        return True
+
+    def _get_image_timestamp(self, image, host_ts):
+        """
+        Returns the capture time of an image on the host clock.
 
-        # Release the previous image from the buffer if it exists
-        if self.last_image is not None:
-            try:
-                self.last_image.Release()
-            except PySpin.SpinnakerException:
-                print("Spinnaker Exception: Couldn't release last image")
+        Args:
+        - image: PySpin image.
+        - host_ts (int): Host time in ns taken before GetNextImage.
 
-        # Update the last captured image reference
-        self.last_image = image
-        self.last_image_filled.set()
+        Returns:
+        - int: Camera timestamp mapped to the host clock in ns, or host_ts if
+          the camera does not support timestamp latching.
+        """
+        if self.device_clock.needs_update(host_ts) and not self._latch_timestamp():
+            return host_ts
+        try:
+            return self.device_clock.to_host(image.GetTimeStamp())
+        except PySpin.SpinnakerException:
+            return host_ts
 
-        # Record the image if video recording is active
-        if self.video_recording_on.is_set():
-            self.video_recording_idle.clear()
+    def _store_frame(self, frame, ts):
+        """
+        Copies a raw frame into the frame ring buffer, publishes it as the last
+        captured image and queues it for recording if recording is active.
 
-            frame = self.get_last_image_data()
-            frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+        Args:
+        - frame (numpy.ndarray): Raw frame.
+        - ts (int): Capture time of the frame in ns.
 
-            self.video_output.write(frame)
-            self.video_recording_idle.set()
+        Returns:
+        - int: Frame ID of the stored frame.
+        """
+        frame_id = self.frame_buffer.write(frame, timestamp=ts)
+        if self.frame_history is not None:
+            self.frame_history.write(frame, timestamp=ts)
+        self.last_capture_time = ts
+        self.last_image_filled.set()
+
+        # Queue the raw image if video recording is active.
+        # Debayering and encoding run on the writer thread.
+        if self.video_recording_on.is_set():
+            frame = self.frame_buffer.get_frame(frame_id)
+            if frame is not None:
+                self.video_writer.submit(frame, frame_id, ts)
+        return frame_id
 
     def get_last_capture_time(self, millisecond=False):
         """
@@ -527,27 +841,26 @@ class PySpinCamera:
         Returns:
         - str: Timestamp in the format 'YYYYMMDD-HHMMSS'.
         """
-        ts = self.last_capture_time
-        dt = datetime.datetime.fromtimestamp(ts)
-        if millisecond:
-            return "%04d%02d%02d-%02d%02d%02d.%03d" % (
-                dt.year,
-                dt.month,
-                dt.day,
-                dt.hour,
-                dt.minute,
-                dt.second,
-                dt.microsecond // 1000,
-            )
-        else:
-            return "%04d%02d%02d-%02d%02d%02d" % (
-                dt.year,
-                dt.month,
-                dt.day,
-                dt.hour,
-                dt.minute,
-                dt.second,
-            )
+        return format_timestamp_ns(self.last_capture_time, millisecond=millisecond)
+
+    def get_acquisition_stats(self):
+        """
+        Returns the acquisition health counters.
+
+        Returns:
+        - CameraStats: Counters of frames acquired, incomplete, dropped and released
+          late, achieved fps and capture-to-consumer latency.
+        """
+        return self.stats
+
+    def get_last_capture_timestamp(self):
+        """
+        Returns the capture time of the last captured image.
+
+        Returns:
+        - int or None: Timestamp in ns on the host clock.
+        """
+        return self.last_capture_time
 
     def save_last_image(
         self, filepath, isTimestamp=False, custom_name="Microscope_"):
@@ -585,12 +898,72 @@ class PySpinCamera:
 
     def get_last_image(self):
         """
-        Returns the last captured image.
+        Returns the last captured raw (undebayered) image.
 
         Returns:
-        - PySpin.Image: The last captured image.
+        - numpy.ndarray: View of the last captured frame in the ring buffer.
         """
-        return self.last_image
+        _, frame = self.frame_buffer.get_latest()
+        return frame
+
+    def get_last_frame_id(self):
+        """
+        Returns the frame ID of the last captured image.
+
+        Returns:
+        - int or None: Frame ID, None if no frame has been captured yet.
+        """
+        frame_id, _ = self.frame_buffer.get_latest()
+        return frame_id
+
+    def get_frame(self, frame_id):
+        """
+        Returns a zero-copy view of the raw frame with the given frame ID.
+
+        Args:
+        - frame_id (int): Frame ID.
+
+        Returns:
+        - numpy.ndarray or None: Raw frame, None if it was already overwritten.
+        """
+        return self.frame_buffer.get_frame(frame_id)
+
+    def get_latest_frames(self, n):
+        """
+        Returns up to the newest n raw frames, ordered from oldest to newest.
+
+        Args:
+        - n (int): Number of frames.
+
+        Returns:
+        - list: List of (frame_id, numpy.ndarray) tuples.
+        """
+        return self.frame_buffer.get_latest_n(n)
+
+    def get_frames_since(self, frame_id):
+        """
+        Returns the buffered raw frames newer than the given frame ID.
+
+        Args:
+        - frame_id (int or None): Last frame ID seen by the caller.
+
+        Returns:
+        - list: List of (frame_id, numpy.ndarray) tuples.
+        """
+        return self.frame_buffer.get_frames_since(frame_id)
+
+    def get_frame_products(self, frame_id=None):
+        """
+        Returns the cached derived products (BGR, gray, blurred and resized
+        images) of a buffered frame.
+
+        Args:
+        - frame_id (int, optional): Frame ID. Defaults to the last captured frame.
+
+        Returns:
+        - FrameProducts or None: Products, None if the frame is not buffered.
+        """
+        return self.frame_products.get(frame_id)
 
     # Get the last captured image data as a numpy array
     def get_last_image_data(self):
@@ -598,15 +971,24 @@ class PySpinCamera:
         Returns the last captured image data as a numpy array.
         Shape: (height, width, 3) for RGB,  (height, width) for mono
 
+        The image stays valid after the capture thread reuses its ring buffer slot,
+        the frame products hold a copy of the frame. The image is shared with the
+        other consumers of the frame and must not be modified.
+
         Returns:
-        - numpy.ndarray: Image data in array format.
+        - numpy.ndarray or None: Image data in array format, None if no frame could
+          be read, e.g. after the buffer was reset for a new ROI.
         """
-        # Wait until last_image is not None
+        # Wait until the first frame is in the ring buffer
         self.last_image_filled.wait()
-        frame_image = self.last_image.GetNDArray()
-        if self.pixelformat == "BayerRG8":
-            frame_image = cv2.cvtColor(frame_image, cv2.COLOR_BayerRG2BGR)
-        return frame_image
+        # A frame overwritten before it was copied is retried with the newer frame
+        for _ in range(self.frame_buffer_slots):
+            products = self.frame_products.get()
+            if products is not None:
+                # Debayered image is cached per frame, shared with the other consumers
+                return products.bgr()
+        logger.warning(f"{self.name(sn_only=True)} no frame could be read from the buffer")
+        return None
 
     # Get the last captured image data as a numpy array
     def get_last_image_data_singleFrame(self):
@@ -615,13 +997,10 @@ class PySpinCamera:
         Shape: (height, width, 3) for RGB,  (height, width) for mono
 
         Returns:
-        - numpy.ndarray: Image data in array format.
+        - numpy.ndarray or None: Image data in array format, None if no frame could
+          be read.
         """
-        # Wait until last_image is not None
-        self.last_image_filled.wait()
-        frame_image = self.last_image.GetNDArray()
-        if self.pixelformat == "BayerRG8":
-            frame_image = cv2.cvtColor(frame_image, cv2.COLOR_BayerRG2BGR)
+        frame_image = self.get_last_image_data()
         self.last_image_cleared.set()
         return frame_image
 
@@ -630,17 +1009,16 @@ class PySpinCamera:
         Retrieves and logs the camera's essential information 
         such as frame dimensions and channels.
         """
-        # Gather camera details
-        self.height = self.camera.Height()
-        self.width = self.camera.Width()
-        try:
-            if self.last_image is not None:
-                self.channels = self.last_image.GetNumChannels()
-        except Exception as e:
-            logger.error(f"An error occurred while getting channel info: {e}")
+        # Gather camera details. Width and Height only cover the ROI while one is
+        # active, frames are delivered at the full sensor size (see _to_full_frame).
+        self.width = PySpin.CIntegerPtr(self.node_map.GetNode("WidthMax")).GetValue()
+        self.height = PySpin.CIntegerPtr(self.node_map.GetNode("HeightMax")).GetValue()
+        self.channels = 3 if self.device_color_type == "Color" else 1
         logger.info(
-            f"camera frame width: {self.width}, height: {self.width}, channels: {self.channels}"
+            f"camera frame width: {self.width}, height: {self.height}, channels: {self.channels}"
         )
+        if self.roi is not None:
+            logger.info(f"camera ROI width: {self.roi[2]}, height: {self.roi[3]}")
 
         # Set frame rate equal to the current acquisition frame rate (Hz)
         nodeFramerate = PySpin.CFloatPtr(
@@ -655,7 +1033,8 @@ class PySpinCamera:
         logger.info(f"Frame rate to be set to {self.frame_rate}")
 
     def save_recording(
-        self, filepath, isTimestamp=False, custom_name="Microscope_"
+        self, filepath, isTimestamp=False, custom_name="Microscope_",
+        recording_format="video"
     ):
         """
         Begins video recording and saves the video to the specified file path.
@@ -664,12 +1043,15 @@ class PySpinCamera:
         - filepath (str): Directory to save the video.
         - isTimestamp (bool): Whether to append a timestamp to the filename.
         - custom_name (str): Custom prefix for the filename.
+        - recording_format (str): "video" for an XVID .avi file, "raw" for lossless
+          undebayered frames in chunk files with a frame index (see raw_recording).
         """
+        extension = RAW_RECORDING_EXTENSION if recording_format == "raw" else ".avi"
         # Formulate the video name based on the input parameters
         video_name = (
-            "{}_{}.avi".format(custom_name, self.get_last_capture_time())
+            "{}_{}{}".format(custom_name, self.get_last_capture_time(), extension)
             if isTimestamp
-            else "{}.avi".format(custom_name)
+            else "{}{}".format(custom_name, extension)
         )
         full_path = os.path.join(filepath, video_name)
         print(f"Saving video to {full_path}")
@@ -679,20 +1061,186 @@ class PySpinCamera:
         self.camera_info()
 
         # Begin the video recording with appropriate configurations
-        fourcc = cv2.VideoWriter_fourcc(*"XVID")
-        self.video_output = cv2.VideoWriter(
-            full_path, fourcc, self.frame_rate, (self.width, self.height), True
+        if recording_format == "raw":
+            sink = RawRecordingSink(
+                full_path,
+                pixelformat=self.pixelformat,
+                metadata={
+                    "camera": self.name(sn_only=True),
+                    "frame_rate": self.frame_rate,
+                },
+            )
+        else:
+            sink = VideoFileSink(
+                full_path,
+                self.frame_rate,
+                (self.width, self.height),
+                pixelformat=self.pixelformat,
+            )
+        self.video_writer = AsyncFrameWriter(
+            sink,
+            max_queue=self.recording_queue_size,
+            policy=self.recording_queue_policy,
+            name=self.name(sn_only=True),
         )
+        self.video_writer.start()
         self.video_recording_on.set()
 
+    def enable_frame_history(self, seconds=2.0, max_bytes=2 * 1024**3):
+        """
+        Keeps a rolling history of the raw frames of the last seconds in memory, so
+        that save_burst() can save frames captured before it was called.
+
+        Args:
+        - seconds (float): Length of the history.
+        - max_bytes (int): Upper bound of the history memory. The history is
+          shortened if the frames of the last seconds do not fit.
+
+        Returns:
+        - int: Number of frames kept in the history.
+        """
+        frame_rate = self.frame_rate or 30.0
+        n_frames = int(np.ceil(seconds * frame_rate)) + 1
+        if self.width and self.height:
+            frame_bytes = self.width * self.height * (3 if self.pixelformat is None else 1)
+            n_frames = max(1, min(n_frames, max_bytes // frame_bytes))
+        self.frame_history = FrameRingBuffer(n_slots=n_frames)
+        logger.debug(f"{self.name(sn_only=True)} frame history of {n_frames} frames")
+        return n_frames
+
+    def disable_frame_history(self):
+        """
+        Frees the rolling frame history.
+        """
+        self.frame_history = None
+
+    def save_burst(
+        self, filepath, trigger_ts=None, pre_seconds=1.0, post_seconds=1.0,
+        custom_name="Microscope_"
+    ):
+        """
+        Saves the frames captured from pre_seconds before to post_seconds after the
+        trigger time as a raw recording (see raw_recording) in the background.
+        The frames before the trigger are taken from the frame history, the frames
+        after the trigger are written as they arrive.
+
+        Args:
+        - filepath (str): Directory to save the burst.
+        - trigger_ts (int, optional): Trigger time in ns. Defaults to now.
+        - pre_seconds (float): Time saved before the trigger.
+        - post_seconds (float): Time saved after the trigger.
+        - custom_name (str): Custom prefix for the directory name.
+
+        Returns:
+        - threading.Thread: Thread writing the burst, None if the frame history is off.
+        """
+        if self.frame_history is None:
+            logger.error(f"{self.name(sn_only=True)}: frame history is not enabled")
+            return None
+        if trigger_ts is None:
+            trigger_ts = time.time_ns()
+        full_path = os.path.join(
+            filepath,
+            "{}_{}_burst{}".format(
+                custom_name, format_timestamp_ns(trigger_ts), RAW_RECORDING_EXTENSION
+            ),
+        )
+        print(f"Saving burst to {full_path}")
+        sink = RawRecordingSink(
+            full_path,
+            pixelformat=self.pixelformat,
+            metadata={
+                "camera": self.name(sn_only=True),
+                "frame_rate": self.frame_rate,
+                "trigger_timestamp": trigger_ts,
+                "pre_seconds": pre_seconds,
+                "post_seconds": post_seconds,
+            },
+        )
+        thread = threading.Thread(
+            target=self._write_burst,
+            args=(
+                self.frame_history,
+                sink,
+                trigger_ts - int(pre_seconds * NS_PER_SECOND),
+                trigger_ts + int(post_seconds * NS_PER_SECOND),
+            ),
+            name=f"Burst-{self.name(sn_only=True)}",
+            daemon=True,
+        )
+        thread.start()
+        return thread
+
+    @staticmethod
+    def _write_burst(history, sink, start_ts, end_ts):
+        """
+        Writes the frames of the history captured between start_ts and end_ts.
+        Runs on the burst thread. The oldest frames are written first, since they are
+        the first to be overwritten. Frames overwritten before they were written are
+        counted and skipped.
+
+        Args:
+        - history (FrameRingBuffer): Frame history.
+        - sink (RawRecordingSink): Burst recording.
+        - start_ts (int), end_ts (int): Time window in ns.
+        """
+        last_id = -1
+        written, lost = 0, 0
+        try:
+            while True:
+                for frame_id, ts in history.get_timestamps():
+                    if frame_id <= last_id:
+                        continue
+                    if ts > end_ts:
+                        return
+                    last_id = frame_id
+                    if ts < start_ts:
+                        continue
+                    frame = history.copy_frame(frame_id)
+                    if frame is None:
+                        lost += 1
+                        continue
+                    sink.write(frame, frame_id=frame_id, timestamp=ts)
+                    written += 1
+                # Wait for the frames after the trigger. Stop one second after the
+                # end of the window if the camera stopped delivering frames.
+                if time.time_ns() > end_ts + NS_PER_SECOND:
+                    return
+                history.wait_for_frame(last_id, timeout=0.1)
+        finally:
+            sink.release()
+            if lost:
+                logger.warning(f"Burst {sink.path}: {lost} frames overwritten before saving")
+            logger.debug(f"Burst {sink.path}: {written} frames saved")
+
+    def get_recording_stats(self):
+        """
+        Returns the counters of the current (or last) recording.
+
+        Returns:
+        - dict or None: Queued, written and dropped frame counts, None if nothing was recorded.
+        """
+        if self.video_writer is None:
+            return None
+        return self.video_writer.get_stats()
+
     def stop_recording(self):
         """
-        Stops the ongoing video capture process and releases video resources.
+        Stops the ongoing video capture process, writes the frames still in
+        the queue and releases video resources.
+
+        Returns:
+        - dict or None: Final recording counters.
         """
         self.video_recording_on.clear()
-        self.video_recording_idle.wait()
-        self.video_recording_idle.clear()
-        self.video_output.release()
+        if self.video_writer is None:
+            return None
+        stats = self.video_writer.stop(drain=True)
+        logger.info(
+            f"{self.name(sn_only=True)} recording stopped: "
+            f"{stats['written']} written, {stats['dropped']} dropped"
+        )
+        return stats
 
     # Clean up the camera
     def stop(self, clean=False):
@@ -707,7 +1255,6 @@ class PySpinCamera:
             self.running = False
             self.capture_thread.join()
             self.camera.EndAcquisition()
-            self.last_image = None
             self.last_image_filled.clear()
 
         if self.video_recording_on.is_set():
@@ -723,14 +1270,15 @@ class MockCamera:
 
     n_cameras = 0
 
+    # Number of frame buffers the frames are rendered into in turn
+    n_buffers = 2
+
     def __init__(self):
         """Initialize a mock camera with a unique name"""
         self._name = f"MockCamera{MockCamera.n_cameras}"
         MockCamera.n_cameras += 1
-        # Create mock image data with random values
-        self.data = np.random.randint(
-            0, 255, size=(5, 3000, 4000), dtype="ubyte"
-        )
+        # Frame buffers are allocated on the first frame and reused
+        self._buffers = None
         self._next_frame = 0
         self.device_color_type = None
         self.width = 4000
@@ -745,8 +1293,19 @@ class MockCamera:
         Return last image as numpy array with shape (height, width, 3) for RGB
 		or (height, width) for mono.
         """
-        frame = self.data[self._next_frame]
-        self._next_frame = (self._next_frame + 1) % self.data.shape[0]
+        frame = self._next_buffer()
+        cv2.randu(frame, 0, 255)
+        return frame
+
+    def _next_buffer(self):
+        """Return the next frame buffer, the previous frame stays valid for its consumers."""
+        if self._buffers is None:
+            self._buffers = [
+                np.empty((self.height, self.width), dtype=np.uint8)
+                for _ in range(self.n_buffers)
+            ]
+        frame = self._buffers[self._next_frame]
+        self._next_frame = (self._next_frame + 1) % self.n_buffers
         return frame
 
     def save_last_image(
@@ -789,13 +1348,29 @@ class MockCamera:
         """Dummy function"""
         return
 
+    def get_last_capture_timestamp(self):
+        """Dummy function"""
+        return
+
+    def get_acquisition_stats(self):
+        """Dummy function"""
+        return
+
+    def get_last_frame_id(self):
+        """Dummy function"""
+        return
+
     def stop(self, clean=False):
         """Dummy function"""
         return
 
 
 class VideoSource:
-    """Video Source"""
+    """Video Source
+
+    Kept for backward compatibility. Use replay_camera.ReplayCamera to replay
+    recordings with their original timestamps.
+    """
 
     def __init__(self, filename):
         """Initialize a video source with a given filename"""
@@ -848,6 +1423,22 @@ class VideoSource:
         """Dummy function"""
         return
 
+    def get_last_capture_time(self, millisecond=False):
+        """Dummy function"""
+        return
+
+    def get_last_capture_timestamp(self):
+        """Dummy function"""
+        return
+
+    def get_acquisition_stats(self):
+        """Dummy function"""
+        return
+
+    def get_last_frame_id(self):
+        """Dummy function"""
+        return
+
     def stop(self, clean=False):
         """Dummy function"""
         return
@@ -0,0 +1,157 @@
+"""
+CameraStats collects the acquisition health counters of a camera: frames acquired,
+incomplete, dropped and released late, the achieved frame rate and the distribution of
+the latency between capture and consumption.
+
+The capture thread and the consumers update the counters concurrently, so all updates
+are done under a lock. get_stats() returns a snapshot as a plain dictionary.
+"""
+
+import collections
+import logging
+import threading
+
+import numpy as np
+
+from .timestamps import NS_PER_MILLISECOND, NS_PER_SECOND
+
+# Set logger name
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)
+
+
+class CameraStats:
+    """Acquisition health counters of a camera."""
+
+    def __init__(
+        self, fps_window=2.0, latency_window=256, release_late_ms=50.0, track_latency=True
+    ):
+        """Initialize the counters.
+
+        Args:
+            fps_window (float): Time window in seconds of the achieved frame rate.
+            latency_window (int): Number of latency samples kept for the distribution.
+            release_late_ms (float): Time a camera buffer may be held before its release
+                is counted as late.
+            track_latency (bool): Whether to record the consumer latency. Disable it
+                for sources whose timestamps are not on the current host clock.
+        """
+        self.fps_window_ns = int(fps_window * NS_PER_SECOND)
+        self.release_late_ns = int(release_late_ms * NS_PER_MILLISECOND)
+        self.track_latency = track_latency
+        self.lock = threading.Lock()
+        self._capture_times = collections.deque()
+        self._latencies = collections.deque(maxlen=latency_window)
+        self.reset()
+
+    def reset(self):
+        """Reset all counters."""
+        with self.lock:
+            self.acquired = 0
+            self.incomplete = 0
+            self.dropped = 0
+            self.released_late = 0
+            self._last_device_frame_id = None
+            self._capture_times.clear()
+            self._latencies.clear()
+
+    def add_frame(self, timestamp, device_frame_id=None):
+        """Count an acquired frame.
+
+        Args:
+            timestamp (int): Capture time of the frame in ns.
+            device_frame_id (int, optional): Frame counter of the camera. Gaps in the
+                counter are counted as dropped frames.
+        """
+        with self.lock:
+            self.acquired += 1
+            if device_frame_id is not None:
+                last = self._last_device_frame_id
+                if last is not None and device_frame_id > last + 1:
+                    self.dropped += device_frame_id - last - 1
+                self._last_device_frame_id = device_frame_id
+            self._capture_times.append(timestamp)
+            while timestamp - self._capture_times[0] > self.fps_window_ns:
+                self._capture_times.popleft()
+
+    def add_incomplete(self):
+        """Count an incomplete image."""
+        with self.lock:
+            self.incomplete += 1
+
+    def add_release(self, hold_time_ns, failed=False):
+        """Count the release of a camera buffer.
+
+        Args:
+            hold_time_ns (int): Time between receiving and releasing the buffer.
+            failed (bool): Whether the release failed.
+        """
+        if failed or hold_time_ns > self.release_late_ns:
+            with self.lock:
+                self.released_late += 1
+
+    def add_latency(self, latency_ns):
+        """Record the latency between the capture and the consumption of a frame.
+
+        Args:
+            latency_ns (int): Latency in ns.
+        """
+        if not self.track_latency:
+            return
+        with self.lock:
+            self._latencies.append(latency_ns)
+
+    def get_fps(self):
+        """Return the achieved frame rate over the fps window."""
+        with self.lock:
+            return self._fps()
+
+    def _fps(self):
+        """Frame rate of the buffered capture times. Call under the lock."""
+        if len(self._capture_times) < 2:
+            return 0.0
+        span = self._capture_times[-1] - self._capture_times[0]
+        if span <= 0:
+            return 0.0
+        return (len(self._capture_times) - 1) * NS_PER_SECOND / span
+
+    def get_stats(self):
+        """Return a snapshot of the counters.
+
+        Returns:
+            dict: Counters, achieved fps and the latency distribution in ms
+                (latency_ms_p50, latency_ms_p95, latency_ms_max, None without samples).
+        """
+        with self.lock:
+            stats = {
+                "acquired": self.acquired,
+                "incomplete": self.incomplete,
+                "dropped": self.dropped,
+                "released_late": self.released_late,
+                "fps": self._fps(),
+            }
+            latencies = np.array(self._latencies, dtype=np.float64) / NS_PER_MILLISECOND
+        if latencies.size:
+            p50, p95 = np.percentile(latencies, (50, 95))
+            stats.update(
+                latency_ms_p50=p50, latency_ms_p95=p95, latency_ms_max=latencies.max()
+            )
+        else:
+            stats.update(latency_ms_p50=None, latency_ms_p95=None, latency_ms_max=None)
+        return stats
+
+    def format(self):
+        """Return the counters as a short multi-line text for display."""
+        stats = self.get_stats()
+        lines = [
+            f"{stats['fps']:.1f} fps",
+            f"acquired {stats['acquired']}",
+            f"incomplete {stats['incomplete']}  dropped {stats['dropped']}",
+            f"released late {stats['released_late']}",
+        ]
+        if stats["latency_ms_p50"] is not None:
+            lines.append(
+                f"latency p50 {stats['latency_ms_p50']:.0f} / p95 "
+                f"{stats['latency_ms_p95']:.0f} / max {stats['latency_ms_max']:.0f} ms"
+            )
+        return "\n".join(lines)
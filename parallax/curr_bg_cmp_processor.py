@@ -22,6 +22,7 @@ import os
 import cv2
 import numpy as np
 
+from .detection_profiler import DetectionProfiler
 from .probe_fine_tip_detector import ProbeFineTipDetector
 from .utils import UtilsCoords, UtilsCrops
 
@@ -42,7 +43,8 @@ class CurrBgCmpProcessor():
     """Finding diff image using Current and Background Comparison"""
 
     def __init__(
-        self, cam_name, ProbeDetector, original_size, resized_size, reticle_zone=None
+        self, cam_name, ProbeDetector, original_size, resized_size, reticle_zone=None,
+        profiler=None,
     ):
         """
         Initialize the CurrBgCmpProcessor.
@@ -52,6 +54,8 @@ class CurrBgCmpProcessor():
             original_size (tuple): The original size of the image (height, width).
             resized_size (tuple): The resized size of the image (height, width).
             reticle_zone (numpy.ndarray, optional): The reticle zone image. Defaults to None.
+            profiler (DetectionProfiler, optional): Profiler timing the Hough line and
+                fine tip detection. Defaults to a profiler of this processor.
         """
         self.cam_name = cam_name
         self.diff_img = None
@@ -59,12 +63,17 @@ class CurrBgCmpProcessor():
         self.curr = None
         self.mask = None
         self.bg = None
+        self.bg_model = None  # Running average of the binary images
+        self.bg_update_mask = None
+        self.bg_alpha = 0.1
+        self.bg_exclusion_width = 10
         self.org_img = None
         self.IMG_SIZE = resized_size
         self.IMG_SIZE_ORIGINAL = original_size
         self.ProbeDetector = ProbeDetector
         self.reticle_zone = reticle_zone
         self.crop_init = 50
+        self.profiler = profiler if profiler is not None else DetectionProfiler()
 
         # Debug
         self.top_fine, self.bottom_fine, self.left_fine, self.right_fine = None, None, None, None
@@ -101,19 +110,21 @@ class CurrBgCmpProcessor():
         if ret:
             logger.debug("FirstCurrBgCmpProcessor:: detect")
             ret_precise_tip = self._get_precise_tip(org_img)
-            self.bg = cv2.bitwise_not(
+            self._set_bg(cv2.bitwise_not(
                 cv2.bitwise_xor(self.diff_img, self.curr_img), mask=self.mask
-            )
+            ))
 
         return ret, ret_precise_tip
 
-    def update_cmp(self, curr_img, mask, org_img):
+    def update_cmp(self, curr_img, mask, org_img, predicted_tip=None):
         """Update the comparison.
 
         Args:
             curr_img (numpy.ndarray): Current image.
             mask (numpy.ndarray): Mask image.
             org_img (numpy.ndarray): Original image.
+            predicted_tip (tuple, optional): Tip position predicted from the stage
+                motion. If given, the search starts around it.
 
         Returns:
             bool: True if probe is detected and precise tip is found, False otherwise.
@@ -127,11 +138,17 @@ class CurrBgCmpProcessor():
             self._create_bg(self.curr_img)
 
         self._preprocess_diff_image(self.curr_img)
-        ret = self._update_crop()
+        ret = self._update_crop(predicted_tip)
         if ret:
             ret_precise_tip_ret = self._get_precise_tip(org_img)
-            if ret_precise_tip_ret:
-                self._update_bg(extended_offset = 10)
+
+        # Update the background of every frame, outside the detected probe or, if
+        # not detected, the predicted or last known probe
+        tip, base = self.ProbeDetector.probe_tip, self.ProbeDetector.probe_base
+        if tip is not None and base is not None:
+            if not (ret and ret_precise_tip_ret) and predicted_tip is not None:
+                tip, base = UtilsCrops.shift_to_predicted_tip(tip, base, predicted_tip)
+            self._update_bg(tip, base)
 
         logger.debug(f"update: {ret}, precise_tip: {ret_precise_tip_ret}")
 
@@ -143,79 +160,81 @@ class CurrBgCmpProcessor():
 
         return ret, ret_precise_tip_ret
 
-    def _update_bg(self, extended_offset = 10):
-        """Update the background image."""
-        kernel = np.ones((3, 3), np.uint8)
-        self.diff_img_crop = cv2.dilate(
-            self.diff_img_crop, kernel, iterations=1
-        )
+    def _update_bg(self, tip, base, extended_offset=10):
+        """Update the background model outside the probe.
 
-        # Find and process contours
-        contours, _ = cv2.findContours(
-            self.diff_img_crop, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
-        )
-        if len(contours) >= 2:
-            largest_contour = max(contours, key=cv2.contourArea)
-            for contour in contours:
-                if contour is not largest_contour:
-                    self.diff_img_crop = cv2.drawContours(
-                        self.diff_img_crop, [contour], -1, (0, 0, 0), -1
-                    )
+        The background model is a running average of the binary images at the
+        resized resolution, accumulated in place. The probe, from its base to a bit
+        beyond its tip, is left out, so it never becomes part of the background.
 
-        # Initialize an empty image for drawing
-        diff_img = np.zeros_like(self.diff_img)
+        Args:
+            tip (tuple): Detected or predicted probe tip.
+            base (tuple): Detected or predicted probe base.
+            extended_offset (int): Length by which the probe line is extended at
+                both ends.
+        """
+        if self.bg_update_mask is None or self.bg_update_mask.shape != self.curr_img.shape:
+            self.bg_update_mask = np.empty_like(self.curr_img)
+        if self.mask is None:
+            self.bg_update_mask.fill(255)
+        else:
+            np.copyto(self.bg_update_mask, self.mask)
 
         # Calculate the direction and extend the line between probe tip and base
-        tip_direction = np.array(self.ProbeDetector.probe_tip) - np.array(
-            self.ProbeDetector.probe_base
-        )
-        tip_direction_normalized = tip_direction / np.linalg.norm(tip_direction)
-        extended_probe_tip = tuple(
-            np.array(self.ProbeDetector.probe_tip)
-            + (extended_offset * tip_direction_normalized).astype(int)
-        )
-        extended_probe_base = tuple(
-            np.array(self.ProbeDetector.probe_base)
-            - (extended_offset * tip_direction_normalized).astype(int)
+        tip_direction = np.array(tip, dtype=float) - np.array(base, dtype=float)
+        norm = np.linalg.norm(tip_direction)
+        if norm > 0:
+            offset = (extended_offset * tip_direction / norm).astype(int)
+            tip = tuple(int(v) for v in np.array(tip) + offset)
+            base = tuple(int(v) for v in np.array(base) - offset)
+        cv2.line(self.bg_update_mask, tip, base, 0, thickness=self.bg_exclusion_width)
+
+        cv2.accumulateWeighted(
+            self.curr_img, self.bg_model, self.bg_alpha, mask=self.bg_update_mask
         )
+        # Background pixels are the ones that are not features in most images
+        cv2.compare(self.bg_model, 127.5, cv2.CMP_LT, dst=self.bg)
+        if self.mask is not None:
+            cv2.bitwise_and(self.bg, self.mask, dst=self.bg)
 
-        # Draw the extended line
-        cv2.line(
-            #diff_img, extended_probe_tip, extended_probe_base, 255, thickness=5
-            diff_img, extended_probe_tip, extended_probe_base, 255, thickness=10
-        )
+    def _update_crop(self, predicted_tip=None):
+        """Update the crop region.
 
-        # Combine the processed image with the current image to extract the background
-        self.bg = cv2.bitwise_and(self.curr_img, cv2.bitwise_not(diff_img))
-        self.bg = cv2.bitwise_not(self.bg, mask=self.mask)
+        The crop region grows around the last detected probe until the probe is
+        found. With a predicted tip, it is centered on the prediction and doubles
+        in size at each step.
 
-    def _update_crop(self):
-        """Update the crop region.
+        Args:
+            predicted_tip (tuple, optional): Tip position predicted from the stage motion.
 
         Returns:
             bool: True if probe is detected, False otherwise.
         """
         ret = False
-        crop_size = self.crop_init
-        while (ret is False) and (crop_size <= max(self.IMG_SIZE[0], self.IMG_SIZE[1])):
+        hierarchical = predicted_tip is not None
+        if hierarchical:
+            tip, base = UtilsCrops.shift_to_predicted_tip(
+                self.ProbeDetector.probe_tip, self.ProbeDetector.probe_base, predicted_tip
+            )
+        for crop_size in UtilsCrops.get_crop_sizes(self.crop_init, self.IMG_SIZE, hierarchical):
+            if not hierarchical:
+                tip, base = self.ProbeDetector.probe_tip, self.ProbeDetector.probe_base
             self.top, self.bottom, self.left, self.right = UtilsCrops.calculate_crop_region(
-                self.ProbeDetector.probe_tip,
-                self.ProbeDetector.probe_base,
-                crop_size,
-                self.IMG_SIZE,
+                tip, base, crop_size, self.IMG_SIZE,
             )
             self.diff_img_crop = self.diff_img[self.top:self.bottom, self.left:self.right]
             hough_minLineLength_adpative = (
                 60 + int(crop_size / self.crop_init) * 5
             )
-            ret = self.ProbeDetector.update_probe(
-                self.diff_img_crop,
-                self.mask,
-                hough_minLineLength=hough_minLineLength_adpative,
-                maxLineGap=0,
-                offset_x=self.left,
-                offset_y=self.top,
-            )
+            with self.profiler.measure("hough"):
+                ret = self.ProbeDetector.update_probe(
+                    self.diff_img_crop,
+                    self.mask,
+                    hough_minLineLength=hough_minLineLength_adpative,
+                    maxLineGap=0,
+                    offset_x=self.left,
+                    offset_y=self.top,
+                )
 
             # cv2.rectangle(diff_img_, (left, top), (right, bottom), (155, 155, 0), 5)  # Green rectangle
             if ret and UtilsCrops.is_point_on_crop_region(
@@ -236,8 +255,6 @@ class CurrBgCmpProcessor():
             if ret:
                 break
 
-            crop_size += 100
-
         return ret
     
     def get_point_tip(self):
@@ -300,15 +317,16 @@ class CurrBgCmpProcessor():
         )
         
         self.tip_image = org_img[self.top_fine:self.bottom_fine, self.left_fine:self.right_fine]
-        ret, tip = ProbeFineTipDetector.get_precise_tip(
-            self.tip_image,
-            probe_tip_original_coords,
-            probe_base_original_coords,
-            offset_x=self.left_fine,
-            offset_y=self.top_fine,
-            direction=self.ProbeDetector.probe_tip_direction,
-            cam_name=self.cam_name
-        )
+        with self.profiler.measure("fine_tip"):
+            ret, tip = ProbeFineTipDetector.get_precise_tip(
+                self.tip_image,
+                probe_tip_original_coords,
+                probe_base_original_coords,
+                offset_x=self.left_fine,
+                offset_y=self.top_fine,
+                direction=self.ProbeDetector.probe_tip_direction,
+                cam_name=self.cam_name
+            )
 
         if ret:
             self.ProbeDetector.probe_tip_org = tip
@@ -347,7 +365,12 @@ class CurrBgCmpProcessor():
 
     def _create_bg(self, curr_img):
         """Create background image."""
-        self.bg = cv2.bitwise_not(curr_img)
+        self._set_bg(cv2.bitwise_not(curr_img))
+
+    def _set_bg(self, bg):
+        """Set the background image and restart the background model from it."""
+        self.bg = bg
+        self.bg_model = cv2.bitwise_not(bg).astype(np.float32)
 
     def _preprocess_diff_image(self, curr_img):
         """Preprocess difference image."""
@@ -355,4 +378,5 @@ class CurrBgCmpProcessor():
 
     def _detect_probe(self):
         """Detect probe in difference image."""
-        return self.ProbeDetector.first_detect_probe(self.diff_img, self.mask)
\ No newline at end of file
+        with self.profiler.measure("hough"):
+            return self.ProbeDetector.first_detect_probe(self.diff_img, self.mask)
\ No newline at end of file
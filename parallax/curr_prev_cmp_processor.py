@@ -22,6 +22,7 @@ import os
 import cv2
 import numpy as np
 
+from .detection_profiler import DetectionProfiler
 from .probe_fine_tip_detector import ProbeFineTipDetector
 from .utils import UtilsCoords, UtilsCrops
 
@@ -40,7 +41,7 @@ if logger.getEffectiveLevel() == logging.DEBUG:
 class CurrPrevCmpProcessor():
     """Finding diff image using Current Previous Comparison"""
 
-    def __init__(self, cam_name, ProbeDetector, original_size, resized_size):
+    def __init__(self, cam_name, ProbeDetector, original_size, resized_size, profiler=None):
         """
         Initialize the CurrPrevCmpProcessor.
 
@@ -48,6 +49,8 @@ class CurrPrevCmpProcessor():
             ProbeDetector (object): An instance of the ProbeDetector class.
             original_size (tuple): The original size of the image (height, width).
             resized_size (tuple): The resized size of the image (height, width).
+            profiler (DetectionProfiler, optional): Profiler timing the Hough line and
+                fine tip detection. Defaults to a profiler of this processor.
         """
         self.cam_name = cam_name
         self.diff_img = None
@@ -59,6 +62,7 @@ class CurrPrevCmpProcessor():
         self.shadow_threshold = 0.5
         self.ProbeDetector = ProbeDetector
         self.crop_init = 50
+        self.profiler = profiler if profiler is not None else DetectionProfiler()
 
         # Debug
         self.top_fine, self.bottom_fine, self.left_fine, self.right_fine = None, None, None, None
@@ -82,14 +86,18 @@ class CurrPrevCmpProcessor():
         if not self._apply_threshold():
             return ret, ret_precise_tip
         
-        ret = self.ProbeDetector.first_detect_probe(self.diff_img, self.mask)
+        with self.profiler.measure("hough"):
+            ret = self.ProbeDetector.first_detect_probe(self.diff_img, self.mask)
         if ret:
             logger.debug("CurrPrevCmpProcessor First::detect")
             ret_precise_tip = self._get_precise_tip(org_img)
 
         return ret, ret_precise_tip
 
-    def update_cmp(self, curr_img, prev_img, mask, org_img):
+    def update_cmp(
+        self, curr_img, prev_img, mask, org_img, predicted_tip=None, shared=None,
+        max_crop_size=None,
+    ):
         """Update the comparison.
 
         Args:
@@ -97,6 +105,12 @@ class CurrPrevCmpProcessor():
             prev_img (numpy.ndarray): Previous image.
             mask (numpy.ndarray): Mask image.
             org_img (numpy.ndarray): Original image.
+            predicted_tip (tuple, optional): Tip position predicted from the stage
+                motion. If given, the search starts around it.
+            shared (dict, optional): Images shared by the probes tracked in the same
+                frame. The difference image is computed by the first probe.
+            max_crop_size (int, optional): Largest crop size to search. Defaults to
+                the whole image.
 
         Returns:
             bool: True if probe is detected and precise tip is found, False otherwise.
@@ -104,52 +118,73 @@ class CurrPrevCmpProcessor():
         ret, ret_precise_tip = False, False
         self.mask = mask
         self.ProbeDetector.probe_tip_org = None
-        self._preprocess_diff_images(curr_img, prev_img)  # Subtraction
-        ret = self._apply_threshold()
-        if not ret:
-            return ret, ret_precise_tip
-        
-        ret = self._update_crop()
+        if shared is not None and "curr_prev_diff" in shared:
+            diff_img = shared["curr_prev_diff"]
+            if diff_img is None:
+                return ret, ret_precise_tip
+            self.diff_img = diff_img.copy()  # The crops of the detection are modified
+        else:
+            self._preprocess_diff_images(curr_img, prev_img)  # Subtraction
+            ret = self._apply_threshold()
+            if shared is not None:
+                shared["curr_prev_diff"] = self.diff_img.copy() if ret else None
+            if not ret:
+                return ret, ret_precise_tip
+
+        ret = self._update_crop(predicted_tip, max_crop_size)
         if ret:
             logger.debug("CurrPrevCmpProcessor Update::detect")
             ret_precise_tip = self._get_precise_tip(org_img)
 
         return ret, ret_precise_tip
 
-    def _update_crop(self):
+    def _update_crop(self, predicted_tip=None, max_crop_size=None):
         """Update the crop region.
 
+        The crop region grows around the last detected probe until the probe is
+        found. With a predicted tip, it is centered on the prediction and doubles
+        in size at each step.
+
+        Args:
+            predicted_tip (tuple, optional): Tip position predicted from the stage motion.
+            max_crop_size (int, optional): Largest crop size to search.
+
         Returns:
             bool: True if probe is detected, False otherwise.
         """
         ret = False
-        crop_size = self.crop_init
-        while (ret is False) and (
-            crop_size <= max(self.IMG_SIZE[0], self.IMG_SIZE[1])
-        ):
+        hierarchical = predicted_tip is not None
+        if hierarchical:
+            tip, base = UtilsCrops.shift_to_predicted_tip(
+                self.ProbeDetector.probe_tip, self.ProbeDetector.probe_base, predicted_tip
+            )
+        for crop_size in UtilsCrops.get_crop_sizes(self.crop_init, self.IMG_SIZE, hierarchical):
+            if max_crop_size is not None and crop_size > max_crop_size:
+                break
+            if not hierarchical:
+                tip, base = self.ProbeDetector.probe_tip, self.ProbeDetector.probe_base
             self.top, self.bottom, self.left, self.right = UtilsCrops.calculate_crop_region(
-                self.ProbeDetector.probe_tip,
-                self.ProbeDetector.probe_base,
-                crop_size,
-                self.IMG_SIZE,
+                tip, base, crop_size, self.IMG_SIZE,
             )
             diff_img_crop = self.diff_img[self.top:self.bottom, self.left:self.right]
             hough_minLineLength_adpative = (
                 40 + int(crop_size / self.crop_init) * 5
             )
-            ret = self.ProbeDetector.update_probe(
-                diff_img_crop,
-                self.mask,
-                hough_minLineLength=hough_minLineLength_adpative,
-                offset_x=self.left,
-                offset_y=self.top
-            )
+            with self.profiler.measure("hough"):
+                ret = self.ProbeDetector.update_probe(
+                    diff_img_crop,
+                    self.mask,
+                    hough_minLineLength=hough_minLineLength_adpative,
+                    offset_x=self.left,
+                    offset_y=self.top
+                )
             
             if ret and UtilsCrops.is_point_on_crop_region(
                 self.ProbeDetector.probe_tip, self.top, self.bottom, self.left, self.right,
             ):
                 ret = False
-            crop_size += 100
+            if ret:
+                break
 
         return ret
 
@@ -209,15 +244,16 @@ class CurrPrevCmpProcessor():
             IMG_SIZE=self.IMG_SIZE_ORIGINAL,
         )
         self.tip_image = org_img[self.top_fine:self.bottom_fine, self.left_fine:self.right_fine]
-        ret, tip = ProbeFineTipDetector.get_precise_tip(
-            self.tip_image,
-            probe_tip_original_coords,
-            probe_base_original_coords,
-            offset_x=self.left_fine,
-            offset_y=self.top_fine,
-            direction=self.ProbeDetector.probe_tip_direction,
-            cam_name=self.cam_name
-        )
+        with self.profiler.measure("fine_tip"):
+            ret, tip = ProbeFineTipDetector.get_precise_tip(
+                self.tip_image,
+                probe_tip_original_coords,
+                probe_base_original_coords,
+                offset_x=self.left_fine,
+                offset_y=self.top_fine,
+                direction=self.ProbeDetector.probe_tip_direction,
+                cam_name=self.cam_name
+            )
         
         if ret:
             self.ProbeDetector.probe_tip_org = tip
@@ -244,7 +280,8 @@ class CurrPrevCmpProcessor():
         Returns:
             bool: True if probe is detected, False otherwise.
         """
-        return self.ProbeDetector.first_detect_probe(self.diff_img, self.mask)
+        with self.profiler.measure("hough"):
+            return self.ProbeDetector.first_detect_probe(self.diff_img, self.mask)
 
     def _preprocess_diff_images(self, curr_img, prev_img):
         """Subtract current image from previous image to find differences.
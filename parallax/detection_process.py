@@ -0,0 +1,316 @@
+"""
+DetectionProcess runs the probe detection of one camera in a separate process, so the
+Python parts of the detection (Hough segments, contours and corners) of several cameras
+run in parallel instead of taking turns on the GIL.
+
+Frames are written to a shared memory buffer instead of being pickled, and only the
+frame shape, the model data the detection reads and the queued worker calls are sent
+over a pipe. The process returns the signals emitted by its worker, the overlay layers
+and the stage timings, which the parent emits through the same signals of its worker,
+applies to the real overlay and merges into its profiler, see
+ProbeDetectManager.ProcessWorker.
+
+A process that crashed or does not return a frame within the timeout is terminated
+and started again, and the worker calls made so far are replayed to restore the worker
+state.
+"""
+
+import logging
+import multiprocessing as mp
+import threading
+from multiprocessing import shared_memory
+from types import SimpleNamespace
+
+import numpy as np
+
+# Set logger name
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)
+
+
+class ModelSnapshot:
+    """Stand-in for the Model in a detection process, holding the data the probe
+    detection reads. Updated from the parent with every frame."""
+
+    def __init__(self):
+        """Initialize an empty snapshot."""
+        self.coords_axis = None
+        self.coords_debug = None
+        self.intrinsic = None
+        self.transforms = {}
+        self.stages = {}
+
+    def update(self, data):
+        """Update the snapshot.
+
+        Args:
+            data (dict): Data from ProbeDetectManager.ProcessWorker.get_model_data().
+        """
+        for key, value in data.items():
+            setattr(self, key, value)
+
+    def get_coords_axis(self, camera_name):
+        """Get the reticle axis coordinates of the camera."""
+        return self.coords_axis
+
+    def get_coords_for_debug(self, camera_name):
+        """Get the debug reticle coordinates of the camera."""
+        return self.coords_debug
+
+    def get_camera_intrinsic(self, camera_name):
+        """Get the calibration [mtx, dist, rvec, tvec] of the camera."""
+        return self.intrinsic
+
+    def get_transform(self, stage_sn):
+        """Get the transformation matrix and scale of a stage."""
+        return self.transforms.get(stage_sn)
+
+    def get_stage(self, stage_sn):
+        """Get the local coordinates of a stage as stage_x, stage_y and stage_z."""
+        coords = self.stages.get(stage_sn)
+        if coords is None:
+            return None
+        return SimpleNamespace(stage_x=coords[0], stage_y=coords[1], stage_z=coords[2])
+
+
+class RecordingOverlay:
+    """Stand-in for the OverlayModel in a detection process, recording the layers set
+    while processing a frame."""
+
+    def __init__(self):
+        """Initialize the overlay without layers."""
+        self.layers = {}
+
+    def set_layer(self, name, *shapes):
+        """Record the shapes of a layer."""
+        self.layers[name] = shapes
+
+    def clear(self, *names):
+        """Record the removal of layers."""
+        for name in names:
+            self.layers[name] = ()
+
+    def take(self):
+        """Return and forget the recorded layers."""
+        layers, self.layers = self.layers, {}
+        return layers
+
+
+def _attach_shared_memory(name):
+    """Attach to the shared memory created by the parent process."""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        # The parent owns the buffer, do not unlink it when this process exits
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+    return shm
+
+
+def _detection_process_main(conn, camera_name):
+    """Run the probe detection of the frames received from the parent.
+
+    Args:
+        conn (multiprocessing.connection.Connection): Pipe to the parent.
+        camera_name (str): Camera serial number.
+    """
+    from .probe_detect_manager import ProbeDetectManager
+
+    model = ModelSnapshot()
+    overlay = RecordingOverlay()
+    worker = ProbeDetectManager.Worker(camera_name, model, overlay)
+    worker.profiler.keep_samples()  # Merged into the profiler of the parent
+    signals = []  # (signal name, arguments) emitted while processing a frame
+    for name in ("found_coords", "tips_tracked"):
+        getattr(worker, name).connect(
+            lambda *args, name=name: signals.append((name, args))
+        )
+    shm = None
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message[0] == "stop":
+            break
+
+        _, calls, shm_name, shape, dtype, timestamp, frame_id, data = message
+        model.update(data)
+        for method, args in calls:
+            getattr(worker, method)(*args)
+
+        if shm is None or shm.name != shm_name:
+            if shm is not None:
+                shm.close()
+            shm = _attach_shared_memory(shm_name)
+        # Copy, the detection keeps crops of the frame that must not point into the
+        # buffer the parent writes the next frame to
+        frame = np.ndarray(shape, dtype=dtype, buffer=shm.buf).copy()
+        try:
+            worker.process(frame, timestamp, frame_id)
+        except Exception as e:
+            logger.exception(f"{camera_name} probe detection failed: {e}")
+        conn.send((signals[:], overlay.take(), worker.profiler.take_samples()))
+        signals.clear()
+
+    if shm is not None:
+        shm.close()
+
+
+class DetectionProcess:
+    """Parent side of a probe detection process."""
+
+    def __init__(self, camera_name, timeout=5.0, startup_timeout=60.0):
+        """Start the detection process.
+
+        Args:
+            camera_name (str): Camera serial number.
+            timeout (float): Seconds to wait for the result of a frame before the
+                process is restarted.
+            startup_timeout (float): Seconds to wait for the result of the first frame,
+                which includes starting the process and importing the detection.
+        """
+        self.camera_name = camera_name
+        self.timeout = timeout
+        self.startup_timeout = startup_timeout
+        self.n_restarts = 0
+        self.shm = None
+        self.pending_calls = []
+        self._call_history = {}  # (method, args) in the order of their last call
+        self._calls_lock = threading.Lock()
+        self._lock = threading.Lock()  # One frame at a time over the pipe
+        self._closed = False
+        self._start()
+
+    def _start(self):
+        """Start the process and the pipe to it."""
+        # Spawn, as forking a process with running Qt and scheduler threads is unsafe
+        ctx = mp.get_context("spawn")
+        self.conn, child_conn = ctx.Pipe()
+        self.child = ctx.Process(
+            target=_detection_process_main,
+            args=(child_conn, self.camera_name),
+            name=f"{self.camera_name} probe detection",
+            daemon=True,
+        )
+        self.child.start()
+        child_conn.close()
+        self._started = False  # Until the first frame is returned
+
+    def _restart(self):
+        """Terminate a crashed or hung process and start a new one. Called with the
+        lock held."""
+        self.child.terminate()
+        self.child.join(1)
+        if self.child.is_alive():
+            self.child.kill()  # E.g. a stopped process does not handle SIGTERM
+            self.child.join()
+        self.conn.close()
+        self.n_restarts += 1
+        self._start()
+        with self._calls_lock:
+            # The new worker gets the state of the old one before its first frame
+            self.pending_calls = list(self._call_history)
+
+    def call(self, method, *args):
+        """Call a method of the worker in the process before the next frame.
+
+        Calls are queued, so they do not wait for a frame being processed. They are
+        also kept to be replayed if the process is restarted, a call repeated with the
+        same arguments only once at the position of its last call.
+
+        Args:
+            method (str): Name of the ProbeDetectManager.Worker method.
+            *args: Arguments of the method, hashable.
+        """
+        with self._calls_lock:
+            self.pending_calls.append((method, args))
+            self._call_history.pop((method, args), None)
+            self._call_history[(method, args)] = None
+
+    def _get_buffer(self, nbytes):
+        """Return a shared memory buffer of at least nbytes."""
+        if self.shm is None or self.shm.size < nbytes:
+            self._release_buffer()
+            self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        return self.shm
+
+    def _release_buffer(self):
+        """Free the shared memory buffer."""
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def process(self, frame, timestamp, frame_id, data):
+        """Run the probe detection of a frame in the process.
+
+        Args:
+            frame (numpy.ndarray): Input frame.
+            timestamp (int): Capture time of the frame in ns.
+            frame_id (int): Camera frame ID.
+            data (dict): Model data read by the detection, see ModelSnapshot.
+
+        Returns:
+            tuple or None: (signals, layers, samples), the names and arguments of the
+                signals emitted, the overlay layers set and the DetectionProfiler
+                samples recorded. None if the process was closed, crashed or did not
+                return the frame within the timeout.
+        """
+        with self._lock:
+            if self._closed:
+                return None
+            if not self.child.is_alive():
+                logger.error(
+                    f"{self.camera_name} probe detection process exited with code "
+                    f"{self.child.exitcode}, restarting it"
+                )
+                self._restart()
+            frame = np.ascontiguousarray(frame)
+            shm = self._get_buffer(frame.nbytes)
+            np.ndarray(frame.shape, dtype=frame.dtype, buffer=shm.buf)[...] = frame
+            with self._calls_lock:
+                calls, self.pending_calls = self.pending_calls, []
+            try:
+                self.conn.send(
+                    ("frame", calls, shm.name, frame.shape, frame.dtype.str,
+                     timestamp, frame_id, data)
+                )
+                timeout = self.timeout if self._started else self.startup_timeout
+                if not self.conn.poll(timeout):
+                    logger.error(
+                        f"{self.camera_name} probe detection process did not respond "
+                        f"within {timeout} s, restarting it"
+                    )
+                    self._restart()
+                    return None
+                self._started = True
+                return self.conn.recv()
+            except (EOFError, OSError) as e:
+                logger.error(
+                    f"{self.camera_name} probe detection process stopped: {e}, restarting it"
+                )
+                self._restart()
+                return None
+
+    def close(self, timeout=2):
+        """Stop the process and free the shared memory.
+
+        Args:
+            timeout (float): Time to wait for the process to exit before terminating it.
+        """
+        # Waits at most for the frame timeout of a frame being processed
+        with self._lock:
+            self._closed = True
+            if self.child.is_alive():
+                try:
+                    self.conn.send(("stop",))
+                except OSError:
+                    pass
+                self.child.join(timeout)
+                if self.child.is_alive():
+                    self.child.terminate()
+            self.conn.close()
+            self._release_buffer()
@@ -0,0 +1,250 @@
+"""
+DetectionProfiler times the stages of the probe detection of a camera: preprocessing,
+mask, the curr-prev and curr-bg comparisons for the first detection and the tracking,
+the Hough line detection and the fine tip detection. It keeps the rolling percentiles
+of each stage, the success and failure counts of the comparisons and the rate of the
+processed frames.
+
+Stages nest, e.g. "hough" and "fine_tip" are part of the comparison that runs them,
+and "total" covers the whole detection of a frame. The detection thread records and the
+GUI thread reads, so all updates are done under a lock. get_stats() returns a snapshot
+as a plain dictionary and write_csv() exports the profiles of several cameras.
+"""
+
+import collections
+import csv
+import logging
+import threading
+import time
+
+import numpy as np
+
+from .timestamps import NS_PER_MILLISECOND, NS_PER_SECOND
+
+# Set logger name
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)
+
+CSV_FIELDS = (
+    "camera", "stage", "count", "mean_ms", "p50_ms", "p95_ms", "max_ms",
+    "success", "failure", "fps",
+)
+
+
+class _StageTimer:
+    """Context manager adding the time spent in a stage to the profiler."""
+
+    __slots__ = ("profiler", "stage", "start")
+
+    def __init__(self, profiler, stage):
+        """Time the given stage of the profiler."""
+        self.profiler = profiler
+        self.stage = stage
+        self.start = None
+
+    def __enter__(self):
+        """Start the timer."""
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        """Add the elapsed time to the stage, and let any exception through."""
+        self.profiler.add_time(self.stage, time.perf_counter_ns() - self.start)
+        return False
+
+
+class DetectionProfiler:
+    """Stage timings and comparison results of the probe detection of a camera."""
+
+    def __init__(self, window=256, fps_window=2.0):
+        """Initialize the profiler.
+
+        Args:
+            window (int): Number of timing samples per stage kept for the percentiles.
+            fps_window (float): Time window in seconds of the frame rate.
+        """
+        self.window = window
+        self.fps_window_ns = int(fps_window * NS_PER_SECOND)
+        self.lock = threading.Lock()
+        self._samples = None  # Recorded samples, see keep_samples()
+        self.reset()
+
+    def reset(self):
+        """Reset all timings and counters."""
+        with self.lock:
+            self.frames = 0
+            self._stages = {}  # stage: [count, total ns, deque of ns]
+            self._results = {}  # stage: [success, failure]
+            self._frame_times = collections.deque()
+
+    def measure(self, stage):
+        """Return a context manager timing a stage.
+
+        Args:
+            stage (str): Stage name.
+        """
+        return _StageTimer(self, stage)
+
+    def add_time(self, stage, elapsed_ns):
+        """Record the time spent in a stage.
+
+        Args:
+            stage (str): Stage name.
+            elapsed_ns (int): Elapsed time in ns.
+        """
+        with self.lock:
+            entry = self._stages.get(stage)
+            if entry is None:
+                entry = self._stages[stage] = [0, 0, collections.deque(maxlen=self.window)]
+            entry[0] += 1
+            entry[1] += elapsed_ns
+            entry[2].append(elapsed_ns)
+            if self._samples is not None:
+                self._samples.append(("time", stage, elapsed_ns))
+
+    def add_result(self, stage, success):
+        """Count the success or failure of a comparison.
+
+        Args:
+            stage (str): Stage name, e.g. "update_curr_prev".
+            success (bool): Whether the probe tip was found.
+        """
+        with self.lock:
+            counts = self._results.setdefault(stage, [0, 0])
+            counts[0 if success else 1] += 1
+            if self._samples is not None:
+                self._samples.append(("result", stage, bool(success)))
+
+    def add_frame(self, now=None):
+        """Count a processed frame.
+
+        Args:
+            now (int, optional): Time the frame was processed in ns on the monotonic
+                clock. Defaults to the current time.
+        """
+        if now is None:
+            now = time.monotonic_ns()
+        with self.lock:
+            self.frames += 1
+            self._frame_times.append(now)
+            while now - self._frame_times[0] > self.fps_window_ns:
+                self._frame_times.popleft()
+
+    def keep_samples(self):
+        """Also record the samples to be taken by take_samples(), e.g. to merge the
+        profile of a detection process into the profiler of the parent."""
+        with self.lock:
+            if self._samples is None:
+                self._samples = []
+
+    def take_samples(self):
+        """Return and forget the samples recorded since the last call."""
+        with self.lock:
+            if self._samples is None:
+                return []
+            samples, self._samples = self._samples, []
+        return samples
+
+    def add_samples(self, samples):
+        """Record samples taken from another profiler.
+
+        Args:
+            samples (list): Samples returned by take_samples().
+        """
+        for kind, stage, value in samples:
+            if kind == "time":
+                self.add_time(stage, value)
+            else:
+                self.add_result(stage, value)
+
+    def get_fps(self):
+        """Return the rate of the processed frames over the fps window."""
+        with self.lock:
+            return self._fps()
+
+    def _fps(self):
+        """Rate of the buffered frame times. Call under the lock."""
+        if len(self._frame_times) < 2:
+            return 0.0
+        span = self._frame_times[-1] - self._frame_times[0]
+        if span <= 0:
+            return 0.0
+        return (len(self._frame_times) - 1) * NS_PER_SECOND / span
+
+    def get_stats(self):
+        """Return a snapshot of the profile.
+
+        Returns:
+            dict: "frames", "fps" and "stages", by stage name a dictionary of the
+                "count", "mean_ms", "p50_ms", "p95_ms", "max_ms" of the timings
+                (None if not timed) and the "success" and "failure" counts (None if
+                not a comparison).
+        """
+        with self.lock:
+            frames, fps = self.frames, self._fps()
+            timings = {
+                stage: (count, total, np.array(samples, dtype=np.float64))
+                for stage, (count, total, samples) in self._stages.items()
+            }
+            results = {stage: tuple(counts) for stage, counts in self._results.items()}
+
+        stages = {}
+        for stage in list(timings) + [s for s in results if s not in timings]:
+            entry = dict.fromkeys(
+                ("count", "mean_ms", "p50_ms", "p95_ms", "max_ms", "success", "failure")
+            )
+            if stage in timings:
+                count, total, samples = timings[stage]
+                samples /= NS_PER_MILLISECOND
+                p50, p95 = np.percentile(samples, (50, 95))
+                entry.update(
+                    count=count, mean_ms=total / count / NS_PER_MILLISECOND,
+                    p50_ms=p50, p95_ms=p95, max_ms=samples.max(),
+                )
+            if stage in results:
+                entry["success"], entry["failure"] = results[stage]
+            stages[stage] = entry
+        return {"frames": frames, "fps": fps, "stages": stages}
+
+    def format(self):
+        """Return the profile as a short multi-line text for display."""
+        stats = self.get_stats()
+        lines = [f"detection {stats['fps']:.1f} fps"]
+        for stage, entry in stats["stages"].items():
+            line = stage
+            if entry["count"] is not None:
+                line += f" p50 {entry['p50_ms']:.1f} / p95 {entry['p95_ms']:.1f} ms"
+            if entry["success"] is not None:
+                line += f"  {entry['success']} ok {entry['failure']} failed"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def get_rows(self, camera_name):
+        """Return the profile as CSV rows, one per stage.
+
+        Args:
+            camera_name (str): Camera serial number written in the rows.
+
+        Returns:
+            list: Dictionaries with the CSV_FIELDS keys.
+        """
+        stats = self.get_stats()
+        return [
+            {"camera": camera_name, "stage": stage, "fps": stats["fps"], **entry}
+            for stage, entry in stats["stages"].items()
+        ]
+
+
+def write_csv(path, profilers):
+    """Write the profiles of several cameras to a CSV file.
+
+    Args:
+        path (str): Path of the CSV file.
+        profilers (dict): DetectionProfiler by camera serial number.
+    """
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for camera_name, profiler in profilers.items():
+            writer.writerows(profiler.get_rows(camera_name))
+    logger.debug(f"Detection profile saved: {path}")
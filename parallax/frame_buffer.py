@@ -0,0 +1,224 @@
+"""
+FrameRingBuffer keeps a fixed number of preallocated frame slots per camera.
+Every written frame gets a monotonically increasing frame ID so that consumers can
+request a specific frame (or the newest N frames) as a zero-copy view instead of
+racing the capture thread for 'whatever is latest'.
+"""
+
+import logging
+import threading
+
+import numpy as np
+
+# Set logger name
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)
+
+
+class FrameRingBuffer:
+    """Fixed-size ring of preallocated numpy frame slots."""
+
+    def __init__(self, n_slots=4):
+        """Initialize the ring buffer.
+
+        Args:
+            n_slots (int): Number of frame slots kept in memory. Defaults to 4.
+        """
+        if n_slots < 1:
+            raise ValueError("FrameRingBuffer needs at least one slot")
+        self.n_slots = n_slots
+        self.slots = None
+        self.frame_ids = np.full(n_slots, -1, dtype=np.int64)
+        self.timestamps = np.zeros(n_slots, dtype=np.int64)
+        self.last_frame_id = -1
+        self.lock = threading.Lock()
+        self.frame_written = threading.Condition(self.lock)
+
+    def _allocate(self, shape, dtype):
+        """Allocate (or reallocate) the frame slots for the given frame shape.
+
+        Args:
+            shape (tuple): Shape of a single frame.
+            dtype (numpy.dtype): Data type of the frame.
+        """
+        logger.debug(f"Allocate {self.n_slots} slots of shape {shape}, {dtype}")
+        self.slots = np.empty((self.n_slots,) + tuple(shape), dtype=dtype)
+        self.frame_ids.fill(-1)
+
+    def _slot_index(self, frame_id):
+        """Return the slot index holding the frame ID, or None if it was overwritten."""
+        if frame_id is None or frame_id < 0:
+            return None
+        idx = frame_id % self.n_slots
+        if self.frame_ids[idx] != frame_id:
+            return None
+        return idx
+
+    def write(self, frame, timestamp=None):
+        """Copy a frame into the next slot.
+
+        Args:
+            frame (numpy.ndarray): Frame data.
+            timestamp (int, optional): Capture time of the frame in nanoseconds.
+
+        Returns:
+            int: Frame ID assigned to the written frame.
+        """
+        with self.lock:
+            if self.slots is None or self.slots.shape[1:] != frame.shape \
+                    or self.slots.dtype != frame.dtype:
+                self._allocate(frame.shape, frame.dtype)
+            frame_id = self.last_frame_id + 1
+            idx = frame_id % self.n_slots
+            # Invalidate the slot while it is being overwritten
+            self.frame_ids[idx] = -1
+
+        np.copyto(self.slots[idx], frame)
+
+        with self.lock:
+            self.frame_ids[idx] = frame_id
+            self.timestamps[idx] = timestamp if timestamp is not None else 0
+            self.last_frame_id = frame_id
+            self.frame_written.notify_all()
+        return frame_id
+
+    def get_frame(self, frame_id):
+        """Get a zero-copy view of the frame with the given ID.
+
+        The view stays valid until n_slots newer frames have been written.
+        Use is_valid() to check whether the frame has been overwritten since.
+
+        Args:
+            frame_id (int): Frame ID.
+
+        Returns:
+            numpy.ndarray or None: Frame view, None if the frame is not in the buffer.
+        """
+        with self.lock:
+            idx = self._slot_index(frame_id)
+            if idx is None:
+                return None
+            return self.slots[idx]
+
+    def copy_frame(self, frame_id):
+        """Copy the frame with the given ID out of the buffer.
+
+        Unlike get_frame(), the copy stays valid after the slot is overwritten.
+
+        Args:
+            frame_id (int): Frame ID.
+
+        Returns:
+            numpy.ndarray or None: Frame copy, None if the frame is not in the buffer
+                or was overwritten while copying.
+        """
+        frame = self.get_frame(frame_id)
+        if frame is None:
+            return None
+        frame = frame.copy()
+        # The capture thread may have reused the slot during the copy
+        if not self.is_valid(frame_id):
+            return None
+        return frame
+
+    def get_timestamp(self, frame_id):
+        """Get the capture timestamp of the frame with the given ID.
+
+        Returns:
+            int or None: Timestamp in nanoseconds, None if the frame is not in the buffer.
+        """
+        with self.lock:
+            idx = self._slot_index(frame_id)
+            if idx is None:
+                return None
+            return int(self.timestamps[idx])
+
+    def is_valid(self, frame_id):
+        """Return True if the frame with the given ID is still in the buffer."""
+        with self.lock:
+            return self._slot_index(frame_id) is not None
+
+    def get_latest(self):
+        """Get the newest frame.
+
+        Returns:
+            tuple: (frame_id, frame) or (None, None) if nothing was written yet.
+        """
+        with self.lock:
+            idx = self._slot_index(self.last_frame_id)
+            if idx is None:
+                return None, None
+            return self.last_frame_id, self.slots[idx]
+
+    def get_latest_n(self, n):
+        """Get up to the newest N frames, ordered from oldest to newest.
+
+        Args:
+            n (int): Number of frames.
+
+        Returns:
+            list: List of (frame_id, frame) tuples.
+        """
+        with self.lock:
+            frames = []
+            first_id = max(self.last_frame_id - min(n, self.n_slots) + 1, 0)
+            for frame_id in range(first_id, self.last_frame_id + 1):
+                idx = self._slot_index(frame_id)
+                if idx is not None:
+                    frames.append((frame_id, self.slots[idx]))
+            return frames
+
+    def get_timestamps(self):
+        """Get the IDs and timestamps of all buffered frames, ordered from oldest to newest.
+
+        Returns:
+            list: List of (frame_id, timestamp) tuples.
+        """
+        with self.lock:
+            entries = []
+            first_id = max(self.last_frame_id - self.n_slots + 1, 0)
+            for frame_id in range(first_id, self.last_frame_id + 1):
+                idx = self._slot_index(frame_id)
+                if idx is not None:
+                    entries.append((frame_id, int(self.timestamps[idx])))
+            return entries
+
+    def get_frames_since(self, frame_id):
+        """Get all frames newer than the given frame ID that are still buffered.
+
+        This lets a slow consumer catch up on frames it missed.
+
+        Args:
+            frame_id (int or None): Last frame ID processed by the consumer.
+
+        Returns:
+            list: List of (frame_id, frame) tuples, ordered from oldest to newest.
+        """
+        if frame_id is None:
+            frame_id = -1
+        n = self.last_frame_id - frame_id
+        if n <= 0:
+            return []
+        return self.get_latest_n(n)
+
+    def wait_for_frame(self, after_frame_id=None, timeout=None):
+        """Block until a frame newer than after_frame_id has been written.
+
+        Args:
+            after_frame_id (int, optional): Frame ID already seen by the caller.
+            timeout (float, optional): Timeout in seconds.
+
+        Returns:
+            bool: True if a newer frame is available, False on timeout.
+        """
+        if after_frame_id is None:
+            after_frame_id = -1
+        with self.frame_written:
+            return self.frame_written.wait_for(
+                lambda: self.last_frame_id > after_frame_id, timeout=timeout
+            )
+
+    def reset(self):
+        """Invalidate all buffered frames. Frame IDs keep increasing."""
+        with self.lock:
+            self.frame_ids.fill(-1)
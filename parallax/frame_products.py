@@ -0,0 +1,173 @@
+"""
+FrameProducts caches the images derived from one raw camera frame (debayered BGR,
+grayscale, blurred and downsampled levels) so that each variant is computed at most
+once per frame and shared by the display, reticle detection and probe detection
+pipelines. FrameProductsCache keeps the products of the most recent frames keyed
+by frame ID.
+
+The cache copies the raw frame out of the ring buffer when it creates the products.
+The products are computed whenever a consumer first asks for them, which can be after
+the capture thread has reused the slot of the frame.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+
+import cv2
+
+# Set logger name
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)
+
+
+class FrameProducts:
+    """Lazily computed products of a single raw frame."""
+
+    def __init__(self, frame_id, raw, pixelformat=None, timestamp=None):
+        """Initialize the frame products.
+
+        Args:
+            frame_id (int): Frame ID of the raw frame.
+            raw (numpy.ndarray): Raw frame (Bayer, mono or BGR), owned by the products.
+                Mono and BGR frames are returned by bgr() and gray() unchanged.
+            pixelformat (str, optional): Pixel format of the raw frame, e.g. "BayerRG8".
+            timestamp (int, optional): Capture time of the frame in nanoseconds.
+        """
+        self.frame_id = frame_id
+        self.raw = raw
+        self.pixelformat = pixelformat
+        self.timestamp = timestamp
+        self._products = {}
+        self._lock = threading.RLock()
+
+    def _get(self, key, compute):
+        """Return the cached product for key, computing it on first use."""
+        with self._lock:
+            product = self._products.get(key)
+            if product is None:
+                product = compute()
+                self._products[key] = product
+            return product
+
+    def bgr(self):
+        """Debayered BGR image. Mono and BGR frames are returned unchanged.
+
+        Returns:
+            numpy.ndarray: Image of shape (height, width, 3) or (height, width) for mono.
+        """
+        return self._get("bgr", self._compute_bgr)
+
+    def gray(self):
+        """Grayscale image at full resolution.
+
+        Bayer frames are converted directly to gray without debayering to BGR first.
+
+        Returns:
+            numpy.ndarray: Image of shape (height, width).
+        """
+        return self._get("gray", self._compute_gray)
+
+    def blurred(self, ksize=(11, 11)):
+        """Gaussian-blurred grayscale image at full resolution.
+
+        Args:
+            ksize (tuple): Gaussian kernel size.
+
+        Returns:
+            numpy.ndarray: Blurred image of shape (height, width).
+        """
+        ksize = tuple(ksize)
+        return self._get(
+            ("blurred", ksize),
+            lambda: cv2.GaussianBlur(self.gray(), ksize, 0),
+        )
+
+    def resized(self, size):
+        """Grayscale image resized to the given pyramid level.
+
+        Every level is resized from the full resolution gray image, so the result
+        does not depend on which consumer requested a level first.
+
+        Args:
+            size (tuple): Target size (width, height).
+
+        Returns:
+            numpy.ndarray: Resized image of shape (height, width).
+        """
+        size = tuple(size)
+        return self._get(
+            ("resized", size), lambda: cv2.resize(self.gray(), size)
+        )
+
+    def _compute_bgr(self):
+        """Convert the raw frame to BGR."""
+        if self.pixelformat == "BayerRG8":
+            return cv2.cvtColor(self.raw, cv2.COLOR_BayerRG2BGR)
+        return self.raw
+
+    def _compute_gray(self):
+        """Convert the raw frame to gray."""
+        if self.pixelformat == "BayerRG8":
+            return cv2.cvtColor(self.raw, cv2.COLOR_BayerRG2GRAY)
+        if self.raw.ndim == 3:
+            return cv2.cvtColor(self.raw, cv2.COLOR_BGR2GRAY)
+        return self.raw
+
+
+class FrameProductsCache:
+    """Keeps the FrameProducts of the most recent frames of a FrameRingBuffer."""
+
+    def __init__(self, frame_buffer, pixelformat=None, max_entries=2):
+        """Initialize the cache.
+
+        Args:
+            frame_buffer (FrameRingBuffer): Ring buffer holding the raw frames.
+            pixelformat (str, optional): Pixel format of the raw frames.
+            max_entries (int): Number of frames whose products are kept. Defaults to 2.
+        """
+        self.frame_buffer = frame_buffer
+        self.pixelformat = pixelformat
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, frame_id=None):
+        """Get the products of a frame.
+
+        Args:
+            frame_id (int, optional): Frame ID. Defaults to the newest frame.
+
+        Returns:
+            FrameProducts or None: Products, None if the frame is not buffered.
+        """
+        if frame_id is None:
+            frame_id, _ = self.frame_buffer.get_latest()
+        if frame_id is None or not self.frame_buffer.is_valid(frame_id):
+            return None
+
+        with self._lock:
+            products = self._entries.get(frame_id)
+        if products is not None:
+            return products
+
+        # Copy outside the lock, the slot may be reused before the products are computed
+        timestamp = self.frame_buffer.get_timestamp(frame_id)
+        raw = self.frame_buffer.copy_frame(frame_id)
+        if raw is None:
+            return None  # Overwritten in the meantime
+        with self._lock:
+            products = self._entries.get(frame_id)
+            if products is None:
+                products = FrameProducts(
+                    frame_id, raw, pixelformat=self.pixelformat, timestamp=timestamp
+                )
+                self._entries[frame_id] = products
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return products
+
+    def clear(self):
+        """Drop all cached products."""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,230 @@
+"""
+FrameScheduler runs the frame processing of all screens (no filter, axis filter, reticle
+and probe detection) on one shared pool of worker threads.
+
+Each processing step is registered as a job with a latest-frame mailbox. Submitting a
+frame replaces the frame waiting in the mailbox and wakes a worker thread, so workers
+sleep while no frames arrive and a slow job skips to the newest frame instead of
+falling behind. A job never runs concurrently with itself, so the state of a worker
+object is only touched by one thread at a time.
+
+Waiting jobs run by priority, display < reticle detection < probe tracking during
+calibration, and in submission order within a priority. Since every job holds at most
+one waiting frame, a busy camera cannot crowd out the other cameras.
+
+Frames submitted with a frame ID are skipped if the job has already accepted that frame,
+so polling a slow camera faster than it delivers frames does not repeat the work.
+"""
+
+import heapq
+import itertools
+import logging
+import os
+import threading
+
+# Set logger name
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)
+
+
+class FrameJob:
+    """A processing step registered with a FrameScheduler."""
+
+    def __init__(self, scheduler, handler, priority, name):
+        """Initialize the job. Use FrameScheduler.add_job() to create jobs.
+
+        Args:
+            scheduler (FrameScheduler): Scheduler running the job.
+            handler (callable): Called with the submitted arguments on a worker thread.
+            priority (int): Priority, higher runs first.
+            name (str): Name used in log messages.
+        """
+        self.scheduler = scheduler
+        self.handler = handler
+        self.priority = priority
+        self.name = name
+        self.removed = False
+        self.last_frame_id = None  # ID of the last accepted frame
+        self._args = None  # Mailbox, the latest submitted arguments
+        self._queued = False
+        self._running = False
+
+    def submit(self, *args, frame_id=None):
+        """Submit the arguments of the next call, replacing the waiting ones.
+
+        Args:
+            *args: Arguments of the handler.
+            frame_id (int, optional): Camera frame ID. A frame with the same ID as the
+                last accepted frame is skipped.
+
+        Returns:
+            bool: False if the frame was skipped or the job was removed.
+        """
+        return self.scheduler._submit(self, args, frame_id)
+
+    def set_priority(self, priority):
+        """Set the priority. Applies from the next submitted frame."""
+        self.priority = priority
+
+    def remove(self, wait=False):
+        """Remove the job from the scheduler.
+
+        Args:
+            wait (bool): Whether to wait until a running call has returned.
+        """
+        self.scheduler.remove_job(self, wait=wait)
+
+
+class FrameScheduler:
+    """Runs frame processing jobs on a shared pool of worker threads."""
+
+    PRIORITY_DISPLAY = 0
+    PRIORITY_DETECTION = 1
+    PRIORITY_TRACKING = 2
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_workers=None):
+        """Initialize the scheduler and start its worker threads.
+
+        Args:
+            max_workers (int, optional): Number of worker threads. Defaults to the
+                number of CPUs.
+        """
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        self.max_workers = max_workers
+        # Workers wait for queued jobs on _cond, remove_job() and wait_idle() wait for
+        # returning jobs on _idle_cond, so that queuing a job always wakes a worker
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._idle_cond = threading.Condition(self._lock)
+        self._queue = []  # (-priority, sequence, job)
+        self._sequence = itertools.count()
+        self._n_running = 0
+        self._stopped = False
+        self._threads = []
+        for i in range(max_workers):
+            thread = threading.Thread(
+                target=self._work, name=f"FrameScheduler-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    @classmethod
+    def shared(cls):
+        """Return the scheduler shared by all screens, created on first use."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def add_job(self, handler, priority=PRIORITY_DISPLAY, name=""):
+        """Register a processing step.
+
+        Args:
+            handler (callable): Called with the submitted arguments on a worker thread.
+            priority (int): PRIORITY_DISPLAY, PRIORITY_DETECTION or PRIORITY_TRACKING.
+            name (str): Name used in log messages.
+
+        Returns:
+            FrameJob: Job to submit frames to.
+        """
+        return FrameJob(self, handler, priority, name)
+
+    def remove_job(self, job, wait=False):
+        """Remove a job. Waiting frames are dropped.
+
+        Args:
+            job (FrameJob): Job to remove.
+            wait (bool): Whether to wait until a running call has returned. Must not
+                be used from the handler of the job.
+        """
+        with self._idle_cond:
+            job.removed = True
+            job._args = None
+            if wait:
+                while job._running:
+                    self._idle_cond.wait()
+
+    def _enqueue(self, job):
+        """Queue a job for a worker thread. Called with the lock held."""
+        job._queued = True
+        heapq.heappush(self._queue, (-job.priority, next(self._sequence), job))
+        self._cond.notify()
+
+    def _submit(self, job, args, frame_id=None):
+        """Put the arguments in the mailbox of a job and queue it if idle."""
+        with self._cond:
+            if job.removed or self._stopped:
+                return False
+            if frame_id is not None:
+                if frame_id == job.last_frame_id:
+                    return False  # Already processed or waiting
+                job.last_frame_id = frame_id
+            job._args = args
+            # A running job is queued again when it returns
+            if not job._queued and not job._running:
+                self._enqueue(job)
+            return True
+
+    def _work(self):
+        """Run queued jobs. Runs on each worker thread."""
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                _, _, job = heapq.heappop(self._queue)
+                job._queued = False
+                if job.removed or job._args is None:
+                    # The queue may be empty now, wake wait_idle()
+                    self._idle_cond.notify_all()
+                    continue
+                args, job._args = job._args, None
+                job._running = True
+                self._n_running += 1
+
+            try:
+                job.handler(*args)
+            except Exception as e:
+                logger.exception(f"Frame processing job {job.name} failed: {e}")
+
+            with self._cond:
+                job._running = False
+                self._n_running -= 1
+                if job._args is not None and not job.removed:
+                    self._enqueue(job)
+                # Wake remove_job() and wait_idle()
+                self._idle_cond.notify_all()
+
+    def wait_idle(self, timeout=None):
+        """Wait until no job is queued or running.
+
+        Args:
+            timeout (float, optional): Maximum time to wait in seconds.
+
+        Returns:
+            bool: True if the scheduler is idle.
+        """
+        with self._idle_cond:
+            return self._idle_cond.wait_for(
+                lambda: not self._queue and not self._n_running, timeout
+            )
+
+    def shutdown(self, wait=True):
+        """Stop the worker threads. Queued frames are dropped.
+
+        Args:
+            wait (bool): Whether to wait until the running calls have returned.
+        """
+        with self._cond:
+            self._stopped = True
+            self._queue.clear()
+            self._cond.notify_all()
+            self._idle_cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
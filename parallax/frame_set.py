@@ -0,0 +1,205 @@
+"""
+FrameSetGrouper groups the frames of several cameras into time-aligned frame sets, so
+that stereo detection consumes frames captured at the same moment instead of
+pairing whatever each camera delivered last.
+
+Two grouping modes are supported:
+    timestamp  frames are matched by capture timestamp within a tolerance
+    trigger    cameras with software triggering enabled are triggered together,
+               then the new frames are matched by timestamp
+"""
+
+import logging
+
+# Set logger name
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)
+
+
+class FrameSet:
+    """Frames of several cameras captured at the same moment."""
+
+    def __init__(self, set_id, frames):
+        """Initialize a frame set.
+
+        Args:
+            set_id (int): Sequential ID of the frame set.
+            frames (dict): Camera serial number -> (frame_id, timestamp in ns).
+        """
+        self.set_id = set_id
+        self.frames = frames
+        timestamps = [ts for _, ts in frames.values()]
+        # The earliest capture time, so that stage positions are looked up conservatively
+        self.timestamp = min(timestamps)
+        self.spread_ns = max(timestamps) - self.timestamp
+
+    def __contains__(self, sn):
+        """Return True if the frame set holds a frame of the camera."""
+        return sn in self.frames
+
+    @property
+    def cameras(self):
+        """list: Serial numbers of the cameras in the frame set."""
+        return list(self.frames)
+
+    def get_frame_id(self, sn):
+        """Get the frame ID of a camera.
+
+        Args:
+            sn (str): Camera serial number.
+
+        Returns:
+            int or None: Frame ID, None if the camera is not in the frame set.
+        """
+        entry = self.frames.get(sn)
+        return entry[0] if entry is not None else None
+
+    def get_timestamp(self, sn):
+        """Get the capture timestamp (ns) of a camera's frame, None if not in the frame set."""
+        entry = self.frames.get(sn)
+        return entry[1] if entry is not None else None
+
+
+class FrameSetGrouper:
+    """Groups the buffered frames of several cameras into time-aligned frame sets."""
+
+    MODES = ("timestamp", "trigger")
+
+    def __init__(self, cameras, tolerance_ms=20.0, mode="timestamp", trigger_timeout=1.0):
+        """Initialize the grouper.
+
+        Args:
+            cameras (list): Cameras to group. Cameras without a frame buffer
+                (e.g. MockCamera) are ignored.
+            tolerance_ms (float): Maximum capture time difference within a frame set.
+            mode (str): "timestamp" or "trigger".
+            trigger_timeout (float): Seconds to wait for the triggered frames.
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown grouping mode '{mode}', expected one of {self.MODES}")
+        self.cameras = {}
+        for camera in cameras:
+            if hasattr(camera, "frame_buffer"):
+                self.cameras[camera.name(sn_only=True)] = camera
+        self.tolerance_ns = int(tolerance_ms * 1_000_000)
+        self.mode = mode
+        self.trigger_timeout = trigger_timeout
+        self.n_sets = 0
+        self.n_rejected = 0
+        self._last_frame_ids = {}
+        self._last_rejected = None
+
+    def reset(self):
+        """Forget the frames grouped so far."""
+        self._last_frame_ids = {}
+        self._last_rejected = None
+
+    def get_stats(self):
+        """Return the number of frame sets grouped and rejected for misalignment."""
+        return {"sets": self.n_sets, "rejected": self.n_rejected}
+
+    def trigger(self):
+        """
+        Triggers all cameras with software triggering enabled and waits until
+        every camera delivered a new frame.
+
+        Returns:
+            bool: True if all cameras delivered a frame within the timeout.
+        """
+        last_ids = {
+            sn: camera.frame_buffer.last_frame_id for sn, camera in self.cameras.items()
+        }
+        for camera in self.cameras.values():
+            if getattr(camera, "software_trigger_enabled", False):
+                camera.execute_software_trigger()
+        for sn, camera in self.cameras.items():
+            if not camera.frame_buffer.wait_for_frame(last_ids[sn], self.trigger_timeout):
+                logger.debug(f"{sn} did not deliver a triggered frame")
+                return False
+        return True
+
+    def _closest_frames(self):
+        """
+        Selects the buffered frame of each camera closest to the newest frame time
+        that all cameras have reached.
+
+        Returns:
+            dict or None: Camera serial number -> (frame_id, timestamp), None if a
+                camera has no buffered frame.
+        """
+        if not self.cameras:
+            return None
+        entries = {}
+        for sn, camera in self.cameras.items():
+            buffered = camera.frame_buffer.get_timestamps()
+            if not buffered:
+                return None
+            entries[sn] = buffered
+
+        reference = min(buffered[-1][1] for buffered in entries.values())
+        return {
+            sn: min(buffered, key=lambda entry: abs(entry[1] - reference))
+            for sn, buffered in entries.items()
+        }
+
+    def select(self):
+        """
+        Returns the frames of all cameras closest to a common capture time, without
+        checking the alignment tolerance or whether the frames were grouped before.
+        Used for one-off captures such as snapshots.
+
+        Returns:
+            FrameSet or None: Frame set, None if a camera has no buffered frame.
+        """
+        frames = self._closest_frames()
+        if frames is None:
+            return None
+        return FrameSet(self.n_sets, frames)
+
+    def match(self):
+        """
+        Matches the buffered frames of all cameras by capture timestamp.
+
+        The reference time is the newest frame time that all cameras have reached.
+        Each camera contributes its frame closest to the reference time.
+
+        Returns:
+            FrameSet or None: New frame set, None if no new aligned frame set is available.
+        """
+        frames = self._closest_frames()
+        if frames is None:
+            return None
+
+        # Every camera has to contribute a frame that was not grouped yet
+        for sn, (frame_id, _) in frames.items():
+            if frame_id <= self._last_frame_ids.get(sn, -1):
+                return None
+
+        timestamps = [ts for _, ts in frames.values()]
+        if max(timestamps) - min(timestamps) > self.tolerance_ns:
+            key = tuple(frame_id for frame_id, _ in frames.values())
+            if key != self._last_rejected:
+                self._last_rejected = key
+                self.n_rejected += 1
+                logger.debug(
+                    f"Frames not aligned: spread {(max(timestamps) - min(timestamps)) / 1e6:.1f} ms"
+                )
+            return None
+
+        frame_set = FrameSet(self.n_sets, frames)
+        self.n_sets += 1
+        self._last_frame_ids = {sn: frame_id for sn, (frame_id, _) in frames.items()}
+        return frame_set
+
+    def get_frame_set(self):
+        """
+        Returns the next time-aligned frame set.
+
+        In trigger mode the cameras are triggered first.
+
+        Returns:
+            FrameSet or None: New frame set, None if no aligned frame set is available.
+        """
+        if self.mode == "trigger" and not self.trigger():
+            return None
+        return self.match()
@@ -15,7 +15,8 @@ import logging
 import os
 from functools import partial
 
-from PyQt5.QtCore import QCoreApplication, QPoint, QStandardPaths, QTimer
+from PyQt5.QtCore import (QCoreApplication, QPoint, QStandardPaths, QTimer,
+                          pyqtSignal)
 from PyQt5.QtGui import QFont, QFontDatabase
 # Import required PyQt5 modules and other libraries
 from PyQt5.QtWidgets import (QApplication, QFileDialog, QGridLayout, QGroupBox,
@@ -23,6 +24,9 @@ from PyQt5.QtWidgets import (QApplication, QFileDialog, QGridLayout, QGroupBox,
                              QVBoxLayout, QWidget)
 from PyQt5.uic import loadUi
 
+from .detection_profiler import write_csv
+from .frame_scheduler import FrameScheduler
+from .frame_set import FrameSetGrouper
 from .recording_manager import RecordingManager
 from .screen_widget import ScreenWidget
 from .stage_widget import StageWidget
@@ -50,6 +54,8 @@ class MainWindow(QMainWindow):
     components, camera and stage management, and recording functionality.
     """
 
+    frame_set_ready = pyqtSignal(object)  # FrameSet grouped on a worker thread
+
     def __init__(self, model, dummy=False):
         """
         Initialize the MainWindow.
@@ -66,6 +72,11 @@ class MainWindow(QMainWindow):
         # Initialize an empty list to keep track of microscopeGrp widgets instances
         self.screen_widgets = []
         self.recording_camera_list = []
+        # Groups the frames of all cameras into time-aligned frame sets. Grouping runs
+        # as a scheduler job, so waiting for triggered frames does not block the GUI.
+        self.frame_set_grouper = None
+        self.frame_set_job = None
+        self.frame_set_ready.connect(self.refresh_frame_set)
 
         # Update camera information
         self.refresh_cameras()
@@ -145,7 +156,23 @@ class MainWindow(QMainWindow):
         self.startButton.clicked.connect(self.start_button_handler)
 
         # Recording functions
-        self.recordingManager = RecordingManager(self.model)
+        self.recordingManager = RecordingManager(
+            self.model,
+            recording_format=self.model.recording_format,
+            snapshot_format=self.model.snapshot_format,
+            png_compression=self.model.png_compression,
+        )
+        self.recordingManager.snapshot_writer.finished.connect(self.snapshot_finished)
+        self.burstButton.clicked.connect(
+            lambda: self.recordingManager.save_burst(
+                self.dirLabel.text(),
+                self.screen_widgets,
+                pre_seconds=self.model.burst_seconds,
+                post_seconds=self.model.burst_seconds,
+            )
+        )
+        self.burstButton.setVisible(self.model.burst_seconds > 0)
+        self.burstButton.setEnabled(False)
         self.snapshotButton.clicked.connect(
             lambda: self.recordingManager.save_last_image(
                 self.dirLabel.text(), self.screen_widgets
@@ -168,8 +195,8 @@ class MainWindow(QMainWindow):
         It adds mock cameras for testing purposes and scans for actual cameras if the application
         is not in dummy mode. This ensures that the list of available cameras is always up-to-date.
         """
-        # Add mock cameras for testing purposes
-        self.model.add_mock_cameras()
+        # Add mock cameras for testing purposes, rendering a reticle and a probe in dummy mode
+        self.model.add_mock_cameras(synthetic=self.dummy)
         # If not in dummy mode, scan for actual available cameras
         if not self.dummy:
             try:
@@ -210,18 +237,44 @@ class MainWindow(QMainWindow):
         if self.startButton.isChecked():
             print("\nRefreshing Screen")
             # Camera begin acquisition
+            cameras = []
             for screen in self.screen_widgets:
                 camera_name = screen.get_camera_name()
                 if camera_name not in refresh_camera_list:
+                    if self.model.sync_mode == "trigger" and screen.is_camera():
+                        screen.camera.set_software_trigger(True)
+                    if self.model.burst_seconds > 0 and screen.is_camera():
+                        # Keep the frames needed before a burst trigger
+                        screen.camera.enable_frame_history(2 * self.model.burst_seconds)
                     screen.start_acquisition_camera()
                     refresh_camera_list.append(camera_name)
+                    cameras.append(screen.camera)
+
+            # Group the frames into time-aligned frame sets
+            if self.model.sync_mode is not None:
+                self.frame_set_grouper = FrameSetGrouper(
+                    cameras,
+                    tolerance_ms=self.model.sync_tolerance_ms,
+                    mode=self.model.sync_mode,
+                    trigger_timeout=0.5,
+                )
+                if not self.frame_set_grouper.cameras:
+                    self.frame_set_grouper = None  # e.g. mock cameras only
+                else:
+                    self.frame_set_job = FrameScheduler.shared().add_job(
+                        partial(self.group_frame_set, self.frame_set_grouper),
+                        FrameScheduler.PRIORITY_DISPLAY,
+                        "frame set grouping",
+                    )
 
-            # Refreshing images to display screen
-            self.refresh_timer.start(125)
+            # Refreshing images to display screen. Frames already shown are skipped,
+            # so the refresh rate can exceed the camera frame rate.
+            self.refresh_timer.start(max(1, round(1000 / self.model.display_fps)))
 
             # Start button is checked, enable record and snapshot button.
             self.recordButton.setEnabled(True)
             self.snapshotButton.setEnabled(True)
+            self.burstButton.setEnabled(True)
 
         else:
             print("Stop Refreshing Screen")
@@ -229,23 +282,62 @@ class MainWindow(QMainWindow):
             self.recordButton.setEnabled(False)
             self.recordButton.setChecked(False)
             self.snapshotButton.setEnabled(False)
+            self.burstButton.setEnabled(False)
 
             # Stop Refresh: stop refreshing images to display screen
             if self.refresh_timer.isActive():
                 self.refresh_timer.stop()
 
+            if self.frame_set_job is not None:
+                # Wait for a running trigger before the cameras are stopped
+                self.frame_set_job.remove(wait=True)
+                self.frame_set_job = None
+            if self.frame_set_grouper is not None:
+                logger.info(f"Frame sets: {self.frame_set_grouper.get_stats()}")
+                self.frame_set_grouper = None
+
             # End acquisition from camera: stop acquiring images from camera to framebuffer
             for screen in self.screen_widgets:
                 camera_name = screen.get_camera_name()
                 if camera_name not in refresh_camera_list:
                     screen.stop_acquisition_camera()
+                    if self.model.sync_mode == "trigger" and screen.is_camera():
+                        screen.camera.set_software_trigger(False)
                     refresh_camera_list.append(camera_name)
 
     def refresh(self):
         """Refreshing from framebuffer to screen"""
+        if self.frame_set_job is not None:
+            # The screens are refreshed once the frame set is grouped
+            self.frame_set_job.submit()
+            return
         for screen in self.screen_widgets:
             screen.refresh()  # Refresh the screens
 
+    def group_frame_set(self, grouper):
+        """
+        Groups the next time-aligned frame set. Called by the frame scheduler, in trigger
+        mode this waits for the triggered frames.
+
+        Args:
+            grouper (FrameSetGrouper): Grouper of the running acquisition.
+        """
+        frame_set = grouper.get_frame_set()
+        if frame_set is not None:
+            self.frame_set_ready.emit(frame_set)
+
+    def refresh_frame_set(self, frame_set):
+        """
+        Refreshes the screens with a frame set grouped on the worker thread.
+
+        Args:
+            frame_set (FrameSet): Time-aligned frames of all cameras.
+        """
+        if self.frame_set_job is None:
+            return  # Grouped before the acquisition stopped
+        for screen in self.screen_widgets:
+            screen.refresh(frame_set)  # Refresh the screens
+
     def display_mock_camera(self):
         """Display mock camera when there is no detected camera."""
         self.createNewGroupBox(0, 0, mock=True)
@@ -345,6 +437,9 @@ class MainWindow(QMainWindow):
                 parent=microscopeGrp,
             )
         screen.setObjectName(f"Screen")
+        screen.show_camera_stats(self.model.camera_stats)
+        screen.set_detection_rate(self.model.detection_fps)
+        screen.set_detection_process(self.model.detection_processes)
         verticalLayout.addWidget(screen)
 
         if mock is False:
@@ -774,6 +869,32 @@ class MainWindow(QMainWindow):
         height = self.height()
         self.user_setting.save_user_configs(nColumn, directory, width, height)
 
+    def snapshot_finished(self, paths):
+        """
+        Reports the snapshots saved in the background.
+
+        Args:
+            paths (list): Paths of the saved snapshots.
+        """
+        for path in paths:
+            logger.debug(f"Snapshot saved: {path}")
+        print(f"Snapshot saved ({len(paths)} cameras)")
+
+    def save_detection_profile(self, path):
+        """
+        Saves the probe detection stage timings of all cameras to a CSV file.
+
+        Args:
+            path (str): Path of the CSV file.
+        """
+        profilers = {}
+        for screen in self.screen_widgets:
+            profiler = screen.get_detection_profiler()
+            if profiler is not None:
+                profilers[screen.get_camera_name()] = profiler
+        write_csv(path, profilers)
+        print(f"Detection profile saved: {path}")
+
     def closeEvent(self, event):
         """
         Handles the widget's close event by performing cleanup actions for the model instances.
@@ -787,4 +908,8 @@ class MainWindow(QMainWindow):
         self.model.close_all_point_meshes()
         self.model.close_clac_instance()
         self.model.close_reticle_metadata_instance()
+        # Finish writing the pending snapshots
+        self.recordingManager.snapshot_writer.shutdown(wait=True)
+        if self.model.detection_profile:
+            self.save_detection_profile(self.model.detection_profile)
         event.accept()
\ No newline at end of file
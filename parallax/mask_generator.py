@@ -25,6 +25,7 @@ class MaskGenerator:
             initial_detect (bool, optional): Whether to perform initial detection with different settings.
         """
         self.img = None
+        self.products = None
         self.original_size = (None, None)
         self.is_reticle_exist = None
         self.initial_detect = initial_detect
@@ -36,7 +37,10 @@ class MaskGenerator:
         if self.initial_detect:
             self.img = cv2.resize(self.img, (120, 90))
         else:
-            self.img = cv2.resize(self.img, (400, 300))
+            if self.products is not None:
+                self.img = self.products.resized((400, 300))
+            else:
+                self.img = cv2.resize(self.img, (400, 300))
             self.img = cv2.GaussianBlur(self.img, (9, 9), 0)
 
     def _apply_threshold(self):
@@ -183,11 +187,13 @@ class MaskGenerator:
         if self.is_reticle_exist is None:
             self._is_reticle_frame(threshold = threshold)
 
-    def process(self, img):
+    def process(self, img, products=None):
         """Process the input image and generate a mask.
 
         Args:
             img (numpy.ndarray): Input image.
+            products (FrameProducts, optional): Cached derived images of the frame.
+                If given, the downsampled level is taken from the cache.
 
         Returns:
             numpy.ndarray: Generated mask image.
@@ -201,6 +207,7 @@ class MaskGenerator:
             img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
 
         self.img = img
+        self.products = products
         self.original_size = img.shape[1], img.shape[0]
         self._resize_and_blur() # Resize to smaller image and blur
         if self.initial_detect:
@@ -218,4 +225,71 @@ class MaskGenerator:
             return None
         self._finalize_image()  # Resize back to original size
 
-        return self.img
\ No newline at end of file
+        return self.img
+
+
+class MaskCache:
+    """Reuse the mask of a MaskGenerator while the scene does not change.
+
+    The reticle and tissue barely change while the camera is fixed, so the mask is
+    only generated again when a thumbnail of the image differs from the thumbnail
+    of the image the cached mask was generated from, or after invalidate(), e.g.
+    when the camera settings change.
+    """
+
+    THUMBNAIL_SIZE = (40, 30)
+
+    def __init__(self, mask_generator, tolerance=6.0):
+        """Initialize the MaskCache object.
+
+        Args:
+            mask_generator (MaskGenerator): Generator of the cached mask.
+            tolerance (float, optional): Largest mean absolute difference in gray
+                levels between the thumbnails for which the cached mask is reused.
+        """
+        self.mask_generator = mask_generator
+        self.tolerance = tolerance
+        self.mask = None
+        self.thumbnail = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def is_reticle_exist(self):
+        """Whether the reticle was found in the image of the cached mask."""
+        return self.mask_generator.is_reticle_exist
+
+    def invalidate(self):
+        """Generate the mask again for the next image."""
+        self.thumbnail = None
+
+    def _get_thumbnail(self, img):
+        """Return the thumbnail of a grayscale or BGR image."""
+        if img.ndim == 3:
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(img, self.THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+
+    def process(self, img, products=None):
+        """Return the cached mask or generate it if the scene has changed.
+
+        Args:
+            img (numpy.ndarray): Input image.
+            products (FrameProducts, optional): Cached derived images of the frame.
+
+        Returns:
+            numpy.ndarray: Generated mask image, None if no reticle was found.
+        """
+        if img is None:
+            return None
+        thumbnail = self._get_thumbnail(img)
+        if (
+            self.thumbnail is not None
+            and cv2.absdiff(thumbnail, self.thumbnail).mean() <= self.tolerance
+        ):
+            self.hits += 1
+            return self.mask
+
+        self.misses += 1
+        self.mask = self.mask_generator.process(img, products=products)
+        self.thumbnail = thumbnail
+        return self.mask
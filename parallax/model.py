@@ -9,7 +9,9 @@ their initialization, configuration, and transformations between local and globa
 from collections import OrderedDict
 from PyQt5.QtCore import QObject, pyqtSignal
 from .camera import MockCamera, PySpinCamera, close_cameras, list_cameras
+from .replay_camera import ReplayCamera
 from .stage_listener import Stage, StageInfo
+from .synthetic_camera import SyntheticCamera
 
 class Model(QObject):
     """Model class to handle cameras, stages, and calibration data."""
@@ -17,16 +19,64 @@ class Model(QObject):
     msg_posted = pyqtSignal(str)
     accutest_point_reached = pyqtSignal()
 
-    def __init__(self, version="V1", bundle_adjustment=False):
+    def __init__(
+        self,
+        version="V1",
+        bundle_adjustment=False,
+        recording_format="video",
+        sync_mode=None,
+        sync_tolerance_ms=20.0,
+        roi_tracking=False,
+        camera_stats=False,
+        snapshot_format="png",
+        png_compression=1,
+        burst_seconds=0.0,
+        display_fps=8.0,
+        detection_fps=0.0,
+        detection_processes=False,
+        detection_profile=None,
+    ):
         """Initialize the Model object.
 
         Args:
             version (str): The version of the model, typically used for camera setup.
             bundle_adjustment (bool): Whether to enable bundle adjustment for calibration.
+            recording_format (str): Recording format, "video" (XVID .avi) or "raw" (lossless frames).
+            sync_mode (str, optional): Group the frames of all cameras into time-aligned
+                frame sets, "timestamp" or "trigger". Defaults to None (no grouping).
+            sync_tolerance_ms (float): Maximum capture time difference within a frame set.
+            roi_tracking (bool): Whether to narrow the camera acquisition to a region of
+                interest around the detected probe tip.
+            camera_stats (bool): Whether to show the acquisition health overlay on the
+                camera screens.
+            snapshot_format (str): Snapshot format, "png", "tiff" (uncompressed) or
+                "npy" (raw frame).
+            png_compression (int): PNG compression level of the snapshots from 0 to 9.
+            burst_seconds (float): Time saved before and after a burst capture. The
+                cameras keep a frame history of twice this length. 0 disables bursts.
+            display_fps (float): Refresh rate of the camera screens.
+            detection_fps (float): Maximum probe detection rate per camera. 0 runs the
+                detection on every new frame shown.
+            detection_processes (bool): Whether to run the probe detection of each
+                camera in a separate process.
+            detection_profile (str, optional): CSV file the probe detection stage
+                timings of all cameras are saved to on exit.
         """
         QObject.__init__(self)
         self.version = version
         self.bundle_adjustment = bundle_adjustment
+        self.recording_format = recording_format
+        self.sync_mode = sync_mode
+        self.sync_tolerance_ms = sync_tolerance_ms
+        self.roi_tracking = roi_tracking
+        self.camera_stats = camera_stats
+        self.snapshot_format = snapshot_format
+        self.png_compression = png_compression
+        self.burst_seconds = burst_seconds
+        self.display_fps = display_fps
+        self.detection_fps = detection_fps
+        self.detection_processes = detection_processes
+        self.detection_profile = detection_profile
         # camera
         self.cameras = []
         self.cameras_sn = []
@@ -98,26 +148,45 @@ class Model(QObject):
         for stage_sn in self.stages.keys():
             self.transforms[stage_sn] = [None, None]
 
-    def add_video_source(self, video_source):
+    def add_video_source(self, video_source, mode="realtime", loop=False):
         """Add a video source (camera).
 
         Args:
-            video_source: The camera object to add to the model's camera list.
+            video_source: The camera object to add to the model's camera list, or the path
+                of a raw recording / video file to replay with a ReplayCamera.
+            mode (str): Replay mode ("realtime", "fast" or "step") if a path is given.
+            loop (bool): Whether the replay restarts at the end if a path is given.
+
+        Returns:
+            The added camera object.
         """
+        if isinstance(video_source, str):
+            video_source = ReplayCamera(video_source, mode=mode, loop=loop)
         self.cameras.append(video_source)
+        self._count_cameras()
+        return video_source
 
-    def add_mock_cameras(self, n=1):
+    def add_mock_cameras(self, n=1, synthetic=False):
         """Add mock cameras for testing purposes.
 
         Args:
             n (int): The number of mock cameras to add.
+            synthetic (bool): Add synthetic cameras rendering a reticle and a probe
+                instead of noise.
         """
         for i in range(n):
-            self.cameras.append(MockCamera())
+            self.cameras.append(SyntheticCamera() if synthetic else MockCamera())
 
     def scan_for_cameras(self):
         """Scan and detect all available cameras."""
         self.cameras = list_cameras(version=self.version) + self.cameras
+        self._count_cameras()
+
+    def _count_cameras(self):
+        """Update the camera serial numbers and the number of mock and PySpin cameras.
+
+        Replay cameras count as PySpin cameras, since they are displayed the same way.
+        """
         self.cameras_sn = [camera.name(sn_only=True) for camera in self.cameras]
         self.nMockCameras = len(
             [
@@ -449,7 +518,7 @@ class Model(QObject):
     def save_all_camera_frames(self):
         """Save the current frames from all cameras."""
         for i, camera in enumerate(self.cameras):
-            if camera.last_image:
+            if camera.get_last_image() is not None:
                 filename = 'camera%d_%s.png' % (i, camera.get_last_capture_time())
                 camera.save_last_image(filename)
                 self.msg_log.post("Saved camera frame: %s" % filename)
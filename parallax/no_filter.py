@@ -1,13 +1,14 @@
 """
 NoFilter serves as a pass-through component in a frame processing pipeline, 
-employing a worker-thread model to asynchronously handle frames without modification, 
+employing a worker on the shared frame scheduler to asynchronously handle frames without modification, 
 facilitating integration and optional processing steps.
 """
 
 import logging
-import time
 
-from PyQt5.QtCore import QObject, QThread, pyqtSignal
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from .frame_scheduler import FrameScheduler
 
 # Set logger name
 logger = logging.getLogger(__name__)
@@ -20,9 +21,8 @@ class NoFilter(QObject):
     frame_processed = pyqtSignal(object)
 
     class Worker(QObject):
-        """Worker class for processing frames in a separate thread."""
+        """Worker class for processing frames on the frame scheduler."""
 
-        finished = pyqtSignal()
         frame_processed = pyqtSignal(object)
 
         def __init__(self, name):
@@ -30,17 +30,6 @@ class NoFilter(QObject):
             QObject.__init__(self)
             self.name = name
             self.running = True
-            self.new = False
-            self.frame = None
-
-        def update_frame(self, frame):
-            """Update the frame to be processed.
-
-            Args:
-                frame: The frame to be processed.
-            """
-            self.frame = frame
-            self.new = True
 
         def process(self, frame):
             """Process nothing (no filter) and emit the frame_processed signal.
@@ -58,78 +47,70 @@ class NoFilter(QObject):
             """Start the worker running."""
             self.running = True
 
-        def run(self):
-            """Run the worker thread."""
-            while self.running:
-                if self.new:
-                    self.process(self.frame)
-                    self.new = False
-                time.sleep(0.001)
-            self.finished.emit()
+        def run(self, frame):
+            """Process one frame. Called by the frame scheduler.
+
+            Args:
+                frame: The frame to be processed.
+            """
+            if self.running:
+                self.process(frame)
 
         def set_name(self, name):
             """Set name as camera serial number."""
             self.name = name
 
-    def __init__(self, camera_name):
-        """Initialize the filter object."""
+    def __init__(self, camera_name, scheduler=None):
+        """Initialize the filter object.
+
+        Args:
+            camera_name (str): Camera serial number.
+            scheduler (FrameScheduler, optional): Scheduler running the worker.
+                Defaults to the shared scheduler.
+        """
         logger.debug(f"{self.name} Init no filter manager")
         super().__init__()
+        self.scheduler = scheduler if scheduler is not None else FrameScheduler.shared()
         self.worker = None
+        self.job = None
         self.name = camera_name
-        self.thread = None
         self.start()
 
-    def init_thread(self):
-        """Initialize or reinitialize the worker and thread"""
-        if self.thread is not None:
-            self.clean()  # Clean up existing thread and worker before reinitializing 
-        self.thread = QThread()
+    def init_job(self):
+        """Initialize or reinitialize the worker and its scheduler job."""
+        if self.job is not None:
+            self.clean()  # Clean up existing job and worker before reinitializing
         self.worker = self.Worker(self.name)
-        self.worker.moveToThread(self.thread)
-
-        self.thread.started.connect(self.worker.run)
-        self.thread.finished.connect(self.thread.deleteLater)
-        self.thread.destroyed.connect(self.onThreadDestroyed)
-        self.threadDeleted = False
-
         self.worker.frame_processed.connect(self.frame_processed.emit)
-        self.worker.finished.connect(self.thread.quit)
-        self.worker.finished.connect(self.worker.deleteLater)
-        self.worker.destroyed.connect(self.onWorkerDestroyed) # Debug msg
+        self.job = self.scheduler.add_job(
+            self.worker.run, FrameScheduler.PRIORITY_DISPLAY, f"{self.name} no filter"
+        )
         logger.debug(f"{self.name} init camera name")
 
-    def process(self, frame):
+    def process(self, frame, frame_id=None):
         """Process the frame using the worker.
 
         Args:
             frame: The frame to be processed.
+            frame_id (int, optional): Camera frame ID. A frame is only processed once.
         """
-        if self.worker is not None:
-            self.worker.update_frame(frame)
+        if self.job is not None:
+            self.job.submit(frame, frame_id=frame_id)
 
     def start(self):
-        """Start the filter by reinitializing and starting the worker and thread."""
-        logger.debug(f" {self.name} Starting thread")
-        self.init_thread()  # Reinitialize and start the worker and thread
-        self.thread.start()
+        """Start the filter by reinitializing the worker and its job."""
+        logger.debug(f" {self.name} Starting job")
+        self.init_job()  # Reinitialize the worker and job
         self.worker.start_running()
 
     def stop(self):
         """Stop the filter by stopping the worker."""
-        logger.debug(f" {self.name} Stopping thread")
+        logger.debug(f" {self.name} Stopping job")
         if self.worker is not None:
             self.worker.stop_running()
-
-    def onWorkerDestroyed(self):
-        """Cleanup after worker finishes."""
-        logger.debug(f"{self.name} worker destroyed")
-
-    def onThreadDestroyed(self):
-        """Flag if thread is deleted"""
-        logger.debug(f"{self.name} thread destroyed")
-        self.threadDeleted = True
-        self.thread = None
+        if self.job is not None:
+            self.job.remove(wait=True)  # A restarted worker must not overlap the running one
+            self.job = None
 
     def set_name(self, camera_name):
         """Set camera name."""
@@ -138,19 +119,23 @@ class NoFilter(QObject):
             self.worker.set_name(self.name)
         logger.debug(f"{self.name} set camera name")
 
-    def clean(self):
-        """Safely clean up the reticle detection manager."""
-        logger.debug(f"{self.name} Cleaning the thread")
+    def clean(self, wait=True):
+        """Safely clean up the filter.
+
+        Args:
+            wait (bool): Whether to wait for a running frame to finish. Must be False
+                when called from a scheduler thread, e.g. by the garbage collector.
+        """
+        logger.debug(f"{self.name} Cleaning the job")
         if self.worker is not None:
             self.worker.stop_running()  # Signal the worker to stop
-        
-        if not self.threadDeleted and self.thread.isRunning():
-            self.thread.quit()  # Ask the thread to quit
-            self.thread.wait()  # Wait for the thread to finish
-        self.thread = None  # Clear the reference to the thread
+
+        if self.job is not None:
+            self.job.remove(wait=wait)  # Wait for a running frame to finish
+        self.job = None  # Clear the reference to the job
         self.worker = None  # Clear the reference to the worker
-        logger.debug(f"{self.name} Cleaned the thread")
+        logger.debug(f"{self.name} Cleaned the job")
 
     def __del__(self):
         """Destructor for the filter object."""
-        self.clean()
\ No newline at end of file
+        self.clean(wait=False)  # May run on any thread
@@ -0,0 +1,224 @@
+"""
+Vector overlay of the screen widgets: reticle points, axes, probe tips, crop boxes and
+text shown as pyqtgraph graphics items on top of the camera image.
+
+The detection workers describe what to show in an OverlayModel instead of drawing into
+the frame pixels, so that shared frames are never modified and the overlay costs nothing
+per frame. OverlayView rebuilds the graphics items of a layer only when the layer
+changes.
+
+A layer holds a tuple of shapes:
+    Points  filled circles, per point or common color
+    Lines   line segments
+    Rects   rectangle outlines
+    Text    multi-line text at an image position
+Coordinates are full-frame pixels and colors are RGB tuples.
+"""
+
+import logging
+import threading
+from collections import namedtuple
+
+import numpy as np
+import pyqtgraph as pg
+from PyQt5.QtCore import QObject, pyqtSignal
+
+# Set logger name
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)
+
+# Drawn above the camera image
+OVERLAY_Z_VALUE = 10
+
+Points = namedtuple("Points", ["coords", "radius", "colors"])
+Lines = namedtuple("Lines", ["segments", "color", "width"])
+Rects = namedtuple("Rects", ["rects", "color", "width"])
+Text = namedtuple("Text", ["lines", "pos", "color", "anchor"])
+
+
+def _color(color):
+    """Return an RGB color as a tuple of ints."""
+    return tuple(int(c) for c in color)
+
+
+def points(coords, radius, color):
+    """Create filled circles.
+
+    Args:
+        coords (iterable): (x, y) centers.
+        radius (float): Radius in image pixels.
+        color (tuple or list): RGB color of all points, or one RGB color per point.
+
+    Returns:
+        Points: Shape.
+    """
+    coords = tuple((float(x), float(y)) for x, y in coords)
+    if np.ndim(color) == 2:
+        colors = tuple(_color(c) for c in color)
+    else:
+        colors = (_color(color),) * len(coords)
+    return Points(coords, float(radius), colors)
+
+
+def lines(segments, color, width=1):
+    """Create line segments.
+
+    Args:
+        segments (iterable): ((x0, y0), (x1, y1)) segments.
+        color (tuple): RGB color.
+        width (float): Line width in screen pixels.
+
+    Returns:
+        Lines: Shape.
+    """
+    segments = tuple(
+        ((float(p0[0]), float(p0[1])), (float(p1[0]), float(p1[1]))) for p0, p1 in segments
+    )
+    return Lines(segments, _color(color), width)
+
+
+def rects(boxes, color, width=1):
+    """Create rectangle outlines.
+
+    Args:
+        boxes (iterable): (left, top, right, bottom) rectangles.
+        color (tuple): RGB color.
+        width (float): Line width in screen pixels.
+
+    Returns:
+        Rects: Shape.
+    """
+    boxes = tuple(tuple(float(v) for v in box) for box in boxes)
+    return Rects(boxes, _color(color), width)
+
+
+def text(lines_, pos, color=(255, 255, 255), anchor=(0, 0)):
+    """Create a text block.
+
+    Args:
+        lines_ (list or str): Text lines.
+        pos (tuple): (x, y) position in image pixels.
+        color (tuple): RGB color.
+        anchor (tuple): Anchor of the text box at pos, (0, 0) top left, (1, 1) bottom right.
+
+    Returns:
+        Text: Shape.
+    """
+    if isinstance(lines_, str):
+        lines_ = [lines_]
+    return Text(tuple(lines_), (float(pos[0]), float(pos[1])), _color(color), tuple(anchor))
+
+
+class OverlayModel(QObject):
+    """Named layers of overlay shapes. Layers can be set from any thread."""
+
+    changed = pyqtSignal(str)  # layer name
+
+    def __init__(self):
+        """Initialize an empty overlay."""
+        super().__init__()
+        self._layers = {}
+        self._lock = threading.Lock()
+
+    def set_layer(self, name, *shapes):
+        """Replace the shapes of a layer. Nothing happens if the shapes are unchanged.
+
+        Args:
+            name (str): Layer name.
+            *shapes: Shapes created with points(), lines(), rects() or text().
+        """
+        with self._lock:
+            if self._layers.get(name, ()) == shapes:
+                return
+            self._layers[name] = shapes
+        self.changed.emit(name)
+
+    def clear(self, *names):
+        """Remove the shapes of the given layers.
+
+        Args:
+            *names (str): Layer names.
+        """
+        for name in names:
+            self.set_layer(name)
+
+    def get_layer(self, name):
+        """Return the shapes of a layer.
+
+        Returns:
+            tuple: Shapes, empty if the layer does not exist.
+        """
+        with self._lock:
+            return self._layers.get(name, ())
+
+    def layer_names(self):
+        """Return the names of all layers."""
+        with self._lock:
+            return list(self._layers)
+
+
+class OverlayView:
+    """Shows the layers of an OverlayModel as graphics items in a view box."""
+
+    def __init__(self, view_box, model):
+        """Initialize the view.
+
+        Args:
+            view_box (pyqtgraph.ViewBox): View box showing the camera image.
+            model (OverlayModel): Overlay to show.
+        """
+        self.view_box = view_box
+        self.model = model
+        self.items = {}
+        self.model.changed.connect(self.update_layer)
+        for name in self.model.layer_names():
+            self.update_layer(name)
+
+    def update_layer(self, name):
+        """Rebuild the graphics items of a layer."""
+        for item in self.items.pop(name, []):
+            self.view_box.removeItem(item)
+        items = [self._create_item(shape) for shape in self.model.get_layer(name)]
+        items = [item for item in items if item is not None]
+        for item in items:
+            item.setZValue(OVERLAY_Z_VALUE)
+            self.view_box.addItem(item)
+        self.items[name] = items
+
+    @staticmethod
+    def _segments_item(segments, color, width):
+        """Create a curve item drawing unconnected segments."""
+        x = [coord for p0, p1 in segments for coord in (p0[0], p1[0])]
+        y = [coord for p0, p1 in segments for coord in (p0[1], p1[1])]
+        return pg.PlotCurveItem(x, y, connect="pairs", pen=pg.mkPen(color, width=width))
+
+    def _create_item(self, shape):
+        """Create the graphics item of a shape."""
+        if isinstance(shape, Points):
+            if not shape.coords:
+                return None
+            return pg.ScatterPlotItem(
+                pos=list(shape.coords),
+                size=2 * shape.radius,
+                brush=[pg.mkBrush(color) for color in shape.colors],
+                pen=None,
+                pxMode=False,
+            )
+        if isinstance(shape, Lines):
+            if not shape.segments:
+                return None
+            return self._segments_item(shape.segments, shape.color, shape.width)
+        if isinstance(shape, Rects):
+            if not shape.rects:
+                return None
+            segments = []
+            for left, top, right, bottom in shape.rects:
+                corners = [(left, top), (right, top), (right, bottom), (left, bottom)]
+                segments.extend(zip(corners, corners[1:] + corners[:1]))
+            return self._segments_item(segments, shape.color, shape.width)
+        if isinstance(shape, Text):
+            item = pg.TextItem("\n".join(shape.lines), color=shape.color, anchor=shape.anchor)
+            item.setPos(*shape.pos)
+            return item
+        logger.warning(f"Unknown overlay shape {shape}")
+        return None
@@ -1,21 +1,26 @@
 """
-ProbeDetectManager coordinates probe detection in images, leveraging PyQt threading 
-and signals for real-time processing. It handles frame updates, detection, 
+ProbeDetectManager coordinates probe detection in images, leveraging the shared frame 
+scheduler and PyQt signals for real-time processing. It handles frame updates, detection, 
 and result communication, utilizing components like MaskGenerator and ProbeDetector.
 """
 
 import logging
-import time
 
 import cv2
 import numpy as np
-from PyQt5.QtCore import QObject, QThread, pyqtSignal
+from PyQt5.QtCore import QObject, pyqtSignal
 
+from . import overlay as ov
 from .curr_bg_cmp_processor import CurrBgCmpProcessor
 from .curr_prev_cmp_processor import CurrPrevCmpProcessor
-from .mask_generator import MaskGenerator
+from .detection_process import DetectionProcess
+from .detection_profiler import DetectionProfiler
+from .frame_scheduler import FrameScheduler
+from .mask_generator import MaskCache, MaskGenerator
 from .probe_detector import ProbeDetector
 from .reticle_detection import ReticleDetection
+from .timestamps import NS_PER_SECOND
+from .tip_predictor import TipPredictor
 
 # Set logger name
 logger = logging.getLogger(__name__)
@@ -31,34 +36,40 @@ class ProbeDetectManager(QObject):
     """
     name = "None"
     frame_processed = pyqtSignal(object)
-    found_coords = pyqtSignal(str, str, tuple, tuple)
+    found_coords = pyqtSignal(object, object, str, tuple, tuple)  # timestamp (ns), frame_id, sn, stage_info, pixel_coords
+    tips_tracked = pyqtSignal(object, object, dict)  # timestamp (ns), frame_id, {sn: pixel_coords}
+    detection_missed = pyqtSignal(object, object)  # timestamp (ns), frame_id
+    RETICLE_LAYER = "probe_detection_reticle"
+    TIP_LAYER = "probe_detection_tip"
+    DEBUG_LAYER = "probe_detection_debug"
 
     class Worker(QObject):
         """
-        Worker class for performing probe detection in a separate thread. This class handles 
+        Worker class for performing probe detection on the frame scheduler. This class handles 
         image processing, probe detection, and reticle detection, and communicates results 
         through PyQt signals.
         """
-        finished = pyqtSignal()
         frame_processed = pyqtSignal(object)
-        found_coords = pyqtSignal(str, str, tuple)
+        found_coords = pyqtSignal(object, object, str, tuple)  # timestamp (ns), frame_id, sn, pixel_coords
+        tips_tracked = pyqtSignal(object, object, dict)  # timestamp (ns), frame_id, {sn: pixel_coords}
+        detection_missed = pyqtSignal(object, object)  # timestamp (ns), frame_id
 
-        def __init__(self, name, model):
+        def __init__(self, name, model, overlay):
             """
             Initialize the Worker object with camera and model data.
 
             Args:
                 name (str): Camera serial number.
                 model (object): The main model containing stage and camera data.
+                overlay (OverlayModel): Overlay showing the reticle and the probe tip.
             """
             QObject.__init__(self)
             self.model = model
+            self.overlay = overlay
             self.name = name # Camera serial number
             self.running = False
             self.is_detection_on = False
             self.is_calib = False
-            self.new = False
-            self.frame = None
             # Reticle
             self.reticle_coords = self.model.get_coords_axis(self.name)
             self.reticle_coords_debug = self.model.get_coords_for_debug(self.name)
@@ -74,11 +85,25 @@ class ProbeDetectManager(QObject):
             self.IMG_SIZE = (1000, 750)
             self.IMG_SIZE_ORIGINAL = (4000, 3000)
             self.CROP_INIT = 50
-            self.mask_detect = MaskGenerator()
+            # Window around the other probes tracked in the same frame, see track_other_probes()
+            self.CROP_MAX_OTHER_PROBES = 200
+            # The mask is only generated again when the scene or camera settings change
+            self.mask_detect = MaskCache(MaskGenerator())
+            # Predicts the tip from the stage motion to search a small window first
+            self.tip_predictor = TipPredictor(
+                self.model, self.name, self.IMG_SIZE_ORIGINAL, self.IMG_SIZE
+            )
 
             self.probe_stopped = False
             self.is_curr_prev_comp, self.is_curr_bg_comp = False, False
 
+            # Detection rate, see set_detection_rate()
+            self.detection_interval_ns = 0
+            self.last_detection_ts = None
+            self.detection_stats = {"frames": 0, "found": 0, "first_ts": None, "last_ts": None}
+            # Timing of the detection stages, see get_profiler()
+            self.profiler = DetectionProfiler()
+
             self.register_colormap()
 
         def update_sn(self, sn):
@@ -91,11 +116,14 @@ class ProbeDetectManager(QObject):
                 self.sn = sn
                 self.probeDetect = ProbeDetector(self.sn, self.IMG_SIZE)
                 self.currPrevCmpProcess = CurrPrevCmpProcessor(
-                    self.name, self.probeDetect, self.IMG_SIZE_ORIGINAL, self.IMG_SIZE
+                    self.name, self.probeDetect, self.IMG_SIZE_ORIGINAL, self.IMG_SIZE,
+                    profiler=self.profiler,
                 )
                 self.currBgCmpProcess = CurrBgCmpProcessor(
-                    self.name, self.probeDetect, self.IMG_SIZE_ORIGINAL, self.IMG_SIZE
+                    self.name, self.probeDetect, self.IMG_SIZE_ORIGINAL, self.IMG_SIZE,
+                    profiler=self.profiler,
                 )
+                self.currBgCmpProcess.update_reticle_zone(self.reticle_zone)
                 self.probes[self.sn] = {
                     "probeDetector": self.probeDetect,
                     "currPrevCmpProcess": self.currPrevCmpProcess,
@@ -114,107 +142,209 @@ class ProbeDetectManager(QObject):
                 else:
                     pass
 
-        def update_frame(self, frame, timestamp):
-            """Update the frame and timestamp.
-
-            Args:
-                frame (numpy.ndarray): Input frame.
-                timestamp (str): Timestamp of the frame.
-            """
-            self.frame = frame
-            self.new = True
-            self.timestamp = timestamp
-
-        def process(self, frame, timestamp):
+        def process(self, frame, timestamp, frame_id=None, products=None):
             """Process the frame for probe detection.
             1. First run currPrevCmpProcess
             2. If it fails on 1, run currBgCmpProcess
  
             Args:
                 frame (numpy.ndarray): Input frame.
-                timestamp (str): Timestamp of the frame.
+                timestamp (int): Capture time of the frame in ns.
+                frame_id (int, optional): Camera frame ID, passed on with the found coordinates.
+                products (FrameProducts, optional): Cached derived images of the frame.
+                    If given, gray and resized images are taken from the cache.
  
             Returns:
-                tuple: Processed frame and timestamp.
+                tuple: Frame and timestamp. The detected tip is shown on the overlay,
+                    the frame is not modified.
             """
-            if frame.ndim > 2:
-                gray_img = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            else:
-                gray_img = frame
+            tip_color = None
+            debug_shapes = []
+            with self.profiler.measure("preprocess"):
+                if products is not None:
+                    gray_img = products.gray()
+                    resized_img = products.resized(self.IMG_SIZE)
+                else:
+                    if frame.ndim > 2:
+                        gray_img = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                    else:
+                        gray_img = frame
+                    resized_img = cv2.resize(gray_img, self.IMG_SIZE)
+                self.curr_img = cv2.GaussianBlur(resized_img, (9, 9), 0)
 
-            resized_img = cv2.resize(gray_img, self.IMG_SIZE)
-            self.curr_img = cv2.GaussianBlur(resized_img, (9, 9), 0)
-            mask = self.mask_detect.process(resized_img)  # Generate Mask
+            with self.profiler.measure("mask"):
+                mask = self.mask_detect.process(resized_img, products=products)  # Cached mask
 
-            if self.mask_detect.is_reticle_exist and self.reticle_zone is None:
-                reticle = ReticleDetection(
-                    self.IMG_SIZE, self.mask_detect, self.name
-                )
-                self.reticle_zone = reticle.get_reticle_zone(
-                    frame
-                )  # Generate X and Y Coordinates zone
-                self.currBgCmpProcess.update_reticle_zone(self.reticle_zone)
+            if self.reticle_zone is None:
+                with self.profiler.measure("reticle_zone"):
+                    self.update_reticle_zone(frame, products)
 
+            tracked_tips = {}
             if self.prev_img is not None:
+                shared = {}  # Images shared by the probes tracked in this frame
                 if self.probeDetect.angle is None:
                     # Detecting probe for the first time
                     is_first_detect = True
-                    self.ret_crop, self.ret_tip = self.currPrevCmpProcess.first_cmp(
+                    self.ret_crop, self.ret_tip = self.run_cmp(
+                        "first_curr_prev", self.currPrevCmpProcess.first_cmp,
                         self.curr_img, self.prev_img, mask, gray_img
                     )
                     if self.ret_crop is False:
-                        self.ret_crop, self.ret_tip = self.currBgCmpProcess.first_cmp(
+                        self.ret_crop, self.ret_tip = self.run_cmp(
+                            "first_curr_bg", self.currBgCmpProcess.first_cmp,
                             self.curr_img, mask, gray_img
                         )
+                    if self.ret_crop:
+                        self.tip_predictor.set_anchor(self.sn, self.probeDetect.probe_tip)
                 else:  # Tracking for the known probe
                     is_first_detect = False
+                    predicted_tip = self.tip_predictor.predict(self.sn)
                     if self.is_calib and self.probe_stopped: # stage is stopped and first frame
-                        self.ret_crop, self.ret_tip = self.currPrevCmpProcess.update_cmp(
-                            self.curr_img, self.prev_img, mask, gray_img
+                        self.ret_crop, self.ret_tip = self.run_cmp(
+                            "update_curr_prev", self.currPrevCmpProcess.update_cmp,
+                            self.curr_img, self.prev_img, mask, gray_img, predicted_tip,
+                            shared=shared,
                         )
                         self.is_curr_prev_comp = True if (self.ret_crop and self.ret_tip) else False
                         if self.is_curr_prev_comp is False:
-                            self.ret_crop, self.ret_tip = self.currBgCmpProcess.update_cmp(
-                                self.curr_img, mask, gray_img
+                            self.ret_crop, self.ret_tip = self.run_cmp(
+                                "update_curr_bg", self.currBgCmpProcess.update_cmp,
+                                self.curr_img, mask, gray_img, predicted_tip
                             )
                             self.is_curr_bg_comp = True if (self.ret_crop and self.ret_tip) else False
                         
                         if self.is_curr_prev_comp or self.is_curr_bg_comp: 
-                            self.found_coords.emit(timestamp, self.sn, self.probeDetect.probe_tip_org)
-                            cv2.circle(frame, self.probeDetect.probe_tip_org, 5, (255, 0, 0), -1)
+                            self.emit_found_coords(timestamp, frame_id)
+                            tip_color = (255, 0, 0)
+                            self.tip_predictor.set_anchor(self.sn, self.probeDetect.probe_tip)
                             self.prev_img = self.curr_img
                             self.probe_stopped = False
 
                     elif self.is_calib and not self.probe_stopped: # stage is stopped and second frame
                         if self.is_curr_prev_comp or self.is_curr_bg_comp:
-                            self.found_coords.emit(timestamp, self.sn, self.probeDetect.probe_tip_org)
-                            cv2.circle(frame, self.probeDetect.probe_tip_org, 5, (255, 0, 0), -1)
+                            self.emit_found_coords(timestamp, frame_id)
+                            tip_color = (255, 0, 0)
                             
                     else: # stage is moving
                         self.probe_stopped = True
                         is_curr_prev_comp, is_curr_bg_comp = False, False
 
-                        ret_crop, ret_tip = self.currPrevCmpProcess.update_cmp(
-                            self.curr_img, self.prev_img, mask, gray_img
+                        ret_crop, ret_tip = self.run_cmp(
+                            "update_curr_prev", self.currPrevCmpProcess.update_cmp,
+                            self.curr_img, self.prev_img, mask, gray_img, predicted_tip,
+                            shared=shared,
                         )
                         is_curr_prev_comp = True if (ret_crop and ret_tip) else False
                         if is_curr_prev_comp is False:
-                            ret_crop, ret_tip = self.currBgCmpProcess.update_cmp(
-                                self.curr_img, mask, gray_img
+                            ret_crop, ret_tip = self.run_cmp(
+                                "update_curr_bg", self.currBgCmpProcess.update_cmp,
+                                self.curr_img, mask, gray_img, predicted_tip
                             )
                             is_curr_bg_comp = True if (ret_crop and ret_tip) else False
                         
                         if is_curr_prev_comp or is_curr_bg_comp: 
-                            cv2.circle(frame, self.probeDetect.probe_tip_org, 5, (255, 255, 0), -1)
+                            tip_color = (255, 255, 0)
+                            self.tip_predictor.set_anchor(self.sn, self.probeDetect.probe_tip)
 
                 if logger.getEffectiveLevel() == logging.DEBUG and self.is_calib:
-                    frame = self.debug_draw_boundary(frame, is_first_detect, \
+                    debug_shapes = self.debug_draw_boundary(frame.shape, is_first_detect, \
                         self.ret_crop, self.ret_tip, self.is_curr_prev_comp, self.is_curr_bg_comp)
+
+                with self.profiler.measure("other_probes"):
+                    tracked_tips = self.track_other_probes(mask, gray_img, shared)
             else:
                 self.prev_img = self.curr_img
 
+            tip_shapes = []
+            if tracked_tips:
+                tip_shapes.append(ov.points(list(tracked_tips.values()), 5, (0, 255, 255)))
+            if tip_color is not None:
+                tip_shapes.append(ov.points([self.probeDetect.probe_tip_org], 5, tip_color))
+                tracked_tips[self.sn] = self.probeDetect.probe_tip_org
+            if tracked_tips:
+                self.tips_tracked.emit(timestamp, frame_id, tracked_tips)
+            self.overlay.set_layer(ProbeDetectManager.TIP_LAYER, *tip_shapes)
+            self.overlay.set_layer(ProbeDetectManager.DEBUG_LAYER, *debug_shapes)
             return frame, timestamp
 
+        def run_cmp(self, stage, cmp, *args, **kwargs):
+            """Run a comparison, timing it and counting whether the tip was found.
+
+            Args:
+                stage (str): Stage name of the comparison in the profile.
+                cmp (callable): first_cmp or update_cmp of a processor.
+                *args: Arguments of the comparison.
+                **kwargs: Keyword arguments of the comparison.
+
+            Returns:
+                tuple: ret_crop and ret_tip of the comparison.
+            """
+            with self.profiler.measure(stage):
+                ret_crop, ret_tip = cmp(*args, **kwargs)
+            self.profiler.add_result(stage, bool(ret_crop and ret_tip))
+            return ret_crop, ret_tip
+
+        def track_other_probes(self, mask, gray_img, shared):
+            """Track the known probes other than the selected one in the same frame.
+
+            The probes share the blurred image, the mask and the difference image of
+            the frame. Only the motion since the previous image is searched, in a
+            window around the predicted or last tip of each probe, so a probe is not
+            mistaken for another moving probe.
+
+            The tracking is limited to showing the other probes: their tips are drawn
+            on the overlay and emitted with tips_tracked, but not with found_coords, so
+            they do not reach the stage listener or the calibration of the selected
+            probe. Only probes detected while they were selected are tracked, and a
+            probe that stopped moving is not found until it moves again.
+
+            Args:
+                mask (numpy.ndarray): Mask of the frame.
+                gray_img (numpy.ndarray): Gray frame.
+                shared (dict): Images shared by the probes tracked in this frame.
+
+            Returns:
+                dict: Detected tips in original image coordinates by serial number.
+            """
+            tips = {}
+            for sn, probe in self.probes.items():
+                probe_detector = probe["probeDetector"]
+                if sn == self.sn or probe_detector.angle is None:
+                    continue
+                ret_crop, ret_tip = probe["currPrevCmpProcess"].update_cmp(
+                    self.curr_img, self.prev_img, mask, gray_img,
+                    self.tip_predictor.predict(sn), shared=shared,
+                    max_crop_size=self.CROP_MAX_OTHER_PROBES,
+                )
+                if ret_crop and ret_tip:
+                    self.tip_predictor.set_anchor(sn, probe_detector.probe_tip)
+                    tips[sn] = probe_detector.probe_tip_org
+            return tips
+
+        def update_reticle_zone(self, frame=None, products=None):
+            """Set the X and Y coordinates zone of the reticle.
+
+            The zone is derived once from the stored camera calibration. Cameras
+            without calibration fall back to detecting the reticle in the frame.
+
+            Args:
+                frame (numpy.ndarray, optional): Frame to detect the reticle in.
+                products (FrameProducts, optional): Cached derived images of the frame.
+            """
+            reticle = ReticleDetection(self.IMG_SIZE, self.mask_detect, self.name)
+            self.reticle_zone = reticle.get_reticle_zone_from_calibration(
+                self.model.get_camera_intrinsic(self.name), self.IMG_SIZE_ORIGINAL
+            )
+            if self.reticle_zone is None and frame is not None \
+                    and self.mask_detect.is_reticle_exist:
+                self.reticle_zone = reticle.get_reticle_zone(frame, products=products)
+            for probe in self.probes.values():
+                probe["currBgCmpProcess"].update_reticle_zone(self.reticle_zone)
+
+        def invalidate_mask(self):
+            """Generate the mask again from the next frame."""
+            self.mask_detect.invalidate()
+
         def stop_running(self):
             """Stop the worker from running."""
             self.running = False
@@ -230,6 +360,7 @@ class ProbeDetectManager(QObject):
         def stop_detection(self):
             """Stop the probe detection."""
             self.is_detection_on = False
+            self.overlay.clear(ProbeDetectManager.TIP_LAYER, ProbeDetectManager.DEBUG_LAYER)
 
         def enable_calib(self):
             """Enable calibration mode."""
@@ -239,28 +370,25 @@ class ProbeDetectManager(QObject):
             """Disable calibration mode."""
             self.is_calib = False
 
-        def process_draw_reticle(self, frame):
+        def process_draw_reticle(self):
             """
-            Draw reticle coordinates on the frame for visualization.
+            Show the reticle coordinates on the overlay for visualization.
 
-            Args:
-                frame (numpy.ndarray): Input frame.
-
-            Returns:
-                numpy.ndarray: Frame with reticle coordinates drawn.
+            The overlay only changes when the reticle coordinates change, so the
+            reticle is not redrawn for every frame.
             """
+            shapes = []
             if self.reticle_coords is not None:
                 for coords in self.reticle_coords:
-                    for point_idx, (x, y) in enumerate(coords):
-                        color = self.colormap_reticle[point_idx][0].tolist()
-                        cv2.circle(frame, (x, y), 7, color, -1)
+                    colors = self.colormap_reticle[:len(coords), 0]
+                    shapes.append(ov.points(coords, 7, colors))
 
             if self.reticle_coords_debug is not None:
-                for point_idx, (x, y) in enumerate(self.reticle_coords_debug[0]):
-                    color = self.colormap_reticle_debug[point_idx][0].tolist()
-                    cv2.circle(frame, (x, y), 1, color, -1)
+                coords = self.reticle_coords_debug[0]
+                colors = self.colormap_reticle_debug[:len(coords), 0]
+                shapes.append(ov.points(coords, 1, colors))
 
-            return frame
+            self.overlay.set_layer(ProbeDetectManager.RETICLE_LAYER, *shapes)
 
         def register_colormap(self):
             """Register a colormap for visualizing reticle coordinates."""
@@ -282,34 +410,94 @@ class ProbeDetectManager(QObject):
                     )
                 self.colormap_reticle_debug = cv2.applyColorMap(indices, cv2.COLORMAP_JET)
             
-        def run(self):
-            """Run the worker thread."""
-            logger.debug("probe_detect_manager running ")
-            while self.running:
-                if self.new:
-                    if self.is_detection_on:
-                        self.frame, self.timestamp = self.process(
-                            self.frame, self.timestamp
-                        )
-                    self.frame = self.process_draw_reticle(self.frame)
-                    self.frame_processed.emit(self.frame)
-                    self.new = False
-                time.sleep(0.001)
-            logger.debug("probe_detect_manager running done")
-            self.finished.emit()
+        def emit_found_coords(self, timestamp, frame_id):
+            """Emit the detected probe tip and count the detection."""
+            self.detection_stats["found"] += 1
+            self.found_coords.emit(timestamp, frame_id, self.sn, self.probeDetect.probe_tip_org)
+
+        def is_detection_due(self, timestamp):
+            """Whether to run the detection on a frame, given the detection rate.
+
+            Args:
+                timestamp (int): Capture time of the frame in ns.
+            """
+            if self.detection_interval_ns <= 0 or timestamp is None \
+                    or self.last_detection_ts is None:
+                return True
+            return timestamp - self.last_detection_ts >= self.detection_interval_ns
+
+        def count_detection(self, timestamp):
+            """Record a frame run through the detection."""
+            stats = self.detection_stats
+            stats["frames"] += 1
+            if timestamp is not None:
+                self.last_detection_ts = timestamp
+                if stats["first_ts"] is None:
+                    stats["first_ts"] = timestamp
+                stats["last_ts"] = timestamp
+
+        def get_profiler(self):
+            """Return the profiler timing the detection stages."""
+            return self.profiler
+
+        def get_detection_stats(self):
+            """Return the number of frames run through the detection, the number of
+            detections and the detection rate over the capture times of the frames.
+
+            Returns:
+                dict: "frames", "found" and "fps".
+            """
+            stats = self.detection_stats
+            fps = 0.0
+            if stats["frames"] > 1 and stats["last_ts"] > stats["first_ts"]:
+                fps = (stats["frames"] - 1) * NS_PER_SECOND / (stats["last_ts"] - stats["first_ts"])
+            return {"frames": stats["frames"], "found": stats["found"], "fps": fps}
+
+        def run(self, frame, timestamp, frame_id=None, products=None):
+            """Process one frame. Called by the frame scheduler.
+
+            Args:
+                frame (numpy.ndarray): Input frame.
+                timestamp (int): Capture time of the frame in ns.
+                frame_id (int, optional): Camera frame ID.
+                products (FrameProducts, optional): Cached derived images of the frame.
+            """
+            if not self.running:
+                return
+            # Frames between detections are only displayed
+            if self.is_detection_on and self.is_detection_due(timestamp):
+                self.count_detection(timestamp)
+                found = self.detection_stats["found"]
+                with self.profiler.measure("total"):
+                    frame, timestamp = self.process(frame, timestamp, frame_id, products)
+                self.profiler.add_frame()
+                if self.detection_stats["found"] == found:
+                    self.detection_missed.emit(timestamp, frame_id)
+            self.frame_processed.emit(frame)
 
         def set_name(self, name):
             """Set name as camera serial number."""
             self.name = name
             self.reticle_coords = self.model.get_coords_axis(self.name)
             self.reticle_coords_debug = self.model.get_coords_for_debug(self.name)
+            self.register_colormap()
+            # Another camera, derive the reticle zone and the mask again
+            self.reticle_zone = None
+            self.mask_detect.invalidate()
+            self.tip_predictor.camera_name = self.name
+            self.tip_predictor.reset()
+            if self.running:
+                self.process_draw_reticle()
+
+        def close(self):
+            """Release the resources of the worker. Nothing to release."""
 
-        def debug_draw_boundary(self, frame, is_first_detect, ret_crop, ret_tip, is_curr_prev_comp, is_curr_bg_comp):
+        def debug_draw_boundary(self, frame_shape, is_first_detect, ret_crop, ret_tip, is_curr_prev_comp, is_curr_bg_comp):
             """
-            Draw debug boundaries and detection results on the frame.
+            Create the overlay shapes of the debug boundaries and detection results.
 
             Args:
-                frame (numpy.ndarray): The input frame where boundaries will be drawn.
+                frame_shape (tuple): Shape of the processed frame.
                 is_first_detect (bool): Whether this is the first detection attempt.
                 ret_crop (bool): Whether the crop region detection was successful.
                 ret_tip (bool): Whether the fine tip detection was successful.
@@ -317,20 +505,15 @@ class ProbeDetectManager(QObject):
                 is_curr_bg_comp (bool): Whether current-background frame comparison succeeded.
 
             Returns:
-                numpy.ndarray: Frame with boundary rectangles and other debug information drawn.
+                list: Overlay shapes of the boundary rectangles and other debug information.
             """
-            # Display text on the frame
+            shapes = []
+            # Display text at the bottom right corner
             if is_first_detect:
-                text = "first detection"
-                height, width = frame.shape[:2]
-                font = cv2.FONT_HERSHEY_SIMPLEX
-                font_scale = 1
-                thickness = 2
-                text_size = cv2.getTextSize(text, font, font_scale, thickness)[0]
-                text_x = width - text_size[0] - 10  # 10 pixels from the right edge
-                text_y = height - 10  # 10 pixels from the bottom edge   
+                height, width = frame_shape[:2]
+                pos = (width - 10, height - 10)  # 10 pixels from the right and bottom edges
                 color = (0, 255, 0) if (ret_crop and ret_tip) else (255, 0, 0) # Green if detection is successful, red otherwise
-                cv2.putText(frame, text, (text_x, text_y), font, font_scale, color, thickness)
+                shapes.append(ov.text("first detection", pos, color, anchor=(1, 1)))
 
                 # Debug log when first detection is successful
                 if (ret_crop and ret_tip): # debug log when first detection is successful
@@ -365,9 +548,9 @@ class ProbeDetectManager(QObject):
 
                 # Draw the rectangles if boundaries are valid
                 if top is not None:
-                    cv2.rectangle(frame, (left, top), (right, bottom), color_crop, 1)
+                    shapes.append(ov.rects([(left, top, right, bottom)], color_crop))
                 if top_f is not None:
-                    cv2.rectangle(frame, (left_f, top_f), (right_f, bottom_f), color_tip, 1)
+                    shapes.append(ov.rects([(left_f, top_f, right_f, bottom_f)], color_tip))
 
                 # Draw lines from tip and base points
                 tip, base = None, None
@@ -378,64 +561,175 @@ class ProbeDetectManager(QObject):
                     tip = self.currBgCmpProcess.get_point_tip()
                     base = self.currBgCmpProcess.get_point_base()
                 if tip is not None and base is not None:
-                    cv2.line(frame, tip, base, color_crop, 1)
+                    shapes.append(ov.lines([(tip, base)], color_crop))
+
+            return shapes
+
+    class ProcessWorker(Worker):
+        """
+        Worker running the probe detection of its frames in a separate process, so the
+        detection of several cameras is not serialized by the GIL. The detection rate,
+        the reticle overlay and the signals stay in this process.
+        """
+
+        def __init__(self, name, model, overlay):
+            """
+            Initialize the worker and start its detection process.
+
+            Args:
+                name (str): Camera serial number.
+                model (object): The main model containing stage and camera data.
+                overlay (OverlayModel): Overlay showing the reticle and the probe tip.
+            """
+            super().__init__(name, model, overlay)
+            self.detection_process = DetectionProcess(name)
+            # Serial numbers of the probes tracked in the process, whose detectors
+            # only exist in the process
+            self.probe_sns = []
+
+        def get_model_data(self):
+            """Return the model data read by the detection of all tracked probes."""
+            data = {
+                "coords_axis": self.reticle_coords,
+                "coords_debug": self.reticle_coords_debug,
+                "intrinsic": self.model.get_camera_intrinsic(self.name),
+                "transforms": {},
+                "stages": {},
+            }
+            for sn in self.probe_sns:
+                data["transforms"][sn] = self.model.get_transform(sn)
+                stage = self.model.get_stage(sn)
+                if stage is not None:
+                    data["stages"][sn] = (stage.stage_x, stage.stage_y, stage.stage_z)
+            return data
+
+        def process(self, frame, timestamp, frame_id=None, products=None):
+            """Run the probe detection of the frame in the detection process.
 
-            return frame
+            Args:
+                frame (numpy.ndarray): Input frame.
+                timestamp (int): Capture time of the frame in ns.
+                frame_id (int, optional): Camera frame ID.
+                products (FrameProducts, optional): Cached derived images of the frame.
+                    The detection only reads the gray image, which is sent to the process.
 
-    def __init__(self, model, camera_name):
+            Returns:
+                tuple: Frame and timestamp.
+            """
+            if products is not None:
+                gray_img = products.gray()
+            elif frame.ndim > 2:
+                gray_img = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            else:
+                gray_img = frame
+
+            result = self.detection_process.process(
+                gray_img, timestamp, frame_id, self.get_model_data()
+            )
+            if result is None:
+                return frame, timestamp
+            signals, layers, samples = result
+            self.profiler.add_samples(samples)
+            for name, shapes in layers.items():
+                self.overlay.set_layer(name, *shapes)
+            for signal, args in signals:
+                if signal == "found_coords":
+                    self.detection_stats["found"] += 1
+                getattr(self, signal).emit(*args)
+            return frame, timestamp
+
+        def update_sn(self, sn):
+            """Update the serial number of the probe detected in the process."""
+            self.sn = sn
+            if sn not in self.probe_sns:
+                self.probe_sns.append(sn)
+            self.detection_process.call("update_sn", sn)
+
+        def enable_calib(self):
+            """Enable calibration mode."""
+            super().enable_calib()
+            self.detection_process.call("enable_calib")
+
+        def disable_calib(self):
+            """Disable calibration mode."""
+            super().disable_calib()
+            self.detection_process.call("disable_calib")
+
+        def invalidate_mask(self):
+            """Generate the mask again from the next frame."""
+            self.detection_process.call("invalidate_mask")
+
+        def set_name(self, name):
+            """Set name as camera serial number."""
+            super().set_name(name)
+            self.detection_process.call("set_name", name)
+
+        def close(self):
+            """Stop the detection process."""
+            self.detection_process.close()
+
+    def __init__(self, model, camera_name, overlay=None, scheduler=None):
         """
         Initialize the ProbeDetectManager object.
 
         Args:
             model (object): The main model containing stage and camera data.
             camera_name (str): Name of the camera being managed for probe detection.
+            overlay (OverlayModel, optional): Overlay of the screen showing the camera.
+            scheduler (FrameScheduler, optional): Scheduler running the worker.
+                Defaults to the shared scheduler.
         """
         super().__init__()
         self.model = model
+        self.overlay = overlay if overlay is not None else ov.OverlayModel()
+        self.scheduler = scheduler if scheduler is not None else FrameScheduler.shared()
         self.worker = None
+        self.job = None
         self.name = camera_name
-        self.thread = None
-        self.threadDeleted = False
+        self.detection_interval_ns = 0
+        self.use_process = False
 
-    def init_thread(self):
+    def init_job(self):
         """
-        Initialize the worker thread and set up signal connections.
+        Initialize the worker and its scheduler job and set up signal connections.
         """
-        if self.thread is not None:
-            self.clean()  # Clean up existing thread and worker before reinitializing 
-        self.thread = QThread()
-        self.worker = self.Worker(self.name, self.model)
-        self.worker.moveToThread(self.thread)
-        
-        self.thread.started.connect(self.worker.run)
-        self.thread.finished.connect(self.thread.deleteLater)
-        self.thread.destroyed.connect(self.onThreadDestroyed)
-        self.threadDeleted = False
-
+        if self.job is not None:
+            self.clean()  # Clean up existing job and worker before reinitializing
+        elif self.worker is not None:
+            self.worker.close()  # Stopped, the job is already removed
+        worker_class = self.ProcessWorker if self.use_process else self.Worker
+        self.worker = worker_class(self.name, self.model, self.overlay)
+        self.worker.detection_interval_ns = self.detection_interval_ns
         self.worker.frame_processed.connect(self.frame_processed)
         self.worker.found_coords.connect(self.found_coords_print)
-        self.worker.finished.connect(self.thread.quit)
-        self.worker.finished.connect(self.worker.deleteLater)
-        self.worker.destroyed.connect(self.onWorkerDestroyed)
+        self.worker.tips_tracked.connect(self.tips_tracked)
+        self.worker.detection_missed.connect(self.detection_missed)
+        self.job = self.scheduler.add_job(
+            self.worker.run, FrameScheduler.PRIORITY_DETECTION, f"{self.name} probe detection"
+        )
         logger.debug(f"{self.name} init camera name")
 
-    def process(self, frame, timestamp):
+    def process(self, frame, timestamp, frame_id=None, products=None):
         """
         Process the frame using the worker.
 
         Args:
             frame (numpy.ndarray): Input frame.
-            timestamp (str): Timestamp of the frame.
+            timestamp (int): Capture time of the frame in ns.
+            frame_id (int, optional): Camera frame ID.
+            products (FrameProducts, optional): Cached derived images of the frame.
         """
-        if self.worker is not None:
-            self.worker.update_frame(frame, timestamp)
+        if self.job is not None:
+            # A frame is only processed once
+            self.job.submit(frame, timestamp, frame_id, products, frame_id=frame_id)
 
-    def found_coords_print(self, timestamp, sn, pixel_coords):
+    def found_coords_print(self, timestamp, frame_id, sn, pixel_coords):
         """
         Emit the found coordinates signal after detection.
 
         Args:
-            timestamp (str): Timestamp of the frame.
+            timestamp (int): Capture time of the frame in ns.
+            frame_id (int): Camera frame ID.
             sn (str): Serial number of the device.
             pixel_coords (tuple): Pixel coordinates of the detected probe tip.
         """
@@ -446,38 +740,40 @@ class ProbeDetectManager(QObject):
                 moving_stage.stage_y,
                 moving_stage.stage_z,
             )
-        self.found_coords.emit(timestamp, sn, stage_info, pixel_coords)
+        self.found_coords.emit(timestamp, frame_id, sn, stage_info, pixel_coords)
+
+    def is_running(self):
+        """
+        Return True while the probe detection manager is running.
+        """
+        return self.job is not None and self.worker is not None and self.worker.running
 
     def start(self):
         """
-        Start the probe detection manager by initializing the worker thread and running it.
+        Start the probe detection manager by initializing the worker and its scheduler job.
         """
-        logger.debug(f" {self.name} Starting thread")
-        self.init_thread()  # Reinitialize and start the worker and thread
+        logger.debug(f" {self.name} Starting job")
+        self.init_job()  # Reinitialize and start the worker and job
         self.worker.start_running()
-        self.thread.start()
+        self.worker.process_draw_reticle()
 
     def stop(self):
         """
-        Stop the probe detection manager by halting the worker thread.
+        Stop the probe detection manager by halting the worker and removing its job.
         """
-        logger.debug(f" {self.name} Stopping thread")
+        logger.debug(f" {self.name} Stopping job")
         if self.worker is not None:
             self.worker.stop_running()
-
-    def onWorkerDestroyed(self):
-        """
-        Cleanup function to handle when the worker is destroyed.
-        """
-        logger.debug(f"{self.name} worker destroyed")
-
-    def onThreadDestroyed(self):
-        """
-        Callback function when the thread is destroyed.
-        """
-        logger.debug(f"{self.name} thread destroyed")
-        self.threadDeleted = True
-        self.thread = None
+            stats = self.worker.get_detection_stats()
+            if stats["frames"]:
+                logger.info(
+                    f"{self.name} probe detection: {stats['frames']} frames, "
+                    f"{stats['found']} detections, {stats['fps']:.1f} fps"
+                )
+        if self.job is not None:
+            self.job.remove(wait=True)  # A restarted worker must not overlap the running one
+            self.job = None
+        self.overlay.clear(self.RETICLE_LAYER, self.TIP_LAYER, self.DEBUG_LAYER)
 
     def start_detection(self, sn):  # Call from stage listener.
         """Start the probe detection for a specific serial number.
@@ -507,6 +803,9 @@ class ProbeDetectManager(QObject):
         """
         if self.worker is not None:
             self.worker.enable_calib()
+        if self.job is not None:
+            # Tracking the probe for calibration goes before display and reticle detection
+            self.job.set_priority(FrameScheduler.PRIORITY_TRACKING)
     
     def disable_calibration(self, sn):  # Call from stage listener.
         """
@@ -517,6 +816,59 @@ class ProbeDetectManager(QObject):
         """
         if self.worker is not None:
             self.worker.disable_calib()
+        if self.job is not None:
+            self.job.set_priority(FrameScheduler.PRIORITY_DETECTION)
+
+    def set_detection_rate(self, fps):
+        """
+        Limit the probe detection rate. The frames in between are only displayed.
+
+        Args:
+            fps (float): Maximum detections per second by capture time. 0 runs the
+                detection on every new frame.
+        """
+        self.detection_interval_ns = int(NS_PER_SECOND / fps) if fps > 0 else 0
+        if self.worker is not None:
+            self.worker.detection_interval_ns = self.detection_interval_ns
+
+    def invalidate_mask(self):
+        """
+        Generate the mask again from the next frame, e.g. after the camera settings
+        have changed.
+        """
+        if self.worker is not None:
+            self.worker.invalidate_mask()
+
+    def set_use_process(self, enabled):
+        """
+        Run the probe detection in a separate process. Applies from the next start().
+
+        Args:
+            enabled (bool): Whether to use a detection process.
+        """
+        self.use_process = enabled
+
+    def get_profiler(self):
+        """
+        Return the profiler timing the detection stages of the running worker.
+
+        Returns:
+            DetectionProfiler or None: None if not started.
+        """
+        if self.worker is None:
+            return None
+        return self.worker.get_profiler()
+
+    def get_detection_stats(self):
+        """
+        Return the detection counters of the running worker.
+
+        Returns:
+            dict or None: "frames", "found" and "fps", None if not started.
+        """
+        if self.worker is None:
+            return None
+        return self.worker.get_detection_stats()
 
     def set_name(self, camera_name):
         """
@@ -530,24 +882,28 @@ class ProbeDetectManager(QObject):
             self.worker.set_name(self.name)
         logger.debug(f"{self.name} set camera name")
 
-    def clean(self):
+    def clean(self, wait=True):
         """
-        Clean up the worker and thread resources.
+        Clean up the worker and its scheduler job.
+
+        Args:
+            wait (bool): Whether to wait for a running frame to finish. Must be False
+                when called from a scheduler thread, e.g. by the garbage collector.
         """
-        logger.debug(f"{self.name} Cleaning the thread")
+        logger.debug(f"{self.name} Cleaning the job")
         if self.worker is not None:
             self.worker.stop_running()
 
-        if self.thread and not self.threadDeleted and self.thread.isRunning():
-            self.thread.quit()  # Ask the thread to quit
-            self.thread.wait()  # Wait for the thread to finish
-        self.thread = None  # Clear the reference to the thread
+        if self.job is not None:
+            self.job.remove(wait=wait)  # Wait for a running frame to finish
+        if self.worker is not None:
+            self.worker.close()
+        self.job = None  # Clear the reference to the job
         self.worker = None  # Clear the reference to the worker
-        self.threadDeleted = True
-        logger.debug(f"{self.name} Cleaned the thread")
+        logger.debug(f"{self.name} Cleaned the job")
 
     def __del__(self):
         """
         Destructor to ensure proper cleanup when the object is deleted.
         """
-        self.clean()
\ No newline at end of file
+        self.clean(wait=False)  # May run on any thread
\ No newline at end of file
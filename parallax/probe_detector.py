@@ -5,7 +5,6 @@ checks to ensure accuracy.
 """
 
 import logging
-from collections import Counter
 
 import cv2
 import numpy as np
@@ -42,6 +41,13 @@ class ProbeDetector:
         self.angle_step_bins_with_neighbor = np.append(
             np.insert(self.angle_step_bins, 0, 180), 0
         )
+        # Bin index of each bin value and the neighboring bins of each bin
+        self.angle_step_bin_index = {
+            angle: i for i, angle in enumerate(self.angle_step_bins.tolist())
+        }
+        self.neighboring_bins = np.lib.stride_tricks.sliding_window_view(
+            self.angle_step_bins_with_neighbor, 3
+        )
 
     def _find_represent_gradient(self, gradient=0):
         """Find the representative gradient.
@@ -49,7 +55,21 @@ class ProbeDetector:
         Returns:
             float: Representative gradient value.
         """
-        index = np.argmin(np.abs(self.angle_step_bins - gradient))
+        return self._find_represent_gradients(np.array([gradient]))[0]
+
+    def _find_represent_gradients(self, gradients):
+        """Find the representative gradients of an array of gradients, the nearest bin
+        of each, the lower one if two bins are as near.
+
+        Args:
+            gradients (numpy.ndarray): Gradients in degrees.
+
+        Returns:
+            numpy.ndarray: Representative gradient values.
+        """
+        index = np.argmin(
+            np.abs(self.angle_step_bins[np.newaxis, :] - gradients[:, np.newaxis]), axis=1
+        )
         return self.angle_step_bins[index]
 
     def _find_neighboring_gradients(self, target_angle):
@@ -59,13 +79,75 @@ class ProbeDetector:
             target_angle (float): Target angle.
 
         Returns:
-            numpy.ndarray: Neighboring gradients.
+            numpy.ndarray: Neighboring gradients, None if the angle is not a bin.
+        """
+        gradient_index = self.angle_step_bin_index.get(target_angle)
+        if gradient_index is None:
+            return None
+        return self.neighboring_bins[gradient_index]
+
+    def _segment_gradients(self, segments):
+        """Compute the representative gradients of line segments.
+
+        Args:
+            segments (numpy.ndarray): Line segments (N, 4) as returned by
+                cv2.HoughLinesP, each as x2, y2, x1, y1.
+
+        Returns:
+            numpy.ndarray: Representative gradient of each segment.
+        """
+        dx = segments[:, 0] - segments[:, 2]
+        dy = segments[:, 1] - segments[:, 3]
+        gradients = (np.degrees(np.arctan2(dy, dx)) + 180) % 180
+        return self._find_represent_gradients(gradients)
+
+    def _get_extremal_points(self, segments, img_height):
+        """Find the highest and the lowest end points of line segments.
+
+        Of points at the same height, the lowest point is the first one and the highest
+        point is the last x2, y2 end point, or the first point if there is none, in the
+        order of the segments.
+
+        Args:
+            segments (numpy.ndarray): Line segments (N, 4), each as x2, y2, x1, y1.
+            img_height (int): Height of the image.
+
+        Returns:
+            tuple: (highest_point, lowest_point), (0, 0) if none is found.
+        """
+        # End points in the order x1, y1 then x2, y2 of each segment
+        points = segments[:, [2, 3, 0, 1]].reshape(-1, 2)
+        ys = points[:, 1]
+
+        lowest_point = (0, 0)
+        index = np.argmax(ys)
+        if ys[index] > 0:
+            lowest_point = tuple(points[index])
+
+        highest_point = (0, 0)
+        min_y = ys.min()
+        if min_y < img_height:
+            # Of the points at min_y, the x2, y2 points replace the first one
+            at_min = np.flatnonzero(ys == min_y)
+            second = at_min[at_min % 2 == 1]
+            index = second[-1] if second.size else at_min[0]
+            highest_point = tuple(points[index])
+        return highest_point, lowest_point
+
+    def _most_common_gradient(self, gradients):
+        """Find the most common gradient, the first one found of equally common ones.
+
+        Args:
+            gradients (numpy.ndarray): Representative gradients.
+
+        Returns:
+            Most common gradient.
         """
-        gradient_index = np.where(self.angle_step_bins == target_angle)[0][0]
-        neighboring_gradients = self.angle_step_bins_with_neighbor[
-            gradient_index : gradient_index + 3
-        ]
-        return neighboring_gradients
+        values, first_index, counts = np.unique(
+            gradients, return_index=True, return_counts=True
+        )
+        candidates = np.flatnonzero(counts == counts.max())
+        return values[candidates[np.argmin(first_index[candidates])]]
 
     def _contour_preprocessing(
         self, img, thresh=20, remove_noise=True, noise_threshold=1
@@ -153,7 +235,6 @@ class ProbeDetector:
         """
         found_ret = False
         self.gradients = []
-        max_y, min_y = 0, img.shape[0]
         lowest_point = (0, 0)
         highest_point = (0, 0)
         line_segments = cv2.HoughLinesP(
@@ -174,27 +255,11 @@ class ProbeDetector:
                 )
                 return None, highest_point, lowest_point
 
-            for line in line_segments:
-                x2, y2, x1, y1 = line[0]
-                # Calculate the gradient
-                gradient = np.arctan2(y2 - y1, x2 - x1)
-                gradient = np.degrees(gradient)
-                gradient += 180
-                gradient %= 180
-                representing_gradient = self._find_represent_gradient(gradient)
-                self.gradients.append(representing_gradient)
-                if y1 > max_y:
-                    max_y = y1
-                    lowest_point = (x1, y1)
-                if y2 > max_y:
-                    max_y = y2
-                    lowest_point = (x2, y2)
-                if y1 < min_y:
-                    min_y = y1
-                    highest_point = (x1, y1)
-                if y2 <= min_y:
-                    min_y = y2
-                    highest_point = (x2, y2)
+            segments = line_segments[:, 0, :]
+            self.gradients = self._segment_gradients(segments)
+            highest_point, lowest_point = self._get_extremal_points(
+                segments, img.shape[0]
+            )
 
         if len(self.gradients) > 0:
             if self._is_distance_in_thres(highest_point, lowest_point):
@@ -225,7 +290,6 @@ class ProbeDetector:
         """
         self.gradients = []
         updated_gradient = self.angle
-        max_y, min_y = 0, img.shape[0]
         line_segments = cv2.HoughLinesP(
             img,
             1,
@@ -237,20 +301,10 @@ class ProbeDetector:
         found_ret, lowest_point, highest_point = False, (0, 0), (0, 0)
 
         # Find the neighboring gradients
-        gradient_index = np.where(self.angle_step_bins == self.angle)
-
-        if gradient_index is None:
-            return found_ret, highest_point, lowest_point
-
-        # Check if gradient_index is not empty
-        if gradient_index[0].size == 0:
+        neighboring_gradients = self._find_neighboring_gradients(self.angle)
+        if neighboring_gradients is None:
             return found_ret, highest_point, lowest_point
 
-        gradient_index = gradient_index[0][0]
-        neighboring_gradients = self.angle_step_bins_with_neighbor[
-            gradient_index : gradient_index + 3
-        ]
-
         # Draw the line segments
         if line_segments is not None:
             if (len(line_segments)) >= 30:
@@ -259,30 +313,15 @@ class ProbeDetector:
                 )
                 return found_ret, highest_point, lowest_point
 
-            for line in line_segments:
-                x2, y2, x1, y1 = line[0]
-                # Calculate the gradient
-                gradient = np.arctan2(y2 - y1, x2 - x1)
-                gradient = np.degrees(gradient)
-                gradient += 180
-                gradient %= 180
-                representing_gradient = self._find_represent_gradient(gradient)
-
-                if representing_gradient in neighboring_gradients:
-                    self.gradients.append(representing_gradient)
-                    found_ret = True
-                    if y1 > max_y:
-                        max_y = y1
-                        lowest_point = (x1, y1)
-                    if y2 > max_y:
-                        max_y = y2
-                        lowest_point = (x2, y2)
-                    if y1 < min_y:
-                        min_y = y1
-                        highest_point = (x1, y1)
-                    if y2 <= min_y:
-                        min_y = y2
-                        highest_point = (x2, y2)
+            segments = line_segments[:, 0, :]
+            gradients = self._segment_gradients(segments)
+            is_neighbor = np.isin(gradients, neighboring_gradients)
+            if is_neighbor.any():
+                found_ret = True
+                self.gradients = gradients[is_neighbor]
+                highest_point, lowest_point = self._get_extremal_points(
+                    segments[is_neighbor], img.shape[0]
+                )
 
             if found_ret is False:
                 return found_ret, highest_point, lowest_point
@@ -297,8 +336,7 @@ class ProbeDetector:
                 )
                 return False, highest_point, lowest_point
 
-            gradient_counts = Counter(self.gradients)
-            updated_gradient, _ = gradient_counts.most_common(1)[0]
+            updated_gradient = self._most_common_gradient(self.gradients)
             logger.debug(
                 f"target angle: {self.angle}, updated_detected: {updated_gradient}, neighbor: {neighboring_gradients}"
             )
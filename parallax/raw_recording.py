@@ -0,0 +1,211 @@
+"""
+Raw lossless recording of undebayered camera frames.
+
+RawRecordingSink appends raw Bayer/Mono8 frames into large preallocated chunk files
+and keeps a compact index (frame ID, capture timestamp, chunk number, byte offset) of
+every written frame. It is used as a sink of AsyncFrameWriter, so recording costs
+little more than a memory copy on the writer thread. RawRecordingReader memory-maps
+the chunks to read the bit-exact frames back, e.g. to reproduce detection failures.
+
+Layout of a recording directory:
+    meta.json          frame shape, dtype, pixel format, frames per chunk, metadata
+    index.bin          one INDEX_DTYPE record per frame
+    chunk_00000.bin    frames_per_chunk raw frames, back to back
+    chunk_00001.bin    ...
+"""
+
+import json
+import logging
+import os
+
+import numpy as np
+
+# Set logger name
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)
+
+RAW_RECORDING_EXTENSION = ".raw"
+META_FILE = "meta.json"
+INDEX_FILE = "index.bin"
+INDEX_DTYPE = np.dtype(
+    [
+        ("frame_id", "<i8"),
+        ("timestamp", "<i8"),
+        ("chunk", "<i4"),
+        ("offset", "<i8"),
+    ]
+)
+
+
+def _chunk_filename(chunk):
+    """Return the file name of the given chunk number."""
+    return f"chunk_{chunk:05d}.bin"
+
+
+class RawRecordingSink:
+    """Writes raw frames into preallocated chunk files with a frame index."""
+
+    def __init__(self, path, pixelformat=None, frames_per_chunk=100, metadata=None):
+        """Create the recording directory.
+
+        Args:
+            path (str): Recording directory. Created if it does not exist.
+            pixelformat (str, optional): Pixel format of the raw frames, e.g. "BayerRG8".
+            frames_per_chunk (int): Number of frames preallocated per chunk file. Defaults to 100.
+            metadata (dict, optional): Additional information stored in meta.json
+                (e.g. camera serial number, frame rate).
+        """
+        self.path = path
+        self.pixelformat = pixelformat
+        self.frames_per_chunk = frames_per_chunk
+        self.metadata = metadata if metadata is not None else {}
+
+        self.frame_shape = None
+        self.dtype = None
+        self.frame_bytes = 0
+        self.n_frames = 0
+        self.chunk = -1
+        self.chunk_file = None
+
+        os.makedirs(self.path, exist_ok=True)
+        self.index_file = open(os.path.join(self.path, INDEX_FILE), "wb")
+
+    def _write_meta(self):
+        """Write meta.json describing the recording."""
+        meta = {
+            "frame_shape": list(self.frame_shape) if self.frame_shape else None,
+            "dtype": self.dtype.str if self.dtype is not None else None,
+            "pixelformat": self.pixelformat,
+            "frames_per_chunk": self.frames_per_chunk,
+            "n_frames": self.n_frames,
+            "metadata": self.metadata,
+        }
+        with open(os.path.join(self.path, META_FILE), "w") as f:
+            json.dump(meta, f, indent=2)
+
+    def _open_chunk(self, chunk):
+        """Close the current chunk and preallocate the next one."""
+        if self.chunk_file is not None:
+            self.chunk_file.close()
+        self.chunk = chunk
+        self.chunk_file = open(os.path.join(self.path, _chunk_filename(chunk)), "wb+")
+        self.chunk_file.truncate(self.frames_per_chunk * self.frame_bytes)
+        logger.debug(f"Open raw recording chunk {chunk} in {self.path}")
+
+    def write(self, frame, frame_id=None, timestamp=None):
+        """Append a raw frame.
+
+        Args:
+            frame (numpy.ndarray): Raw frame. All frames of a recording must have the same shape.
+            frame_id (int, optional): Frame ID. Defaults to the running frame count.
+            timestamp (int, optional): Capture time of the frame in nanoseconds.
+        """
+        if self.frame_shape is None:
+            self.frame_shape = frame.shape
+            self.dtype = frame.dtype
+            self.frame_bytes = frame.nbytes
+            self._write_meta()
+        elif frame.shape != self.frame_shape or frame.dtype != self.dtype:
+            raise ValueError(
+                f"Frame {frame.shape} {frame.dtype} does not match the recording "
+                f"{self.frame_shape} {self.dtype}"
+            )
+
+        chunk, slot = divmod(self.n_frames, self.frames_per_chunk)
+        if chunk != self.chunk:
+            self._open_chunk(chunk)
+        offset = slot * self.frame_bytes
+        self.chunk_file.seek(offset)
+        self.chunk_file.write(np.ascontiguousarray(frame).data)
+
+        record = np.zeros(1, dtype=INDEX_DTYPE)
+        record["frame_id"] = frame_id if frame_id is not None else self.n_frames
+        record["timestamp"] = timestamp if timestamp is not None else -1
+        record["chunk"] = chunk
+        record["offset"] = offset
+        self.index_file.write(record.tobytes())
+        self.n_frames += 1
+
+    def release(self):
+        """Flush the index, trim the unused part of the last chunk and update meta.json."""
+        if self.chunk_file is not None:
+            used = (self.n_frames - self.chunk * self.frames_per_chunk) * self.frame_bytes
+            self.chunk_file.truncate(used)
+            self.chunk_file.close()
+            self.chunk_file = None
+        self.index_file.close()
+        self._write_meta()
+
+
+class RawRecordingReader:
+    """Reads a raw recording back through memory-mapped chunk files."""
+
+    def __init__(self, path):
+        """Open a recording directory.
+
+        Args:
+            path (str): Recording directory written by RawRecordingSink.
+        """
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+        self.pixelformat = meta["pixelformat"]
+        self.frames_per_chunk = meta["frames_per_chunk"]
+        self.metadata = meta.get("metadata", {})
+        self.frame_shape = tuple(meta["frame_shape"]) if meta["frame_shape"] else None
+        self.dtype = np.dtype(meta["dtype"]) if meta["dtype"] else None
+
+        # The index is the source of truth, meta.json may be stale after a crash
+        self.index = np.fromfile(os.path.join(path, INDEX_FILE), dtype=INDEX_DTYPE)
+        self.frame_ids = self.index["frame_id"]
+        self.timestamps = self.index["timestamp"]
+        self._chunks = {}
+
+    def __len__(self):
+        """Return the number of recorded frames."""
+        return len(self.index)
+
+    def __iter__(self):
+        """Iterate over (frame_id, timestamp, frame) tuples."""
+        for i in range(len(self)):
+            yield int(self.frame_ids[i]), int(self.timestamps[i]), self.get_frame(i)
+
+    def _get_chunk(self, chunk):
+        """Return the memory map of a chunk file."""
+        mm = self._chunks.get(chunk)
+        if mm is None:
+            mm = np.memmap(
+                os.path.join(self.path, _chunk_filename(chunk)), dtype=np.uint8, mode="r"
+            )
+            self._chunks[chunk] = mm
+        return mm
+
+    def get_frame(self, index):
+        """Get a frame by its position in the recording.
+
+        Args:
+            index (int): Frame position, 0 <= index < len(self).
+
+        Returns:
+            numpy.ndarray: Read-only memory-mapped view of the raw frame.
+        """
+        record = self.index[index]
+        frame_bytes = int(np.prod(self.frame_shape)) * self.dtype.itemsize
+        mm = self._get_chunk(int(record["chunk"]))
+        offset = int(record["offset"])
+        return mm[offset:offset + frame_bytes].view(self.dtype).reshape(self.frame_shape)
+
+    def get_frame_by_id(self, frame_id):
+        """Get a frame by its camera frame ID.
+
+        Returns:
+            numpy.ndarray or None: Raw frame, None if the frame ID was not recorded.
+        """
+        matches = np.flatnonzero(self.frame_ids == frame_id)
+        if len(matches) == 0:
+            return None
+        return self.get_frame(int(matches[0]))
+
+    def close(self):
+        """Release the memory maps."""
+        self._chunks.clear()
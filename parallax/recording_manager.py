@@ -6,6 +6,11 @@ stopped across active cameras.
 
 import logging
 import os
+import time
+
+from .frame_set import FrameSetGrouper
+from .snapshot_writer import SnapshotWriter
+from .timestamps import format_timestamp_ns
 
 # Set logger name
 logger = logging.getLogger(__name__)
@@ -17,39 +22,132 @@ logging.getLogger("PyQt5.uic.properties").setLevel(logging.WARNING)
 class RecordingManager:
     """RecordingManager manages snapshot saving and video recording"""
 
-    def __init__(self, model):
-        """Initialize recording manager"""
+    RECORDING_FORMATS = ("video", "raw")
+
+    def __init__(
+        self, model, recording_format="video", snapshot_format="png", png_compression=1
+    ):
+        """Initialize recording manager
+
+        Args:
+            model (Model): The data model.
+            recording_format (str): "video" for XVID .avi files, "raw" for lossless
+                undebayered frames with a frame index.
+            snapshot_format (str): "png", "tiff" (uncompressed) or "npy" (raw frame).
+            png_compression (int): PNG compression level from 0 to 9.
+        """
         self.model = model
         self.recording_camera_list = []
         self.snapshot_camera_list = []
+        self.burst_camera_list = []
+        self.recording_format = None
+        self.set_recording_format(recording_format)
+        # Snapshots are encoded in the background, snapshot_writer.finished is
+        # emitted with the saved paths.
+        self.snapshot_writer = SnapshotWriter(snapshot_format, png_compression)
+
+    def set_recording_format(self, recording_format):
+        """Set the format used by the next recording.
+
+        Args:
+            recording_format (str): "video" or "raw".
+        """
+        if recording_format not in self.RECORDING_FORMATS:
+            raise ValueError(
+                f"Unknown recording format '{recording_format}', "
+                f"expected one of {self.RECORDING_FORMATS}"
+            )
+        self.recording_format = recording_format
 
     def save_last_image(self, save_path, screen_widgets):
-        """Saves the last captured image from all active camera feeds."""
+        """Saves a snapshot from all active camera feeds.
+
+        The frames of all cameras closest to a common capture time are copied out of
+        the ring buffers. Conversion and encoding run on the snapshot writer pool, so
+        this returns immediately.
+
+        Returns:
+            list: Futures returning the saved paths.
+        """
         # Initialize the list to keep track of cameras from which an image has been saved
         self.snapshot_camera_list = []
         # Get the directory path where the images will be saved
-        if os.path.exists(save_path):
-            print("\nSnapshot...")
-            for screen in screen_widgets:
-                # Save image only for 'Blackfly' camera
-                if screen.is_camera():
-                    # Use custom name of the camera if it has one, otherwise use the camera's serial number
-                    camera_name = screen.get_camera_name()
-                    if camera_name not in self.snapshot_camera_list:
-                        customName = screen.parent().title()
-                        customName = customName if customName else camera_name
+        if not os.path.exists(save_path):
+            print(f"Directory {save_path} does not exist!")
+            return []
 
-                        # Save the image with a timestamp and custom name
-                        screen.save_image(
-                            save_path, isTimestamp=True, name=customName
-                        )
+        print("\nSnapshot...")
+        cameras = {}
+        for screen in screen_widgets:
+            # Save image only for 'Blackfly' camera
+            if screen.is_camera():
+                # Use custom name of the camera if it has one, otherwise use the camera's serial number
+                camera_name = screen.get_camera_name()
+                if camera_name not in cameras:
+                    customName = screen.parent().title()
+                    customName = customName if customName else camera_name
+                    cameras[camera_name] = (screen.camera, customName)
+            else:
+                logger.debug("save_last_image) camera not found")
 
-                        # Add the camera to the list of cameras from which an image has been saved
-                        self.snapshot_camera_list.append(camera_name)
-                else:
-                    logger.debug("save_last_image) camera not found")
-        else:
+        frame_set = FrameSetGrouper([camera for camera, _ in cameras.values()]).select()
+        snapshots = []
+        for camera_name, (camera, customName) in cameras.items():
+            frame, timestamp = None, None
+            if frame_set is not None and camera_name in frame_set:
+                frame = camera.frame_buffer.copy_frame(frame_set.get_frame_id(camera_name))
+                timestamp = frame_set.get_timestamp(camera_name)
+            if frame is None:
+                logger.error(f"{camera_name}: Image not found or couldn't be retrieved.")
+                continue
+            # Save the image with a timestamp and custom name
+            path = os.path.join(save_path, f"{customName}_{format_timestamp_ns(timestamp)}")
+            print(f"Saving image to {path}.{self.snapshot_writer.snapshot_format}")
+            snapshots.append((frame, camera.pixelformat, path))
+            # Add the camera to the list of cameras from which an image has been saved
+            self.snapshot_camera_list.append(camera_name)
+        return self.snapshot_writer.save(snapshots)
+
+    def save_burst(self, save_path, screen_widgets, pre_seconds=1.0, post_seconds=1.0):
+        """Saves the frames around now from all active camera feeds.
+
+        Each camera writes the frames from its frame history, pre_seconds before the
+        trigger, and the frames of the next post_seconds as a raw recording in the
+        background. The cameras share the trigger time.
+
+        Args:
+            save_path (str): Directory to save the bursts.
+            screen_widgets (list): Screen widgets of the cameras.
+            pre_seconds (float): Time saved before the trigger.
+            post_seconds (float): Time saved after the trigger.
+
+        Returns:
+            list: Threads writing the bursts.
+        """
+        trigger_ts = time.time_ns()
+        self.burst_camera_list = []
+        if not os.path.exists(save_path):
             print(f"Directory {save_path} does not exist!")
+            return []
+
+        print("\nBurst...")
+        threads = []
+        for screen in screen_widgets:
+            camera_name = screen.get_camera_name()
+            if screen.is_camera() and camera_name not in self.burst_camera_list:
+                customName = screen.parent().title()
+                customName = customName if customName else camera_name
+                thread = screen.camera.save_burst(
+                    save_path,
+                    trigger_ts=trigger_ts,
+                    pre_seconds=pre_seconds,
+                    post_seconds=post_seconds,
+                    custom_name=customName,
+                )
+                if thread is not None:
+                    threads.append(thread)
+                    self.burst_camera_list.append(camera_name)
+        return threads
 
     def save_recording(self, save_path, screen_widgets):
         """
@@ -76,7 +174,10 @@ class RecordingManager:
                         customName = customName if customName else camera_name
                         # Start recording and save the video with a timestamp and custom name
                         screen.save_recording(
-                            save_path, isTimestamp=True, name=customName
+                            save_path,
+                            isTimestamp=True,
+                            name=customName,
+                            recording_format=self.recording_format,
                         )
                         self.recording_camera_list.append(camera_name)
         else:
@@ -92,6 +193,11 @@ class RecordingManager:
             camera_name = screen.get_camera_name()
             # Check if it is 'Balckfly' camera and in the list of recording cameras
             if screen.is_camera() and camera_name in self.recording_camera_list:
-                screen.stop_recording()  # Stop recording
+                # Stop recording. Frames still queued are written before it returns.
+                stats = screen.stop_recording()
+                if isinstance(stats, dict) and stats.get("dropped"):
+                    logger.warning(
+                        f"{camera_name}: {stats['dropped']} frames dropped while recording"
+                    )
                 # Remove the camera from the list of cameras that are currently recording
                 self.recording_camera_list.remove(camera_name)
@@ -0,0 +1,362 @@
+"""
+ReplayCamera plays back recorded sessions through the PySpinCamera interface, so the
+GUI and the detection pipelines can run offline on recorded data.
+
+Raw recordings (see raw_recording) are replayed bit-exact with their original capture
+timestamps. Video files are also supported; their timestamps are reconstructed from
+the file modification time and the position in the video.
+
+Playback modes:
+    realtime  frames are released with the original inter-frame timing (scaled by speed)
+    fast      frames are released as fast as the consumers allow, to measure throughput
+    step      a frame is released on each call to step()
+"""
+
+import logging
+import os
+import threading
+import time
+
+import cv2
+
+from .camera import PySpinCamera
+from .camera_stats import CameraStats
+from .raw_recording import RawRecordingReader
+from .timestamps import NS_PER_MILLISECOND, NS_PER_SECOND
+
+# Set logger name
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)
+
+
+class _RawSource:
+    """Sequential reader of a raw recording."""
+
+    def __init__(self, path):
+        """Open the raw recording at path."""
+        self.reader = RawRecordingReader(path)
+        self.pixelformat = self.reader.pixelformat
+        self.sn = self.reader.metadata.get("camera")
+        self.frame_rate = self.reader.metadata.get("frame_rate")
+        self.position = 0
+
+    def __len__(self):
+        """Return the number of frames in the recording."""
+        return len(self.reader)
+
+    def read(self):
+        """Return the next (frame, timestamp), or (None, None) at the end."""
+        if self.position >= len(self.reader):
+            return None, None
+        frame = self.reader.get_frame(self.position)
+        ts = int(self.reader.timestamps[self.position])
+        self.position += 1
+        return frame, ts
+
+    def rewind(self):
+        """Go back to the first frame."""
+        self.position = 0
+
+    def close(self):
+        """Close the recording."""
+        self.reader.close()
+
+
+class _VideoSource:
+    """Sequential reader of a video file."""
+
+    def __init__(self, path):
+        """Open the video file at path.
+
+        Raises:
+            IOError: If the file cannot be opened.
+        """
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise IOError(f"Cannot open video file {path}")
+        self.pixelformat = None
+        self.sn = None
+        self.frame_rate = self.cap.get(cv2.CAP_PROP_FPS) or None
+        n_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        duration = n_frames / self.frame_rate if self.frame_rate else 0.0
+        # The file is closed when the recording stops
+        self.start_time = os.stat(path).st_mtime_ns - int(duration * NS_PER_SECOND)
+        self.n_frames = n_frames
+        self.position = 0
+
+    def __len__(self):
+        """Return the number of frames reported by the video file."""
+        return self.n_frames
+
+    def read(self):
+        """Return the next (frame, timestamp), or (None, None) at the end."""
+        ret, frame = self.cap.read()
+        if not ret:
+            return None, None
+        if self.frame_rate:
+            ts = self.start_time + int(self.position * NS_PER_SECOND / self.frame_rate)
+        else:
+            ts = self.start_time + int(self.cap.get(cv2.CAP_PROP_POS_MSEC) * NS_PER_MILLISECOND)
+        self.position += 1
+        # Recorded videos are channel swapped with respect to the live image
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), ts
+
+    def rewind(self):
+        """Go back to the first frame."""
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        self.position = 0
+
+    def close(self):
+        """Release the video file."""
+        self.cap.release()
+
+
+class ReplayCamera(PySpinCamera):
+    """Camera replaying a raw recording or a video file."""
+
+    MODES = ("realtime", "fast", "step")
+
+    def __init__(self, path, mode="realtime", speed=1.0, loop=False, sn=None):
+        """
+        Initialize a replay camera.
+
+        Args:
+        - path (str): Raw recording directory or video file.
+        - mode (str): "realtime", "fast" or "step".
+        - speed (float): Playback speed factor for the realtime mode.
+        - loop (bool): Restart from the first frame at the end of the recording.
+        - sn (str, optional): Serial number reported by name(). Defaults to the
+          camera serial number stored in the recording, or the file name.
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown replay mode '{mode}', expected one of {self.MODES}")
+        self.path = path
+        self.mode = mode
+        self.speed = speed
+        self.loop = loop
+
+        if os.path.isdir(path):
+            self.source = _RawSource(path)
+        else:
+            self.source = _VideoSource(path)
+        self.sn = sn or self.source.sn or os.path.basename(os.path.normpath(path))
+
+        # PySpinCamera.__init__ opens a PySpin device, only its acquisition state is shared
+        self._init_acquisition_state()
+        self.camera = None
+        self.capture_thread = None
+        self.finished = threading.Event()
+
+        self.device_model = "Replay"
+        self.pixelformat = self.source.pixelformat
+        self.device_color_type = "Mono" if self.pixelformat == "Mono" else "Color"
+        self.frame_products.pixelformat = self.pixelformat
+        self.frame_rate = self.source.frame_rate
+        self.frames_replayed = 0
+        # Replayed timestamps are in the past, the consumer latency is not meaningful
+        self.stats = CameraStats(track_latency=False)
+        # Camera settings shown in the settings menu, not applied to the replay
+        self.settings = {
+            "wbRed": 1.2, "wbBlue": 1.2, "gamma": 1.0, "gain": 20.0, "exposure": 16000
+        }
+
+        self._step_requests = threading.Semaphore(0)
+        self._stop_requested = threading.Event()
+        self._pace_origin = None
+
+    def name(self, sn_only=False):
+        """
+        Retrieves the name of the replay camera.
+
+        Args:
+        - sn_only (bool): Whether to return only the serial number.
+
+        Returns:
+        - str: The device model and serial number or just the serial number.
+        """
+        if sn_only:
+            return self.sn
+        return "%s (Serial # %s)" % (self.device_model, self.sn)
+
+    def camera_info(self):
+        """
+        Retrieves the frame dimensions and channels from the last replayed frame.
+        """
+        frame = self.get_last_image()
+        if frame is not None:
+            self.height, self.width = frame.shape[:2]
+        self.channels = 3 if self.device_color_type == "Color" else 1
+        if self.frame_rate is None:
+            self.frame_rate = 10.0
+
+    def set_wb(self, channel, wb=1.2):
+        """Store the white balance. It has no effect on the replayed frames."""
+        self.settings[f"wb{channel}"] = wb
+
+    def get_wb(self, channel):
+        """Return the stored white balance."""
+        return self.settings[f"wb{channel}"]
+
+    def set_gamma(self, gamma=1.0):
+        """Store the gamma. It has no effect on the replayed frames."""
+        self.settings["gamma"] = gamma
+
+    def disable_gamma(self):
+        """Dummy function"""
+        return
+
+    def set_gain(self, gain=20.0):
+        """Store the gain. It has no effect on the replayed frames."""
+        self.settings["gain"] = gain
+
+    def get_gain(self):
+        """Return the stored gain."""
+        return self.settings["gain"]
+
+    def set_exposure(self, expTime=16000):
+        """Store the exposure time. It has no effect on the replayed frames."""
+        self.settings["exposure"] = expTime
+
+    def get_exposure(self):
+        """Return the stored exposure time."""
+        return self.settings["exposure"]
+
+    def set_software_trigger(self, enable=True):
+        """Software triggering is not supported by the replay, frames follow the recording."""
+        return False
+
+    def execute_software_trigger(self):
+        """Dummy function"""
+        return
+
+    def step(self, n=1):
+        """
+        Releases the next n frames in step mode.
+
+        Args:
+        - n (int): Number of frames to release.
+        """
+        for _ in range(n):
+            self._step_requests.release()
+
+    def rewind(self):
+        """
+        Restarts the replay from the first frame.
+        """
+        self.source.rewind()
+        self._pace_origin = None
+        self.finished.clear()
+
+    def _wait_for_step(self):
+        """Wait until step() is called. Returns False if the replay is stopped."""
+        while self.running:
+            if self._step_requests.acquire(timeout=0.05):
+                return True
+        return False
+
+    def _pace(self, ts):
+        """Sleep until the frame with timestamp ts (ns) is due. Returns False if stopped."""
+        now = time.monotonic()
+        if self._pace_origin is None:
+            self._pace_origin = (now, ts)
+            return True
+        wall_start, ts_start = self._pace_origin
+        delay = wall_start + (ts - ts_start) / NS_PER_SECOND / self.speed - now
+        if delay > 0:
+            return not self._stop_requested.wait(delay)
+        return True
+
+    def capture(self):
+        """
+        Replays the next frame into the frame ring buffer.
+
+        Returns:
+        - bool: False at the end of the recording or when the replay was stopped.
+        """
+        if self.mode == "step" and not self._wait_for_step():
+            return False
+
+        frame, ts = self.source.read()
+        if frame is None:
+            if not self.loop:
+                self.finished.set()
+                return False
+            self.rewind()
+            frame, ts = self.source.read()
+            if frame is None:
+                self.finished.set()
+                return False
+
+        if self.mode == "realtime" and not self._pace(ts):
+            return False
+
+        self._store_frame(frame, ts)
+        self.stats.add_frame(ts)
+        self.frames_replayed += 1
+        return True
+
+    def capture_loop(self):
+        """
+        Continuous loop replaying frames until stopped or the recording ends.
+        """
+        while self.running:
+            if not self.capture():
+                break
+        # The last frame stays available after the end of the recording
+        self.running = False
+        if self.finished.is_set():
+            logger.info(f"{self.sn} replay finished after {self.frames_replayed} frames")
+
+    def begin_continuous_acquisition(self):
+        """
+        Starts replaying in a separate thread.
+        """
+        if self.running:
+            print("Error: camera is already running")
+            return -1
+        self.running = True
+        self._stop_requested.clear()
+        self._pace_origin = None
+        self.capture_thread = threading.Thread(target=self.capture_loop, daemon=True)
+        self.capture_thread.start()
+
+    def begin_singleframe_acquisition(self):
+        """
+        Replays a single frame.
+        """
+        self.capture_thread = threading.Thread(target=self._capture_single, daemon=True)
+        self.capture_thread.start()
+
+    def _capture_single(self):
+        """Replay one frame regardless of the playback mode."""
+        frame, ts = self.source.read()
+        if frame is None and self.loop:
+            self.rewind()
+            frame, ts = self.source.read()
+        if frame is not None:
+            self._store_frame(frame, ts)
+            self.frames_replayed += 1
+        else:
+            self.finished.set()
+
+    def end_singleframe_acquisition(self):
+        """End Acquisition"""
+        self.capture_thread.join()
+        self.last_image_cleared.clear()
+
+    def stop(self, clean=False):
+        """
+        Stops the replay and the recording if active.
+        """
+        if self.running:
+            self.running = False
+            self._stop_requested.set()
+            if self.capture_thread is not None:
+                self.capture_thread.join()
+            self.last_image_filled.clear()
+
+        if self.video_recording_on.is_set():
+            self.stop_recording()
+
+        if clean:
+            self.source.close()
@@ -1,17 +1,17 @@
 """
-Manages reticle detection in images through a worker thread, integrating line detection, 
+Manages reticle detection in images through a worker on the shared frame scheduler, integrating line detection, 
 masking, coordinate analysis, and camera calibration. Uses PyQt's signals 
 for thread-safe operations and real-time processing feedback.
 """
 
 import logging
-import time
 
-import cv2
 import numpy as np
-from PyQt5.QtCore import QObject, QThread, pyqtSignal
+from PyQt5.QtCore import QObject, pyqtSignal
 
+from . import overlay as ov
 from .calibration_camera import CalibrationCamera
+from .frame_scheduler import FrameScheduler
 from .mask_generator import MaskGenerator
 from .reticle_detection import ReticleDetection
 from .reticle_detection_coords_interests import ReticleDetectCoordsInterest
@@ -29,24 +29,28 @@ class ReticleDetectManager(QObject):
     name = "None"
     frame_processed = pyqtSignal(object)
     found_coords = pyqtSignal(np.ndarray, np.ndarray, np.ndarray, np.ndarray, tuple, tuple)
+    OVERLAY_LAYER = "reticle_detection"
 
     class Worker(QObject):
-        """Reticle detection Worker Thread"""
+        """Reticle detection worker, run by the frame scheduler"""
 
-        finished = pyqtSignal()
         frame_processed = pyqtSignal(object)
         found_coords = pyqtSignal(
             np.ndarray, np.ndarray, np.ndarray, np.ndarray, tuple, tuple
         )
 
-        def __init__(self, name):
-            """Initialize the worker"""
+        def __init__(self, name, overlay):
+            """Initialize the worker
+
+            Args:
+                name (str): Camera serial number.
+                overlay (OverlayModel): Overlay showing the detected reticle.
+            """
             QObject.__init__(self)
             self.name = name
+            self.overlay = overlay
             self.running = False
             self.is_detection_on = False
-            self.new = False
-            self.frame = None
             self.IMG_SIZE_ORIGINAL = (4000, 3000)
             self.frame_success = None
 
@@ -57,112 +61,58 @@ class ReticleDetectManager(QObject):
             self.coordsInterests = ReticleDetectCoordsInterest()
             self.calibrationCamera = CalibrationCamera(self.name)
 
-        def update_frame(self, frame):
-            """Update the frame to be processed."""
-            self.frame = frame
-            # Deal with one frame at a time. This may cause the frame drop
-            if self.new is False:
-                self.new = True
-
-        def draw(self, frame, x_axis_coords, y_axis_coords):
-            """Draw the coordinates on the frame.
+        def draw(self, x_axis_coords, y_axis_coords):
+            """Create the overlay shapes of the reticle coordinates.
 
             Args:
-                frame (numpy.ndarray): Input frame.
                 x_axis_coords (numpy.ndarray): X-axis coordinates.
                 y_axis_coords (numpy.ndarray): Y-axis coordinates.
 
             Returns:
-                numpy.ndarray: Frame with coordinates drawn.
+                list: Overlay shapes.
             """
             if x_axis_coords is None or y_axis_coords is None:
-                return frame
-            for pixel in x_axis_coords:
-                pt = tuple(pixel)
-                cv2.circle(frame, pt, 9, (255, 255, 0), -1)
-            for pixel in y_axis_coords:
-                pt = tuple(pixel)
-                cv2.circle(frame, pt, 9, (0, 255, 255), -1)
-            return frame
-
-        def draw_xyz(self, frame, origin, x, y, z):
-            """Draw the XYZ axes on the frame."""
-            frame = cv2.line(frame, origin, x, (0, 0, 255), 3)  # Blue line
-            frame = cv2.line(frame, origin, y, (0, 255, 0), 3)  # Green line
-            frame = cv2.line(frame, origin, z, (255, 0, 0), 3)  # Red line
-            return frame
-
-        def draw_calibration_info(self, frame, ret, mtx, dist):
+                return []
+            return [
+                ov.points(x_axis_coords, 9, (255, 255, 0)),
+                ov.points(y_axis_coords, 9, (0, 255, 255)),
+            ]
+
+        def draw_xyz(self, origin, x, y, z):
+            """Create the overlay shapes of the XYZ axes."""
+            return [
+                ov.lines([(origin, x)], (0, 0, 255), 3),  # Blue line
+                ov.lines([(origin, y)], (0, 255, 0), 3),  # Green line
+                ov.lines([(origin, z)], (255, 0, 0), 3),  # Red line
+            ]
+
+        def draw_calibration_info(self, ret, mtx, dist):
             """
-            Draw calibration information on the frame.
+            Create the overlay text of the calibration information.
 
             Parameters:
-            - frame: The image frame on which to draw.
-            - ret: Boolean indicating if calibration was successful.
+            - ret: Overall RMS re-projection error of the calibration.
             - mtx: The camera matrix obtained from calibration.
             - dist: The distortion coefficients obtained from calibration.
-            """
 
-            # Starting position for the text
-            offset_start = 50
-            line_height = 60
-
-            # Basic settings for the text
-            font = cv2.FONT_HERSHEY_SIMPLEX
-            font_scale = 1.5
-            font_color = (255, 255, 255)  # White color
-            line_type = 2
-
-            # Status text
-            status_text = f"Overall RMS re-projection error: {ret}"
-            cv2.putText(
-                frame,
-                status_text,
-                (10, offset_start),
-                font,
-                font_scale,
-                font_color,
-                line_type,
-            )
-
-            # Camera matrix text
-            mtx_lines = [
+            Returns:
+            - list: Overlay shapes.
+            """
+            info_lines = [
+                f"Overall RMS re-projection error: {ret}",
                 f"Camera Matrix:",
                 f"[{mtx[0][0]:.2f}, {mtx[0][1]:.2f}, {mtx[0][2]:.2f}]",
                 f"[{mtx[1][0]:.2f}, {mtx[1][1]:.2f}, {mtx[1][2]:.2f}]",
-                f"[{mtx[2][0]:.2f}, {mtx[2][1]:.2f}, {mtx[2][2]:.2f}]"
+                f"[{mtx[2][0]:.2f}, {mtx[2][1]:.2f}, {mtx[2][2]:.2f}]",
+                f"Dist Coeffs: [{dist[0][0]:.4f}, {dist[0][1]:.4f}, {dist[0][2]:.4f}, {dist[0][3]:.4f} {dist[0][4]:.4f}]",
             ]
-            # Draw each line of the camera matrix
-            for i, line in enumerate(mtx_lines):
-                cv2.putText(
-                    frame,
-                    line,
-                    (10, offset_start + line_height + i * line_height),
-                    font,
-                    font_scale,
-                    font_color,
-                    line_type,
-                )
-
-            # Distortion coefficients text
-            dist_text = f"Dist Coeffs: [{dist[0][0]:.4f}, {dist[0][1]:.4f}, {dist[0][2]:.4f}, {dist[0][3]:.4f} {dist[0][4]:.4f}]"
-            cv2.putText(
-                frame,
-                dist_text,
-                (10, offset_start + line_height * 5),
-                font,
-                font_scale,
-                font_color,
-                line_type,
-            )
+            return [ov.text(info_lines, (10, 10), (255, 255, 255))]
 
-            return frame
-
-        def process(self, frame):
+        def process(self, frame, products=None):
             """Process the frame for reticle detection."""
             # cv2.circle(frame, (2000,1500), 10, (255, 0, 0), -1)
             ret, frame_, _, inliner_lines_pixels = (
-                self.reticleDetector.get_coords(frame)
+                self.reticleDetector.get_coords(frame, products)
             )
             if not ret:
                 logger.debug(f"{ self.name} get_coords fails ")
@@ -187,9 +137,12 @@ class ReticleDetectManager(QObject):
                         x_axis_coords, y_axis_coords, mtx, dist, rvecs, tvecs
                     )
                     origin, x, y, z = self.calibrationCamera.get_origin_xyz()
-                    frame = self.draw_xyz(frame, origin, x, y, z)
-                    frame = self.draw(frame, x_axis_coords, y_axis_coords)
-                    frame = self.draw_calibration_info(frame, ret, mtx, dist)
+                    self.overlay.set_layer(
+                        ReticleDetectManager.OVERLAY_LAYER,
+                        *self.draw_xyz(origin, x, y, z),
+                        *self.draw(x_axis_coords, y_axis_coords),
+                        *self.draw_calibration_info(ret, mtx, dist),
+                    )
                 self.frame_success = frame
             
             if self.frame_success is None:
@@ -216,79 +169,79 @@ class ReticleDetectManager(QObject):
             """Stop the reticle detection."""
             self.is_detection_on = False
 
-        def run(self):
-            """Run the worker thread."""
-            while self.running:
-                if self.new:
-                    self.frame = self.process(self.frame)
-                    self.frame_processed.emit(self.frame)
-                self.new = False
-                time.sleep(0.001)
-            self.finished.emit()
+        def run(self, frame, products=None):
+            """Process one frame. Called by the frame scheduler.
+
+            Args:
+                frame (numpy.ndarray): Input frame.
+                products (FrameProducts, optional): Cached derived images of the frame.
+            """
+            if self.running:
+                frame = self.process(frame, products)
+                self.frame_processed.emit(frame)
 
         def set_name(self, name):
             """Set name as camera serial number."""
             self.name = name
 
-    def __init__(self, camera_name):
-        """Initialize the reticle detection manager."""
+    def __init__(self, camera_name, overlay=None, scheduler=None):
+        """Initialize the reticle detection manager.
+
+        Args:
+            camera_name (str): Camera serial number.
+            overlay (OverlayModel, optional): Overlay of the screen showing the camera.
+            scheduler (FrameScheduler, optional): Scheduler running the worker.
+                Defaults to the shared scheduler.
+        """
         logger.debug(f"{self.name} Init reticle detect manager")
         super().__init__()
+        self.overlay = overlay if overlay is not None else ov.OverlayModel()
+        self.scheduler = scheduler if scheduler is not None else FrameScheduler.shared()
         self.worker = None
+        self.job = None
         self.name = camera_name
-        self.thread = None
-        self.threadDeleted = False
-
-    def init_thread(self):
-        """Initialize the worker thread."""
-        if self.thread is not None:
-            self.clean()  # Clean up existing thread and worker before reinitializing
-        self.thread = QThread()
-        self.worker = self.Worker(self.name)
-        self.worker.moveToThread(self.thread)
-
-        self.thread.started.connect(self.worker.run)
-        self.thread.finished.connect(self.thread.deleteLater)
-        self.thread.destroyed.connect(self.onThreadDestroyed) # Debug msg
-        self.threadDeleted = False
 
+    def init_job(self):
+        """Initialize the worker and its scheduler job."""
+        if self.job is not None:
+            self.clean()  # Clean up existing job and worker before reinitializing
+        self.worker = self.Worker(self.name, self.overlay)
         self.worker.frame_processed.connect(self.frame_processed)
         self.worker.found_coords.connect(self.found_coords)
-        self.worker.finished.connect(self.thread.quit)
-        self.worker.finished.connect(self.worker.deleteLater)
-        self.worker.destroyed.connect(self.onWorkerDestroyed)
+        self.job = self.scheduler.add_job(
+            self.worker.run, FrameScheduler.PRIORITY_DETECTION, f"{self.name} reticle detection"
+        )
         logger.debug(f"{self.name} init camera")
 
-    def process(self, frame):
+    def process(self, frame, products=None, frame_id=None):
         """Process the frame using the worker.
 
         Args:
             frame (numpy.ndarray): Input frame.
+            products (FrameProducts, optional): Cached derived images of the frame.
+            frame_id (int, optional): Camera frame ID. A frame is only processed once.
         """
-        if self.worker is not None:
-            self.worker.update_frame(frame)
+        if self.job is not None:
+            self.job.submit(frame, products, frame_id=frame_id)
+
+    def is_running(self):
+        """Return True while the reticle detection is running."""
+        return self.job is not None and self.worker is not None and self.worker.running
 
     def start(self):
         """Start the reticle detection manager."""
-        logger.debug(f"{self.name} Starting thread in {self.__class__.__name__}")
-        self.init_thread()  # Reinitialize and start the worker and thread
+        logger.debug(f"{self.name} Starting job in {self.__class__.__name__}")
+        self.init_job()  # Reinitialize and start the worker and job
         self.worker.start_running()
-        self.thread.start()
 
     def stop(self):
         """Stop the reticle detection manager."""
         if self.worker is not None:
             self.worker.stop_running()
-        
-    def onWorkerDestroyed(self):
-        """Cleanup after worker finishes."""
-        logger.debug(f"{self.name} worker finished")
-
-    def onThreadDestroyed(self):
-        """Flag if thread is deleted"""
-        logger.debug(f"{self.name} thread destroyed")
-        self.threadDeleted = True
-        self.thread = None
+        if self.job is not None:
+            self.job.remove(wait=True)  # A restarted worker must not overlap the running one
+            self.job = None
+        self.overlay.clear(self.OVERLAY_LAYER)
 
     def set_name(self, camera_name):
         """Set camera name."""
@@ -297,26 +250,24 @@ class ReticleDetectManager(QObject):
             self.worker.set_name(self.name)
         logger.debug(f"{self.name} set camera name")
 
-    def clean(self):
-        """Safely clean up the reticle detection manager."""
-        logger.debug(f"{self.name} Cleaning the thread")
+    def clean(self, wait=True):
+        """Safely clean up the reticle detection manager.
+
+        Args:
+            wait (bool): Whether to wait for a running frame to finish. Must be False
+                when called from a scheduler thread, e.g. by the garbage collector.
+        """
+        logger.debug(f"{self.name} Cleaning the job")
         if self.worker is not None:
             self.worker.stop_running()  # Signal the worker to stop
-        
-        if self.thread and not self.threadDeleted and self.thread.isRunning():
-            logger.debug(f"{self.name} Stopping thread in {self.__class__.__name__}")
-            self.thread.quit()  # Ask the thread to quit
-            self.thread.wait()  # Wait for the thread to finish
-        self.thread = None  # Clear the reference to the thread
-        self.worker = None  # Clear the reference to the worker
-        self.threadDeleted = True
-        logger.debug(f"{self.name} Cleaned the thread")
 
-    def onThreadDestroyed(self):
-        """Flag if thread is deleted"""
-        self.threadDeleted = True
-        self.thread = None
+        if self.job is not None:
+            logger.debug(f"{self.name} Removing job in {self.__class__.__name__}")
+            self.job.remove(wait=wait)  # Wait for a running frame to finish
+        self.job = None  # Clear the reference to the job
+        self.worker = None  # Clear the reference to the worker
+        logger.debug(f"{self.name} Cleaned the job")
 
     def __del__(self):
         """Destructor for the reticle detection manager."""
-        self.clean()
\ No newline at end of file
+        self.clean(wait=False)  # May run on any thread
\ No newline at end of file
@@ -2,17 +2,18 @@
 
 Process: 
 - preprocessing, masking, and morphological operations
-- Utilizes adaptive thresholding, Gaussian blurring, and RANSAC for line detection, line drawing, and pixel refinement
+- Utilizes adaptive thresholding, Gaussian blurring, and Hough voting with a consensus check for line detection, line drawing, and pixel refinement
 - Supports line intersection and missing point estimation
 """
 
 import logging
-import warnings
 
 import cv2
 import numpy as np
 from scipy.stats import linregress
-from skimage.measure import LineModelND, ransac
+from skimage.measure import LineModelND
+
+from .calibration_camera import SIZE, WORLD_SCALE, X_COORDS_HALF, Y_COORDS_HALF
 
 # Set logger name
 logger = logging.getLogger(__name__)
@@ -32,8 +33,12 @@ class ReticleDetection:
         self.mask = None
         self.name = camera_name
 
-    def _preprocess_image(self, img):
+    def _preprocess_image(self, img, products=None):
         """Convert image to grayscale, blur, and resize."""
+        if products is not None:
+            # Blurred gray image is cached per frame
+            return products.blurred((11, 11))
+
         # Check if image is already grayscale
         if img.ndim == 3 and img.shape[2] == 3:  # Check if image has 3 channels
             bg = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
@@ -90,8 +95,8 @@ class ReticleDetection:
                 35,
             )
 
-    def _ransac_detect_lines(self, img):
-        """Detect lines using RANSAC algorithm.
+    def _detect_lines(self, img):
+        """Detect the two reticle lines through the centroids of the reticle ticks.
 
         Args:
             img (numpy.ndarray): Input image.
@@ -102,64 +107,157 @@ class ReticleDetection:
                 - inlier_lines (list): List of detected line models.
                 - inlier_pixels (list): List of inlier pixel coordinates for each line.
         """
-        inlier_lines = []
-        inlier_pixels = []
-
         if img is None:
-            return False, inlier_lines, inlier_pixels
-
-        # Draw
-        if len(img.shape) == 2:  # Grayscale image
-            img_color = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
-        else:  # Color image
-            img_color = img.copy()
+            return False, [], []
 
         contours, _ = cv2.findContours(
             img, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
         )
         centroids = np.array(self._get_centroid(contours))
         if len(centroids) < 10:
-            logger.debug("points for rasac line detection are less than 10")
-            return False, inlier_lines, inlier_pixels
-
-        max_trials = 7000
-        residual_threshold = 2
-        counter = 50
-        while len(inlier_lines) < 2 and counter > 0:
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore", RuntimeWarning)
-                model_robust, inliers = ransac(
-                    centroids,
-                    LineModelND,
-                    min_samples=9,
-                    residual_threshold=residual_threshold,
-                    max_trials=max_trials,
-                )
-            inlier_points = centroids[inliers]
-            if len(inlier_points) >= 20:
-                logger.debug(f"residual_threshold: {residual_threshold}")
-                inlier_pixels.append(inlier_points)
-                inlier_lines.append(model_robust)
-                centroids = centroids[~inliers]
-                max_trials = 7000
-                residual_threshold = 2
-                counter = 50  # Reset counter
-            else:
-                max_trials += 2000  # if not found, run RASAC again
-                counter -= 1
-                if residual_threshold <= 15:
-                    residual_threshold += 1
-                continue
+            logger.debug("points for line detection are less than 10")
+            return False, [], []
+
+        inlier_lines, inlier_pixels = self._find_lines(centroids)
+        return len(inlier_lines) == 2, inlier_lines, inlier_pixels
+
+    def _find_lines(
+        self, points, n_lines=2, min_inliers=20, residual_thresholds=range(2, 17),
+        max_candidates=10,
+    ):
+        """Find lines through points.
 
-        # Draw the centroids for debug
+        Candidate lines are proposed by Hough voting over the points and confirmed by
+        their consensus, the points within the residual threshold of the line fitted to
+        them. The residual threshold is only raised when no candidate is confirmed, and
+        the inliers of a confirmed line are removed before the next line is searched.
+        There is no random sampling, so the result is reproducible and the number of
+        consensus checks is bounded by n_lines, residual_thresholds and max_candidates.
+
+        Args:
+            points (numpy.ndarray): Point coordinates (N, 2).
+            n_lines (int): Number of lines to find.
+            min_inliers (int): Minimum number of points on a line.
+            residual_thresholds (iterable): Residual thresholds in pixels, tried in order.
+            max_candidates (int): Maximum number of Hough candidates per point set.
+
+        Returns:
+            tuple: (lines, line_pixels)
+                - lines (list): LineModelND of each line found.
+                - line_pixels (list): Inlier points of each line found.
         """
-        for points in inlier_pixels:
-            for point in points:
-                cv2.circle(img_color, (int(point[0]), int(point[1])), 1, (0, 0, 255), -1)  # Draw green circles
-        cv2.imwrite("debug/centroid.jpg", img_color)
+        lines, line_pixels = [], []
+        while len(lines) < n_lines and len(points) >= min_inliers:
+            candidates = self._hough_line_candidates(points, min_inliers, max_candidates)
+            inliers = None
+            for residual_threshold in residual_thresholds:
+                for theta, rho in candidates:
+                    inliers = self._line_consensus(
+                        points, theta, rho, residual_threshold, min_inliers
+                    )
+                    if inliers is not None:
+                        break
+                if inliers is not None:
+                    logger.debug(f"residual_threshold: {residual_threshold}")
+                    break
+            if inliers is None:
+                break
+            line_pixels.append(points[inliers])
+            lines.append(self._line_model(points[inliers]))
+            points = points[~inliers]
+        return lines, line_pixels
+
+    def _hough_line_candidates(
+        self, points, min_votes, max_candidates, theta_step=0.5, rho_step=2.0,
+    ):
+        """Propose lines through points by Hough voting.
+
+        Args:
+            points (numpy.ndarray): Point coordinates (N, 2).
+            min_votes (int): Minimum number of votes of a candidate.
+            max_candidates (int): Maximum number of candidates.
+            theta_step (float): Angle resolution in degrees.
+            rho_step (float): Distance resolution in pixels.
+
+        Returns:
+            list: (theta, rho) of the candidates in the order of their votes, the line
+                being x * cos(theta) + y * sin(theta) = rho.
         """
+        thetas = np.deg2rad(np.arange(0, 180, theta_step))
+        rhos = points[:, :1] * np.cos(thetas) + points[:, 1:] * np.sin(thetas)
+        rho_max = np.abs(rhos).max()
+        n_rhos = int(2 * rho_max / rho_step) + 2
+        rho_index = np.rint((rhos + rho_max) / rho_step).astype(np.int64)
+        accumulator = np.bincount(
+            (rho_index + np.arange(len(thetas)) * n_rhos).ravel(),
+            minlength=len(thetas) * n_rhos,
+        ).reshape(len(thetas), n_rhos)
+        # Points of a line spread over neighboring distance bins
+        votes = accumulator.copy()
+        votes[:, 1:] += accumulator[:, :-1]
+        votes[:, :-1] += accumulator[:, 1:]
+
+        candidates = []
+        theta_radius, rho_radius = max(1, int(2 / theta_step)), max(1, int(10 / rho_step))
+        for _ in range(max_candidates):
+            i, j = np.unravel_index(np.argmax(votes), votes.shape)
+            if votes[i, j] < min_votes:
+                break  # The other cells have fewer votes
+            candidates.append((thetas[i], j * rho_step - rho_max))
+            # Suppress the neighborhood of the candidate, the wrapped angles included
+            rows = np.arange(i - theta_radius, i + theta_radius + 1) % len(thetas)
+            votes[rows, max(0, j - rho_radius):j + rho_radius + 1] = 0
+        return candidates
+
+    def _line_consensus(self, points, theta, rho, residual_threshold, min_inliers, max_iterations=5):
+        """Confirm a candidate line by the points within the residual threshold.
+
+        The line is fitted to its inliers again until they do not change, so a coarse
+        candidate converges to the line through the points.
 
-        return len(inlier_lines) == 2, inlier_lines, inlier_pixels
+        Args:
+            points (numpy.ndarray): Point coordinates (N, 2).
+            theta (float): Angle of the candidate normal in radians.
+            rho (float): Distance of the candidate from the origin.
+            residual_threshold (float): Maximum distance of an inlier from the line.
+            min_inliers (int): Minimum number of inliers.
+            max_iterations (int): Maximum number of fits.
+
+        Returns:
+            numpy.ndarray or None: Inlier mask, None if the line has too few inliers.
+        """
+        normal = np.array([np.cos(theta), np.sin(theta)])
+        # The Hough bins are coarser than the threshold, start with a wider band
+        inliers = np.abs(points @ normal - rho) <= max(residual_threshold, 4)
+        for _ in range(max_iterations):
+            if np.count_nonzero(inliers) < min_inliers:
+                return None
+            inlier_points = points[inliers]
+            origin = inlier_points.mean(axis=0)
+            _, _, vt = np.linalg.svd(inlier_points - origin, full_matrices=False)
+            normal = np.array([-vt[0, 1], vt[0, 0]])
+            updated = np.abs((points - origin) @ normal) <= residual_threshold
+            if np.array_equal(updated, inliers):
+                break
+            inliers = updated
+        if np.count_nonzero(inliers) < min_inliers:
+            return None
+        return inliers
+
+    def _line_model(self, points):
+        """Fit a LineModelND to points."""
+        points = points.astype(np.float64)
+        if hasattr(LineModelND, "from_estimate"):  # scikit-image >= 0.26
+            return LineModelND.from_estimate(points)
+        model = LineModelND()
+        model.estimate(points)
+        return model
+
+    def _line_params(self, line_model):
+        """Return the origin and direction of a LineModelND."""
+        if hasattr(line_model, "origin"):  # scikit-image >= 0.26
+            return line_model.origin, line_model.direction
+        return line_model.params[0], line_model.params[1]
 
     def _fit_line(self, pixels):
         """Fit a line to the given pixels.
@@ -462,7 +560,7 @@ class ReticleDetection:
         refined_pixels = []
 
         for line_model, pixels in zip(lines, line_pixels):
-            origin, direction = line_model.params[0], line_model.params[1]
+            origin, direction = self._line_params(line_model)
             # Extend the line
             point1 = tuple((origin + -2000 * direction).astype(int))  
             point2 = tuple((origin + 2000 * direction).astype(int))
@@ -485,24 +583,62 @@ class ReticleDetection:
         # cv2.imwrite("debug/refined_pixels.jpg", bg)
         return bg, lines, refined_pixels
 
-    def get_reticle_zone(self, img):
+    def get_reticle_zone(self, img, products=None):
         """Get the reticle zone from the image.
 
         Args:
             img (numpy.ndarray): Input image.
+            products (FrameProducts, optional): Cached derived images of the frame.
 
         Returns:
             numpy.ndarray or None: Reticle zone image if reticle exists, None otherwise.
         """
-        bg = self._preprocess_image(img)
+        bg = self._preprocess_image(img, products)
         bg = cv2.resize(bg, self.image_size)
-        masked = self._apply_mask(bg)
+        self._apply_mask(bg)  # Updates is_reticle_exist
         if self.reticle_frame_detector.is_reticle_exist:
             ret, bg, _, pixels_in_lines = self.coords_detect_morph(bg)
             return self._draw_reticle_lines(bg, pixels_in_lines)
         else:
             return None
 
+    def get_reticle_zone_from_calibration(self, intrinsic, original_size=SIZE):
+        """Get the reticle zone from the camera calibration instead of an image.
+
+        The end points of the reticle x and y axes are projected into the image,
+        so the zone does not depend on the mask or the line detection of a frame.
+
+        Args:
+            intrinsic (list): Camera parameters [mtx, dist, rvec, tvec] as stored by
+                Model.add_camera_intrinsic(). rvec and tvec may be the tuples of
+                calibrate_camera().
+            original_size (tuple): (width, height) of the calibrated images.
+
+        Returns:
+            numpy.ndarray or None: Reticle zone image, None if not calibrated.
+        """
+        if intrinsic is None:
+            return None
+        mtx, dist, rvec, tvec = intrinsic
+        if mtx is None or rvec is None or tvec is None:
+            return None
+        if isinstance(rvec, (tuple, list)):
+            rvec, tvec = rvec[0], tvec[0]
+
+        axis_end_points = np.float32(
+            [
+                [[-X_COORDS_HALF, 0, 0], [X_COORDS_HALF, 0, 0]],
+                [[0, -Y_COORDS_HALF, 0], [0, Y_COORDS_HALF, 0]],
+            ]
+        ) * WORLD_SCALE
+        imgpts, _ = cv2.projectPoints(
+            axis_end_points.reshape(-1, 3), rvec, tvec, mtx, dist
+        )
+        scale = np.array(self.image_size) / np.array(original_size)
+        pixels_in_lines = np.around(imgpts.reshape(2, 2, 2) * scale).astype(int).tolist()
+        zone = np.zeros((self.image_size[1], self.image_size[0]), dtype=np.uint8)
+        return self._draw_reticle_lines(zone, pixels_in_lines)
+
     def coords_detect_morph(self, img):
         """
         Applies morphological operations and adaptive thresholding
@@ -534,7 +670,7 @@ class ReticleDetection:
 
         img = self._eroding(img)
         #cv2.imwrite("debug/after_eroding.jpg", img)
-        ret, inliner_lines, inliner_lines_pixels = self._ransac_detect_lines(img)
+        ret, inliner_lines, inliner_lines_pixels = self._detect_lines(img)
         logger.debug(f"n of inliner lines: {len(inliner_lines_pixels)}")
 
         # Draw
@@ -574,11 +710,12 @@ class ReticleDetection:
         else:
             return
 
-    def get_coords(self, img):
+    def get_coords(self, img, products=None):
         """Detect coordinates using morphological operations.
 
         Args:
             img (numpy.ndarray): Input image.
+            products (FrameProducts, optional): Cached derived images of the frame.
 
         Returns:
             tuple: (ret, img, inliner_lines, inliner_lines_pixels)
@@ -587,7 +724,7 @@ class ReticleDetection:
                 - inliner_lines (list): List of inlier line models.
                 - inliner_lines_pixels (list): List of inlier pixel coordinates for each line.
         """
-        bg = self._preprocess_image(img)
+        bg = self._preprocess_image(img, products)
         self._draw_debug(bg, [], "0_bg")
         masked = self._apply_mask(bg)
         self._draw_debug(masked, [], "1_bg")
@@ -0,0 +1,127 @@
+"""
+RoiTracker computes the camera region of interest (ROI) while a probe is tracked.
+
+The ROI follows the probe tip: it is recentred when the tip approaches its border and
+widened step by step up to the full frame when the probe is lost. ROIs are given in
+full-frame pixels as (offset_x, offset_y, width, height) and aligned to the sensor
+increments, so that the Bayer pattern phase is kept.
+"""
+
+import logging
+
+# Set logger name
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)
+
+
+def _align_down(value, increment):
+    """Round value down to a multiple of increment."""
+    return value - value % increment
+
+
+def _align_up(value, increment):
+    """Round value up to a multiple of increment."""
+    return _align_down(value + increment - 1, increment)
+
+
+class RoiTracker:
+    """Region of interest following the tracked probe tip."""
+
+    def __init__(
+        self,
+        full_size=(4000, 3000),
+        min_size=(1024, 768),
+        border=0.2,
+        max_lost=8,
+        increment=(8, 2),
+    ):
+        """Initialize the tracker.
+
+        Args:
+            full_size (tuple): Full sensor size (width, height).
+            min_size (tuple): Smallest ROI (width, height).
+            border (float): Fraction of the ROI size at each side. The ROI is recentred
+                when the tip enters the border.
+            max_lost (int): Number of frames without detection before the ROI is widened.
+            increment (tuple): Alignment of the ROI width and height, and of the offsets.
+        """
+        self.full_size = full_size
+        self.size_increment, self.offset_increment = increment
+        self.min_size = (
+            min(_align_up(min_size[0], self.size_increment), full_size[0]),
+            min(_align_up(min_size[1], self.size_increment), full_size[1]),
+        )
+        self.border = border
+        self.max_lost = max_lost
+        self.n_lost = 0
+        self.roi = None
+
+    @property
+    def full_frame(self):
+        """tuple: ROI covering the full sensor."""
+        return (0, 0, self.full_size[0], self.full_size[1])
+
+    def reset(self):
+        """Return to the full frame."""
+        self.roi = None
+        self.n_lost = 0
+        return self.full_frame
+
+    def _place(self, center, size):
+        """Return an aligned ROI of the given size centred on center, inside the sensor."""
+        width = min(_align_up(int(size[0]), self.size_increment), self.full_size[0])
+        height = min(_align_up(int(size[1]), self.size_increment), self.full_size[1])
+        offset_x = int(round(center[0] - width / 2))
+        offset_y = int(round(center[1] - height / 2))
+        offset_x = min(max(offset_x, 0), self.full_size[0] - width)
+        offset_y = min(max(offset_y, 0), self.full_size[1] - height)
+        offset_x = _align_down(offset_x, self.offset_increment)
+        offset_y = _align_down(offset_y, self.offset_increment)
+        return (offset_x, offset_y, width, height)
+
+    def _is_inside(self, point):
+        """Return True if the point is inside the current ROI, away from its border."""
+        offset_x, offset_y, width, height = self.roi
+        border_x, border_y = width * self.border, height * self.border
+        return (
+            offset_x + border_x <= point[0] <= offset_x + width - border_x
+            and offset_y + border_y <= point[1] <= offset_y + height - border_y
+        )
+
+    def update(self, tip):
+        """Update the ROI with a detected probe tip.
+
+        Args:
+            tip (tuple): Tip coordinates (x, y) in full-frame pixels.
+
+        Returns:
+            tuple or None: New ROI, None if the current ROI still fits.
+        """
+        self.n_lost = 0
+        if self.roi is not None and self._is_inside(tip):
+            return None
+        size = self.min_size if self.roi is None else self.roi[2:]
+        self.roi = self._place(tip, size)
+        logger.debug(f"ROI recentred on {tip}: {self.roi}")
+        return self.roi
+
+    def lost(self):
+        """Report a frame without detection.
+
+        Returns:
+            tuple or None: Widened ROI after max_lost frames without detection,
+                otherwise None.
+        """
+        if self.roi is None:
+            return None
+        self.n_lost += 1
+        if self.n_lost < self.max_lost:
+            return None
+        self.n_lost = 0
+        offset_x, offset_y, width, height = self.roi
+        if (width, height) == self.full_size:
+            return None
+        center = (offset_x + width / 2, offset_y + height / 2)
+        self.roi = self._place(center, (width * 2, height * 2))
+        logger.debug(f"Probe lost, ROI widened to {self.roi}")
+        return self.roi
@@ -5,15 +5,20 @@ for real-time processing and offers camera control functions.
 """
 
 import logging
+import time
 import cv2
+import numpy as np
 import pyqtgraph as pg
-from PyQt5 import QtCore
+from PyQt5 import QtCore, QtWidgets
 from PyQt5.QtCore import Qt, pyqtSignal
 
 from .no_filter import NoFilter
+from .overlay import OverlayModel, OverlayView
 from .probe_detect_manager import ProbeDetectManager
 from .reticle_detect_manager import ReticleDetectManager
 from .axis_filter import AxisFilter
+from .roi_tracker import RoiTracker
+from .viewport_renderer import ViewportRenderer
 
 # Set logger name
 logger = logging.getLogger(__name__)
@@ -28,7 +33,7 @@ class ScreenWidget(pg.GraphicsView):
     selected = pyqtSignal(str, tuple) # camera name, (x, y)
     cleared = pyqtSignal()
     reticle_coords_detected = pyqtSignal()
-    probe_coords_detected = pyqtSignal(str, str, str, tuple, tuple)  # camera name, timestamp, sn, stage_info, pixel_coords
+    probe_coords_detected = pyqtSignal(str, object, object, str, tuple, tuple)  # camera name, timestamp (ns), frame_id, sn, stage_info, pixel_coords
 
     def __init__(self, camera, filename=None, model=None, parent=None):
         """Init screen widget object"""
@@ -46,6 +51,17 @@ class ScreenWidget(pg.GraphicsView):
         self.view_box.addItem(self.image_item)
         self.image_item.mouse_clicked.connect(self.image_clicked)
 
+        # Only the visible part of the frame is rendered, decimated to the view size.
+        # The invisible frame bounds keep autoRange() fitting the full frame.
+        self.viewport_renderer = ViewportRenderer()
+        self._display_frame = None
+        self._display_dtype = None
+        self.frame_bounds = QtWidgets.QGraphicsRectItem()
+        self.frame_bounds.setPen(pg.mkPen(None))
+        self.view_box.addItem(self.frame_bounds)
+        self.view_box.sigRangeChanged.connect(self._render_display)
+        self.view_box.sigResized.connect(self._render_display)
+
         self.click_target = pg.TargetItem()
         self.view_box.addItem(self.click_target)
         self.click_target.setVisible(False)
@@ -54,6 +70,23 @@ class ScreenWidget(pg.GraphicsView):
         self.view_box.addItem(self.click_target2)
         self.click_target2.setVisible(False)
 
+        # Reticle, axes and probe tip annotations of the detection managers
+        self.overlay = OverlayModel()
+        self.overlay_view = OverlayView(self.view_box, self.overlay)
+
+        # Acquisition health overlay, see show_camera_stats()
+        self.stats_overlay = pg.TextItem(color=(255, 255, 0), anchor=(0, 0))
+        self.stats_overlay.setZValue(10)
+        self.view_box.addItem(self.stats_overlay)
+        self.stats_overlay.setVisible(False)
+        self.stats_overlay_interval_ns = 500_000_000
+
+        # Screens that are not displayed and run no detection are refreshed at a
+        # low keep-alive rate, see is_refresh_due()
+        self.keepalive_interval_ns = 1_000_000_000
+        self._last_keepalive = 0
+        self._stats_overlay_updated = 0
+
         self.camera_actions = []
         self.focochan_actions = []
         self.filter_actions = []
@@ -63,12 +96,14 @@ class ScreenWidget(pg.GraphicsView):
 
         # probe
         self.probe_detect_last_timestamp = None
+        self.probe_detect_last_frame_id = None
         self.probe_detect_last_sn = None
         self.probe_detect_last_coords = None
 
         # camera
         self.camera = camera
         self.camera_name = self.get_camera_name()
+        self.last_frame_id = None  # Last frame shown by refresh()
         self.focochan = None
         
         # Dynamically set zoom limits based on image size
@@ -86,12 +121,12 @@ class ScreenWidget(pg.GraphicsView):
         self.filter.frame_processed.connect(self.set_image_item_from_data)
 
         # Axis Filter
-        self.axisFilter = AxisFilter(self.model, self.camera_name)
+        self.axisFilter = AxisFilter(self.model, self.camera_name, self.overlay)
         self.axisFilter.frame_processed.connect(self.set_image_item_from_data)
         self.axisFilter.found_coords.connect(self.found_reticle_coords)
 
         # Reticle Detection
-        self.reticleDetector = ReticleDetectManager(self.camera_name)
+        self.reticleDetector = ReticleDetectManager(self.camera_name, self.overlay)
         self.reticleDetector.frame_processed.connect(
             self.set_image_item_from_data
         )
@@ -99,29 +134,157 @@ class ScreenWidget(pg.GraphicsView):
         self.reticleDetector.found_coords.connect(self.reticle_coords_detected)
 
         # Probe Detection
-        self.probeDetector = ProbeDetectManager(self.model, self.camera_name)
+        self.probeDetector = ProbeDetectManager(self.model, self.camera_name, self.overlay)
         self.model.add_probe_detector(self.probeDetector)
         self.probeDetector.frame_processed.connect(
             self.set_image_item_from_data
         )
         self.probeDetector.found_coords.connect(self.found_probe_coords)
+        self.probeDetector.detection_missed.connect(self.missed_probe_coords)
+
+        # Region of interest acquisition around the detected probe tip
+        self.roi_tracker = None
+        if self.model.roi_tracking and self.is_camera():
+            self.roi_tracker = RoiTracker(full_size=(width, height))
 
         if self.filename:
             self.set_data(cv2.imread(filename, cv2.IMREAD_GRAYSCALE))
 
-    def refresh(self):
+    def refresh(self, frame_set=None):
         """
         Refresh the image displayed in the screen widget. (Continuously)
+
+        A frame that was already shown is skipped, so that a refresh timer faster
+        than the camera does not debayer and process the same frame again.
+
+        Args:
+            frame_set (FrameSet, optional): Time-aligned frames of all cameras. If the
+                camera is part of the frame set, its frame of the set is processed and
+                the detections carry the capture time of the frame set.
+        """
+        if self.camera and self.is_refresh_due():
+            timestamp = None
+            camera_sn = self.get_camera_name()
+            if frame_set is not None and camera_sn in frame_set:
+                products = self._get_frame_products(frame_set.get_frame_id(camera_sn))
+                if products is None:
+                    # The frame was overwritten in the meantime
+                    return
+                timestamp = frame_set.timestamp
+            else:
+                # Take the image and its derived products from the same frame
+                products = self._get_frame_products()
+            if products is not None:
+                frame_id = products.frame_id
+            else:
+                data = self.camera.get_last_image_data()
+                frame_id = self.camera.get_last_frame_id()
+            if frame_id is not None and frame_id == self.last_frame_id:
+                return  # No new frame since the last refresh
+            self.last_frame_id = frame_id
+
+            if products is not None:
+                # A copy owned by the products, not the ring buffer slot the camera
+                # writes to, so the workers and later re-renders see this frame
+                data = products.bgr()
+            self.set_data(data, products, timestamp=timestamp)
+            if products is not None:
+                self._update_camera_stats(products.timestamp)
+
+    def is_displayed(self):
+        """
+        Return True if any part of the screen can be seen: it is shown, its window is
+        not minimized and it is not scrolled out of view.
+        """
+        if not self.isVisible() or self.window().isMinimized():
+            return False
+        return not self.viewport().visibleRegion().isEmpty()
+
+    def is_detection_active(self):
+        """
+        Return True if the screen runs a detection whose results are needed while the
+        screen is not displayed, e.g. probe detection on a calibrated camera pair.
+        """
+        return self.reticleDetector.is_running() or self.probeDetector.is_running()
+
+    def is_refresh_due(self):
+        """
+        Whether refresh() should process a frame now. Displayed screens and screens
+        running a detection are refreshed at the full rate, the others at the
+        keep-alive rate.
+        """
+        if self.is_displayed() or self.is_detection_active():
+            return True
+        now = time.monotonic_ns()
+        if now - self._last_keepalive < self.keepalive_interval_ns:
+            return False
+        self._last_keepalive = now
+        return True
+
+    def _update_camera_stats(self, capture_ts):
+        """
+        Record the capture-to-display latency of a frame and refresh the stats overlay.
+
+        Args:
+            capture_ts (int): Capture time of the displayed frame in ns.
         """
-        if self.camera:
-            data = self.camera.get_last_image_data()
-            self.set_data(data)
+        stats = self.camera.get_acquisition_stats()
+        if stats is None:
+            return
+        now = time.time_ns()
+        stats.add_latency(now - capture_ts)
+        if self.stats_overlay.isVisible() \
+                and now - self._stats_overlay_updated > self.stats_overlay_interval_ns:
+            self._stats_overlay_updated = now
+            text = stats.format()
+            profiler = self.get_detection_profiler()
+            if profiler is not None and self.probeDetector.is_running():
+                text += "\n" + profiler.format()
+            self.stats_overlay.setText(text)
+
+    def show_camera_stats(self, visible=True):
+        """
+        Show or hide the acquisition health overlay (fps, incomplete, dropped and
+        late frames, capture-to-display latency). While the probe detection runs, the
+        overlay also shows its stage timings.
+        """
+        self.stats_overlay.setVisible(visible)
+        if not visible:
+            self.stats_overlay.setText("")
+
+    def set_detection_rate(self, fps):
+        """
+        Limit the probe detection rate, independent of the display rate.
+
+        Args:
+            fps (float): Maximum detections per second. 0 runs the detection on every
+                new frame shown.
+        """
+        self.probeDetector.set_detection_rate(fps)
+
+    def get_detection_profiler(self):
+        """
+        Return the profiler timing the probe detection stages of this screen, None if
+        the probe detection has not been started.
+        """
+        return self.probeDetector.get_profiler()
+
+    def set_detection_process(self, enabled):
+        """
+        Run the probe detection of this screen in a separate process.
+
+        Args:
+            enabled (bool): Whether to use a detection process. Applies from the next
+                start of the probe detection.
+        """
+        self.probeDetector.set_use_process(enabled)
 
     def start_acquisition_camera(self):
         """
         Start the camera acquisition. (Continuously)
         """
         if self.camera:
+            self.last_frame_id = None  # Frame IDs restart with the acquisition
             self.camera.begin_continuous_acquisition()
 
     def stop_acquisition_camera(self):
@@ -137,7 +300,8 @@ class ScreenWidget(pg.GraphicsView):
         """
         if self.camera:
             data = self.camera.get_last_image_data_singleFrame()
-            self.set_data(data)
+            if data is not None:
+                self.set_data(data, self._get_frame_products())
 
     def single_acquisition_camera(self):
         """
@@ -153,15 +317,40 @@ class ScreenWidget(pg.GraphicsView):
         if self.camera:
             self.camera.end_singleframe_acquisition()
 
-    def set_data(self, data):
+    def _get_frame_products(self, frame_id=None):
         """
-        Set the data displayed in the screen widget.
+        Return the cached derived images of a frame if the camera provides them.
+
+        Args:
+            frame_id (int, optional): Frame ID. Defaults to the last captured frame.
+        """
+        if hasattr(self.camera, "get_frame_products"):
+            return self.camera.get_frame_products(frame_id)
+        return None
+
+    def set_data(self, data, products=None, timestamp=None):
         """
-        self.filter.process(data)
-        self.axisFilter.process(data)
-        self.reticleDetector.process(data)
-        captured_time = self.camera.get_last_capture_time(millisecond=True)
-        self.probeDetector.process(data, captured_time)
+        Set the data displayed in the screen widget.
+
+        Args:
+            data (numpy.ndarray): Image data to display.
+            products (FrameProducts, optional): Cached derived images of the frame,
+                shared by the reticle and probe detectors.
+            timestamp (int, optional): Capture time (ns) passed with the probe detections.
+                Defaults to the capture time of the frame.
+        """
+        if products is not None:
+            frame_id = products.frame_id
+            if timestamp is None:
+                timestamp = products.timestamp
+        else:
+            timestamp = self.camera.get_last_capture_timestamp()
+            frame_id = self.camera.get_last_frame_id()
+        # The workers skip frames they have already processed
+        self.filter.process(data, frame_id=frame_id)
+        self.axisFilter.process(data, frame_id=frame_id)
+        self.reticleDetector.process(data, products, frame_id=frame_id)
+        self.probeDetector.process(data, timestamp, frame_id=frame_id, products=products)
 
     def is_camera(self):
         """
@@ -196,23 +385,66 @@ class ScreenWidget(pg.GraphicsView):
         if self.camera:
             self.camera.save_last_image(filepath, isTimestamp, name)
 
-    def save_recording(self, filepath, isTimestamp=False, name="Microscope_"):
+    def save_recording(
+        self, filepath, isTimestamp=False, name="Microscope_", recording_format="video"
+    ):
         """
         Save the recording frames that are displayed from camera.
+
+        Args:
+            recording_format (str): "video" (XVID .avi) or "raw" (lossless chunked frames).
         """
         if self.camera:
-            self.camera.save_recording(filepath, isTimestamp, name)
+            self.camera.save_recording(filepath, isTimestamp, name, recording_format)
 
     def stop_recording(self):
         """
         Stop the recording.
+
+        Returns:
+            dict or None: Recording counters (queued, written, dropped frames) of the camera.
         """
         if self.camera:
-            self.camera.stop_recording()
+            return self.camera.stop_recording()
+        return None
 
     def set_image_item_from_data(self, data):
         """display image from data"""
-        self.image_item.setImage(data, autoLevels=False)
+        if self._display_frame is None or self._display_frame.shape[:2] != data.shape[:2]:
+            self.frame_bounds.setRect(0, 0, data.shape[1], data.shape[0])
+            # Fit the new frame size before rendering the visible region
+            self.view_box.autoRange()
+        self._display_frame = data
+        self._render_display()
+
+    def _render_display(self, *args):
+        """
+        Render the visible part of the last frame, decimated to the view size, or
+        cropped at native resolution when zoomed in.
+        """
+        data = self._display_frame
+        if data is None or not self.is_displayed():
+            return  # Rendered by showEvent() when the screen is shown again
+        scene_rect = self.view_box.sceneBoundingRect()
+        ratio = self.devicePixelRatioF()
+        image, rect = self.viewport_renderer.render(
+            data,
+            self.view_box.viewRange(),
+            (scene_rect.width() * ratio, scene_rect.height() * ratio),
+        )
+        if image is None:
+            return
+
+        # Levels are set once per data type instead of being computed per frame.
+        # 8-bit images are displayed without level scaling.
+        if data.dtype != self._display_dtype:
+            self._display_dtype = data.dtype
+            if data.dtype == np.uint8:
+                self.image_item.setLevels(None)
+            else:
+                self.image_item.setLevels((float(data.min()), float(data.max())))
+        self.image_item.setImage(image, autoLevels=False)
+        self.image_item.setRect(QtCore.QRectF(*rect))
 
     def set_camera_setting(self, setting, val):
         """
@@ -234,6 +466,7 @@ class ScreenWidget(pg.GraphicsView):
                 self.camera.set_wb("Red", val)
             elif setting == "wbBlue":
                 self.camera.set_wb("Blue", val)
+            self.probeDetector.invalidate_mask()  # The image brightness changes
 
     def get_camera_setting(self, setting):
         """Get the specified camera setting value.
@@ -276,7 +509,9 @@ class ScreenWidget(pg.GraphicsView):
         Handle the image click event.
         """
         if event.button() == QtCore.Qt.MouseButton.LeftButton:
-            x, y = event.pos().x(), event.pos().y()
+            # Image item pixels to full-frame pixels
+            pos = self.image_item.mapToParent(QtCore.QPointF(event.pos()))
+            x, y = pos.x(), pos.y()
             x, y = int(round(x)), int(round(y))
             self.select((x, y))
             self.send_clicked_position((x, y))
@@ -296,6 +531,11 @@ class ScreenWidget(pg.GraphicsView):
         self.click_target2.setPos(pos)
         self.click_target2.setVisible(True)
 
+    def showEvent(self, event):
+        """Render the last frame, which is not rendered while the screen is hidden."""
+        super().showEvent(event)
+        self._render_display()
+
     def zoom_out(self):
         """
         Zoom out the image. Fill the screen widget with the image.
@@ -307,15 +547,23 @@ class ScreenWidget(pg.GraphicsView):
         Set the camera.
         """
         self.camera = camera
+        self.last_frame_id = None
         camera_sn = self.get_camera_name()
         self.reticleDetector.set_name(camera_sn)
         self.probeDetector.set_name(camera_sn)
         self.axisFilter.set_name(camera_sn)
         self.filter.set_name(camera_sn)
 
+    def reset_roi(self):
+        """Return the camera to full frame acquisition."""
+        if self.roi_tracker is not None and self.roi_tracker.roi is not None:
+            self.roi_tracker.reset()
+            self.camera.clear_roi()
+
     def run_reticle_detection(self):
         """Run reticle detection by stopping the filter and starting the reticle detector."""
         logger.debug("run_reticle_detection")
+        self.reset_roi()
         self.filter.stop()
         self.axisFilter.stop()
         self.reticleDetector.start()
@@ -329,6 +577,7 @@ class ScreenWidget(pg.GraphicsView):
 
     def run_no_filter(self):
         """Run without any filter by stopping the reticle detector and probe detector."""
+        self.reset_roi()
         self.reticleDetector.stop()
         self.probeDetector.stop()
         self.axisFilter.stop()
@@ -337,6 +586,7 @@ class ScreenWidget(pg.GraphicsView):
     def run_axis_filter(self):
         """Run without any filter by stopping the reticle detector and probe detector."""
         logger.debug("run_axis_filter")
+        self.reset_roi()
         self.filter.stop()
         self.reticleDetector.stop()
         logger.debug("reticleDetector stopped")
@@ -358,19 +608,35 @@ class ScreenWidget(pg.GraphicsView):
         self.rvecs = None
         self.tvecs = None
 
-    def found_probe_coords(self, timestamp, probe_sn, stage_info, tip_coords):
+    def found_probe_coords(self, timestamp, frame_id, probe_sn, stage_info, tip_coords):
         """Store the found probe coordinates and related information."""
         self.probe_detect_last_timestamp = timestamp
+        self.probe_detect_last_frame_id = frame_id
         self.probe_detect_last_sn = probe_sn
         self.stage_info = stage_info
         self.probe_detect_last_coords = tip_coords
 
-        self.probe_coords_detected.emit(self.camera_name, timestamp, probe_sn, stage_info, tip_coords)
+        if self.roi_tracker is not None:
+            roi = self.roi_tracker.update(tip_coords)
+            if roi is not None:
+                self.camera.request_roi(roi)
+
+        self.probe_coords_detected.emit(
+            self.camera_name, timestamp, frame_id, probe_sn, stage_info, tip_coords
+        )
+
+    def missed_probe_coords(self, timestamp, frame_id):
+        """Widen the ROI after the probe detection ran on frames without finding the tip."""
+        if self.roi_tracker is not None:
+            roi = self.roi_tracker.lost()
+            if roi is not None:
+                self.camera.request_roi(roi)
 
     def get_last_detect_probe_info(self):
         """Get the last detected probe information."""
         return (
             self.probe_detect_last_timestamp,
+            self.probe_detect_last_frame_id,
             self.probe_detect_last_sn,
             self.probe_detect_last_coords,
         )
@@ -0,0 +1,162 @@
+"""
+SnapshotWriter converts and encodes camera snapshots on a worker pool, so that saving
+the frames of all cameras does not block the GUI thread, the live view or detection.
+
+Supported formats:
+    png   debayered color image, configurable compression level
+    tiff  debayered color image, uncompressed
+    npy   raw (undebayered) frame as a numpy array
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+from PyQt5.QtCore import QObject, pyqtSignal
+
+# Set logger name
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)
+
+
+class SnapshotWriter(QObject):
+    """Saves snapshots in the background on a pool of worker threads."""
+
+    FORMATS = ("png", "tiff", "npy")
+
+    # Paths of the files saved from one save() call, failed snapshots are left out
+    finished = pyqtSignal(list)
+
+    def __init__(self, snapshot_format="png", png_compression=1, max_workers=None):
+        """Initialize the writer.
+
+        Args:
+            snapshot_format (str): "png", "tiff" or "npy".
+            png_compression (int): PNG compression level from 0 (none) to 9.
+            max_workers (int, optional): Number of worker threads. Defaults to the
+                number of CPUs, up to 8.
+        """
+        super().__init__()
+        self.snapshot_format = None
+        self.png_compression = png_compression
+        self.set_format(snapshot_format, png_compression)
+        if max_workers is None:
+            max_workers = min(8, os.cpu_count() or 1)
+        # OpenCV releases the GIL while converting and encoding
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="SnapshotWriter"
+        )
+
+    def set_format(self, snapshot_format, png_compression=None):
+        """Set the format of the next snapshots.
+
+        Args:
+            snapshot_format (str): "png", "tiff" or "npy".
+            png_compression (int, optional): PNG compression level from 0 to 9.
+        """
+        if snapshot_format not in self.FORMATS:
+            raise ValueError(
+                f"Unknown snapshot format '{snapshot_format}', expected one of {self.FORMATS}"
+            )
+        self.snapshot_format = snapshot_format
+        if png_compression is not None:
+            if not 0 <= png_compression <= 9:
+                raise ValueError("PNG compression level must be between 0 and 9")
+            self.png_compression = png_compression
+
+    @staticmethod
+    def to_color(frame, pixelformat=None):
+        """Convert a raw frame to the image saved as PNG or TIFF.
+
+        Args:
+            frame (numpy.ndarray): Raw frame.
+            pixelformat (str, optional): Pixel format of the raw frame, e.g. "BayerRG8".
+
+        Returns:
+            numpy.ndarray: Image in the channel order expected by cv2.imwrite.
+        """
+        if pixelformat == "BayerRG8":
+            # Same channel order as debayering for display followed by RGB2BGR
+            return cv2.cvtColor(frame, cv2.COLOR_BayerRG2RGB)
+        if frame.ndim == 3:
+            return cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+        return frame
+
+    def _write(self, frame, pixelformat, path, snapshot_format, png_compression):
+        """Convert and write one snapshot. Runs on a worker thread.
+
+        Returns:
+            str or None: Path of the saved file, None if saving failed.
+        """
+        try:
+            if snapshot_format == "npy":
+                np.save(path, frame)
+                return path
+            image = self.to_color(frame, pixelformat)
+            if snapshot_format == "png":
+                params = [cv2.IMWRITE_PNG_COMPRESSION, png_compression]
+            else:
+                # 1: no compression
+                params = [cv2.IMWRITE_TIFF_COMPRESSION, 1]
+            if not cv2.imwrite(path, image, params):
+                logger.error(f"Failed to write snapshot {path}")
+                return None
+            return path
+        except Exception as e:
+            logger.error(f"An error occurred while saving the snapshot {path}: {e}")
+            return None
+
+    def save(self, snapshots):
+        """Save snapshots in the background.
+
+        The frames must not be modified by the caller afterwards, pass copies of
+        frames taken from a ring buffer.
+
+        Args:
+            snapshots (list): (frame, pixelformat, path without extension) tuples.
+
+        Returns:
+            list: Futures returning the saved path, or None if saving failed.
+        """
+        snapshot_format, png_compression = self.snapshot_format, self.png_compression
+        futures = [
+            self.executor.submit(
+                self._write,
+                frame,
+                pixelformat,
+                f"{path}.{snapshot_format}",
+                snapshot_format,
+                png_compression,
+            )
+            for frame, pixelformat, path in snapshots
+        ]
+        if not futures:
+            self.finished.emit([])
+            return futures
+
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def done(_):
+            """Emit finished once the last snapshot is saved."""
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            saved = [future.result() for future in futures]
+            self.finished.emit([path for path in saved if path is not None])
+
+        for future in futures:
+            future.add_done_callback(done)
+        return futures
+
+    def shutdown(self, wait=True):
+        """Stop the worker pool.
+
+        Args:
+            wait (bool): Whether to wait until the queued snapshots are written.
+        """
+        self.executor.shutdown(wait=wait)
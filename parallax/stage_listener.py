@@ -6,12 +6,13 @@ applications, using PyQt5 for threading and signals, and requests for HTTP reque
 import logging
 import time
 from collections import deque
-from datetime import datetime
 
 import numpy as np
 import requests
 from PyQt5.QtCore import QObject, QThread, QTimer, pyqtSignal
 
+from .timestamps import format_timestamp_ns
+
 # Set logger name
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.WARNING)
@@ -217,42 +218,11 @@ class StageListener(QObject):
             self.worker.moveToThread(self.thread)
             self.thread.start()
 
-    def get_last_moved_time(self, millisecond=False):
-        """Get the last moved time of the stage.
-
-        Args:
-            millisecond (bool): Include milliseconds in the timestamp. Defaults to False.
-
-        Returns:
-            str: Last moved time as a string.
-        """
-        ts = time.time()
-        dt = datetime.fromtimestamp(ts)
-        if millisecond:
-            return "%04d%02d%02d-%02d%02d%02d.%03d" % (
-                dt.year,
-                dt.month,
-                dt.day,
-                dt.hour,
-                dt.minute,
-                dt.second,
-                dt.microsecond // 1000,
-            )
-        else:
-            return "%04d%02d%02d-%02d%02d%02d" % (
-                dt.year,
-                dt.month,
-                dt.day,
-                dt.hour,
-                dt.minute,
-                dt.second,
-            )
-
     def append_to_buffer(self, ts, stage):
         """Append stage data to the buffer.
 
         Args:
-            ts (str): Timestamp.
+            ts (int): Timestamp in ns.
             stage (Stage): Stage object.
         """
         self.buffer_ts_local_coords.append(
@@ -265,8 +235,8 @@ class StageListener(QObject):
         Args:
             probe (dict): Probe data.
         """
-        # Format the current timestamp
-        self.timestamp_local = self.get_last_moved_time(millisecond=True)
+        # Host time of the stage update, comparable with the image capture time
+        self.timestamp_local = time.time_ns()
 
         id = probe["Id"]
         sn = probe["SerialNumber"]
@@ -367,18 +337,12 @@ class StageListener(QObject):
         self.stage_ui.updateStageGlobalCoords_default()
         logger.debug(f"requestClearGlobalDataTransformM {self.transM_dict}")
 
-    def _change_time_format(self, str_time):
-        """Change the time format from string to datetime."""
-        fmt = "%Y%m%d-%H%M%S.%f"
-        date_time = datetime.strptime(str_time, fmt)
-        return date_time
-
     def _find_closest_local_coords(self):
         """Find the closest local coordinates based on the image capture timestamp.
 
         Returns:
             tuple: (closest_ts, closest_coords)
-                - closest_ts (str): Closest timestamp.
+                - closest_ts (int): Closest timestamp in ns.
                 - closest_coords (list): Closest local coordinates.
         """
         closest_ts = None
@@ -388,8 +352,7 @@ class StageListener(QObject):
         smallest_time_diff = float("inf")
 
         for ts, local_coords in self.buffer_ts_local_coords:
-            ts_datetime = self._change_time_format(ts)
-            time_diff = (self.ts_img_captured - ts_datetime).total_seconds()
+            time_diff = self.ts_img_captured - ts
 
             if time_diff < 0:
                 break
@@ -402,19 +365,24 @@ class StageListener(QObject):
 
         return closest_ts, closest_coords
 
-    def handleGlobalDataChange(self, sn, global_coords, ts_img_captured, cam0, pt0, cam1, pt1):
+    def handleGlobalDataChange(
+        self, sn, global_coords, ts_img_captured, cam0, pt0, cam1, pt1, frame_ids=None
+    ):
         """Handle changes in global stage data.
 
         Args:
             sn (str): Serial number of the stage.
             coords (list): Global coordinates.
-            ts_img_captured (str): Timestamp of the captured image.
+            ts_img_captured (int): Capture time of the image in ns.
+            frame_ids (tuple, optional): Frame IDs of the images from cam0 and cam1.
         """
-        self.ts_img_captured = self._change_time_format(ts_img_captured)
+        self.ts_img_captured = ts_img_captured
         ts_local_coords, local_coords = self._find_closest_local_coords()
+        frame_id0, frame_id1 = frame_ids if frame_ids is not None else (None, None)
 
         logger.debug(
-            f"\ntimestamp local:{ts_local_coords} img_captured:{ts_img_captured}"
+            f"\ntimestamp local:{ts_local_coords} img_captured:{ts_img_captured} "
+            f"frames:{frame_id0},{frame_id1}"
         )
         global_coords_x = round(global_coords[0][0] * 1000, 1)
         global_coords_y = round(global_coords[0][1] * 1000, 1)
@@ -441,12 +409,18 @@ class StageListener(QObject):
 
             # Debug info
             debug_info = {}
-            debug_info["ts_local_coords"] = ts_local_coords
-            debug_info["ts_img_captured"] = ts_img_captured
+            debug_info["ts_local_coords"] = format_timestamp_ns(
+                ts_local_coords, millisecond=True
+            )
+            debug_info["ts_img_captured"] = format_timestamp_ns(
+                ts_img_captured, millisecond=True
+            )
             debug_info["cam0"] = cam0
             debug_info["pt0"] = pt0
+            debug_info["frame_id0"] = frame_id0
             debug_info["cam1"] = cam1
             debug_info["pt1"] = pt1
+            debug_info["frame_id1"] = frame_id1
                 
             # Update into UI
             moving_stage = self.model.stages.get(sn)
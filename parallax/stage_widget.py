@@ -30,6 +30,9 @@ logger.setLevel(logging.WARNING)
 class StageWidget(QWidget):
     """A widget for stage control and calibration in a microscopy system."""
 
+    # Maximum capture time difference (ns) for probe detections to be triangulated together
+    probe_sync_tolerance_ns = 100_000_000
+
     def __init__(self, model, ui_dir, screen_widgets):
         """
         Initializes the StageWidget instance with model, UI directory, and screen widgets.
@@ -747,10 +750,11 @@ class StageWidget(QWidget):
                 self.model.add_coords_axis(camera_name, coords)
                 self.model.add_camera_intrinsic(camera_name, mtx, dist, rvec, tvec)
 
-    def probe_detect_on_two_screens(self, cam_name, timestamp, sn, stage_info, pixel_coords):
+    def probe_detect_on_two_screens(self, cam_name, timestamp, frame_id, sn, stage_info, pixel_coords):
         """Detect probe coordinates on all screens."""
         cam_name_cmp, timestamp_cmp, sn_cmp = cam_name, timestamp, sn # Coords tip detected screen
         tip_coordsA, tip_coordsB = None, None
+        frame_ids = {cam_name: frame_id}
 
         if cam_name_cmp is None or timestamp_cmp is None or sn_cmp is None:
             return
@@ -768,13 +772,14 @@ class StageWidget(QWidget):
                 continue
             
             if cam_name in [self.camA_best, self.camB_best]:
-                timestamp, sn, tip_coord = screen.get_last_detect_probe_info()
+                timestamp, frame_id, sn, tip_coord = screen.get_last_detect_probe_info()
                 if (sn is None) or (tip_coord is None) or (timestamp is None):
                     return
                 if sn != sn_cmp:
                     return
-                if timestamp_cmp[:-2] != timestamp[:-2]:
+                if abs(timestamp_cmp - timestamp) > self.probe_sync_tolerance_ns:
                     return
+                frame_ids[cam_name] = frame_id
 
                 if cam_name == self.camA_best:
                     tip_coordsA = tip_coord
@@ -796,9 +801,10 @@ class StageWidget(QWidget):
             tip_coordsA, 
             self.camB_best, 
             tip_coordsB, 
+            frame_ids=(frame_ids.get(self.camA_best), frame_ids.get(self.camB_best)),
         )
     
-    def probe_detect_on_screens(self, camA, timestampA, snA, stage_info, tip_coordsA):
+    def probe_detect_on_screens(self, camA, timestampA, frame_idA, snA, stage_info, tip_coordsA):
         """Detect probe coordinates on all screens."""
         tip_coordsB = None
 
@@ -810,12 +816,12 @@ class StageWidget(QWidget):
             if camA == camB:
                 continue
             
-            timestampB, snB, tip_coordsB = screen.get_last_detect_probe_info()
+            timestampB, frame_idB, snB, tip_coordsB = screen.get_last_detect_probe_info()
             if (snB is None) or (tip_coordsB is None) or (timestampB is None):
                 continue
             if snA != snB:
                 continue
-            if timestampA[:-2] != timestampB[:-2]:
+            if abs(timestampA - timestampB) > self.probe_sync_tolerance_ns:
                 continue
 
             # Proceed with triangulation on the two screens
@@ -836,6 +842,7 @@ class StageWidget(QWidget):
                 tip_coordsA, 
                 camB, 
                 tip_coordsB, 
+                frame_ids=(frame_idA, frame_idB),
             )
 
     def probe_overwrite_popup_window(self):
@@ -0,0 +1,242 @@
+"""
+SyntheticCamera renders procedural microscope frames: a reticle with known geometry
+seen through configurable intrinsics/extrinsics and a probe shaft at a configurable
+3D pose, optionally with noise and blur.
+
+Frames are rendered lazily into reused buffers, so the dummy mode can exercise the
+reticle and probe detection and the calibration at realistic load and with known
+ground truth, without holding recorded or random image stacks in memory.
+"""
+
+import logging
+import time
+
+import cv2
+import numpy as np
+
+from .calibration_camera import WORLD_SCALE
+from .camera import MockCamera
+from .timestamps import format_timestamp_ns
+
+# Set logger name
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)
+
+# Number of tick marks on each side of the reticle center
+N_TICKS_HALF = 35
+# Every LONG_TICK_INTERVAL-th tick mark is a long one
+LONG_TICK_INTERVAL = 5
+# Radius of the reticle glass (mm)
+RETICLE_RADIUS = 7.5
+# Line widths and tick mark lengths on the reticle (mm)
+AXIS_WIDTH = 0.015
+TICK_WIDTH = 0.03
+TICK_LENGTH = 0.12
+LONG_TICK_LENGTH = 0.3
+# Width of the probe shaft (mm)
+PROBE_WIDTH = 0.03
+
+BACKGROUND_LEVEL = 60
+RETICLE_LEVEL = 200
+LINE_LEVEL = 80
+PROBE_LEVEL = 40
+
+
+class SyntheticCamera(MockCamera):
+    """Mock camera rendering a reticle and a probe with known geometry."""
+
+    def __init__(
+        self,
+        width=4000,
+        height=3000,
+        mtx=None,
+        dist=None,
+        rvec=(2.8, 0.1, 0.1),
+        tvec=(0.0, 0.0, 60.0),
+        probe_tip=(1.0, -0.6, 0.0),
+        probe_direction=(0.5, 0.7, 0.5),
+        probe_length=20.0,
+        noise=0,
+        blur=0,
+        seed=None,
+    ):
+        """Initialize a synthetic camera.
+
+        Args:
+            width (int): Frame width in pixels.
+            height (int): Frame height in pixels.
+            mtx (numpy.ndarray, optional): Camera matrix. Defaults to the calibration
+                initial guess scaled to the frame size.
+            dist (numpy.ndarray, optional): Distortion coefficients. Defaults to none.
+            rvec (tuple): Rotation vector of the reticle in camera coordinates. The
+                default tilts the reticle slightly, with the reticle y axis pointing up
+                in the image and the z axis pointing toward the camera.
+            tvec (tuple): Translation of the reticle center in camera coordinates (mm).
+            probe_tip (tuple): Probe tip position in reticle coordinates (mm).
+            probe_direction (tuple): Direction of the probe shaft from the tip.
+            probe_length (float): Visible length of the probe shaft (mm).
+            noise (int): Amplitude of the uniform noise added to each frame (gray levels).
+            blur (int): Gaussian blur kernel size, 0 for no blur.
+            seed (int, optional): Seed of the camera's own noise generator.
+        """
+        super().__init__()
+        self._name = f"SyntheticCamera{MockCamera.n_cameras - 1}"
+        self.device_color_type = "Mono"
+        self.width = width
+        self.height = height
+        if mtx is None:
+            mtx = np.array(
+                [[1.54e04 * width / 4000, 0.0, width / 2],
+                 [0.0, 1.54e04 * width / 4000, height / 2],
+                 [0.0, 0.0, 1.0]],
+                dtype=np.float64,
+            )
+        self.mtx = np.asarray(mtx, dtype=np.float64)
+        self.dist = np.zeros(5) if dist is None else np.asarray(dist, dtype=np.float64)
+        self.rvec = np.asarray(rvec, dtype=np.float64).reshape(3, 1)
+        self.tvec = np.asarray(tvec, dtype=np.float64).reshape(3, 1)
+        self.noise = noise
+        self.blur = blur
+        self._rng = np.random.default_rng(seed)
+
+        self.set_probe_pose(probe_tip, probe_direction, probe_length)
+        self._scene = None
+        self.frame_id = None
+        self.last_capture_time = None
+
+    def set_pose(self, rvec=None, tvec=None):
+        """Set the reticle pose in camera coordinates.
+
+        Args:
+            rvec (tuple, optional): Rotation vector.
+            tvec (tuple, optional): Translation (mm).
+        """
+        if rvec is not None:
+            self.rvec = np.asarray(rvec, dtype=np.float64).reshape(3, 1)
+        if tvec is not None:
+            self.tvec = np.asarray(tvec, dtype=np.float64).reshape(3, 1)
+        self._scene = None
+
+    def set_probe_pose(self, tip, direction=None, length=None):
+        """Set the probe pose in reticle coordinates.
+
+        Args:
+            tip (tuple): Probe tip position (mm).
+            direction (tuple, optional): Direction of the shaft from the tip.
+            length (float, optional): Visible length of the shaft (mm).
+        """
+        self.probe_tip = np.asarray(tip, dtype=np.float64)
+        if direction is not None:
+            direction = np.asarray(direction, dtype=np.float64)
+            self.probe_direction = direction / np.linalg.norm(direction)
+        if length is not None:
+            self.probe_length = length
+
+    def project(self, points):
+        """Project points in reticle coordinates (mm) onto the image.
+
+        Args:
+            points (numpy.ndarray): Nx3 points.
+
+        Returns:
+            numpy.ndarray: Nx2 pixel coordinates.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        pixels, _ = cv2.projectPoints(points, self.rvec, self.tvec, self.mtx, self.dist)
+        return pixels.reshape(-1, 2)
+
+    def get_reticle_coords(self):
+        """Ground truth pixel coordinates of the tick marks on the x and y axes.
+
+        Returns:
+            tuple: (x_axis, y_axis), arrays of Nx2 pixel coordinates ordered
+                from negative to positive.
+        """
+        ticks = np.arange(-N_TICKS_HALF, N_TICKS_HALF + 1) * WORLD_SCALE
+        zeros = np.zeros_like(ticks)
+        x_axis = self.project(np.stack([ticks, zeros, zeros], axis=1))
+        y_axis = self.project(np.stack([zeros, ticks, zeros], axis=1))
+        return x_axis, y_axis
+
+    def get_probe_tip_coords(self):
+        """Ground truth pixel coordinates of the probe tip."""
+        return tuple(self.project(self.probe_tip)[0])
+
+    def _line_thickness(self, size_mm):
+        """Line thickness in pixels of a line size_mm wide on the reticle."""
+        return max(1, int(round(self.mtx[0, 0] * size_mm / float(self.tvec[2, 0]))))
+
+    def _render_scene(self):
+        """Render the static part of the frame: background, reticle glass and tick marks."""
+        scene = np.full((self.height, self.width), BACKGROUND_LEVEL, dtype=np.uint8)
+
+        # Reticle glass
+        angles = np.linspace(0, 2 * np.pi, 180, endpoint=False)
+        circle = np.stack(
+            [RETICLE_RADIUS * np.cos(angles), RETICLE_RADIUS * np.sin(angles), np.zeros_like(angles)],
+            axis=1,
+        )
+        cv2.fillPoly(scene, [np.round(self.project(circle)).astype(np.int32)], RETICLE_LEVEL)
+
+        # Axes and tick marks. The tick marks are bolder than the axes, like on the
+        # real reticle, so that they remain as separate blobs in the detection.
+        extent = N_TICKS_HALF * WORLD_SCALE
+        thickness = self._line_thickness(AXIS_WIDTH)
+        for start, end in (((-extent, 0, 0), (extent, 0, 0)), ((0, -extent, 0), (0, extent, 0))):
+            p0, p1 = np.round(self.project([start, end])).astype(np.int32)
+            cv2.line(scene, tuple(p0), tuple(p1), LINE_LEVEL, thickness, cv2.LINE_AA)
+        thickness = self._line_thickness(TICK_WIDTH)
+        for i in range(-N_TICKS_HALF, N_TICKS_HALF + 1):
+            half = LONG_TICK_LENGTH / 2 if i % LONG_TICK_INTERVAL == 0 else TICK_LENGTH / 2
+            pos = i * WORLD_SCALE
+            for start, end in (((pos, -half, 0), (pos, half, 0)), ((-half, pos, 0), (half, pos, 0))):
+                p0, p1 = np.round(self.project([start, end])).astype(np.int32)
+                cv2.line(scene, tuple(p0), tuple(p1), LINE_LEVEL, thickness, cv2.LINE_AA)
+        return scene
+
+    def render(self, out=None):
+        """Render a frame.
+
+        Args:
+            out (numpy.ndarray, optional): Buffer to render into.
+
+        Returns:
+            numpy.ndarray: Grayscale frame.
+        """
+        if self._scene is None:
+            self._scene = self._render_scene()
+        if out is None:
+            out = np.empty_like(self._scene)
+        np.copyto(out, self._scene)
+
+        # Probe shaft
+        shaft_end = self.probe_tip + self.probe_direction * self.probe_length
+        p0, p1 = np.round(self.project([self.probe_tip, shaft_end])).astype(np.int32)
+        cv2.line(out, tuple(p0), tuple(p1), PROBE_LEVEL, self._line_thickness(PROBE_WIDTH), cv2.LINE_AA)
+
+        if self.blur:
+            cv2.GaussianBlur(out, (self.blur, self.blur), 0, dst=out)
+        if self.noise:
+            noise = self._rng.integers(0, 2 * self.noise, size=out.shape, dtype=np.uint8)
+            cv2.add(out, noise, dst=out)
+            cv2.subtract(out, self.noise, dst=out)
+        return out
+
+    def get_last_image_data(self):
+        """Render the next frame into a reused buffer and return it."""
+        frame = self.render(self._next_buffer())
+        self.frame_id = 0 if self.frame_id is None else self.frame_id + 1
+        self.last_capture_time = time.time_ns()
+        return frame
+
+    def get_last_capture_time(self, millisecond=False):
+        """Returns the render time of the last frame in a formatted string."""
+        return format_timestamp_ns(self.last_capture_time, millisecond=millisecond)
+
+    def get_last_capture_timestamp(self):
+        """Returns the render time of the last frame in ns."""
+        return self.last_capture_time
+
+    def get_last_frame_id(self):
+        """Returns the ID of the last rendered frame."""
+        return self.frame_id
@@ -0,0 +1,102 @@
+"""
+Timestamps are carried through the pipeline as integer nanoseconds on the host clock
+(time.time_ns()). They are only formatted into strings at the UI/CSV edge.
+
+- DeviceClockMapper: maps a device clock (e.g. the camera timestamp counter) onto the
+  host clock using an offset measured by latching both clocks at the same moment.
+- format_timestamp_ns: formats a timestamp as 'YYYYMMDD-HHMMSS' or 'YYYYMMDD-HHMMSS.mmm'.
+"""
+
+from datetime import datetime
+
+NS_PER_SECOND = 1_000_000_000
+NS_PER_MILLISECOND = 1_000_000
+
+
+def format_timestamp_ns(ts_ns, millisecond=False):
+    """Format a host timestamp for file names, the UI and CSV files.
+
+    Args:
+        ts_ns (int): Timestamp in nanoseconds since the epoch.
+        millisecond (bool): Include milliseconds. Defaults to False.
+
+    Returns:
+        str or None: Formatted timestamp, None if ts_ns is None.
+    """
+    if ts_ns is None:
+        return None
+    seconds, ns = divmod(int(ts_ns), NS_PER_SECOND)
+    dt = datetime.fromtimestamp(seconds)
+    if millisecond:
+        return "%04d%02d%02d-%02d%02d%02d.%03d" % (
+            dt.year,
+            dt.month,
+            dt.day,
+            dt.hour,
+            dt.minute,
+            dt.second,
+            ns // NS_PER_MILLISECOND,
+        )
+    return "%04d%02d%02d-%02d%02d%02d" % (
+        dt.year,
+        dt.month,
+        dt.day,
+        dt.hour,
+        dt.minute,
+        dt.second,
+    )
+
+
+class DeviceClockMapper:
+    """Maps device clock ticks (ns) onto the host clock (ns)."""
+
+    def __init__(self, relatch_interval=10.0):
+        """Initialize the mapper.
+
+        Args:
+            relatch_interval (float): Seconds after which the offset should be measured
+                again to follow the drift between the clocks. Defaults to 10 s.
+        """
+        self.relatch_interval_ns = int(relatch_interval * NS_PER_SECOND)
+        self.offset_ns = None
+        self.latched_at_ns = None
+
+    @property
+    def is_valid(self):
+        """bool: True if an offset has been measured."""
+        return self.offset_ns is not None
+
+    def update(self, device_ns, host_ns):
+        """Store the offset from a pair of clock readings taken at the same moment.
+
+        Args:
+            device_ns (int): Device clock reading in nanoseconds.
+            host_ns (int): Host clock reading in nanoseconds.
+        """
+        self.offset_ns = int(host_ns) - int(device_ns)
+        self.latched_at_ns = int(host_ns)
+
+    def invalidate(self):
+        """Forget the offset, e.g. when the device does not support latching."""
+        self.offset_ns = None
+        self.latched_at_ns = None
+
+    def needs_update(self, host_ns):
+        """Return True if the offset is older than the relatch interval."""
+        return (
+            self.latched_at_ns is None
+            or host_ns - self.latched_at_ns >= self.relatch_interval_ns
+        )
+
+    def to_host(self, device_ns):
+        """Convert a device timestamp to the host clock.
+
+        Args:
+            device_ns (int): Device timestamp in nanoseconds.
+
+        Returns:
+            int or None: Host timestamp in nanoseconds, None if no offset is known.
+        """
+        if self.offset_ns is None:
+            return None
+        return int(device_ns) + self.offset_ns
@@ -0,0 +1,114 @@
+"""
+TipPredictor predicts where the probe tip appears in a camera image from the stage
+telemetry, so that probe tracking can search a small window around the prediction
+before growing the search region.
+
+The stage position reported by the StageListener is converted to global coordinates
+with the transformation matrix of the probe calibration, and projected into the
+camera with the camera calibration. Only the change in the projection since the last
+detected tip is used, so offsets between the stage and the projected position cancel.
+"""
+
+import logging
+
+import cv2
+import numpy as np
+
+# Set logger name
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)
+
+
+class TipPredictor:
+    """Predict the probe tip position in one camera from the stage position."""
+
+    def __init__(self, model, camera_name, original_size, resized_size):
+        """Initialize the TipPredictor object.
+
+        Args:
+            model (object): The main model with the stages, stage transforms and
+                camera calibrations.
+            camera_name (str): Camera serial number.
+            original_size (tuple): Size of the camera image (width, height).
+            resized_size (tuple): Size of the image the probe is tracked in.
+        """
+        self.model = model
+        self.camera_name = camera_name
+        self.scale = np.array(resized_size, dtype=float) / np.array(original_size)
+        self.anchors = {}  # sn: (tip in resized image, projected stage position)
+
+    def _project(self, sn):
+        """Project the current stage position into the resized camera image.
+
+        Args:
+            sn (str): Serial number of the stage.
+
+        Returns:
+            numpy.ndarray or None: Projected (x, y), None if the stage or camera is
+                not calibrated.
+        """
+        stage = self.model.get_stage(sn)
+        transform = self.model.get_transform(sn)
+        intrinsic = self.model.get_camera_intrinsic(self.camera_name)
+        if stage is None or transform is None or intrinsic is None:
+            return None
+        transM, scale = transform
+        mtx, dist, rvec, tvec = intrinsic
+        if transM is None or scale is None or mtx is None:
+            return None
+        if isinstance(rvec, (tuple, list)):
+            rvec, tvec = rvec[0], tvec[0]
+
+        # Local to global coordinates in um, as in the StageListener
+        local_point = np.array([stage.stage_x, stage.stage_y, stage.stage_z, 1.0])
+        local_point = local_point * np.append(scale, 1)
+        global_point = np.dot(transM, local_point)[:3] / 1000  # mm, reticle units
+        imgpts, _ = cv2.projectPoints(
+            global_point.reshape(1, 3).astype(np.float64), rvec, tvec, mtx, dist
+        )
+        return imgpts.reshape(2) * self.scale
+
+    def set_anchor(self, sn, tip):
+        """Record the detected tip at the current stage position.
+
+        Args:
+            sn (str): Serial number of the stage.
+            tip (tuple): Detected tip (x, y) in the resized image.
+        """
+        projected = self._project(sn) if tip is not None else None
+        if projected is None:
+            self.anchors.pop(sn, None)
+        else:
+            self.anchors[sn] = (np.array(tip, dtype=float), projected)
+
+    def predict(self, sn):
+        """Predict the tip position at the current stage position.
+
+        Args:
+            sn (str): Serial number of the stage.
+
+        Returns:
+            tuple or None: Predicted (x, y) in the resized image, None if no tip was
+                detected yet or the stage or camera is not calibrated.
+        """
+        anchor = self.anchors.get(sn)
+        if anchor is None:
+            return None
+        projected = self._project(sn)
+        if projected is None:
+            return None
+        tip, anchor_projected = anchor
+        predicted = tip + projected - anchor_projected
+        logger.debug(f"{self.camera_name} {sn} predicted tip: {predicted}")
+        return int(round(predicted[0])), int(round(predicted[1]))
+
+    def reset(self, sn=None):
+        """Forget the detected tips.
+
+        Args:
+            sn (str, optional): Serial number of the stage. Defaults to all stages.
+        """
+        if sn is None:
+            self.anchors = {}
+        else:
+            self.anchors.pop(sn, None)
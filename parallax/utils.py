@@ -113,3 +113,47 @@ class UtilsCrops:
             or (left - buffer <= x <= left + buffer)
             or (right - buffer <= x <= right + buffer)
         )
+
+    @classmethod
+    def get_crop_sizes(self, crop_init, IMG_SIZE, hierarchical=False, step=100):
+        """Get the crop sizes to search for the probe, from the smallest.
+
+        Args:
+            crop_init (int): Size of the first crop region.
+            IMG_SIZE (tuple): Size of the image (width, height).
+            hierarchical (bool): Whether to double the crop size at each step. Used
+                when the crop region is centered on a predicted tip position, so the
+                whole image is reached in a few steps.
+            step (int): Increment of the crop size if not hierarchical. Defaults to 100.
+
+        Returns:
+            list: Crop sizes.
+        """
+        max_size = max(IMG_SIZE[0], IMG_SIZE[1])
+        sizes = []
+        crop_size = crop_init
+        while crop_size <= max_size:
+            sizes.append(crop_size)
+            crop_size = crop_size * 2 if hierarchical else crop_size + step
+        if hierarchical and sizes and sizes[-1] < max_size:
+            sizes.append(max_size)  # Whole image as the last resort
+        return sizes
+
+    @classmethod
+    def shift_to_predicted_tip(self, tip, base, predicted_tip):
+        """Move the tip and base so that the tip is at the predicted position.
+
+        The stage moves the probe without rotating it in the image, so the base
+        moves by the same offset as the tip.
+
+        Args:
+            tip (tuple): Coordinates of the last detected tip (x, y).
+            base (tuple): Coordinates of the last detected base (x, y).
+            predicted_tip (tuple): Predicted coordinates of the tip (x, y).
+
+        Returns:
+            tuple: Shifted tip and base coordinates.
+        """
+        dx = int(round(predicted_tip[0] - tip[0]))
+        dy = int(round(predicted_tip[1] - tip[1]))
+        return (tip[0] + dx, tip[1] + dy), (base[0] + dx, base[1] + dy)
@@ -0,0 +1,133 @@
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+from parallax.async_frame_writer import AsyncFrameWriter, VideoFileSink
+
+
+class ListSink:
+    """Sink collecting written frames, optionally blocking until released."""
+
+    def __init__(self, gate=None):
+        """Block each write on gate if it is given."""
+        self.frames = []
+        self.released = False
+        self.gate = gate
+
+    def write(self, frame, frame_id=None, timestamp=None):
+        """Store a copy of the frame with its ID and timestamp."""
+        if self.gate is not None:
+            self.gate.wait()
+        self.frames.append((frame_id, timestamp, frame.copy()))
+
+    def release(self):
+        """Mark the sink as released."""
+        self.released = True
+
+
+def make_frame(value, shape=(30, 40)):
+    """Create a frame filled with the given value."""
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def test_writes_all_frames_and_drains_on_stop():
+    """All submitted frames are written in order before stop() returns."""
+    sink = ListSink()
+    writer = AsyncFrameWriter(sink, max_queue=4, policy="block")
+    writer.start()
+    frame = make_frame(0)
+    for i in range(10):
+        frame[:] = i
+        assert writer.submit(frame, frame_id=i, timestamp=i)
+    stats = writer.stop(drain=True)
+
+    assert sink.released
+    assert [fid for fid, _, _ in sink.frames] == list(range(10))
+    # Frames were copied, so reusing the caller's buffer does not affect them
+    assert [int(f[0, 0]) for _, _, f in sink.frames] == list(range(10))
+    assert stats["written"] == 10
+    assert stats["dropped"] == 0
+    assert stats["pending"] == 0
+
+
+@pytest.mark.parametrize(
+    "policy, expected_ids",
+    [("drop_oldest", [0, 3, 4]), ("drop_newest", [0, 1, 2])],
+)
+def test_drop_policies(policy, expected_ids):
+    """A full queue drops either the oldest queued or the newest frame."""
+    gate = threading.Event()
+    sink = ListSink(gate)
+    writer = AsyncFrameWriter(sink, max_queue=2, policy=policy)
+    writer.start()
+
+    writer.submit(make_frame(0), frame_id=0)
+    # Wait until the writer thread holds frame 0, blocked in the sink
+    while writer.queue_length():
+        pass
+    for i in range(1, 5):
+        writer.submit(make_frame(i), frame_id=i)
+    gate.set()
+    stats = writer.stop(drain=True)
+
+    assert [fid for fid, _, _ in sink.frames] == expected_ids
+    assert stats["queued"] == (5 if policy == "drop_oldest" else 3)
+    assert stats["dropped"] == 2
+    assert stats["written"] == 3
+
+
+def test_block_policy_times_out():
+    """The block policy waits for space and drops the frame on timeout."""
+    gate = threading.Event()
+    sink = ListSink(gate)
+    writer = AsyncFrameWriter(sink, max_queue=1, policy="block", block_timeout=0.05)
+    writer.start()
+    writer.submit(make_frame(0), frame_id=0)
+    while writer.queue_length():
+        pass
+    assert writer.submit(make_frame(1), frame_id=1)
+    assert not writer.submit(make_frame(2), frame_id=2)
+    gate.set()
+    stats = writer.stop()
+    assert stats["written"] == 2
+    assert stats["dropped"] == 1
+
+
+def test_stop_without_drain_and_submit_after_stop():
+    """Queued frames are discarded without drain, later submits are rejected."""
+    gate = threading.Event()
+    sink = ListSink(gate)
+    writer = AsyncFrameWriter(sink, max_queue=4)
+    writer.start()
+    for i in range(3):
+        writer.submit(make_frame(i), frame_id=i)
+    gate.set()
+    stats = writer.stop(drain=False)
+    assert stats["written"] + stats["dropped"] == 3
+    assert not writer.submit(make_frame(9))
+    assert sink.released
+
+
+def test_invalid_policy():
+    """Unknown policies are rejected."""
+    with pytest.raises(ValueError):
+        AsyncFrameWriter(ListSink(), policy="unknown")
+
+
+def test_video_file_sink(tmp_path):
+    """Bayer frames are debayered and encoded into the video file."""
+    filename = str(tmp_path / "test.avi")
+    sink = VideoFileSink(filename, 10, (40, 30), pixelformat="BayerRG8")
+    writer = AsyncFrameWriter(sink)
+    writer.start()
+    for i in range(5):
+        writer.submit(make_frame(i * 40), frame_id=i)
+    stats = writer.stop()
+    assert stats["written"] == 5
+
+    cap = cv2.VideoCapture(filename)
+    n_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    assert n_frames == 5
@@ -4,6 +4,7 @@ import time
 from PyQt5.QtCore import QCoreApplication, QEventLoop
 from unittest.mock import Mock
 from parallax.axis_filter import AxisFilter
+from parallax.overlay import OverlayModel
 
 @pytest.fixture
 def reticle_coords():
@@ -91,3 +92,21 @@ def test_axis_filter_pos_x_cases(axis_filter, test_frame, qt_application):
 
     # Test Case 4: Click near the last point of reticle_coords[1]
     process_axis_filter(axis_filter, test_frame, (2290, 1221), qt_application, (2190, 1121))
+
+def test_axis_filter_draws_on_overlay(mock_model, test_frame):
+    """The reticle points are shown on the overlay and the frame is not modified."""
+    overlay = OverlayModel()
+    changes = []
+    overlay.changed.connect(changes.append)
+    worker = AxisFilter.Worker("TestCamera123", mock_model, overlay)
+    frame = test_frame.copy()
+    worker.process(frame)
+    worker.process(frame)
+
+    np.testing.assert_array_equal(frame, test_frame)
+    shapes = overlay.get_layer(AxisFilter.OVERLAY_LAYER)
+    # Points and end points of both axes, and pos_x
+    assert len(shapes) == 5
+    assert shapes[-1].coords == ((200.0, 200.0),)
+    # Unchanged points do not update the overlay again
+    assert changes == [AxisFilter.OVERLAY_LAYER]
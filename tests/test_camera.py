@@ -1,6 +1,7 @@
 # tests/camera.py
+import numpy as np
 import pytest
-from parallax.camera import list_cameras, close_cameras
+from parallax.camera import PySpinCamera, list_cameras, close_cameras
 
 def test_capture_image(mocker):
     """
@@ -24,6 +25,84 @@ def test_capture_image(mocker):
     mocker.patch('parallax.camera.close_cameras')
     close_cameras()
 
+def test_timestamp_latch_unsupported_checked_once(mocker):
+    """Without timestamp latching, the latch nodes are only looked up once."""
+    pyspin = mocker.patch("parallax.camera.PySpin")
+    pyspin.IsAvailable.return_value = False
+    camera = object.__new__(PySpinCamera)
+    camera._init_acquisition_state()
+    camera.node_map = mocker.Mock()
+
+    for host_ts in (1_000, 2_000, 3_000):
+        assert camera._get_image_timestamp(mocker.Mock(), host_ts) == host_ts
+    assert camera.timestamp_latch_supported is False
+    assert camera.node_map.GetNode.call_count == 2  # TimestampLatch and its value
+
+def test_camera_info_reports_full_sensor_size(mocker):
+    """With an ROI active, the frame size used for sinks and canvases stays full size."""
+    pyspin = mocker.patch("parallax.camera.PySpin")
+    pyspin.CIntegerPtr.side_effect = lambda node: node
+    sizes = {"WidthMax": 4000, "HeightMax": 3000}
+    camera = object.__new__(PySpinCamera)
+    camera._init_acquisition_state()
+    camera.device_color_type = "Mono"
+    camera.camera = mocker.Mock()
+    camera.camera.Width.return_value = 1024
+    camera.camera.Height.return_value = 768
+    camera.node_map = mocker.Mock()
+    camera.node_map.GetNode.side_effect = lambda name: mocker.Mock(
+        GetValue=mocker.Mock(return_value=sizes.get(name, 30.0))
+    )
+    camera.roi = (8, 2, 1024, 768)
+
+    camera.camera_info()
+    assert (camera.width, camera.height) == (4000, 3000)
+    roi_frame = np.ones((768, 1024), dtype=np.uint8)
+    assert camera._to_full_frame(roi_frame, 8, 2).shape == (3000, 4000)
+
+def test_last_image_data_after_buffer_reset(mocker):
+    """Without a buffered frame, e.g. after an ROI change, None is returned."""
+    camera = object.__new__(PySpinCamera)
+    camera._init_acquisition_state()
+    camera.name = mocker.Mock(return_value="SN1")
+    camera.last_image_filled.set()
+    camera.frame_buffer.write(np.full((30, 40), 7, dtype=np.uint8), timestamp=0)
+    frame = camera.get_last_image_data()
+    assert frame.shape == (30, 40) and (frame == 7).all()
+
+    camera.frame_buffer.reset()
+    assert camera.get_last_image_data() is None
+
+def test_roi_offsets_are_aligned_while_acquiring(mocker):
+    """Offsets moved while acquiring are aligned and clamped like a new ROI."""
+    pyspin = mocker.patch("parallax.camera.PySpin")
+    pyspin.SpinnakerException = RuntimeError
+    pyspin.CIntegerPtr.side_effect = lambda node: node
+
+    def node(maximum):
+        """Return an offset node with an increment of 2 and the given max."""
+        node = mocker.Mock(value=0)
+        node.GetInc.return_value = 2
+        node.GetMin.return_value = 0
+        node.GetMax.return_value = maximum
+        node.SetValue.side_effect = lambda value: setattr(node, "value", value)
+        node.GetValue.side_effect = lambda: node.value
+        return node
+
+    nodes = {"OffsetX": node(4000 - 1024), "OffsetY": node(3000 - 768)}
+    camera = object.__new__(PySpinCamera)
+    camera._init_acquisition_state()
+    camera.name = mocker.Mock(return_value="SN1")
+    camera.node_map = mocker.Mock()
+    camera.node_map.GetNode.side_effect = nodes.get
+    camera.roi = (0, 0, 1024, 768)
+
+    camera.request_roi((101, 2999, 1024, 768))
+    camera._apply_pending_roi()
+    assert camera.roi == (100, 2232, 1024, 768)
+    nodes["OffsetX"].SetValue.assert_called_once_with(100)
+    nodes["OffsetY"].SetValue.assert_called_once_with(2232)
+
 # Run the tests
 if __name__ == "__main__":
     pytest.main()
@@ -0,0 +1,77 @@
+import pytest
+
+from parallax.camera_stats import CameraStats
+
+MS = 1_000_000
+
+
+@pytest.fixture
+def stats():
+    """Fixture for camera stats with a 1 s fps window."""
+    return CameraStats(fps_window=1.0, release_late_ms=20.0)
+
+
+def test_counts_acquired_and_fps(stats):
+    """Acquired frames are counted and the fps follows the capture times."""
+    for i in range(11):
+        stats.add_frame(i * 50 * MS)
+    result = stats.get_stats()
+    assert result["acquired"] == 11
+    assert result["fps"] == pytest.approx(20.0)
+
+
+def test_fps_window(stats):
+    """Only the capture times within the fps window count."""
+    for i in range(5):
+        stats.add_frame(i * 100 * MS)
+    for i in range(21):
+        stats.add_frame(2000 * MS + i * 10 * MS)
+    assert stats.get_fps() == pytest.approx(100.0)
+
+
+def test_dropped_from_device_frame_id_gaps(stats):
+    """Gaps in the camera frame counter are counted as dropped frames."""
+    for ts, device_id in enumerate([10, 11, 14, 15, 17]):
+        stats.add_frame(ts * MS, device_frame_id=device_id)
+    assert stats.get_stats()["dropped"] == 3
+
+
+def test_incomplete_and_released_late(stats):
+    """Incomplete images and late or failed releases are counted."""
+    stats.add_incomplete()
+    stats.add_release(5 * MS)
+    stats.add_release(30 * MS)
+    stats.add_release(1 * MS, failed=True)
+    result = stats.get_stats()
+    assert result["incomplete"] == 1
+    assert result["released_late"] == 2
+
+
+def test_latency_distribution(stats):
+    """The latency percentiles are reported in ms."""
+    assert stats.get_stats()["latency_ms_p50"] is None
+    for latency in range(1, 101):
+        stats.add_latency(latency * MS)
+    result = stats.get_stats()
+    assert result["latency_ms_p50"] == pytest.approx(50.5)
+    assert result["latency_ms_max"] == pytest.approx(100.0)
+    assert "latency p50" in stats.format()
+
+
+def test_latency_disabled():
+    """Sources without live timestamps do not record latencies."""
+    stats = CameraStats(track_latency=False)
+    stats.add_latency(5 * MS)
+    assert stats.get_stats()["latency_ms_p50"] is None
+
+
+def test_reset(stats):
+    """reset() clears all counters."""
+    stats.add_frame(0, device_frame_id=1)
+    stats.add_incomplete()
+    stats.add_latency(MS)
+    stats.reset()
+    result = stats.get_stats()
+    assert result["acquired"] == result["incomplete"] == 0
+    assert result["fps"] == 0.0
+    assert result["latency_ms_p50"] is None
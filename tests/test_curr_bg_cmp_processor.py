@@ -1,6 +1,7 @@
 import pytest
 import cv2
 import os
+import numpy as np
 from parallax.curr_bg_cmp_processor import CurrBgCmpProcessor
 from parallax.mask_generator import MaskGenerator
 from parallax.probe_detector import ProbeDetector
@@ -117,4 +118,21 @@ def test_update_cmp(setup_curr_bg_cmp_processor, sample_images):
     assert ret is not False, f"Return value of ret should not be None."
     assert precise_tip is not False, f"Precise_tip should be detected."
     assert isinstance(tip, tuple), "The tip should be a tuple."
-    assert len(tip) == 2, "The tip should contain two elements (x, y)."
\ No newline at end of file
+    assert len(tip) == 2, "The tip should contain two elements (x, y)."
+
+
+def test_update_bg_excludes_probe(setup_curr_bg_cmp_processor):
+    """Test the background model learns static features but not the probe."""
+    processor = setup_curr_bg_cmp_processor
+    curr_img = np.zeros((IMG_SIZE[1], IMG_SIZE[0]), dtype=np.uint8)
+    processor._create_bg(curr_img)
+
+    # A new static feature and the probe, both present in every frame
+    processor.curr_img = curr_img.copy()
+    cv2.rectangle(processor.curr_img, (100, 100), (120, 120), 255, -1)
+    cv2.line(processor.curr_img, (500, 300), (700, 500), 255, 5)
+    for _ in range(10):
+        processor._update_bg((500, 300), (700, 500))
+
+    assert processor.bg[110, 110] == 0  # Absorbed into the background
+    assert processor.bg[400, 600] == 255  # Probe stays in the foreground
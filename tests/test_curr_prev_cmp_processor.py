@@ -1,6 +1,7 @@
 import pytest
 import cv2
 import os
+import numpy as np
 from parallax.curr_prev_cmp_processor import CurrPrevCmpProcessor
 from parallax.mask_generator import MaskGenerator
 from parallax.probe_detector import ProbeDetector
@@ -122,4 +123,24 @@ def test_update_cmp(setup_curr_prev_cmp_processor, sample_images):
     assert ret is not False, f"Return value of ret should not be None."
     assert precise_tip is not False, f"Precise_tip should be detected."
     assert isinstance(tip, tuple), "The tip should be a tuple."
-    assert len(tip) == 2, "The tip should contain two elements (x, y)."
\ No newline at end of file
+    assert len(tip) == 2, "The tip should contain two elements (x, y)."
+
+def test_update_cmp_shares_diff_image(setup_curr_prev_cmp_processor, mocker):
+    """Probes tracked in the same frame compute the difference image once."""
+    processor = setup_curr_prev_cmp_processor
+    processor.ProbeDetector.probe_tip = (500, 375)
+    processor.ProbeDetector.probe_base = (600, 475)
+    other = CurrPrevCmpProcessor("MockCam", ProbeDetector("MockCam", IMG_SIZE), IMG_SIZE_ORIGINAL, IMG_SIZE)
+    other.ProbeDetector.probe_tip = (200, 200)
+    other.ProbeDetector.probe_base = (300, 300)
+    prev_img = np.zeros((750, 1000), dtype=np.uint8)
+    curr_img = prev_img.copy()
+    prev_img[100:110, 100:400] = 200  # Something moved away
+    mask = np.full((750, 1000), 255, dtype=np.uint8)
+
+    shared = {}
+    spy = mocker.spy(CurrPrevCmpProcessor, "_preprocess_diff_images")
+    processor.update_cmp(curr_img, prev_img, mask, None, shared=shared, max_crop_size=50)
+    other.update_cmp(curr_img, prev_img, mask, None, shared=shared, max_crop_size=50)
+    assert spy.call_count == 1
+    assert shared["curr_prev_diff"].max() == 255
@@ -0,0 +1,161 @@
+import os
+import signal
+
+import cv2
+import numpy as np
+import pytest
+from unittest.mock import Mock
+
+from parallax.detection_process import DetectionProcess, ModelSnapshot
+from parallax.probe_detect_manager import ProbeDetectManager
+
+IMAGE_FOLDER = "tests/test_data/probe_detect_manager"
+
+
+@pytest.fixture
+def model():
+    """Model without calibration."""
+    model = Mock()
+    model.get_coords_axis.return_value = None
+    model.get_coords_for_debug.return_value = None
+    model.get_camera_intrinsic.return_value = None
+    model.get_transform.return_value = None
+    model.get_stage.return_value = None
+    return model
+
+
+def test_model_snapshot():
+    """The snapshot answers the model queries of the detection."""
+    snapshot = ModelSnapshot()
+    snapshot.update({"stages": {"SN1": (1.0, 2.0, 3.0)}, "transforms": {"SN1": "T"}})
+    assert snapshot.get_stage("SN1").stage_z == 3.0
+    assert snapshot.get_stage("SN2") is None
+    assert snapshot.get_transform("SN1") == "T"
+    assert snapshot.get_camera_intrinsic("CameraA") is None
+
+
+def test_process_returns_results():
+    """Frames are processed in the process and queued calls run before the frame."""
+    detection_process = DetectionProcess("CameraA")
+    try:
+        detection_process.call("update_sn", "SN1")
+        frame = np.zeros((750, 1000), dtype=np.uint8)
+        signals, layers, samples = detection_process.process(frame, 0, 1, {})
+        assert signals == []
+        assert ProbeDetectManager.TIP_LAYER in layers
+        assert ("time", "preprocess") in [sample[:2] for sample in samples]
+        # A larger frame gets a new shared memory buffer
+        signals, layers, _ = detection_process.process(np.zeros((1500, 2000), np.uint8), 1, 2, {})
+        assert signals == []
+    finally:
+        detection_process.close()
+    assert not detection_process.child.is_alive()
+    assert detection_process.process(frame, 2, 3, {}) is None
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGSTOP"), reason="Needs SIGSTOP")
+def test_hung_process_is_restarted():
+    """A process not returning a frame within the timeout is replaced by a new one."""
+    detection_process = DetectionProcess("CameraA", timeout=0.5)
+    frame = np.zeros((750, 1000), dtype=np.uint8)
+    try:
+        detection_process.call("update_sn", "SN1")
+        assert detection_process.process(frame, 0, 1, {}) is not None
+        hung = detection_process.child
+        os.kill(hung.pid, signal.SIGSTOP)
+        assert detection_process.process(frame, 1, 2, {}) is None
+        assert detection_process.n_restarts == 1
+        assert not hung.is_alive()
+        # The calls made so far are replayed in the new process
+        assert detection_process.pending_calls == [("update_sn", ("SN1",))]
+        assert detection_process.process(frame, 2, 3, {}) is not None
+    finally:
+        detection_process.close()
+
+
+def test_crashed_process_is_restarted():
+    """A process that died is replaced by a new one and the detection goes on."""
+    detection_process = DetectionProcess("CameraA")
+    frame = np.zeros((750, 1000), dtype=np.uint8)
+    try:
+        detection_process.call("update_sn", "SN1")
+        assert detection_process.process(frame, 0, 1, {}) is not None
+        crashed = detection_process.child
+        crashed.kill()
+        crashed.join()
+        # Detected before the next frame is sent
+        assert detection_process.process(frame, 1, 2, {}) is not None
+        assert detection_process.n_restarts == 1
+        # Killed while a frame is processed, the frame is lost
+        detection_process.conn.send = Mock(side_effect=BrokenPipeError("Broken pipe"))
+        assert detection_process.process(frame, 2, 3, {}) is None
+        assert detection_process.n_restarts == 2
+        assert detection_process.pending_calls == [("update_sn", ("SN1",))]
+        assert detection_process.process(frame, 3, 4, {}) is not None
+    finally:
+        detection_process.close()
+
+
+def test_process_worker_matches_worker(model):
+    """The detection in a process gives the same tips as in this process."""
+    images = [
+        cv2.imread(os.path.join(IMAGE_FOLDER, filename), cv2.IMREAD_GRAYSCALE)
+        for filename in sorted(os.listdir(IMAGE_FOLDER))
+    ]
+
+    def run(worker_class):
+        """Return the tips drawn by a worker of the given class for each image."""
+        overlay = Mock()
+        worker = worker_class("CameraA", model, overlay)
+        worker.update_sn("SN12345")
+        tips = []
+        try:
+            for i, frame in enumerate(images):
+                overlay.set_layer.reset_mock()
+                worker.process(frame, i, i)
+                for call in overlay.set_layer.call_args_list:
+                    if call.args[0] == ProbeDetectManager.TIP_LAYER:
+                        tips.append([shape.coords for shape in call.args[1:]])
+        finally:
+            worker.close()
+        return tips
+
+    tips = run(ProbeDetectManager.Worker)
+    assert any(tips)
+    assert run(ProbeDetectManager.ProcessWorker) == tips
+
+
+def test_process_worker_tracks_two_probes(model):
+    """The process gets the model data of all probes and tracks them like this process."""
+    model.get_stage.side_effect = lambda sn: Mock(stage_x=1.0, stage_y=2.0, stage_z=float(sn[-1]))
+    images = [
+        cv2.imread(os.path.join(IMAGE_FOLDER, filename), cv2.IMREAD_GRAYSCALE)
+        for filename in sorted(os.listdir(IMAGE_FOLDER))
+    ]
+
+    def run(worker_class):
+        """Return the found and tracked events of a worker of the given class."""
+        worker = worker_class("CameraA", model, Mock())
+        events = []
+        worker.found_coords.connect(
+            lambda ts, frame_id, sn, tip: events.append(("found", frame_id, sn, tip))
+        )
+        worker.tips_tracked.connect(
+            lambda ts, frame_id, tips: events.append(("tracked", frame_id, tips))
+        )
+        try:
+            worker.update_sn("SN1")
+            for i, frame in enumerate(images):
+                if i == len(images) // 2:
+                    worker.update_sn("SN2")  # SN1 is tracked as another probe
+                worker.process(frame, i, i)
+            if worker_class is ProbeDetectManager.ProcessWorker:
+                data = worker.get_model_data()
+                assert data["stages"] == {"SN1": (1.0, 2.0, 1.0), "SN2": (1.0, 2.0, 2.0)}
+                assert set(data["transforms"]) == {"SN1", "SN2"}
+        finally:
+            worker.close()
+        return events
+
+    events = run(ProbeDetectManager.Worker)
+    assert run(ProbeDetectManager.ProcessWorker) == events
@@ -0,0 +1,95 @@
+import csv
+
+import pytest
+
+from parallax.detection_profiler import DetectionProfiler, write_csv
+
+MS = 1_000_000
+
+
+@pytest.fixture
+def profiler():
+    """Fixture for a profiler with a 1 s fps window."""
+    return DetectionProfiler(window=100, fps_window=1.0)
+
+
+def test_stage_percentiles(profiler):
+    """Stage timings are summarized by count, mean and percentiles."""
+    for i in range(1, 101):
+        profiler.add_time("hough", i * MS)
+    entry = profiler.get_stats()["stages"]["hough"]
+    assert entry["count"] == 100
+    assert entry["mean_ms"] == pytest.approx(50.5)
+    assert entry["p50_ms"] == pytest.approx(50.5)
+    assert entry["p95_ms"] == pytest.approx(95.05)
+    assert entry["max_ms"] == pytest.approx(100.0)
+    assert entry["success"] is None
+
+
+def test_rolling_window(profiler):
+    """Percentiles only cover the last samples, the count and mean all of them."""
+    for _ in range(100):
+        profiler.add_time("mask", 100 * MS)
+    for _ in range(100):
+        profiler.add_time("mask", 1 * MS)
+    entry = profiler.get_stats()["stages"]["mask"]
+    assert entry["count"] == 200
+    assert entry["mean_ms"] == pytest.approx(50.5)
+    assert entry["max_ms"] == pytest.approx(1.0)
+
+
+def test_measure_and_results(profiler):
+    """Measured stages are timed and comparison results counted."""
+    with profiler.measure("update_curr_prev"):
+        pass
+    profiler.add_result("update_curr_prev", True)
+    profiler.add_result("update_curr_prev", False)
+    profiler.add_result("update_curr_bg", False)
+    stages = profiler.get_stats()["stages"]
+    assert stages["update_curr_prev"]["count"] == 1
+    assert (stages["update_curr_prev"]["success"], stages["update_curr_prev"]["failure"]) == (1, 1)
+    assert stages["update_curr_bg"]["count"] is None
+    assert stages["update_curr_bg"]["failure"] == 1
+    assert "update_curr_bg" in profiler.format()
+
+
+def test_fps(profiler):
+    """The frame rate follows the processing times within the fps window."""
+    for i in range(5):
+        profiler.add_frame(i * 500 * MS)
+    for i in range(11):
+        profiler.add_frame(5000 * MS + i * 50 * MS)
+    stats = profiler.get_stats()
+    assert stats["frames"] == 16
+    assert stats["fps"] == pytest.approx(20.0)
+
+
+def test_samples_merge(profiler):
+    """Samples recorded by one profiler are merged into another."""
+    assert profiler.take_samples() == []
+    profiler.keep_samples()
+    profiler.add_time("preprocess", 2 * MS)
+    profiler.add_result("first_curr_prev", True)
+    parent = DetectionProfiler()
+    parent.add_samples(profiler.take_samples())
+    assert profiler.take_samples() == []
+    stages = parent.get_stats()["stages"]
+    assert stages["preprocess"]["count"] == 1
+    assert stages["first_curr_prev"]["success"] == 1
+
+
+def test_write_csv(profiler, tmp_path):
+    """The profiles of several cameras are written to one CSV file."""
+    profiler.add_time("total", 10 * MS)
+    other = DetectionProfiler()
+    other.add_result("first_curr_bg", False)
+    path = tmp_path / "profile.csv"
+    write_csv(str(path), {"CameraA": profiler, "CameraB": other})
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [(row["camera"], row["stage"]) for row in rows] == [
+        ("CameraA", "total"), ("CameraB", "first_curr_bg"),
+    ]
+    assert float(rows[0]["p50_ms"]) == pytest.approx(10.0)
+    assert rows[1]["failure"] == "1"
+    assert rows[1]["p50_ms"] == ""
@@ -0,0 +1,109 @@
+import threading
+
+import numpy as np
+import pytest
+
+from parallax.frame_buffer import FrameRingBuffer
+
+
+@pytest.fixture
+def frame_buffer():
+    """Fixture for a small ring buffer."""
+    return FrameRingBuffer(n_slots=3)
+
+
+def make_frame(value, shape=(30, 40)):
+    """Create a frame filled with the given value."""
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def test_write_assigns_increasing_frame_ids(frame_buffer):
+    """Frame IDs increase monotonically across writes."""
+    ids = [frame_buffer.write(make_frame(i)) for i in range(5)]
+    assert ids == [0, 1, 2, 3, 4]
+    assert frame_buffer.last_frame_id == 4
+
+
+def test_slots_are_preallocated_once(frame_buffer):
+    """Writing frames of the same shape reuses the same slot memory."""
+    frame_buffer.write(make_frame(0))
+    slots = frame_buffer.slots
+    for i in range(1, 6):
+        frame_buffer.write(make_frame(i))
+    assert frame_buffer.slots is slots
+
+
+def test_get_frame_returns_view_until_overwritten(frame_buffer):
+    """A frame can be retrieved by ID until the ring wraps around."""
+    frame_id = frame_buffer.write(make_frame(7))
+    frame = frame_buffer.get_frame(frame_id)
+    assert frame is not None
+    assert np.all(frame == 7)
+    assert np.shares_memory(frame, frame_buffer.slots)
+
+    for i in range(3):
+        frame_buffer.write(make_frame(i))
+    assert frame_buffer.get_frame(frame_id) is None
+    assert not frame_buffer.is_valid(frame_id)
+
+
+def test_get_latest_and_latest_n(frame_buffer):
+    """The newest frame and the newest N frames are returned in order."""
+    assert frame_buffer.get_latest() == (None, None)
+    for i in range(5):
+        frame_buffer.write(make_frame(i), timestamp=i * 1_000_000)
+
+    frame_id, frame = frame_buffer.get_latest()
+    assert frame_id == 4
+    assert np.all(frame == 4)
+    assert frame_buffer.get_timestamp(frame_id) == 4_000_000
+
+    latest = frame_buffer.get_latest_n(10)
+    assert [fid for fid, _ in latest] == [2, 3, 4]
+    assert [int(f[0, 0]) for _, f in latest] == [2, 3, 4]
+
+
+def test_get_frames_since(frame_buffer):
+    """A consumer can catch up on frames it has missed."""
+    for i in range(4):
+        frame_buffer.write(make_frame(i))
+    assert [fid for fid, _ in frame_buffer.get_frames_since(1)] == [2, 3]
+    assert frame_buffer.get_frames_since(3) == []
+    assert [fid for fid, _ in frame_buffer.get_frames_since(None)] == [1, 2, 3]
+
+
+def test_reallocates_on_shape_change(frame_buffer):
+    """A new frame shape reallocates the slots and drops stale frames."""
+    old_id = frame_buffer.write(make_frame(1))
+    new_id = frame_buffer.write(make_frame(2, shape=(10, 10)))
+    assert frame_buffer.slots.shape == (3, 10, 10)
+    assert frame_buffer.get_frame(old_id) is None
+    assert frame_buffer.get_frame(new_id).shape == (10, 10)
+
+
+def test_wait_for_frame(frame_buffer):
+    """wait_for_frame wakes up when a new frame is written."""
+    assert frame_buffer.wait_for_frame(timeout=0.01) is False
+    writer = threading.Timer(0.05, frame_buffer.write, args=(make_frame(1),))
+    writer.start()
+    assert frame_buffer.wait_for_frame(timeout=2) is True
+    writer.join()
+
+
+def test_get_timestamps(frame_buffer):
+    """IDs and timestamps of the buffered frames are listed from oldest to newest."""
+    assert frame_buffer.get_timestamps() == []
+    for i in range(6):
+        frame_buffer.write(make_frame(i), timestamp=i * 10)
+    assert frame_buffer.get_timestamps() == [(3, 30), (4, 40), (5, 50)]
+
+
+def test_copy_frame():
+    """copy_frame returns a copy that survives overwriting the slot."""
+    buffer = FrameRingBuffer(n_slots=2)
+    frame_id = buffer.write(np.full((3, 4), 5, dtype=np.uint8), timestamp=10)
+    copy = buffer.copy_frame(frame_id)
+    buffer.write(np.zeros((3, 4), dtype=np.uint8))
+    buffer.write(np.zeros((3, 4), dtype=np.uint8))
+    assert buffer.copy_frame(frame_id) is None
+    assert np.all(copy == 5)
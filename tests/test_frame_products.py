@@ -0,0 +1,91 @@
+import cv2
+import numpy as np
+import pytest
+
+from parallax.frame_buffer import FrameRingBuffer
+from parallax.frame_products import FrameProducts, FrameProductsCache
+
+
+@pytest.fixture
+def bayer_frame():
+    """Fixture for a random BayerRG8 frame."""
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, (300, 400), dtype=np.uint8)
+
+
+def test_bgr_is_debayered_once(bayer_frame):
+    """The BGR image is debayered on first use and then cached."""
+    products = FrameProducts(0, bayer_frame, pixelformat="BayerRG8")
+    bgr = products.bgr()
+    assert bgr.shape == (300, 400, 3)
+    assert np.array_equal(bgr, cv2.cvtColor(bayer_frame, cv2.COLOR_BayerRG2BGR))
+    assert products.bgr() is bgr
+
+
+def test_gray_from_bayer_skips_bgr(bayer_frame):
+    """Bayer frames are converted to gray directly."""
+    products = FrameProducts(0, bayer_frame, pixelformat="BayerRG8")
+    gray = products.gray()
+    assert np.array_equal(gray, cv2.cvtColor(bayer_frame, cv2.COLOR_BayerRG2GRAY))
+    assert "bgr" not in products._products
+
+
+def test_mono_and_bgr_frames(bayer_frame):
+    """Mono frames are used as is, BGR frames are converted to gray."""
+    mono = FrameProducts(0, bayer_frame, pixelformat="Mono")
+    assert mono.bgr() is bayer_frame
+    assert mono.gray() is bayer_frame
+
+    bgr_frame = cv2.cvtColor(bayer_frame, cv2.COLOR_GRAY2BGR)
+    color = FrameProducts(0, bgr_frame)
+    assert np.array_equal(color.gray(), bayer_frame)
+
+
+def test_resized_and_blurred_levels_are_cached(bayer_frame):
+    """Pyramid levels and blurred images are computed once per key."""
+    products = FrameProducts(0, bayer_frame, pixelformat="Mono")
+    small = products.resized((100, 75))
+    assert small.shape == (75, 100)
+    assert np.array_equal(small, cv2.resize(bayer_frame, (100, 75)))
+    assert products.resized([100, 75]) is small
+
+    blurred = products.blurred((11, 11))
+    assert np.array_equal(blurred, cv2.GaussianBlur(bayer_frame, (11, 11), 0))
+    assert products.blurred((11, 11)) is blurred
+    assert products.blurred((9, 9)) is not blurred
+
+
+def test_cache_shares_products_per_frame(bayer_frame):
+    """The cache returns the same products object for the same frame ID."""
+    frame_buffer = FrameRingBuffer(n_slots=3)
+    cache = FrameProductsCache(frame_buffer, pixelformat="BayerRG8", max_entries=2)
+    assert cache.get() is None
+
+    first_id = frame_buffer.write(bayer_frame, timestamp=1_000_000_000)
+    products = cache.get()
+    assert products.frame_id == first_id
+    assert products.timestamp == 1_000_000_000
+    assert cache.get(first_id) is products
+
+    second_id = frame_buffer.write(bayer_frame, timestamp=2_000_000_000)
+    assert cache.get().frame_id == second_id
+    assert cache.get(first_id) is products
+
+    # Frames that were overwritten in the ring buffer have no products
+    for _ in range(3):
+        frame_buffer.write(bayer_frame)
+    assert cache.get(first_id) is None
+
+
+def test_cached_products_do_not_share_the_slot():
+    """Products computed after the slot was reused still show their own frame."""
+    frame_buffer = FrameRingBuffer(n_slots=4)
+    cache = FrameProductsCache(frame_buffer, pixelformat="Mono", max_entries=2)
+    frame_id = frame_buffer.write(np.zeros((4, 6), dtype=np.uint8), timestamp=100)
+    products = cache.get(frame_id)
+    for value in range(1, 5):
+        frame_buffer.write(np.full((4, 6), value, dtype=np.uint8))
+
+    assert products.timestamp == 100
+    assert not products.bgr().any() and not products.gray().any()
+    assert not np.shares_memory(products.bgr(), frame_buffer.slots)
@@ -0,0 +1,152 @@
+import threading
+import time
+
+import pytest
+
+from parallax.frame_scheduler import FrameScheduler
+
+
+@pytest.fixture
+def scheduler():
+    """Fixture for a scheduler with one worker thread."""
+    scheduler = FrameScheduler(max_workers=1)
+    yield scheduler
+    scheduler.shutdown()
+
+
+def blocking_job(scheduler, calls):
+    """Add a job that blocks the worker thread until the returned event is set."""
+    release = threading.Event()
+
+    def handler(frame):
+        """Record the frame and block until released."""
+        calls.append(("blocker", frame))
+        release.wait(5)
+
+    job = scheduler.add_job(handler, FrameScheduler.PRIORITY_TRACKING, "blocker")
+    return job, release
+
+
+def test_latest_frame_wins(scheduler):
+    """Frames submitted while a job is busy are replaced by the latest one."""
+    calls = []
+    job, release = blocking_job(scheduler, calls)
+    job.submit(0)
+    time.sleep(0.05)
+    for frame in range(1, 5):
+        job.submit(frame)
+    release.set()
+    assert scheduler.wait_idle(5)
+    assert calls == [("blocker", 0), ("blocker", 4)]
+
+
+def test_priority_order(scheduler):
+    """Waiting jobs run by priority, then in submission order."""
+    calls = []
+    blocker, release = blocking_job(scheduler, calls)
+    blocker.submit(0)
+    time.sleep(0.05)
+
+    jobs = {
+        name: scheduler.add_job(
+            lambda frame, name=name: calls.append((name, frame)), priority, name
+        )
+        for name, priority in [
+            ("display", FrameScheduler.PRIORITY_DISPLAY),
+            ("reticle", FrameScheduler.PRIORITY_DETECTION),
+            ("probe", FrameScheduler.PRIORITY_DETECTION),
+        ]
+    }
+    jobs["display"].submit(1)
+    jobs["reticle"].submit(2)
+    jobs["probe"].set_priority(FrameScheduler.PRIORITY_TRACKING)
+    jobs["probe"].submit(3)
+    release.set()
+    assert scheduler.wait_idle(5)
+    assert [name for name, _ in calls] == ["blocker", "probe", "reticle", "display"]
+
+
+def test_job_does_not_run_concurrently_with_itself():
+    """A job runs on one thread at a time even with several workers."""
+    scheduler = FrameScheduler(max_workers=4)
+    active, overlaps = [0], []
+    lock = threading.Lock()
+
+    def handler(frame):
+        """Count the handlers running at the same time."""
+        with lock:
+            active[0] += 1
+            overlaps.append(active[0])
+        time.sleep(0.01)
+        with lock:
+            active[0] -= 1
+
+    job = scheduler.add_job(handler)
+    for frame in range(20):
+        job.submit(frame)
+        time.sleep(0.002)
+    assert scheduler.wait_idle(5)
+    scheduler.shutdown()
+    assert max(overlaps) == 1
+
+
+def test_removed_job_drops_frames(scheduler):
+    """A removed job does not run and rejects new frames."""
+    calls = []
+    blocker, release = blocking_job(scheduler, calls)
+    blocker.submit(0)
+    time.sleep(0.05)
+    job = scheduler.add_job(calls.append)
+    job.submit(1)
+    job.remove()
+    assert job.submit(2) is False
+    release.set()
+    assert scheduler.wait_idle(5)
+    assert calls == [("blocker", 0)]
+
+
+def test_waiting_remove_does_not_delay_other_jobs():
+    """A thread waiting in remove_job() does not take the wakeup of a queued job."""
+    scheduler = FrameScheduler(max_workers=2)
+    calls = []
+    blocker, release = blocking_job(scheduler, calls)
+    blocker.submit(0)
+    time.sleep(0.05)
+    remover = threading.Thread(target=blocker.remove, kwargs={"wait": True})
+    remover.start()
+    time.sleep(0.05)
+    done = threading.Event()
+    job = scheduler.add_job(lambda frame: done.set())
+    job.submit(1)
+    assert done.wait(1)  # Ran while the blocker is still running
+    assert remover.is_alive()
+    release.set()
+    remover.join(5)
+    assert not remover.is_alive()
+    scheduler.shutdown()
+
+
+def test_failing_job_keeps_worker_alive(scheduler):
+    """An exception in a job is logged and the worker keeps running."""
+    calls = []
+    failing = scheduler.add_job(lambda frame: 1 / 0)
+    job = scheduler.add_job(calls.append)
+    failing.submit(0)
+    job.submit(1)
+    assert scheduler.wait_idle(5)
+    assert calls == [1]
+
+
+def test_frame_id_processed_once(scheduler):
+    """A frame submitted again with the same frame ID is skipped."""
+    calls = []
+    job = scheduler.add_job(calls.append)
+    assert job.submit("a", frame_id=1)
+    assert scheduler.wait_idle(5)
+    assert not job.submit("a", frame_id=1)
+    assert job.submit("b", frame_id=2)
+    # Frames without an ID are always processed
+    assert scheduler.wait_idle(5)
+    assert job.submit("c") and job.submit("c")
+    assert scheduler.wait_idle(5)
+    assert calls[:2] == ["a", "b"] and set(calls[2:]) == {"c"}
@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+from parallax.frame_buffer import FrameRingBuffer
+from parallax.frame_set import FrameSetGrouper
+
+MS = 1_000_000
+
+
+class FakeCamera:
+    """Camera writing frames with given timestamps into a ring buffer."""
+
+    def __init__(self, sn, software_trigger=False):
+        """Create a camera with a ring buffer of 4 slots."""
+        self.sn = sn
+        self.frame_buffer = FrameRingBuffer(n_slots=4)
+        self.software_trigger_enabled = software_trigger
+        self.triggered = 0
+
+    def name(self, sn_only=False):
+        """Return the serial number."""
+        return self.sn
+
+    def capture(self, timestamp):
+        """Write a blank frame with the given timestamp."""
+        return self.frame_buffer.write(np.zeros((3, 4), dtype=np.uint8), timestamp=timestamp)
+
+    def execute_software_trigger(self):
+        """Capture a frame right away."""
+        self.triggered += 1
+        self.capture(1000 * MS + self.triggered)
+
+
+@pytest.fixture
+def cameras():
+    """Fixture for two fake cameras."""
+    return FakeCamera("A"), FakeCamera("B")
+
+
+def test_matches_closest_frames(cameras):
+    """Each camera contributes its frame closest to the common reference time."""
+    cam_a, cam_b = cameras
+    grouper = FrameSetGrouper(cameras, tolerance_ms=10)
+    assert grouper.get_frame_set() is None
+
+    for ts in (0, 100, 200):
+        cam_a.capture(ts * MS)
+    for ts in (5, 105):
+        cam_b.capture(ts * MS)
+
+    frame_set = grouper.get_frame_set()
+    assert frame_set.get_frame_id("A") == 1
+    assert frame_set.get_frame_id("B") == 1
+    assert frame_set.timestamp == 100 * MS
+    assert frame_set.spread_ns == 5 * MS
+    assert sorted(frame_set.cameras) == ["A", "B"]
+
+    # The same frames are not grouped twice
+    assert grouper.get_frame_set() is None
+    cam_b.capture(203 * MS)
+    frame_set = grouper.get_frame_set()
+    assert (frame_set.get_frame_id("A"), frame_set.get_frame_id("B")) == (2, 2)
+    assert grouper.get_stats() == {"sets": 2, "rejected": 0}
+
+
+def test_rejects_misaligned_frames(cameras):
+    """Frames further apart than the tolerance are not grouped."""
+    cam_a, cam_b = cameras
+    grouper = FrameSetGrouper(cameras, tolerance_ms=10)
+    cam_a.capture(0)
+    cam_b.capture(50 * MS)
+    assert grouper.get_frame_set() is None
+    assert grouper.get_frame_set() is None
+    assert grouper.get_stats() == {"sets": 0, "rejected": 1}
+
+
+def test_trigger_mode():
+    """In trigger mode all cameras are triggered before grouping."""
+    cameras = FakeCamera("A", software_trigger=True), FakeCamera("B", software_trigger=True)
+    grouper = FrameSetGrouper(cameras, tolerance_ms=10, mode="trigger", trigger_timeout=0.1)
+    frame_set = grouper.get_frame_set()
+    assert frame_set is not None
+    assert all(camera.triggered == 1 for camera in cameras)
+
+
+def test_cameras_without_frame_buffer_are_ignored():
+    """Mock cameras without a frame buffer are not grouped."""
+    class NoBufferCamera:
+        """Camera without a frame buffer."""
+
+        def name(self, sn_only=False):
+            """Return the name of a mock camera."""
+            return "Mock"
+
+    grouper = FrameSetGrouper([NoBufferCamera()])
+    assert grouper.cameras == {}
+    assert grouper.get_frame_set() is None
+    with pytest.raises(ValueError):
+        FrameSetGrouper([], mode="hardware")
+
+
+def test_select_ignores_tolerance_and_history(cameras):
+    """select() returns the closest frames even if misaligned or grouped before."""
+    cam_a, cam_b = cameras
+    grouper = FrameSetGrouper(cameras, tolerance_ms=1)
+    cam_a.capture(100 * MS)
+    cam_b.capture(150 * MS)
+    assert grouper.match() is None
+    frame_set = grouper.select()
+    assert frame_set.get_timestamp("A") == 100 * MS
+    assert frame_set.get_timestamp("B") == 150 * MS
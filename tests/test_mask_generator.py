@@ -1,7 +1,8 @@
 import pytest
 import cv2
 import os
-from parallax.mask_generator import MaskGenerator
+import numpy as np
+from parallax.mask_generator import MaskCache, MaskGenerator
 
 RETICLE_DIR = "tests/test_data/mask_generator/Reticle/"
 
@@ -47,3 +48,25 @@ def test_mask_generator_no_image():
 
     # Assert that the result is None
     assert result is None, "The result should be None when processing a None image."
+
+
+def test_mask_cache_reuses_mask(mocker):
+    """MaskCache generates the mask again only when the scene changes or after invalidate()."""
+    mask_gen = MaskGenerator()
+    mask_gen.process = mocker.Mock(side_effect=lambda img, products=None: img.copy())
+    cache = MaskCache(mask_gen)
+
+    image = np.full((750, 1000), 100, dtype=np.uint8)
+    first = cache.process(image)
+    noisy = image.copy()
+    noisy[300:310, 400:600] = 255  # A thin probe entering the image
+    assert cache.process(noisy) is first
+    assert mask_gen.process.call_count == 1
+
+    cache.process(np.full((750, 1000), 160, dtype=np.uint8))  # Brightness changed
+    assert mask_gen.process.call_count == 2
+
+    cache.invalidate()  # e.g. exposure changed
+    cache.process(np.full((750, 1000), 160, dtype=np.uint8))
+    assert mask_gen.process.call_count == 3
+    assert (cache.hits, cache.misses) == (1, 3)
@@ -0,0 +1,77 @@
+import numpy as np
+import pyqtgraph as pg
+import pytest
+from PyQt5.QtWidgets import QApplication
+
+from parallax import overlay as ov
+from parallax.overlay import OverlayModel, OverlayView
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    """Fixture for the QApplication needed by the graphics items."""
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def model():
+    """Fixture for an overlay model recording the changed layers."""
+    model = OverlayModel()
+    model.changes = []
+    model.changed.connect(model.changes.append)
+    return model
+
+
+def test_points_colors():
+    """Points take one common color or one color per point."""
+    coords = np.array([[1, 2], [3, 4]])
+    assert ov.points(coords, 5, (255, 0, 0)).colors == ((255, 0, 0), (255, 0, 0))
+    colors = np.array([[0, 0, 255], [0, 255, 0]], dtype=np.uint8)
+    shape = ov.points(coords, 5, colors)
+    assert shape.coords == ((1.0, 2.0), (3.0, 4.0))
+    assert shape.colors == ((0, 0, 255), (0, 255, 0))
+
+
+def test_set_layer_emits_only_on_change(model):
+    """Setting the same shapes again does not signal a change."""
+    shape = ov.points([(10, 10)], 4, (255, 255, 0))
+    model.set_layer("reticle", shape)
+    model.set_layer("reticle", ov.points([(10, 10)], 4, (255, 255, 0)))
+    assert model.changes == ["reticle"]
+    assert model.get_layer("reticle") == (shape,)
+
+    model.set_layer("reticle", ov.points([(11, 10)], 4, (255, 255, 0)))
+    assert model.changes == ["reticle", "reticle"]
+
+
+def test_clear(model):
+    """Cleared layers are empty and clearing an empty layer does nothing."""
+    model.clear("missing")
+    model.set_layer("tip", ov.points([(1, 1)], 5, (255, 0, 0)))
+    model.clear("tip")
+    assert model.get_layer("tip") == ()
+    assert model.changes == ["tip", "tip"]
+
+
+def test_view_creates_items(qapp, model):
+    """The view shows one graphics item per shape and updates with the layer."""
+    view_box = pg.ViewBox()
+    model.set_layer("axes", ov.lines([((0, 0), (10, 10))], (0, 0, 255), 3))
+    view = OverlayView(view_box, model)
+    assert len(view.items["axes"]) == 1
+
+    model.set_layer(
+        "debug",
+        ov.rects([(0, 0, 5, 5)], (0, 255, 0)),
+        ov.points([(1, 1), (2, 2)], 5, (255, 0, 0)),
+        ov.text(["first detection"], (100, 100), anchor=(1, 1)),
+    )
+    items = view.items["debug"]
+    assert [type(item) for item in items] == [
+        pg.PlotCurveItem, pg.ScatterPlotItem, pg.TextItem
+    ]
+    assert all(item in view_box.addedItems for item in items)
+
+    model.clear("debug")
+    assert view.items["debug"] == []
+    assert not any(item in view_box.addedItems for item in items)
@@ -22,13 +22,15 @@ def load_images_from_folder(folder):
 
 @pytest.fixture()
 def probe_detect_manager_instance(mocker):  # Ensure qapp fixture is included
-    """Fixture to initialize ProbeDetectManager with a mock model and worker thread."""
+    """Fixture to initialize ProbeDetectManager with a mock model and worker."""
     # Mock the model to avoid using the actual model implementation
     mock_model = mocker.Mock()
 
     # Mock the return values for get_coords_axis and get_coords_for_debug
     mock_model.get_coords_axis.return_value = [[(100, 200), (150, 250), (200, 300)]]
     mock_model.get_coords_for_debug.return_value = [[(120, 220), (170, 270), (220, 320)]]
+    mock_model.get_camera_intrinsic.return_value = None  # Not calibrated
+    mock_model.get_transform.return_value = None
 
     mock_model.get_stage.return_value = mocker.Mock(stage_x=1000, stage_y=750, stage_z=500)
 
@@ -36,7 +38,7 @@ def probe_detect_manager_instance(mocker):  # Ensure qapp fixture is included
     camera_name = "CameraA"
     probe_detect_manager = ProbeDetectManager(mock_model, camera_name)
     
-    # Call init_thread to initialize the worker and thread
+    # Call start to initialize the worker and its scheduler job
     probe_detect_manager.start()
 
     # Yield control back to the test
@@ -73,4 +75,105 @@ def test_found_coords(probe_detect_manager_instance):  # Added 'qapp' fixture
     # Assert that at least one frame detected the probe tip
     probe_detect_manager_instance.stop_detection("SN12345")
     
-    assert found, "No probe tip was detected in the frames."
\ No newline at end of file
+    assert found, "No probe tip was detected in the frames."
+
+def test_detection_rate(mocker):
+    """With a detection rate, frames between detections are only displayed."""
+    model = mocker.Mock()
+    model.get_coords_axis.return_value = None
+    model.get_coords_for_debug.return_value = None
+    manager = ProbeDetectManager(model, "CameraA")
+    manager.set_detection_rate(10)  # At most every 100 ms
+    manager.start()
+    worker = manager.worker
+    worker.start_detection()
+    worker.process = mocker.Mock(side_effect=lambda frame, ts, *args: (frame, ts))
+    missed = []
+    worker.detection_missed.connect(lambda ts, frame_id: missed.append(frame_id))
+
+    for i in range(10):
+        worker.run(None, i * 40_000_000, frame_id=i)  # 25 fps
+    # Frames at 0, 120, 240 and 360 ms
+    assert worker.process.call_count == 4
+    assert missed == [0, 3, 6, 9]  # Only frames run through the detection
+    stats = manager.get_detection_stats()
+    assert stats["frames"] == 4
+    assert stats["fps"] == pytest.approx(1e9 / 120_000_000)
+    manager.stop()
+
+def test_track_other_probes(mocker):
+    """Known probes other than the selected one are tracked in the same frame."""
+    model = mocker.Mock()
+    model.get_coords_axis.return_value = None
+    model.get_coords_for_debug.return_value = None
+    model.get_camera_intrinsic.return_value = None
+    model.get_transform.return_value = None
+    worker = ProbeDetectManager.Worker("CameraA", model, mocker.Mock())
+    worker.update_sn("SN1")
+    worker.update_sn("SN2")  # Selected probe, not detected yet
+    other = worker.probes["SN1"]
+    other["probeDetector"].angle = 45
+    other["probeDetector"].probe_tip_org = (400, 300)
+    other["currPrevCmpProcess"].update_cmp = mocker.Mock(return_value=(True, True))
+    tracked = []
+    worker.tips_tracked.connect(lambda ts, frame_id, tips: tracked.append((ts, frame_id, tips)))
+
+    frame = cv2.imread(os.path.join(IMAGE_FOLDER, sorted(os.listdir(IMAGE_FOLDER))[0]), cv2.IMREAD_GRAYSCALE)
+    worker.process(frame, 0, 0)  # Previous image
+    worker.process(frame, 1, 1)
+    assert tracked == [(1, 1, {"SN1": (400, 300)})]
+    # The other probe searches a window only
+    assert other["currPrevCmpProcess"].update_cmp.call_args.kwargs["max_crop_size"] == 200
+
+def test_other_probes_scope(mocker):
+    """Other probes are only tracked while moving, once detected, and not as found_coords."""
+    model = mocker.Mock()
+    model.get_coords_axis.return_value = None
+    model.get_coords_for_debug.return_value = None
+    model.get_camera_intrinsic.return_value = None
+    model.get_transform.return_value = None
+    worker = ProbeDetectManager.Worker("CameraA", model, mocker.Mock())
+    worker.update_sn("SN1")
+    worker.update_sn("SN3")  # Never detected
+    worker.update_sn("SN2")  # Selected probe
+    stopped = worker.probes["SN1"]
+    stopped["probeDetector"].angle = 45
+    stopped["probeDetector"].probe_tip_org = (400, 300)
+    checked = mocker.spy(stopped["currPrevCmpProcess"], "update_cmp")
+    never_detected = mocker.spy(worker.probes["SN3"]["currPrevCmpProcess"], "update_cmp")
+    tracked, found = [], []
+    worker.tips_tracked.connect(lambda ts, frame_id, tips: tracked.append(tips))
+    worker.found_coords.connect(lambda ts, frame_id, sn, tip: found.append(sn))
+
+    frame = cv2.imread(os.path.join(IMAGE_FOLDER, sorted(os.listdir(IMAGE_FOLDER))[0]), cv2.IMREAD_GRAYSCALE)
+    for i in range(3):
+        worker.process(frame, i, i)  # No motion
+    assert checked.call_count > 0
+    assert all("SN1" not in tips for tips in tracked)
+    never_detected.assert_not_called()
+    assert set(found) <= {"SN2"}
+
+
+def test_detection_profile(mocker):
+    """The stages of the detection are timed and the comparison results counted."""
+    model = mocker.Mock()
+    model.get_coords_axis.return_value = None
+    model.get_coords_for_debug.return_value = None
+    model.get_camera_intrinsic.return_value = None
+    model.get_transform.return_value = None
+    manager = ProbeDetectManager(model, "CameraA")
+    manager.start()
+    worker = manager.worker
+    worker.start_detection()
+    worker.update_sn("SN12345")
+    for i, frame in enumerate(load_images_from_folder(IMAGE_FOLDER)):
+        worker.run(frame, i, frame_id=i)
+
+    stats = manager.get_profiler().get_stats()
+    stages = stats["stages"]
+    assert stats["frames"] == stages["total"]["count"]
+    for stage in ("preprocess", "mask", "first_curr_prev", "hough"):
+        assert stages[stage]["count"] > 0
+    first = stages["first_curr_prev"]
+    assert first["success"] + first["failure"] == first["count"]
+    manager.stop()
@@ -1,6 +1,10 @@
 import pytest
 import cv2
 import os
+import time
+from collections import Counter
+
+import numpy as np
 from parallax.probe_detector import ProbeDetector
 from parallax.mask_generator import MaskGenerator
 
@@ -115,3 +119,108 @@ def test_update_probe(probe_detector, test_images, sample_images):
 
     # Check if the update was successful
     assert ret, "Updated Detection failed"
+
+def reference_analysis(detector, line_segments, img_height, neighboring_gradients=None):
+    """Segment analysis as implemented before vectorization, one segment at a time.
+
+    Returns:
+        tuple: (found, gradients, highest_point, lowest_point)
+    """
+    found = False
+    gradients = []
+    max_y, min_y = 0, img_height
+    lowest_point, highest_point = (0, 0), (0, 0)
+    for line in line_segments:
+        x2, y2, x1, y1 = line[0]
+        gradient = np.arctan2(y2 - y1, x2 - x1)
+        gradient = np.degrees(gradient)
+        gradient += 180
+        gradient %= 180
+        index = np.argmin(np.abs(detector.angle_step_bins - gradient))
+        representing_gradient = detector.angle_step_bins[index]
+        if neighboring_gradients is not None \
+                and representing_gradient not in neighboring_gradients:
+            continue
+        gradients.append(representing_gradient)
+        found = True
+        if y1 > max_y:
+            max_y = y1
+            lowest_point = (x1, y1)
+        if y2 > max_y:
+            max_y = y2
+            lowest_point = (x2, y2)
+        if y1 < min_y:
+            min_y = y1
+            highest_point = (x1, y1)
+        if y2 <= min_y:
+            min_y = y2
+            highest_point = (x2, y2)
+    return found, gradients, highest_point, lowest_point
+
+def random_segments(rng, n, size=120):
+    """Random Hough segments in a small image, so that end points share heights."""
+    return rng.integers(0, size, size=(n, 1, 4)).astype(np.int32)
+
+def test_vectorized_first_detection_matches_loop(probe_detector, mocker):
+    """The vectorized first detection finds the same points and angle as the loop."""
+    rng = np.random.default_rng(0)
+    img = np.zeros((120, 120), dtype=np.uint8)
+    for _ in range(300):
+        segments = random_segments(rng, rng.integers(1, 30))
+        mocker.patch("parallax.probe_detector.cv2.HoughLinesP", return_value=segments)
+        _, gradients, highest, lowest = reference_analysis(probe_detector, segments, 120)
+
+        probe_detector.angle = None
+        ret, highest_point, lowest_point = probe_detector._hough_line_first_detection(img)
+        assert (highest_point, lowest_point) == (highest, lowest)
+        assert list(probe_detector.gradients) == gradients
+        if ret:
+            assert probe_detector.angle == np.median(gradients)
+
+def test_vectorized_update_matches_loop(probe_detector, mocker):
+    """The vectorized update keeps the same segments and selects the same angle."""
+    rng = np.random.default_rng(1)
+    img = np.zeros((120, 120), dtype=np.uint8)
+    for _ in range(300):
+        segments = random_segments(rng, rng.integers(1, 30))
+        mocker.patch("parallax.probe_detector.cv2.HoughLinesP", return_value=segments)
+        angle = rng.choice(probe_detector.angle_step_bins)
+        index = np.where(probe_detector.angle_step_bins == angle)[0][0]
+        neighbors = probe_detector.angle_step_bins_with_neighbor[index:index + 3]
+        found, gradients, highest, lowest = reference_analysis(
+            probe_detector, segments, 120, neighbors
+        )
+
+        probe_detector.angle = angle
+        ret, highest_point, lowest_point = probe_detector._hough_line_update(img)
+        assert (highest_point, lowest_point) == (highest, lowest)
+        assert list(probe_detector.gradients) == gradients
+        if ret:
+            # Most common gradient, the first found of equally common ones
+            assert probe_detector.angle == Counter(gradients).most_common(1)[0][0]
+        else:
+            assert probe_detector.angle == angle
+
+# Timings depend on the machine, run with PARALLAX_BENCHMARK=1 and -s to see them
+@pytest.mark.skipif(
+    not os.environ.get("PARALLAX_BENCHMARK"), reason="Benchmark, set PARALLAX_BENCHMARK=1 to run."
+)
+def test_vectorized_analysis_benchmark(probe_detector):
+    """Microbenchmark of the segment analysis of a noisy crop, 29 segments."""
+    rng = np.random.default_rng(2)
+    segments = random_segments(rng, 29, size=750)
+    repeat = 200
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        reference_analysis(probe_detector, segments, 750)
+    loop_us = (time.perf_counter() - start) / repeat * 1e6
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        gradients = probe_detector._segment_gradients(segments[:, 0, :])
+        probe_detector._get_extremal_points(segments[:, 0, :], 750)
+        probe_detector._most_common_gradient(gradients)
+    vectorized_us = (time.perf_counter() - start) / repeat * 1e6
+
+    print(f"Segment analysis: loop {loop_us:.1f} us, vectorized {vectorized_us:.1f} us")
@@ -0,0 +1,84 @@
+import os
+
+import numpy as np
+import pytest
+
+from parallax.async_frame_writer import AsyncFrameWriter
+from parallax.raw_recording import INDEX_DTYPE, RawRecordingReader, RawRecordingSink
+
+
+def make_frame(value, shape=(30, 40)):
+    """Create a raw frame filled with the given value."""
+    return np.full(shape, value, dtype=np.uint8)
+
+
+@pytest.fixture
+def recording_path(tmp_path):
+    """Fixture for the recording directory."""
+    return str(tmp_path / "Microscope_.raw")
+
+
+def test_write_and_read_back_bit_exact(recording_path):
+    """Frames are read back bit-exact with their IDs and timestamps."""
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (30, 40), dtype=np.uint8) for _ in range(7)]
+    sink = RawRecordingSink(
+        recording_path, pixelformat="BayerRG8", frames_per_chunk=3,
+        metadata={"camera": "123"},
+    )
+    for i, frame in enumerate(frames):
+        sink.write(frame, frame_id=10 + i, timestamp=100_000_000_000 + i)
+    sink.release()
+
+    reader = RawRecordingReader(recording_path)
+    assert len(reader) == 7
+    assert reader.pixelformat == "BayerRG8"
+    assert reader.metadata == {"camera": "123"}
+    assert list(reader.frame_ids) == list(range(10, 17))
+    assert list(reader.timestamps) == [100_000_000_000 + i for i in range(7)]
+    for i, (frame_id, timestamp, frame) in enumerate(reader):
+        assert frame_id == 10 + i
+        assert np.array_equal(frame, frames[i])
+    assert np.array_equal(reader.get_frame_by_id(15), frames[5])
+    assert reader.get_frame_by_id(99) is None
+    reader.close()
+
+
+def test_chunks_are_preallocated_and_trimmed(recording_path):
+    """Chunk files are preallocated and the last one is trimmed on release."""
+    sink = RawRecordingSink(recording_path, frames_per_chunk=4)
+    frame_bytes = make_frame(0).nbytes
+    for i in range(5):
+        sink.write(make_frame(i), frame_id=i)
+    # Second chunk is preallocated while recording
+    assert os.path.getsize(os.path.join(recording_path, "chunk_00001.bin")) == 4 * frame_bytes
+    sink.release()
+
+    assert os.path.getsize(os.path.join(recording_path, "chunk_00000.bin")) == 4 * frame_bytes
+    assert os.path.getsize(os.path.join(recording_path, "chunk_00001.bin")) == frame_bytes
+    index = np.fromfile(os.path.join(recording_path, "index.bin"), dtype=INDEX_DTYPE)
+    assert list(index["chunk"]) == [0, 0, 0, 0, 1]
+    assert list(index["offset"]) == [0, frame_bytes, 2 * frame_bytes, 3 * frame_bytes, 0]
+
+
+def test_shape_mismatch_is_rejected(recording_path):
+    """All frames of a recording must have the same shape."""
+    sink = RawRecordingSink(recording_path)
+    sink.write(make_frame(0))
+    with pytest.raises(ValueError):
+        sink.write(make_frame(0, shape=(10, 10)))
+    sink.release()
+
+
+def test_raw_sink_with_async_writer(recording_path):
+    """The raw sink records through the asynchronous writer."""
+    writer = AsyncFrameWriter(RawRecordingSink(recording_path), policy="block")
+    writer.start()
+    for i in range(20):
+        writer.submit(make_frame(i), frame_id=i, timestamp=i)
+    stats = writer.stop()
+    assert stats["written"] == 20
+
+    reader = RawRecordingReader(recording_path)
+    assert len(reader) == 20
+    assert [int(reader.get_frame(i)[0, 0]) for i in range(20)] == list(range(20))
@@ -2,7 +2,9 @@
 
 import pytest
 import os
+import numpy as np
 from unittest.mock import Mock, MagicMock
+from parallax.frame_buffer import FrameRingBuffer
 from parallax.recording_manager import RecordingManager
 
 @pytest.fixture
@@ -21,6 +23,13 @@ def mock_screen_widget():
     screen.stop_recording = Mock()
     screen.parent = Mock()
     screen.parent().title = Mock(return_value="MockCamera")
+    screen.camera = Mock()
+    screen.camera.name = Mock(return_value="MockCamera123")
+    screen.camera.pixelformat = "BayerRG8"
+    screen.camera.frame_buffer = FrameRingBuffer(n_slots=2)
+    screen.camera.frame_buffer.write(
+        np.zeros((30, 40), dtype=np.uint8), timestamp=1_700_000_000_000_000_000
+    )
     return screen
 
 @pytest.fixture
@@ -33,13 +42,14 @@ def test_save_last_image(recording_manager, mock_screen_widget, tmpdir):
     save_path = str(tmpdir)
     screen_widgets = [mock_screen_widget]
 
-    # Call the method to save the last image.
-    recording_manager.save_last_image(save_path, screen_widgets)
+    # Call the method to save the last image and wait for the background writer.
+    futures = recording_manager.save_last_image(save_path, screen_widgets)
+    paths = [future.result() for future in futures]
 
-    # Assert that the save_image method was called.
-    mock_screen_widget.save_image.assert_called_once_with(
-        save_path, isTimestamp=True, name="MockCamera"
-    )
+    # Assert that the snapshot was written with the custom name.
+    assert len(paths) == 1
+    assert os.path.basename(paths[0]).startswith("MockCamera_")
+    assert paths[0].endswith(".png") and os.path.exists(paths[0])
     # Assert that the camera name was added to the snapshot_camera_list.
     assert "MockCamera123" in recording_manager.snapshot_camera_list, (
         f"{mock_screen_widget.get_camera_name()} was not tracked as a snapshot camera."
@@ -53,8 +63,8 @@ def test_save_last_image_directory_not_exists(recording_manager, mock_screen_wid
     # Call the method to save the last image.
     recording_manager.save_last_image(save_path, screen_widgets)
 
-    # Assert that save_image was not called since the directory does not exist.
-    mock_screen_widget.save_image.assert_not_called()
+    # Assert that no snapshot was taken since the directory does not exist.
+    assert recording_manager.snapshot_camera_list == []
 
 def test_save_recording(recording_manager, mock_screen_widget, tmpdir):
     """Test starting a recording for a camera."""
@@ -66,7 +76,7 @@ def test_save_recording(recording_manager, mock_screen_widget, tmpdir):
 
     # Assert that the save_recording method was called.
     mock_screen_widget.save_recording.assert_called_once_with(
-        save_path, isTimestamp=True, name="MockCamera"
+        save_path, isTimestamp=True, name="MockCamera", recording_format="video"
     )
     # Assert that the camera name is in the list of currently recording cameras.
     assert mock_screen_widget.get_camera_name() in recording_manager.recording_camera_list
@@ -110,3 +120,45 @@ def test_stop_recording_not_recording_camera(recording_manager, mock_screen_widg
 
     # Assert that the stop_recording method was not called since the camera was not recording.
     mock_screen_widget.stop_recording.assert_not_called()
+
+def test_stop_recording_reports_dropped_frames(recording_manager, mock_screen_widget, caplog):
+    """Test that dropped frames reported by the camera writer are logged."""
+    screen_widgets = [mock_screen_widget]
+    mock_screen_widget.stop_recording = Mock(
+        return_value={"queued": 10, "written": 8, "dropped": 2, "errors": 0, "pending": 0}
+    )
+    recording_manager.recording_camera_list.append(mock_screen_widget.get_camera_name())
+
+    recording_manager.stop_recording(screen_widgets)
+
+    mock_screen_widget.stop_recording.assert_called_once()
+    assert "2 frames dropped" in caplog.text
+
+def test_save_recording_raw_format(mock_model, mock_screen_widget, tmpdir):
+    """Test starting a raw recording."""
+    recording_manager = RecordingManager(mock_model, recording_format="raw")
+    recording_manager.save_recording(str(tmpdir), [mock_screen_widget])
+
+    mock_screen_widget.save_recording.assert_called_once_with(
+        str(tmpdir), isTimestamp=True, name="MockCamera", recording_format="raw"
+    )
+
+def test_set_recording_format_invalid(recording_manager):
+    """Test that an unknown recording format is rejected."""
+    with pytest.raises(ValueError):
+        recording_manager.set_recording_format("mp4")
+    assert recording_manager.recording_format == "video"
+
+
+def test_save_burst(recording_manager, mock_screen_widget, tmpdir):
+    """All cameras save a burst with the same trigger time."""
+    thread = Mock()
+    mock_screen_widget.camera.save_burst = Mock(return_value=thread)
+    threads = recording_manager.save_burst(
+        str(tmpdir), [mock_screen_widget, mock_screen_widget], pre_seconds=2, post_seconds=1
+    )
+    assert threads == [thread]
+    _, kwargs = mock_screen_widget.camera.save_burst.call_args
+    assert kwargs["pre_seconds"] == 2 and kwargs["post_seconds"] == 1
+    assert kwargs["custom_name"] == "MockCamera"
+    assert recording_manager.burst_camera_list == ["MockCamera123"]
@@ -0,0 +1,169 @@
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from parallax.model import Model
+from parallax.raw_recording import RawRecordingReader, RawRecordingSink
+from parallax.replay_camera import ReplayCamera
+
+
+N_FRAMES = 5
+INTERVAL = 0.05
+INTERVAL_NS = 50_000_000
+START_NS = 1_700_000_000_000_000_000
+
+
+@pytest.fixture
+def raw_recording(tmp_path):
+    """Fixture for a raw Bayer recording with frames 50 ms apart."""
+    path = str(tmp_path / "cam.raw")
+    sink = RawRecordingSink(
+        path, pixelformat="BayerRG8", metadata={"camera": "12345", "frame_rate": 20}
+    )
+    for i in range(N_FRAMES):
+        sink.write(np.full((30, 40), i * 10, dtype=np.uint8), frame_id=i,
+                   timestamp=START_NS + i * INTERVAL_NS)
+    sink.release()
+    return path
+
+
+def wait_until_finished(camera, timeout=5):
+    """Wait until the replay reaches the end of the recording."""
+    assert camera.finished.wait(timeout)
+    camera.capture_thread.join(timeout)
+
+
+def test_fast_mode_replays_all_frames_with_original_timestamps(raw_recording):
+    """All frames are replayed bit-exact with their recorded timestamps."""
+    camera = ReplayCamera(raw_recording, mode="fast")
+    assert camera.name(sn_only=True) == "12345"
+    assert camera.get_device_color_type() == "Color"
+    camera.begin_continuous_acquisition()
+    wait_until_finished(camera)
+
+    assert camera.frames_replayed == N_FRAMES
+    assert not camera.running
+    assert int(camera.get_last_image()[0, 0]) == (N_FRAMES - 1) * 10
+    assert camera.get_last_capture_timestamp() == START_NS + (N_FRAMES - 1) * INTERVAL_NS
+    assert camera.get_last_capture_time(millisecond=True).endswith(".200")
+    # The last frame stays available at the end of the recording
+    assert camera.get_last_image_data().shape == (30, 40, 3)
+    camera.stop(clean=True)
+
+
+def test_realtime_mode_keeps_original_pacing(raw_recording):
+    """Realtime replay takes as long as the recording."""
+    camera = ReplayCamera(raw_recording, mode="realtime")
+    start = time.time()
+    camera.begin_continuous_acquisition()
+    wait_until_finished(camera)
+    elapsed = time.time() - start
+    assert elapsed >= (N_FRAMES - 1) * INTERVAL * 0.9
+    camera.stop(clean=True)
+
+
+def test_step_mode(raw_recording):
+    """In step mode a frame is released per step() call."""
+    camera = ReplayCamera(raw_recording, mode="step")
+    camera.begin_continuous_acquisition()
+    time.sleep(0.1)
+    assert camera.get_last_frame_id() is None
+
+    camera.step()
+    assert camera.frame_buffer.wait_for_frame(timeout=2)
+    assert int(camera.get_last_image()[0, 0]) == 0
+    camera.step(2)
+    assert camera.frame_buffer.wait_for_frame(after_frame_id=1, timeout=2)
+    assert int(camera.get_last_image()[0, 0]) == 20
+    camera.stop(clean=True)
+    assert not camera.running
+
+
+def test_loop_restarts_recording(raw_recording):
+    """With loop enabled, the replay restarts at the end of the recording."""
+    camera = ReplayCamera(raw_recording, mode="fast", loop=True)
+    camera.begin_continuous_acquisition()
+    while camera.frames_replayed < 2 * N_FRAMES:
+        time.sleep(0.01)
+    camera.stop(clean=True)
+    assert not camera.finished.is_set()
+
+
+def test_video_file_replay(tmp_path):
+    """Video files are replayed with reconstructed timestamps."""
+    path = str(tmp_path / "video.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (40, 30), True)
+    for i in range(3):
+        writer.write(np.full((30, 40, 3), i * 50, dtype=np.uint8))
+    writer.release()
+
+    camera = ReplayCamera(path, mode="fast")
+    assert camera.name(sn_only=True) == "video.avi"
+    camera.begin_continuous_acquisition()
+    wait_until_finished(camera)
+    assert camera.frames_replayed == 3
+    frame = camera.get_last_image_data()
+    assert frame.shape == (30, 40, 3)
+    # BGR frames are copied out of the ring buffer
+    assert not np.shares_memory(frame, camera.frame_buffer.slots)
+    camera.stop(clean=True)
+
+
+def test_invalid_mode(raw_recording):
+    """Unknown replay modes are rejected."""
+    with pytest.raises(ValueError):
+        ReplayCamera(raw_recording, mode="slow")
+
+
+def test_model_add_video_source_path(raw_recording):
+    """A recording path added to the model becomes a replay camera."""
+    model = Model()
+    camera = model.add_video_source(raw_recording, mode="step")
+    assert isinstance(camera, ReplayCamera)
+    assert model.cameras == [camera]
+    assert model.nPySpinCameras == 1
+    assert model.cameras_sn == ["12345"]
+
+
+def burst_path(tmp_path):
+    """Return the single burst directory written into tmp_path."""
+    bursts = [p for p in tmp_path.iterdir() if p.name.endswith("_burst.raw")]
+    assert len(bursts) == 1
+    return str(bursts[0])
+
+
+def test_burst_from_frame_history(raw_recording, tmp_path):
+    """A burst saves the frames of the history within the window around the trigger."""
+    camera = ReplayCamera(raw_recording, mode="fast")
+    assert camera.save_burst(str(tmp_path)) is None  # History not enabled
+    assert camera.enable_frame_history(seconds=1.0) == 21
+    camera.begin_continuous_acquisition()
+    wait_until_finished(camera)
+
+    trigger_ts = START_NS + 2 * INTERVAL_NS
+    thread = camera.save_burst(
+        str(tmp_path), trigger_ts=trigger_ts, pre_seconds=0.06, post_seconds=0.06,
+        custom_name="cam",
+    )
+    thread.join(5)
+    assert not thread.is_alive()
+
+    burst = RawRecordingReader(burst_path(tmp_path))
+    assert [int(ts) for ts in burst.timestamps] == [
+        START_NS + i * INTERVAL_NS for i in (1, 2, 3)
+    ]
+    assert [int(frame[0, 0]) for _, _, frame in burst] == [10, 20, 30]
+    assert burst.metadata["trigger_timestamp"] == trigger_ts
+    camera.stop(clean=True)
+
+
+def test_shares_acquisition_state(raw_recording):
+    """The replay camera has the ROI and clock state of the PySpin cameras."""
+    camera = ReplayCamera(raw_recording, mode="fast")
+    assert camera.roi is None
+    camera.request_roi((0, 0, 20, 10))
+    camera.clear_roi()
+    assert camera.device_clock is not None
+    assert camera.frame_history is None
@@ -104,7 +104,7 @@ def test_reticle_detect_manager_found_coords_signal(test_frame, qt_application):
 
 # Test the cleanup function of ReticleDetectManager
 def test_reticle_detect_manager_cleanup(test_frame, qt_application):
-    """Test that ReticleDetectManager properly cleans up its threads."""
+    """Test that ReticleDetectManager properly cleans up its worker and scheduler job."""
     
     # Initialize ReticleDetectManager
     camera_name = "TestCamera123"
@@ -119,11 +119,11 @@ def test_reticle_detect_manager_cleanup(test_frame, qt_application):
     # Wait for some time to ensure processing has started
     time.sleep(1)
 
-    # Call the clean method to clean up threads
+    # Call the clean method to clean up the job
     detect_manager.clean()
 
-    # Ensure the thread and worker are cleaned up
-    assert detect_manager.thread is None, "Thread was not cleaned up"
+    # Ensure the job and worker are cleaned up
+    assert detect_manager.job is None, "Job was not cleaned up"
     assert detect_manager.worker is None, "Worker was not cleaned up"
 
     # Stop the ReticleDetectManager
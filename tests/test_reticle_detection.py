@@ -45,3 +45,69 @@ def test_get_coords(reticle_detection, test_image):
     assert all(isinstance(line, np.ndarray) for line in inliner_lines_pixels), "All inlier pixel sets should be numpy arrays"
     assert all(len(line) > 0 for line in inliner_lines_pixels), "Each set of inlier pixels should contain points"
     assert processed_img.shape == IMG_SIZE, f"Processed image shape mismatch: expected {IMG_SIZE}, got {processed_img.shape}"
+
+
+def test_get_reticle_zone_from_calibration():
+    """The reticle zone is drawn along the projected reticle axes without a frame."""
+    reticle = ReticleDetection((1000, 750), MaskGenerator(), CAMERA_NAME)
+    mtx = np.array([[1.54e4, 0, 2000], [0, 1.54e4, 1500], [0, 0, 1]], dtype=np.float32)
+    dist = np.zeros((1, 5), dtype=np.float32)
+    # Reticle centered in front of the camera, axes parallel to the image axes
+    rvecs = (np.zeros((3, 1)),)
+    tvecs = (np.array([[0.0], [0.0], [20.0]]),)
+    zone = reticle.get_reticle_zone_from_calibration([mtx, dist, rvecs, tvecs])
+
+    assert zone.shape == (750, 1000)
+    assert zone[375, 50] == 255 and zone[375, 950] == 255  # x-axis
+    assert zone[50, 500] == 255 and zone[700, 500] == 255  # y-axis
+    assert zone[100, 100] == 0
+    assert reticle.get_reticle_zone_from_calibration(None) is None
+
+def reticle_ticks(rng, angle=7, spacing=60, n_noise=200):
+    """Centroids of the ticks of two perpendicular reticle axes and of noise."""
+    t = np.arange(-30, 31)
+    theta = np.deg2rad(angle)
+    center = np.array([2000, 1500])
+    x_axis = center + np.outer(t * spacing, [np.cos(theta), np.sin(theta)])
+    y_axis = center + np.outer(t[t != 0] * spacing, [-np.sin(theta), np.cos(theta)])
+    ticks = np.vstack([x_axis, y_axis]) + rng.normal(0, 0.7, (len(x_axis) + len(y_axis), 2))
+    noise = rng.uniform([0, 0], [4000, 3000], (n_noise, 2))
+    points = np.rint(np.vstack([ticks, noise])).astype(int)
+    rng.shuffle(points)
+    return points
+
+def test_find_lines(reticle_detection):
+    """Both reticle axes are found through the ticks, the noise is left out."""
+    points = reticle_ticks(np.random.default_rng(0))
+    lines, line_pixels = reticle_detection._find_lines(points)
+
+    assert len(lines) == 2
+    assert sorted(len(pixels) for pixels in line_pixels) == [60, 61]
+    directions = [np.abs(reticle_detection._line_params(line)[1]) for line in lines]
+    expected = [np.cos(np.deg2rad(7)), np.sin(np.deg2rad(7))]
+    assert any(np.allclose(d, expected, atol=1e-2) for d in directions)
+    assert any(np.allclose(d, expected[::-1], atol=1e-2) for d in directions)
+    # Deterministic
+    _, line_pixels_again = reticle_detection._find_lines(points)
+    assert all(np.array_equal(a, b) for a, b in zip(line_pixels, line_pixels_again))
+
+def test_find_lines_gives_up_on_noise(reticle_detection, mocker):
+    """Without lines the search ends after its bounded number of checks."""
+    points = np.rint(np.random.default_rng(1).uniform([0, 0], [4000, 3000], (300, 2))).astype(int)
+    candidates = mocker.spy(reticle_detection, "_hough_line_candidates")
+    consensus = mocker.spy(reticle_detection, "_line_consensus")
+    lines, line_pixels = reticle_detection._find_lines(points, max_candidates=10)
+    assert (lines, line_pixels) == ([], [])
+    # One candidate search, each candidate checked at most at every residual threshold
+    assert candidates.call_count == 1
+    assert consensus.call_count <= len(range(2, 17)) * len(candidates.spy_return)
+
+def test_detect_lines(reticle_detection):
+    """The lines are detected through the centroids of the ticks in an image."""
+    img = np.zeros((3000, 4000), dtype=np.uint8)
+    for x, y in reticle_ticks(np.random.default_rng(2), spacing=45, n_noise=50):
+        cv2.circle(img, (int(x), int(y)), 5, 255, -1)
+    ret, lines, line_pixels = reticle_detection._detect_lines(img)
+    assert ret
+    assert all(len(pixels) >= 60 for pixels in line_pixels)
+    assert reticle_detection._detect_lines(np.zeros((3000, 4000), np.uint8))[0] is False
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from parallax.camera import PySpinCamera
+from parallax.roi_tracker import RoiTracker
+
+
+@pytest.fixture
+def tracker():
+    """Fixture for a tracker on a 4000x3000 sensor."""
+    return RoiTracker(full_size=(4000, 3000), min_size=(1000, 750), max_lost=3)
+
+
+def test_first_detection_centers_min_roi(tracker):
+    """The first detection narrows the acquisition to the minimum ROI around the tip."""
+    roi = tracker.update((2000, 1500))
+    x, y, w, h = roi
+    assert (w, h) == (1000, 752)  # Height aligned to the size increment
+    assert x % 2 == 0 and y % 2 == 0
+    assert x <= 2000 <= x + w and y <= 1500 <= y + h
+
+
+def test_roi_kept_while_tip_inside(tracker):
+    """Small tip movements inside the ROI do not reprogram the camera."""
+    tracker.update((2000, 1500))
+    assert tracker.update((2100, 1550)) is None
+
+
+def test_roi_recentred_near_border(tracker):
+    """The ROI is recentred when the tip enters its border."""
+    first = tracker.update((2000, 1500))
+    roi = tracker.update((first[0] + first[2] - 10, 1500))
+    assert roi is not None
+    assert roi[2:] == first[2:]
+    assert roi[0] > first[0]
+
+
+def test_roi_clamped_to_sensor(tracker):
+    """The ROI stays inside the sensor at the image corners."""
+    x, y, w, h = tracker.update((5, 2995))
+    assert x == 0
+    assert y + h <= 3000
+
+
+def test_lost_widens_to_full_frame(tracker):
+    """The ROI grows after max_lost frames without detection, up to the full frame."""
+    assert tracker.lost() is None  # Not tracking yet
+    tracker.update((2000, 1500))
+    sizes = []
+    for _ in range(12):
+        roi = tracker.lost()
+        if roi is not None:
+            sizes.append(roi[2:])
+    assert sizes[0] == (2000, 1504)
+    assert sizes[-1] == (4000, 3000)
+    assert tracker.roi == tracker.full_frame
+
+
+def test_detection_resets_lost_count(tracker):
+    """A detection in between resets the lost frame count."""
+    tracker.update((2000, 1500))
+    tracker.lost()
+    tracker.lost()
+    tracker.update((2000, 1500))
+    assert tracker.lost() is None
+
+
+def test_roi_frame_pasted_into_full_frame():
+    """ROI frames are stored at their position in the full frame."""
+    camera = PySpinCamera.__new__(PySpinCamera)
+    camera.width, camera.height = 40, 30
+    camera._roi_canvas = None
+    roi_frame = np.full((10, 8), 7, dtype=np.uint8)
+    frame = camera._to_full_frame(roi_frame, 12, 6)
+    assert frame.shape == (30, 40)
+    assert np.all(frame[6:16, 12:20] == 7)
+    assert frame.sum() == roi_frame.sum()
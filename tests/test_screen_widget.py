@@ -4,6 +4,8 @@ import numpy as np
 from unittest.mock import Mock
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtCore import Qt, QPoint
+from parallax.frame_buffer import FrameRingBuffer
+from parallax.frame_products import FrameProductsCache
 from parallax.screen_widget import ScreenWidget
 
 @pytest.fixture(scope="function")
@@ -57,14 +59,36 @@ def test_set_data(screen_widget, mock_camera):
     # Call set_data to process the image
     screen_widget.set_data(data)
 
-    # Assert that each filter's process method was called with the data
-    screen_widget.filter.process.assert_called_once_with(data)
-    screen_widget.axisFilter.process.assert_called_once_with(data)
-    screen_widget.reticleDetector.process.assert_called_once_with(data)
+    # Assert that each filter's process method was called with the data and frame ID
+    frame_id = screen_widget.camera.get_last_frame_id.return_value
+    screen_widget.filter.process.assert_called_once_with(data, frame_id=frame_id)
+    screen_widget.axisFilter.process.assert_called_once_with(data, frame_id=frame_id)
+    screen_widget.reticleDetector.process.assert_called_once_with(
+        data, None, frame_id=frame_id
+    )
     screen_widget.probeDetector.process.assert_called_once_with(
-        data, screen_widget.camera.get_last_capture_time.return_value
+        data,
+        screen_widget.camera.get_last_capture_timestamp.return_value,
+        frame_id=frame_id,
+        products=None,
     )
 
+def test_refresh_skips_frames_already_shown(screen_widget, mock_camera):
+    """A refresh without a new camera frame does not debayer or process it again."""
+    screen_widget.is_displayed = Mock(return_value=True)
+    products = Mock(frame_id=7, timestamp=0)
+    mock_camera.get_frame_products.return_value = products
+    screen_widget.set_data = Mock()
+
+    screen_widget.refresh()
+    screen_widget.refresh()
+    assert screen_widget.set_data.call_count == 1
+    products.bgr.assert_called_once()
+
+    products.frame_id = 8
+    screen_widget.refresh()
+    assert screen_widget.set_data.call_count == 2
+
 def test_start_and_stop_acquisition_camera(screen_widget, mock_camera):
     # Mock the methods for camera acquisition
     mock_camera.begin_continuous_acquisition = Mock()
@@ -99,4 +123,77 @@ def test_zoom_out(screen_widget):
     screen_widget.zoom_out()
 
     # Verify that autoRange was called
-    screen_widget.view_box.autoRange.assert_called_once()
\ No newline at end of file
+    screen_widget.view_box.autoRange.assert_called_once()
+
+def test_display_is_decimated_in_full_frame_coordinates(screen_widget):
+    """The displayed image is decimated and placed in full-frame pixel coordinates."""
+    screen_widget.resize(400, 300)
+    screen_widget.is_displayed = Mock(return_value=True)
+    screen_widget.zoom_out()
+    data = np.zeros((3000, 4000), dtype=np.uint8)
+    screen_widget.set_image_item_from_data(data)
+
+    image = screen_widget.image_item.image
+    assert image.shape[0] < 3000 and image.shape[1] < 4000
+    bounds = screen_widget.image_item.mapRectToParent(screen_widget.image_item.boundingRect())
+    assert bounds.width() == pytest.approx(4000, abs=20)
+    assert bounds.height() == pytest.approx(3000, abs=20)
+
+def test_hidden_screen_is_refreshed_at_keepalive_rate(screen_widget, mock_camera):
+    """A hidden screen without detection skips refreshes and does not render."""
+    screen_widget.is_displayed = Mock(return_value=False)
+    screen_widget.set_data = Mock()
+    products = Mock(frame_id=0, timestamp=0)
+    mock_camera.get_frame_products.return_value = products
+    for frame_id in range(5):
+        products.frame_id = frame_id
+        screen_widget.refresh()
+    assert screen_widget.set_data.call_count == 1
+
+    screen_widget.set_image_item_from_data(np.zeros((300, 400), dtype=np.uint8))
+    assert screen_widget.image_item.image is None
+
+def test_hidden_screen_keeps_detection(screen_widget, mock_camera):
+    """A hidden screen running a required detection is refreshed at the full rate."""
+    screen_widget.is_displayed = Mock(return_value=False)
+    screen_widget.set_data = Mock()
+    screen_widget.probeDetector.is_running = Mock(return_value=True)
+    products = Mock(frame_id=0, timestamp=0)
+    mock_camera.get_frame_products.return_value = products
+    for frame_id in range(5):
+        products.frame_id = frame_id
+        screen_widget.refresh()
+    assert screen_widget.set_data.call_count == 5
+
+def test_roi_widened_only_after_missed_detection(screen_widget, mock_camera):
+    """Refreshes do not count as lost frames, only detections without a tip do."""
+    screen_widget.is_displayed = Mock(return_value=True)
+    screen_widget.set_data = Mock()
+    screen_widget.roi_tracker = Mock()
+    screen_widget.roi_tracker.lost.return_value = (0, 0, 2048, 1536)
+    products = Mock(frame_id=0, timestamp=0)
+    mock_camera.get_frame_products.return_value = products
+    for frame_id in range(3):
+        products.frame_id = frame_id
+        screen_widget.refresh()
+    screen_widget.roi_tracker.lost.assert_not_called()
+
+    screen_widget.probeDetector.detection_missed.emit(0, 2)
+    screen_widget.roi_tracker.lost.assert_called_once()
+    mock_camera.request_roi.assert_called_once_with((0, 0, 2048, 1536))
+
+def test_refresh_passes_frames_outside_the_ring_buffer(screen_widget, mock_camera):
+    """The frame sent to the workers and kept for display is not a ring buffer slot."""
+    frame_buffer = FrameRingBuffer(n_slots=4)
+    cache = FrameProductsCache(frame_buffer, pixelformat="Mono")
+    mock_camera.get_frame_products.side_effect = cache.get
+    screen_widget.is_displayed = Mock(return_value=True)
+    screen_widget.set_data = Mock()
+    frame_buffer.write(np.zeros((30, 40), dtype=np.uint8), timestamp=0)
+
+    screen_widget.refresh()
+    data = screen_widget.set_data.call_args.args[0]
+    for value in range(1, 5):
+        frame_buffer.write(np.full((30, 40), value, dtype=np.uint8))
+    assert not np.shares_memory(data, frame_buffer.slots)
+    assert not data.any()
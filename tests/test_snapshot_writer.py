@@ -0,0 +1,73 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+from PyQt5.QtWidgets import QApplication
+
+from parallax.snapshot_writer import SnapshotWriter
+
+
+@pytest.fixture
+def bayer_frame():
+    """Fixture for a random Bayer frame."""
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 255, (60, 80), dtype=np.uint8)
+
+
+@pytest.fixture
+def writer():
+    """Fixture for a snapshot writer with two workers."""
+    writer = SnapshotWriter(max_workers=2)
+    yield writer
+    writer.shutdown()
+
+
+@pytest.mark.parametrize("snapshot_format", ["png", "tiff"])
+def test_color_formats(writer, bayer_frame, tmpdir, snapshot_format):
+    """PNG and TIFF snapshots hold the debayered image, lossless."""
+    writer.set_format(snapshot_format)
+    futures = writer.save([(bayer_frame, "BayerRG8", os.path.join(tmpdir, "cam"))])
+    path = futures[0].result()
+    assert path.endswith(f".{snapshot_format}")
+    saved = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+    np.testing.assert_array_equal(saved, cv2.cvtColor(bayer_frame, cv2.COLOR_BayerRG2RGB))
+
+
+def test_npy_keeps_raw_frame(writer, bayer_frame, tmpdir):
+    """NPY snapshots hold the raw frame."""
+    writer.set_format("npy")
+    path = writer.save([(bayer_frame, "BayerRG8", os.path.join(tmpdir, "cam"))])[0].result()
+    np.testing.assert_array_equal(np.load(path), bayer_frame)
+
+
+def test_finished_signal(writer, bayer_frame, tmpdir):
+    """finished is emitted once with the paths of all saved snapshots."""
+    app = QApplication.instance() or QApplication([])
+    emitted = []
+    writer.finished.connect(emitted.append)
+    snapshots = [
+        (bayer_frame, "BayerRG8", os.path.join(tmpdir, f"cam{i}")) for i in range(3)
+    ]
+    futures = writer.save(snapshots)
+    for future in futures:
+        future.result()
+    writer.shutdown()
+    # The signal is emitted on a worker thread and delivered by the event loop
+    app.processEvents()
+    assert len(emitted) == 1
+    assert sorted(emitted[0]) == sorted(future.result() for future in futures)
+
+
+def test_failed_snapshot_left_out(writer, bayer_frame, tmpdir):
+    """A snapshot that cannot be written returns None."""
+    missing_dir = os.path.join(tmpdir, "missing", "cam")
+    assert writer.save([(bayer_frame, "BayerRG8", missing_dir)])[0].result() is None
+
+
+def test_invalid_format():
+    """Unknown formats and compression levels are rejected."""
+    with pytest.raises(ValueError):
+        SnapshotWriter(snapshot_format="jpg")
+    with pytest.raises(ValueError):
+        SnapshotWriter(png_compression=12)
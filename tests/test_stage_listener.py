@@ -105,4 +105,20 @@ def test_clear_global_data_transform(mock_get, stage_listener):
     stage_listener.requestUpdateGlobalDataTransformM(sn, transM, scale)
     stage_listener.requestClearGlobalDataTransformM()
     assert stage_listener.transM_dict == {}
-    assert stage_listener.scale_dict == {}
\ No newline at end of file
+    assert stage_listener.scale_dict == {}
+
+@patch('requests.get', return_value=mock_get_request(mock_status_response()))
+def test_find_closest_local_coords(mock_get, stage_listener):
+    """Test that the latest stage position before the image capture time (ns) is found."""
+    stage_listener.buffer_ts_local_coords.append((1_000_000_000, [1, 1, 1]))
+    stage_listener.buffer_ts_local_coords.append((1_050_000_000, [2, 2, 2]))
+    stage_listener.buffer_ts_local_coords.append((1_200_000_000, [3, 3, 3]))
+
+    stage_listener.ts_img_captured = 1_100_000_000
+    ts, coords = stage_listener._find_closest_local_coords()
+    assert ts == 1_050_000_000
+    assert coords == [2, 2, 2]
+
+    # No stage position before the image capture
+    stage_listener.ts_img_captured = 900_000_000
+    assert stage_listener._find_closest_local_coords() == (None, None)
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from parallax.calibration_camera import CalibrationCamera
+from parallax.camera import MockCamera
+from parallax.mask_generator import MaskGenerator
+from parallax.model import Model
+from parallax.reticle_detection import ReticleDetection
+from parallax.reticle_detection_coords_interests import ReticleDetectCoordsInterest
+from parallax.synthetic_camera import PROBE_LEVEL, RETICLE_LEVEL, SyntheticCamera
+
+
+@pytest.fixture(scope="module")
+def synthetic_frame():
+    """Fixture for a noisy, blurred synthetic frame and its camera."""
+    camera = SyntheticCamera(noise=8, blur=5, seed=1)
+    return camera, camera.get_last_image_data().copy()
+
+
+def test_seeded_cameras_do_not_share_noise():
+    """Cameras with the same seed render the same noise, in any order."""
+    first = SyntheticCamera(width=400, height=300, noise=8, seed=3)
+    second = SyntheticCamera(width=400, height=300, noise=8, seed=3)
+    first_frame = first.get_last_image_data().copy()
+    assert np.array_equal(second.get_last_image_data(), first_frame)
+    assert not np.array_equal(first.get_last_image_data(), first_frame)
+
+
+def test_frames_are_rendered_into_reused_buffers():
+    """Frames are rendered into the same buffers in turn."""
+    camera = SyntheticCamera(width=400, height=300)
+    frames = [camera.get_last_image_data() for _ in range(3)]
+    assert frames[0].shape == (300, 400)
+    assert frames[0].dtype == np.uint8
+    assert frames[2] is frames[0]
+    assert frames[1] is not frames[0]
+    assert camera.get_last_frame_id() == 2
+    assert camera.get_last_capture_timestamp() is not None
+    assert isinstance(camera, MockCamera)
+
+
+def test_probe_is_drawn_at_its_pose():
+    """The probe tip is drawn at its projected position and follows its pose."""
+    camera = SyntheticCamera(width=800, height=600)
+    frame = camera.render()
+    x, y = np.round(camera.get_probe_tip_coords()).astype(int)
+    assert frame[y, x] < (PROBE_LEVEL + RETICLE_LEVEL) / 2
+
+    camera.set_probe_pose((-1.0, 1.0, 0.5))
+    x2, y2 = np.round(camera.get_probe_tip_coords()).astype(int)
+    assert (x2, y2) != (x, y)
+    assert camera.render()[y2, x2] < (PROBE_LEVEL + RETICLE_LEVEL) / 2
+
+
+def test_reticle_detection_and_calibration_recover_the_pose(synthetic_frame):
+    """Reticle detection finds the ticks and calibration recovers the camera pose."""
+    camera, frame = synthetic_frame
+    detection = ReticleDetection((4000, 3000), MaskGenerator(initial_detect=True), "syn")
+    ret, _, _, pixels_in_lines = detection.get_coords(frame)
+    assert ret
+
+    ret, x_axis, y_axis = ReticleDetectCoordsInterest().get_coords_interest(pixels_in_lines)
+    assert ret
+    x_truth, y_truth = camera.get_reticle_coords()
+    center = len(x_truth) // 2
+    n = len(x_axis) // 2
+    assert np.abs(x_axis - x_truth[center - n:center + n + 1]).max() <= 5
+    assert np.abs(y_axis - y_truth[center - n:center + n + 1]).max() <= 5
+
+    ret, _, _, rvecs, tvecs = CalibrationCamera("syn").calibrate_camera(x_axis, y_axis)
+    assert ret
+    assert np.allclose(rvecs[0].ravel(), camera.rvec.ravel(), atol=0.02)
+    assert np.allclose(tvecs[0].ravel(), camera.tvec.ravel(), atol=0.5)
+
+
+def test_model_adds_synthetic_cameras():
+    """The model adds synthetic cameras in place of noise mock cameras."""
+    model = Model()
+    model.add_mock_cameras(n=2, synthetic=True)
+    assert all(isinstance(camera, SyntheticCamera) for camera in model.cameras)
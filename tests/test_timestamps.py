@@ -0,0 +1,36 @@
+import time
+from datetime import datetime
+
+from parallax.timestamps import DeviceClockMapper, format_timestamp_ns
+
+
+def test_format_timestamp_ns():
+    """Timestamps are formatted like the capture time strings."""
+    ts_ns = int(datetime(2024, 5, 6, 7, 8, 9).timestamp()) * 1_000_000_000 + 123_456_789
+    assert format_timestamp_ns(ts_ns) == "20240506-070809"
+    assert format_timestamp_ns(ts_ns, millisecond=True) == "20240506-070809.123"
+    assert format_timestamp_ns(None) is None
+
+
+def test_format_timestamp_ns_matches_host_clock():
+    """Formatting time.time_ns() gives the current local time."""
+    now = time.time_ns()
+    expected = datetime.fromtimestamp(now // 1_000_000_000).strftime("%Y%m%d-%H%M%S")
+    assert format_timestamp_ns(now) == expected
+
+
+def test_device_clock_mapper():
+    """Device timestamps are shifted by the latched offset."""
+    mapper = DeviceClockMapper(relatch_interval=10.0)
+    assert not mapper.is_valid
+    assert mapper.to_host(5) is None
+    assert mapper.needs_update(0)
+
+    mapper.update(device_ns=1_000, host_ns=1_700_000_000_000_000_000)
+    assert mapper.is_valid
+    assert mapper.to_host(3_000) == 1_700_000_000_000_002_000
+    assert not mapper.needs_update(1_700_000_000_000_000_000 + 9_000_000_000)
+    assert mapper.needs_update(1_700_000_000_000_000_000 + 10_000_000_000)
+
+    mapper.invalidate()
+    assert not mapper.is_valid
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from unittest.mock import Mock
+
+from parallax.tip_predictor import TipPredictor
+
+MTX = np.array([[1.54e4, 0, 2000], [0, 1.54e4, 1500], [0, 0, 1]], dtype=np.float64)
+DIST = np.zeros((1, 5))
+RVEC = np.zeros((3, 1))
+TVEC = np.array([[0.0], [0.0], [20.0]])
+
+
+@pytest.fixture
+def model():
+    """Model with one calibrated camera and stage, local and global coordinates equal."""
+    model = Mock()
+    model.stage = Mock(stage_x=0.0, stage_y=0.0, stage_z=0.0)
+    model.get_stage.return_value = model.stage
+    model.get_transform.return_value = [np.eye(4), np.ones(3)]
+    model.get_camera_intrinsic.return_value = [MTX, DIST, (RVEC,), (TVEC,)]
+    return model
+
+
+def test_predict_follows_stage(model):
+    """The predicted tip moves by the projected stage motion."""
+    predictor = TipPredictor(model, "CameraA", (4000, 3000), (1000, 750))
+    assert predictor.predict("SN1") is None  # No tip detected yet
+
+    predictor.set_anchor("SN1", (300, 200))
+    assert predictor.predict("SN1") == (300, 200)
+
+    model.stage.stage_x = 100.0  # 100 um along x
+    expected_dx = 1.54e4 * 0.1 / 20 / 4  # Projected shift in the resized image
+    assert predictor.predict("SN1") == (round(300 + expected_dx), 200)
+
+
+def test_predict_without_calibration(model):
+    """No prediction is made for an uncalibrated stage."""
+    model.get_transform.return_value = None
+    predictor = TipPredictor(model, "CameraA", (4000, 3000), (1000, 750))
+    predictor.set_anchor("SN1", (300, 200))
+    assert predictor.predict("SN1") is None
@@ -53,3 +53,17 @@ def test_is_point_on_crop_region():
 
     # Point outside the boundary should return False
     assert UtilsCrops.is_point_on_crop_region(point_outside, top, bottom, left, right) == False, "Point should not be on the boundary."
+
+
+def test_get_crop_sizes():
+    """Test the linear and hierarchical crop size sequences."""
+    assert UtilsCrops.get_crop_sizes(50, (300, 200)) == [50, 150, 250]
+    # Hierarchical sizes double and end with the whole image
+    assert UtilsCrops.get_crop_sizes(50, (1000, 750), hierarchical=True) == [50, 100, 200, 400, 800, 1000]
+
+
+def test_shift_to_predicted_tip():
+    """Test moving the tip and base by the predicted tip motion."""
+    tip, base = UtilsCrops.shift_to_predicted_tip((100, 100), (150, 180), (120.4, 90))
+    assert tip == (120, 90)
+    assert base == (170, 170)
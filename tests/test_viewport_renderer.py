@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from parallax.viewport_renderer import ViewportRenderer
+
+
+@pytest.fixture
+def frame():
+    """Fixture for a 4000x3000 frame with distinct pixel values."""
+    return np.arange(3000 * 4000, dtype=np.uint32).reshape(3000, 4000)
+
+
+def test_full_view_is_decimated_to_view_size(frame):
+    """The full frame shown in a small view is decimated to about the view size."""
+    renderer = ViewportRenderer(margin=0)
+    image, rect = renderer.render(frame, ((0, 4000), (0, 3000)), (400, 300))
+    assert image.shape == (300, 400)
+    assert rect == (0, 0, 4000, 3000)
+    assert image[1, 1] == frame[10, 10]
+
+
+def test_zoomed_in_view_is_native_crop(frame):
+    """When zoomed in beyond one pixel per device pixel, the crop is at native resolution."""
+    renderer = ViewportRenderer(margin=0)
+    image, rect = renderer.render(frame, ((1000, 1200), (500, 650)), (400, 300))
+    assert rect == (1000, 500, 200, 150)
+    np.testing.assert_array_equal(image, frame[500:650, 1000:1200])
+
+
+def test_margin_and_clipping(frame):
+    """The margin extends the crop, clipped to the frame."""
+    renderer = ViewportRenderer(margin=0.5)
+    _, rect = renderer.render(frame, ((0, 400), (0, 300)), (400, 300))
+    assert rect == (0, 0, 600, 450)
+
+
+def test_view_outside_frame(frame):
+    """Nothing is rendered when the view does not overlap the frame."""
+    renderer = ViewportRenderer()
+    assert renderer.render(frame, ((5000, 6000), (0, 300)), (400, 300)) == (None, None)
+
+
+def test_crop_aligned_to_decimation(frame):
+    """The crop origin is a multiple of the decimation factor."""
+    renderer = ViewportRenderer(margin=0)
+    x0, y0, _, _, factor = renderer.get_region(frame.shape, ((1003, 3003), (7, 1507)), (500, 375))
+    assert factor == 4
+    assert x0 % factor == 0 and y0 % factor == 0